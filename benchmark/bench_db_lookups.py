@@ -0,0 +1,183 @@
+"""
+Benchmark of the *_db lookups of ORCA Network Library against a populated Neo4j.
+
+The script populates the configured Neo4j with synthetic devices in the
+198.18.0.0/15 benchmarking range (RFC 2544), measures the latency of the existing
+*_db lookups, and removes the synthetic devices again.
+With the default arguments more than 50k nodes are created.
+
+Usage:
+    python benchmark/bench_db_lookups.py [--devices 100] [--interfaces 128] [--vlans 100]
+                                         [--rounds 200] [--drop-indexes]
+
+--drop-indexes drops the indexes declared in orca_nw_lib.db_schema first,
+measures, installs the indexes again and measures once more,
+so that latency with and without indexes can be compared.
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from neomodel import db
+
+from orca_nw_lib.bgp_db import get_bgp_neighbor_from_db
+from orca_nw_lib.db_schema import DB_INDEXES, drop_db_index, install_db_schema
+from orca_nw_lib.device_db import get_device_db_obj
+from orca_nw_lib.interface_db import (
+    get_interface_by_alias_from_db,
+    get_interface_of_device_from_db,
+    get_sub_interface_from_db,
+)
+from orca_nw_lib.stp_port_db import get_stp_port_members_from_db
+from orca_nw_lib.vlan_db import get_vlan_obj_from_db, get_vlan_obj_from_db_using_id
+
+BENCH_IP_PREFIX = "198.18."
+
+
+def _device_ip(indx: int) -> str:
+    return f"{BENCH_IP_PREFIX}{indx // 256}.{indx % 256}"
+
+
+def _sub_if_ip(dev: int, intf: int) -> str:
+    return f"10.{dev % 256}.{intf // 256}.{intf % 256}"
+
+
+def populate(devices: int, interfaces: int, vlans: int, neighbors: int) -> int:
+    """Creates the synthetic topology and returns the number of nodes created."""
+    for d in range(devices):
+        db.cypher_query(
+            """
+            CREATE (dev:Device {mgt_ip: $ip, mac: $mac})
+            WITH dev
+            UNWIND range(0, $interfaces - 1) AS i
+            CREATE (dev)-[:HAS]->(intf:Interface {name: 'Ethernet' + toString(i * 4),
+                                                   alias: 'Eth1/' + toString(i + 1)})
+            CREATE (intf)-[:HAS]->(:SubInterface {ip_address: $sub_ips[i], prefix: 31})
+            CREATE (dev)-[:HAS]->(:STP_PORT {if_name: 'Ethernet' + toString(i * 4)})
+            WITH DISTINCT dev
+            UNWIND range(1, $vlans) AS v
+            CREATE (dev)-[:HAS]->(:Vlan {vlanid: v, name: 'Vlan' + toString(v)})
+            WITH DISTINCT dev
+            UNWIND range(0, $neighbors - 1) AS n
+            CREATE (dev)-[:HAS]->(:BGP_NEIGHBOR {neighbor_ip: '172.16.' + toString(n) + '.1'})
+            """,
+            {
+                "ip": _device_ip(d),
+                "mac": f"bench:{d}",
+                "interfaces": interfaces,
+                "vlans": vlans,
+                "neighbors": neighbors,
+                "sub_ips": [_sub_if_ip(d, i) for i in range(interfaces)],
+            },
+        )
+    return devices * (1 + 3 * interfaces + vlans + neighbors)
+
+
+def cleanup():
+    """Removes the synthetic topology."""
+    db.cypher_query(
+        """
+        MATCH (d:Device) WHERE d.mgt_ip STARTS WITH $prefix
+        OPTIONAL MATCH (d)-[:HAS*1..2]->(n)
+        DETACH DELETE n, d
+        """,
+        {"prefix": BENCH_IP_PREFIX},
+    )
+
+
+def measure(name: str, func, args_gen, rounds: int):
+    latencies = []
+    for _ in range(rounds):
+        args = args_gen()
+        start = time.perf_counter()
+        func(*args)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    print(
+        f"{name:<40} mean {statistics.mean(latencies):8.2f} ms   "
+        f"p50 {latencies[len(latencies) // 2]:8.2f} ms   "
+        f"p99 {latencies[int(len(latencies) * 0.99) - 1]:8.2f} ms"
+    )
+
+
+def run_lookups(devices: int, interfaces: int, vlans: int, neighbors: int, rounds: int):
+    rand_dev = lambda: _device_ip(random.randrange(devices))
+    rand_if = lambda: random.randrange(interfaces)
+    measure("get_device_db_obj", get_device_db_obj, lambda: (rand_dev(),), rounds)
+    measure(
+        "get_interface_of_device_from_db",
+        get_interface_of_device_from_db,
+        lambda: (rand_dev(), f"Ethernet{rand_if() * 4}"),
+        rounds,
+    )
+    measure(
+        "get_interface_by_alias_from_db",
+        get_interface_by_alias_from_db,
+        lambda: (rand_dev(), f"Eth1/{rand_if() + 1}"),
+        rounds,
+    )
+    measure(
+        "get_sub_interface_from_db",
+        get_sub_interface_from_db,
+        lambda: (_sub_if_ip(random.randrange(devices), rand_if()),),
+        rounds,
+    )
+    measure(
+        "get_vlan_obj_from_db",
+        get_vlan_obj_from_db,
+        lambda: (rand_dev(), f"Vlan{random.randint(1, vlans)}"),
+        rounds,
+    )
+    measure(
+        "get_vlan_obj_from_db_using_id",
+        get_vlan_obj_from_db_using_id,
+        lambda: (rand_dev(), random.randint(1, vlans)),
+        rounds,
+    )
+    measure(
+        "get_bgp_neighbor_from_db",
+        get_bgp_neighbor_from_db,
+        lambda: (rand_dev(), f"172.16.{random.randrange(neighbors)}.1"),
+        rounds,
+    )
+    measure(
+        "get_stp_port_members_from_db",
+        get_stp_port_members_from_db,
+        lambda: (rand_dev(), f"Ethernet{rand_if() * 4}"),
+        rounds,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--interfaces", type=int, default=128)
+    parser.add_argument("--vlans", type=int, default=100)
+    parser.add_argument("--neighbors", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--drop-indexes", action="store_true")
+    args = parser.parse_args()
+
+    cleanup()
+    start = time.perf_counter()
+    nodes = populate(args.devices, args.interfaces, args.vlans, args.neighbors)
+    print(f"Created {nodes} nodes in {time.perf_counter() - start:.1f} s")
+    lookup_args = (args.devices, args.interfaces, args.vlans, args.neighbors, args.rounds)
+    try:
+        if args.drop_indexes:
+            for name, _, _ in DB_INDEXES:
+                drop_db_index(name)
+            print("\nWithout indexes:")
+            run_lookups(*lookup_args)
+            install_db_schema()
+            db.cypher_query("CALL db.awaitIndexes(300)")
+            print("\nWith indexes:")
+        run_lookups(*lookup_args)
+    finally:
+        cleanup()
+
+
+if __name__ == "__main__":
+    main()
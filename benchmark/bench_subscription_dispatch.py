@@ -0,0 +1,143 @@
+"""
+Benchmark of the routing of gNMI subscription updates to their handlers.
+
+The script builds synthetic interface, port group, STP port, system, CRM and DOM updates
+and measures how many updates per second are routed to their handlers,
+with the previous routing, which builds the gNMI paths of every handler for every
+prefix element of every update, and with the dispatch table built once per subscription.
+Handlers are replaced by no-ops, so that only the routing is measured.
+
+Usage:
+    python benchmark/bench_subscription_dispatch.py [--updates 100000]
+"""
+
+import argparse
+import time
+
+from orca_nw_lib.device_gnmi import get_device_state_url
+from orca_nw_lib.dom_gnmi import get_dom_path
+from orca_nw_lib.gnmi_pb2 import (
+    Notification,
+    Path,
+    PathElem,
+    SubscribeResponse,
+    TypedValue,
+    Update,
+)
+from orca_nw_lib.gnmi_sub import dispatch_update, get_subscription_handlers
+from orca_nw_lib.interface_gnmi import get_interface_base_path
+from orca_nw_lib.portgroup_gnmi import _get_port_groups_base_path
+from orca_nw_lib.stp_port_gnmi import get_stp_port_path
+from orca_nw_lib.system_gnmi import get_crm_stats_path, get_system_base_path
+from orca_nw_lib.utils import get_telemetry_db
+
+_handled = 0
+
+
+def _noop(device_ip, resp):
+    global _handled
+    _handled += 1
+
+
+def _update(*elems) -> SubscribeResponse:
+    return SubscribeResponse(
+        update=Notification(
+            prefix=Path(elem=[PathElem(name=name, key=key) for name, key in elems]),
+            update=[
+                Update(
+                    path=Path(elem=[PathElem(name="mtu")]),
+                    val=TypedValue(uint_val=9100),
+                )
+            ],
+        )
+    )
+
+
+def build_updates(count: int) -> list:
+    samples = [
+        _update(
+            ("openconfig-interfaces:interfaces", {}),
+            ("interface", {"name": "Ethernet0"}),
+            ("config", {}),
+        ),
+        _update(("openconfig-port-group:port-groups", {}), ("port-group", {"id": "1"})),
+        _update(
+            ("openconfig-spanning-tree:stp", {}),
+            ("interfaces", {}),
+            ("interface", {"name": "Ethernet0"}),
+        ),
+        _update(("openconfig-system:system", {}), ("openconfig-events:events", {})),
+        _update(
+            ("openconfig-system:system", {}),
+            ("openconfig-system-crm:crm", {}),
+            ("statistics", {}),
+        ),
+        _update(("openconfig-platform:components", {}), ("component", {"name": "Eth0"})),
+    ]
+    return [samples[i % len(samples)] for i in range(count)]
+
+
+def legacy_dispatch(device_ip: str, resp: SubscribeResponse):
+    """Routing of handle_update before the dispatch table, handlers replaced by no-ops."""
+    for ele in resp.update.prefix.elem:
+        if ele.name == get_interface_base_path().elem[0].name:
+            _noop(device_ip, resp)
+            if get_telemetry_db() == "influxdb":
+                _noop(device_ip, resp)
+            elif get_telemetry_db() == "prometheus":
+                _noop(device_ip, resp)
+        if ele.name == _get_port_groups_base_path().elem[0].name:
+            _noop(device_ip, resp)
+        if ele.name == get_stp_port_path().elem[0].name:
+            _noop(device_ip, resp)
+        if ele.name == get_device_state_url().elem[0].name:
+            _noop(device_ip, resp)
+        if ele.name == get_system_base_path().elem[0].name:
+            if get_telemetry_db() == "influxdb":
+                _noop(device_ip, resp)
+            elif get_telemetry_db() == "prometheus":
+                _noop(device_ip, resp)
+        if ele.name == get_crm_stats_path().elem[1].name:
+            if get_telemetry_db() == "influxdb":
+                _noop(device_ip, resp)
+            elif get_telemetry_db() == "prometheus":
+                _noop(device_ip, resp)
+        if ele.name == get_dom_path().elem[0].name:
+            if get_telemetry_db() == "influxdb":
+                _noop(device_ip, resp)
+            elif get_telemetry_db() == "prometheus":
+                _noop(device_ip, resp)
+
+
+def measure(name: str, dispatch, updates: list) -> float:
+    global _handled
+    _handled = 0
+    start = time.perf_counter()
+    for resp in updates:
+        dispatch("198.18.0.1", resp)
+    elapsed = time.perf_counter() - start
+    rate = len(updates) / elapsed
+    print(f"{name:<16} {rate:>12,.0f} updates/s  ({_handled} handler calls)")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--updates", type=int, default=100000)
+    args = parser.parse_args()
+
+    updates = build_updates(args.updates)
+    handlers = {
+        name: [_noop] * len(funcs) for name, funcs in get_subscription_handlers().items()
+    }
+    before = measure("legacy routing", legacy_dispatch, updates)
+    after = measure(
+        "dispatch table",
+        lambda device_ip, resp: dispatch_update(handlers, device_ip, resp),
+        updates,
+    )
+    print(f"speedup {after / before:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark of per-interface against wildcard keyed gNMI subscription paths.
+
+For a device discovered in the configured Neo4j the script builds the subscriptions
+of the device once per interface and once with interface[name=*] paths, and reports
+the number of subscriptions the device has to track, the size of the SubscribeRequest
+and the time to build it. Unless --no-subscribe is given, it then subscribes to the
+device with both lists and measures the time until the sync response and the number
+of notifications and updates sent by the device until then.
+
+Usage:
+    python benchmark/bench_subscription_paths.py --device 10.10.130.10 [--rounds 3]
+                                                 [--no-subscribe]
+"""
+
+import argparse
+import statistics
+import time
+from unittest import mock
+
+from orca_nw_lib import gnmi_sub
+from orca_nw_lib.gnmi_sub import (
+    get_device_subscriptions,
+    get_subscribe_request,
+    subscribe_to_path,
+)
+from orca_nw_lib.gnmi_util import send_gnmi_subscribe
+
+MODES = ("per_interface", "wildcard")
+
+
+def build_subscriptions(device_ip: str, mode: str):
+    with mock.patch.object(gnmi_sub, "get_subscription_paths", return_value=mode):
+        start = time.perf_counter()
+        subscriptions = get_device_subscriptions(device_ip)
+        return subscriptions, time.perf_counter() - start
+
+
+def measure_sync(device_ip: str, subscriptions: list) -> tuple:
+    """Subscribes with the subscriptions until the sync response, returns seconds, notifications and updates."""
+    notifications = updates = 0
+    start = time.perf_counter()
+    call = send_gnmi_subscribe(
+        device_ip=device_ip,
+        subscribe_request=subscribe_to_path(get_subscribe_request(subscriptions)),
+    )
+    try:
+        for resp in call:
+            if resp.sync_response:
+                break
+            notifications += 1
+            updates += len(resp.update.update)
+        return time.perf_counter() - start, notifications, updates
+    finally:
+        call.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--device", required=True)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--no-subscribe", action="store_true")
+    args = parser.parse_args()
+
+    for mode in MODES:
+        subscriptions, build_time = build_subscriptions(args.device, mode)
+        request_size = get_subscribe_request(subscriptions).ByteSize()
+        print(
+            f"{mode:<14} {len(subscriptions):>6} subscriptions  {request_size:>8} request bytes  "
+            f"built in {build_time * 1000:.1f} ms"
+        )
+        if args.no_subscribe:
+            continue
+        results = [measure_sync(args.device, subscriptions) for _ in range(args.rounds)]
+        print(
+            f"{'':<14} sync in {statistics.median(r[0] for r in results) * 1000:.0f} ms (median of {args.rounds}), "
+            f"{results[-1][1]} notifications, {results[-1][2]} updates until sync"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark of the in-memory telemetry store.
+
+The script records the interface counters of synthetic devices in the 198.18.0.0/15
+benchmarking range (RFC 2544) into a TelemetryStore, then reports the memory used by
+the value columns and the latency of recording a counters sample and of get_live_counters.
+No device, Neo4j or telemetry db is used.
+
+Usage:
+    python benchmark/bench_telemetry_store.py [--devices 100] [--interfaces 128] [--rounds 100000]
+"""
+
+import argparse
+import random
+import time
+
+from orca_nw_lib.telemetry_store import GROUP_INTERFACE, TelemetryStore
+
+COUNTERS = (
+    "in-octets",
+    "in-unicast-pkts",
+    "in-broadcast-pkts",
+    "in-multicast-pkts",
+    "in-errors",
+    "in-discards",
+    "out-octets",
+    "out-unicast-pkts",
+    "out-broadcast-pkts",
+    "out-multicast-pkts",
+    "out-errors",
+    "out-discards",
+)
+
+
+def _device_ip(indx: int) -> str:
+    return f"198.18.{indx // 256}.{indx % 256}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--interfaces", type=int, default=128)
+    parser.add_argument("--rounds", type=int, default=100000)
+    args = parser.parse_args()
+
+    keys = [
+        (_device_ip(d), f"Ethernet{i}")
+        for d in range(args.devices)
+        for i in range(args.interfaces)
+    ]
+    store = TelemetryStore(max_series=len(keys) * len(COUNTERS))
+    sample = {counter: 2**40 for counter in COUNTERS}
+    start = time.perf_counter()
+    for device_ip, if_name in keys:
+        store.record(device_ip, GROUP_INTERFACE, if_name, sample, time.time_ns())
+    elapsed = time.perf_counter() - start
+    stats = store.get_stats()
+    print(
+        f"{stats['series']:,} series, {stats['bytes'] / 2**20:.1f} MiB of value columns, "
+        f"created in {elapsed:.2f} s"
+    )
+
+    picks = [random.choice(keys) for _ in range(args.rounds)]
+    start = time.perf_counter()
+    for device_ip, if_name in picks:
+        store.record(device_ip, GROUP_INTERFACE, if_name, sample, 0)
+    record_us = (time.perf_counter() - start) / args.rounds * 1e6
+    start = time.perf_counter()
+    for device_ip, if_name in picks:
+        store.get(device_ip, GROUP_INTERFACE, if_name)
+    get_us = (time.perf_counter() - start) / args.rounds * 1e6
+    print(f"record {record_us:.2f} us/sample, get_live_counters {get_us:.2f} us/interface")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,8 @@
 import logging
 
 from orca_nw_lib.gnmi_sub import gnmi_subscribe_for_all_devices_in_db
-from orca_nw_lib.utils import load_orca_config
+from orca_nw_lib.metrics import start_metrics_server
+from orca_nw_lib.utils import is_subscription_shard_worker, load_orca_config
 
 
 
@@ -10,6 +11,12 @@ load_orca_config()
 
 logging.getLogger("neo4j").setLevel(logging.ERROR)
 
-## Also subscribe for gnmi events for all devices already discovered in the database.
-## This is the case when devices are already discovered but the application is restarted, due to any reason.
-gnmi_subscribe_for_all_devices_in_db()
+## Subscription shard workers only subscribe the devices assigned to them by the coordinator,
+## their metrics are served by the coordinating process.
+if not is_subscription_shard_worker():
+    ## Serve the subscription pipeline metrics, if metrics_port is configured.
+    start_metrics_server()
+
+    ## Also subscribe for gnmi events for all devices already discovered in the database.
+    ## This is the case when devices are already discovered but the application is restarted, due to any reason.
+    gnmi_subscribe_for_all_devices_in_db()
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Iterator, List, Optional, Tuple
 from .bgp_db import (
     get_bgp_global_af_list_from_db,
     get_bgp_global_with_vrf_from_db,
@@ -8,7 +8,7 @@ from .bgp_db import (
     get_bgp_global_af_network_from_db,
     get_bgp_global_af_aggregate_addr_from_db,
     insert_device_bgp_neighbors_in_db,
-    get_bgp_neighbor_from_db, get_bgp_neighbor_af_from_db, get_bgp_neighbor_local_bgp_from_db,
+    get_bgp_neighbor_from_db, get_bgp_neighbors_page_from_db, get_bgp_neighbor_af_from_db, get_bgp_neighbor_local_bgp_from_db,
     get_bgp_neighbor_remote_bgp_from_db, connect_bgp_neighbor_to_bgp_global,
 )
 from .bgp_gnmi import (
@@ -624,7 +624,7 @@ def discover_bgp_neighbors(device_ip: str):
             )
             raise
         finally:
-            connect_bgp_neighbor_to_bgp_global()
+            connect_bgp_neighbor_to_bgp_global(device.mgt_ip)
 
 
 def _create_bgp_neighbors_graph_objects(device_ip: str):
@@ -693,6 +693,45 @@ def get_bgp_neighbors(device_ip: str, neighbor_ip: str = None):
         return bgp_neighbor.__properties__ if bgp_neighbor else None
 
 
+def get_bgp_neighbors_page(
+    device_ip: str, cursor: Optional[str] = None, limit: Optional[int] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Retrieves one page of the BGP neighbor details of a device, ordered by neighbor IP.
+
+    Args:
+        device_ip (str): The IP address of the device.
+        cursor (str, optional): Cursor returned with the previous page. Defaults to None, i.e. first page.
+        limit (int, optional): Max number of neighbors in the page. Defaults to db_read_page_size.
+
+    Returns:
+        Tuple[List[dict], Optional[str]]: The BGP neighbor details,
+        and the cursor of the next page or None if it is the last page.
+    """
+    page, next_cursor = get_bgp_neighbors_page_from_db(device_ip, cursor, limit)
+    return [i.__properties__ for i in page], next_cursor
+
+
+def iter_bgp_neighbors(device_ip: str, page_size: Optional[int] = None) -> Iterator[dict]:
+    """
+    Yields the BGP neighbor details of a device, fetched page by page,
+    so that memory usage is bounded by the page size.
+
+    Args:
+        device_ip (str): The IP address of the device.
+        page_size (int, optional): Number of neighbors fetched per query. Defaults to db_read_page_size.
+
+    Yields:
+        dict: The BGP neighbor details.
+    """
+    cursor = None
+    while True:
+        page, cursor = get_bgp_neighbors_page(device_ip, cursor, page_size)
+        yield from page
+        if not cursor:
+            return
+
+
 def get_bgp_neighbor_af(device_ip: str, neighbor_ip: str, afi_safi: str = None):
     """
     Retrieves the BGP neighbor AF details.
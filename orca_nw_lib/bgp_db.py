@@ -1,8 +1,12 @@
-from typing import List
+from typing import List, Optional, Tuple
 
-from .utils import get_logging
+from neomodel import db
+
+from .utils import get_db_read_page_size, get_logging
 from .device_db import get_device_db_obj
-from .interface_db import get_sub_interface_from_db
+from .db_transaction import checkpoint, write_transaction
+from .interface_db import get_sub_interface_with_ip_from_db
+from .storage_backend import storage_operation
 from .graph_db_models import (
     BGP,
     BGP_GLOBAL_AF,
@@ -32,6 +36,7 @@ def copy_bgp_object_prop(target_obj: BGP, src_obj: BGP):
     target_obj.router_id = src_obj.router_id
 
 
+@storage_operation
 def get_bgp_from_db(asn: int) -> List[BGP]:
     """
     Retrieves a list of BGP objects from the database that have a matching local AS number.
@@ -50,6 +55,7 @@ def get_bgp_from_db(asn: int) -> List[BGP]:
     ]
 
 
+@storage_operation
 def get_bgp_global_af_list_from_db(device_ip: str, asn: int) -> List[BGP_GLOBAL_AF]:
     """
     Retrieves a list of BGP_GLOBAL_AF objects from the database for a specific device.
@@ -66,6 +72,8 @@ def get_bgp_global_af_list_from_db(device_ip: str, asn: int) -> List[BGP_GLOBAL_
     return bgp.af.all() if bgp else None
 
 
+@storage_operation
+@write_transaction("bgp")
 def insert_device_bgp_in_db(device: Device, bgp_global_list: dict):
     """
     Inserts the given list of BGP objects into the database for the specified device.
@@ -125,6 +133,7 @@ def insert_device_bgp_in_db(device: Device, bgp_global_list: dict):
             bgp.delete()
 
 
+@storage_operation
 def connect_bgp_neighbours_and_asn():
     """
     Connects BGP peers by iterating through each device from the database and
@@ -147,7 +156,7 @@ def connect_bgp_neighbours_and_asn():
             for prop in bgp.neighbor_prop or []:
                 neighbor_rel = (
                     bgp.neighbor.connect(si)
-                    if (si := get_sub_interface_from_db(prop.get("neighbor")))
+                    if (si := get_sub_interface_with_ip_from_db(prop.get("neighbor")))
                     else None
                 )
                 if neighbor_rel:
@@ -159,6 +168,7 @@ def connect_bgp_neighbours_and_asn():
                     bgp.remote_asn_node.connect(rem_bgp)
 
 
+@storage_operation
 def get_bgp_global_with_vrf_from_db(device_ip, vrf_name: str = None):
     """
     Retrieve the BGP global list of a device from the database.
@@ -175,6 +185,7 @@ def get_bgp_global_with_vrf_from_db(device_ip, vrf_name: str = None):
     return device.bgp.all() if device else None
 
 
+@storage_operation
 def get_bgp_global_with_asn_from_db(device_ip, asn: int = None):
     """
     Get the BGP global configuration for a device based on its IP address and optional ASN.
@@ -193,6 +204,7 @@ def get_bgp_global_with_asn_from_db(device_ip, asn: int = None):
     return device.bgp.all() if device else None
 
 
+@storage_operation
 def get_remote_bgp_asn_from_db(device_ip, asn: str):
     """
     Get the remote BGP ASN nodes from the database for a given device IP and ASN.
@@ -225,6 +237,7 @@ def create_bgp_peer_link_rel():
     connect_bgp_neighbours_and_asn()
 
 
+@storage_operation
 def get_bgp_global_af_from_db(device_ip: str, asn: int, afi_safi: str = None) -> list[BGP_GLOBAL_AF] | BGP_GLOBAL_AF:
     """
     Retrieves the BGP global address family configuration from the database for a given device IP, ASN, and AFI/SAFI.
@@ -246,6 +259,7 @@ def get_bgp_global_af_from_db(device_ip: str, asn: int, afi_safi: str = None) ->
     return bgp.af.all() if bgp else None
 
 
+@storage_operation
 def get_bgp_global_af_network_from_db(
         device_ip: str, asn: int, afi_safi: str = None
 ) -> list[BGP_GLOBAL_AF_NETWORK] | BGP_GLOBAL_AF_NETWORK:
@@ -264,6 +278,7 @@ def get_bgp_global_af_network_from_db(
     return bgp.af_network.all() if bgp else None
 
 
+@storage_operation
 def get_bgp_global_af_aggregate_addr_from_db(
         device_ip: str, asn: int, afi_safi: str = None
 ) -> list[BGP_GLOBAL_AF_AGGREGATE_ADDR] | BGP_GLOBAL_AF_AGGREGATE_ADDR:
@@ -299,6 +314,8 @@ def copy_bgp_neighbor_object_prop(src_obj: BGP_NEIGHBOR, target_obj: BGP_NEIGHBO
     target_obj.remote_asn = src_obj.remote_asn
 
 
+@storage_operation
+@write_transaction("bgp_neighbor")
 def insert_device_bgp_neighbors_in_db(device: Device, bgp_neighbor_list: dict):
     """
     Inserts the BGP neighbors in the database.
@@ -311,6 +328,7 @@ def insert_device_bgp_neighbors_in_db(device: Device, bgp_neighbor_list: dict):
         None
     """
     for bgp_neighbor, family in bgp_neighbor_list.items():
+        checkpoint()
         if bgp_neighbor_from_db := get_bgp_neighbor_from_db(
                 device_ip=device.mgt_ip, neighbor_ip=bgp_neighbor.neighbor_ip
         ):
@@ -332,7 +350,7 @@ def insert_device_bgp_neighbors_in_db(device: Device, bgp_neighbor_list: dict):
     saved_bgp_neighbors = get_bgp_neighbor_from_db(device.mgt_ip)
     for i in saved_bgp_neighbors:
         if i.neighbor_ip:
-            neighbor_sub = get_sub_interface_from_db(i.neighbor_ip)
+            neighbor_sub = get_sub_interface_with_ip_from_db(i.neighbor_ip)
             i.neighbor_rel.disconnect_all()
             if neighbor_sub:
                 i.neighbor_rel.connect(neighbor_sub)
@@ -342,6 +360,7 @@ def insert_device_bgp_neighbors_in_db(device: Device, bgp_neighbor_list: dict):
             i.delete()
 
 
+@storage_operation
 def get_bgp_neighbor_from_db(device_ip: str, neighbor_ip: str = None) -> BGP_NEIGHBOR | list[BGP_NEIGHBOR]:
     """
     Get the BGP neighbor from the database.
@@ -359,6 +378,36 @@ def get_bgp_neighbor_from_db(device_ip: str, neighbor_ip: str = None) -> BGP_NEI
     return device.bgp_neighbor.all() if device_ip else None
 
 
+@storage_operation
+def get_bgp_neighbors_page_from_db(
+    device_ip: str, after: Optional[str] = None, limit: Optional[int] = None
+) -> Tuple[List[BGP_NEIGHBOR], Optional[str]]:
+    """
+    Get one page of the BGP neighbors of a device from the database, ordered by neighbor IP.
+
+    Args:
+        device_ip (str): The IP address of the device.
+        after (str, optional): IP of the last neighbor of the previous page. Defaults to None.
+        limit (int, optional): Max number of neighbors in the page. Defaults to db_read_page_size.
+
+    Returns:
+        Tuple[List[BGP_NEIGHBOR], Optional[str]]: The BGP neighbors, and the cursor of the next page
+        or None if it is the last page.
+    """
+    limit = limit or get_db_read_page_size()
+    results, _ = db.cypher_query(
+        """
+        MATCH (:Device {mgt_ip: $device_ip})-[:HAS]->(n:BGP_NEIGHBOR)
+        WHERE $after IS NULL OR n.neighbor_ip > $after
+        RETURN n ORDER BY n.neighbor_ip LIMIT $limit
+        """,
+        {"device_ip": device_ip, "after": after, "limit": limit},
+    )
+    page = [BGP_NEIGHBOR.inflate(n) for n, in results]
+    return page, page[-1].neighbor_ip if len(page) == limit else None
+
+
+@storage_operation
 def get_bgp_neighbor_af_from_db(device_ip: str, neighbor_ip: str, afi_safi: str = None) -> list[BGP_NEIGHBOR_AF] | BGP_NEIGHBOR_AF:
     """
     Get the BGP neighbor address family from the database.
@@ -378,6 +427,7 @@ def get_bgp_neighbor_af_from_db(device_ip: str, neighbor_ip: str, afi_safi: str
     return bgp_neighbor.af.all() if bgp_neighbor else None
 
 
+@storage_operation
 def get_bgp_neighbor_subinterfaces_from_db(device_ip, neighbor_ip: str):
     """
     Get the BGP neighbor subinterfaces from the database.
@@ -390,6 +440,7 @@ def get_bgp_neighbor_subinterfaces_from_db(device_ip, neighbor_ip: str):
     return bgp_nbr.neighbor_rel.all() if bgp_nbr else None
 
 
+@storage_operation
 def get_bgp_neighbor_local_bgp_from_db(device_ip, neighbor_ip: str, asn: int = None):
     """
     Get the BGP neighbor BGP global from the database.
@@ -405,6 +456,7 @@ def get_bgp_neighbor_local_bgp_from_db(device_ip, neighbor_ip: str, asn: int = N
     return bgp_nbr.local_asn_rel.all() if bgp_nbr else None
 
 
+@storage_operation
 def get_bgp_neighbor_remote_bgp_from_db(device_ip, neighbor_ip: str, asn: int = None):
     """
     Get the BGP neighbor BGP global from the database.
@@ -420,20 +472,62 @@ def get_bgp_neighbor_remote_bgp_from_db(device_ip, neighbor_ip: str, asn: int =
     return bgp_nbr.remote_asn_rel.all() if bgp_nbr else None
 
 
-def connect_bgp_neighbor_to_bgp_global():
-    devices = get_device_db_obj()
-    bgp_neighbors = []
-    bgp_globals = []
-    for device in devices:
-        for bgp_neighbor in device.bgp_neighbor.all():
-            bgp_neighbors.append(bgp_neighbor)
-        for bgp_global in device.bgp.all():
-            bgp_globals.append(bgp_global)
-    for bgp_neighbor in bgp_neighbors:
-        bgp_neighbor.local_asn_rel.disconnect_all()
-        bgp_neighbor.remote_asn_rel.disconnect_all()
-        for bgp_global in bgp_globals:
-            if bgp_global.local_asn == bgp_neighbor.remote_asn:
-                bgp_neighbor.remote_asn_rel.connect(bgp_global)
-            if bgp_global.local_asn == bgp_neighbor.local_asn:
-                bgp_neighbor.local_asn_rel.connect(bgp_global)
+"""
+Relationships from a BGP neighbor to the BGP globals, with the neighbor property
+which has to match the local_asn of the BGP global.
+"""
+BGP_NEIGHBOR_ASN_RELS = (("ASN", "remote_asn"), ("LOCAL_ASN", "local_asn"))
+
+
+@storage_operation
+@write_transaction("bgp_neighbor_asn")
+def connect_bgp_neighbor_to_bgp_global(device_ip: str = None):
+    """
+    Connects the BGP neighbors to the BGP globals having their remote and local ASN.
+    Only the relationships involving the given device are updated, i.e. the relationships of
+    the BGP neighbors of the device and the relationships to the BGP globals of the device.
+    Relationships not matching the ASN anymore are deleted.
+
+    Args:
+        device_ip (str, optional): The IP address of the device. Defaults to None, i.e. all devices.
+
+    Returns:
+        None
+    """
+    device_match = "(d:Device {mgt_ip: $device_ip})" if device_ip else "(d:Device)"
+    params = {"device_ip": device_ip}
+    for rel, prop in BGP_NEIGHBOR_ASN_RELS:
+        db.cypher_query(
+            f"""
+            MATCH {device_match}-[:HAS]->(n:BGP_NEIGHBOR)-[r:{rel}]->(b:BGP)
+            WHERE NOT coalesce(b.local_asn = n.{prop}, false)
+            DELETE r
+            """,
+            params,
+        )
+        db.cypher_query(
+            f"""
+            MATCH {device_match}-[:HAS]->(n:BGP_NEIGHBOR)
+            MATCH (:Device)-[:BGP_GLOBAL]->(b:BGP {{local_asn: n.{prop}}})
+            MERGE (n)-[:{rel}]->(b)
+            """,
+            params,
+        )
+        if not device_ip:
+            continue
+        db.cypher_query(
+            f"""
+            MATCH {device_match}-[:BGP_GLOBAL]->(b:BGP)<-[r:{rel}]-(n:BGP_NEIGHBOR)
+            WHERE NOT coalesce(b.local_asn = n.{prop}, false)
+            DELETE r
+            """,
+            params,
+        )
+        db.cypher_query(
+            f"""
+            MATCH {device_match}-[:BGP_GLOBAL]->(b:BGP)
+            MATCH (:Device)-[:HAS]->(n:BGP_NEIGHBOR {{{prop}: b.local_asn}})
+            MERGE (n)-[:{rel}]->(b)
+            """,
+            params,
+        )
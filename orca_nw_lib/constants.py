@@ -13,6 +13,42 @@ neo4j_url='neo4j_url'
 neo4j_user='neo4j_user'
 neo4j_password='neo4j_password'
 
+#storage
+storage_backend='storage_backend'
+memory_snapshot_file='memory_snapshot_file'
+
+#cache
+db_cache_enabled='db_cache_enabled'
+db_cache_max_entries='db_cache_max_entries'
+db_read_page_size='db_read_page_size'
+
+#transactions
+db_write_batch_size='db_write_batch_size'
+orphan_sweep_interval='orphan_sweep_interval'
+db_write_behind_window='db_write_behind_window'
+db_write_behind_max_pending='db_write_behind_max_pending'
+
+#subscriptions
+subscription_workers='subscription_workers'
+subscription_queue_size='subscription_queue_size'
+subscription_mode='subscription_mode'
+subscription_event_loops='subscription_event_loops'
+subscription_shards='subscription_shards'
+subscription_shard_mode='subscription_shard_mode'
+subscription_shard_status_interval='subscription_shard_status_interval'
+subscription_paths='subscription_paths'
+telemetry_lane_policy='telemetry_lane_policy'
+telemetry_lane_workers='telemetry_lane_workers'
+telemetry_lane_queue_size='telemetry_lane_queue_size'
+subscription_reconnect_backoff='subscription_reconnect_backoff'
+subscription_reconnect_max_backoff='subscription_reconnect_max_backoff'
+subscription_sync_timeout='subscription_sync_timeout'
+subscription_resync_features='subscription_resync_features'
+telemetry_store='telemetry_store'
+telemetry_store_max_series='telemetry_store_max_series'
+subscription_profiles='subscription_profiles'
+metrics_port='metrics_port'
+
 #influxdb
 influxdb_url='influxdb_url'
 influxdb_token='influxdb_token'
@@ -26,6 +62,9 @@ promdb_job= 'promdb_job'
 #flasgs
 telemetry_db= 'telemetry_db'
 
+#process name prefix of the subscription shard workers
+subscription_shard_process_name='orca_subscription_shard'
+
 #env_var
 env_default_orca_nw_lib_config_file="ORCA_NW_LIB_CONFIG_FILE"
 env_default_logging_config_file = "ORCA_NW_LIB_LOGGING_CONFIG_FILE"
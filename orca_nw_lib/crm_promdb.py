@@ -2,6 +2,7 @@
 from prometheus_client import CollectorRegistry, Info
 
 from orca_nw_lib.promdb_utils import write_to_prometheus
+from .gnmi_decoders import CRM_STATS_DECODERS, decode_updates, get_prometheus_labels
 from .gnmi_pb2 import SubscribeResponse
 from .gnmi_util import get_logging
 
@@ -24,7 +25,6 @@ def handle_crm_stats_promdb(device_ip: str, resp: SubscribeResponse):
         None
     """
     crm_metric = ""
-    crm_dict = {}
 
     for ele in resp.update.prefix.elem:
         if ele.name == "statistics":
@@ -35,54 +35,9 @@ def handle_crm_stats_promdb(device_ip: str, resp: SubscribeResponse):
         _logger.debug("CRM Statistics not found in gNMI subscription response from %s",device_ip,)
         return
 
-    for u in resp.update.update:
-        for ele in u.path.elem:
-            if ele.name == "dnat-entries-available":
-                crm_dict["dnat_entries_available"] = str(u.val.uint_val)
-            if ele.name == "dnat-entries-used":
-                crm_dict["dnat_entries_used"] = str(u.val.uint_val)
-            if ele.name == "fdb-entries-available":
-                crm_dict["fdb_entries_available"] = str(u.val.uint_val)
-            if ele.name == "fdb-entries-used":
-                crm_dict["fdb_entries_used"] = str(u.val.uint_val)
-            if ele.name == "ipv4-neighbors-available":
-                crm_dict["ipv4_neighbors_available"] = str(u.val.uint_val)
-            if ele.name == "ipv4-neighbors-used":
-                crm_dict["ipv4_neighbors_used"] = str(u.val.uint_val)
-            if ele.name == "ipv4-nexthops-available":
-                crm_dict["ipv4_nexthops_available"] = str(u.val.uint_val)
-            if ele.name == "ipv4-nexthops-used":
-                crm_dict["ipv4_nexthops_used"] = str(u.val.uint_val)
-            if ele.name == "ipv4-routes-available":
-                crm_dict["ipv4_routes_available"] = str(u.val.uint_val)
-            if ele.name == "ipv4-routes-used":
-                crm_dict["ipv4_routes_used"] = str(u.val.uint_val)
-            if ele.name == "ipv6-neighbors-available":
-                crm_dict["ipv6_neighbors_available"] = str(u.val.uint_val)
-            if ele.name == "ipv6-neighbors-used":
-                crm_dict["ipv6_neighbors_used"] = str(u.val.uint_val)
-            if ele.name == "ipv6-nexthops-available":
-                crm_dict["ipv6_nexthops_available"] = str(u.val.uint_val)
-            if ele.name == "ipv6-nexthops-used":
-                crm_dict["ipv6_nexthops_used"] = str(u.val.uint_val)
-            if ele.name == "ipv6-routes-available":
-                crm_dict["ipv6_routes_available"] = str(u.val.uint_val)
-            if ele.name == "ipv6-routes-used":
-                crm_dict["ipv6_routes_used"] = str(u.val.uint_val)
-            if ele.name == "nexthop-group-members-available":
-                crm_dict["nexthop_group_members_available"] = str(u.val.uint_val)
-            if ele.name == "nexthop-group-members-used":
-                crm_dict["nexthop_group_members_used"] = str(u.val.uint_val)
-            if ele.name == "nexthop-groups-available":
-                crm_dict["nexthop_groups_available"] = str(u.val.uint_val)
-            if ele.name == "nexthop-groups-used":
-                crm_dict["nexthop_groups_used"] = str(u.val.uint_val)
-            if ele.name == "snat-entries-available":
-                crm_dict["snat_entries_available"] = str(u.val.uint_val)
-            if ele.name == "snat-entries-used":
-                crm_dict["snat_entries_used"] = str(u.val.uint_val)
-
-
+    crm_dict = get_prometheus_labels(
+        decode_updates(CRM_STATS_DECODERS, resp.update.update)
+    )
     crm_stats.labels(device_ip=device_ip).info(crm_dict)
     write_to_prometheus(registry=crm_satas_registry)
     
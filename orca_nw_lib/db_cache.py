@@ -0,0 +1,170 @@
+""" Read-through in-memory cache in front of the *_db getters """
+
+import copy
+import threading
+from collections import OrderedDict
+from functools import wraps
+
+from .graph_db_models import Device
+from .storage_backend import is_memory_backend
+from .utils import get_db_cache_enabled, get_db_cache_max_entries, get_logging
+
+_logger = get_logging().getLogger(__name__)
+
+"""
+Cached getter results.
+    Key: (device_ip, getter name, args, kwargs)
+    Value: (device version at the time of the read, result)
+Entries are kept in LRU order, least recently used first.
+"""
+_cache = OrderedDict()
+
+"""
+Version of the cached data of every device.
+    Key: device_ip
+    Value: int, incremented on every write to the device's data in DB.
+Cached entries with a version older than the device version are stale.
+"""
+_device_versions = {}
+
+_cache_stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+_cache_lock = threading.Lock()
+
+# Devices being written by the current thread, reads for them bypass the cache.
+_writing = threading.local()
+
+
+def get_device_ip_from_args(args: tuple, kwargs: dict):
+    """
+    Extracts the device IP from the arguments of a *_db function.
+    Functions receive either the device IP (str) or the Device object,
+    as first argument or as the keyword argument device_ip/device/mgt_ip.
+
+    Args:
+        args (tuple): Positional arguments.
+        kwargs (dict): Keyword arguments.
+
+    Returns:
+        str: The device IP if found, otherwise None.
+    """
+    arg = (
+        kwargs.get("device_ip")
+        or kwargs.get("device")
+        or kwargs.get("mgt_ip")
+        or (args[0] if args else None)
+    )
+    if isinstance(arg, Device):
+        return arg.mgt_ip
+    return arg if isinstance(arg, str) else None
+
+
+def _get_writing_devices() -> dict:
+    if not hasattr(_writing, "devices"):
+        _writing.devices = {}
+    return _writing.devices
+
+
+def invalidate_db_cache(device_ip: str = None):
+    """
+    Invalidates the cached entries of a device, or of all devices if device_ip is None.
+
+    Args:
+        device_ip (str, optional): The IP address of the device. Defaults to None.
+    """
+    with _cache_lock:
+        _cache_stats["invalidations"] += 1
+        if device_ip:
+            _device_versions[device_ip] = _device_versions.get(device_ip, 0) + 1
+        else:
+            for ip in _device_versions:
+                _device_versions[ip] += 1
+            _cache.clear()
+
+
+def cached_db_read(func):
+    """
+    Decorator to cache the result of a *_db getter per device.
+    Has no effect when the cache is disabled by configuration
+    or when the in-memory storage backend is used, which serves the reads from memory anyway.
+    The cache keeps its own copy of the nodes read and every hit returns a fresh copy,
+    callers may update and save the nodes returned without altering the cached entries.
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        device_ip = get_device_ip_from_args(args, kwargs)
+        if (
+            not device_ip
+            or not get_db_cache_enabled()
+            or is_memory_backend()
+            or device_ip in _get_writing_devices()
+        ):
+            return func(*args, **kwargs)
+        key = (device_ip, func.__qualname__, args[1:], tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return func(*args, **kwargs)
+        with _cache_lock:
+            version = _device_versions.get(device_ip, 0)
+            entry = _cache.get(key)
+            hit = entry is not None and entry[0] == version
+            if hit:
+                _cache.move_to_end(key)
+                _cache_stats["hits"] += 1
+            else:
+                _cache_stats["misses"] += 1
+        if hit:
+            # Copied out of the lock, the cached entry is never modified once stored.
+            return copy.deepcopy(entry[1])
+        result = func(*args, **kwargs)
+        cached = copy.deepcopy(result)
+        with _cache_lock:
+            _cache[key] = (version, cached)
+            _cache.move_to_end(key)
+            max_entries = get_db_cache_max_entries()
+            while len(_cache) > max_entries:
+                _cache.popitem(last=False)
+                _cache_stats["evictions"] += 1
+        return result
+
+    return wrapper
+
+
+def invalidates_db_cache(func):
+    """
+    Decorator for *_db writers, invalidates the cached entries of the device written.
+    While the writer runs, reads of the device done by the same thread bypass the cache.
+    If the device can not be determined from the arguments, the whole cache is invalidated.
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        device_ip = get_device_ip_from_args(args, kwargs)
+        writing = _get_writing_devices()
+        writing[device_ip] = writing.get(device_ip, 0) + 1
+        try:
+            return func(*args, **kwargs)
+        finally:
+            writing[device_ip] -= 1
+            if not writing[device_ip]:
+                del writing[device_ip]
+            invalidate_db_cache(device_ip)
+
+    return wrapper
+
+
+def get_db_cache_stats() -> dict:
+    """
+    Returns the cache metrics.
+
+    Returns:
+        dict: hits, misses, evictions, invalidations, hit_ratio, size and max_size of the cache.
+    """
+    with _cache_lock:
+        stats = dict(_cache_stats)
+        stats["size"] = len(_cache)
+    lookups = stats["hits"] + stats["misses"]
+    stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+    stats["max_size"] = get_db_cache_max_entries()
+    return stats
@@ -0,0 +1,194 @@
+""" Per device reader/writer locks for the DB operations """
+
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from .db_transaction import in_write_transaction
+
+
+class ReadWriteLock:
+    """
+    Writer preferring reader/writer lock.
+
+    Any number of threads may hold the lock for reading at the same time,
+    a writer gets exclusive access. Once a writer is waiting, new readers wait
+    until the writer is done, so that writers are not starved by a stream of readers.
+    The lock is reentrant for a thread already holding it, a thread holding the write lock
+    may also acquire the read lock, but upgrading from read to write is not supported.
+    Time spent waiting for the lock is recorded per mode.
+    """
+
+    def __init__(self, name: str = ""):
+        self.name = name
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._writer_depth = 0
+        self._waiting_writers = 0
+        self._local = threading.local()
+        self._stats = {
+            mode: {"acquired": 0, "contended": 0, "wait_time": 0.0, "max_wait_time": 0.0}
+            for mode in ("read", "write")
+        }
+
+    def _read_depth(self) -> int:
+        return getattr(self._local, "read_depth", 0)
+
+    def _record_wait(self, mode: str, wait_time: float, contended: bool):
+        stats = self._stats[mode]
+        stats["acquired"] += 1
+        if contended:
+            stats["contended"] += 1
+            stats["wait_time"] += wait_time
+            stats["max_wait_time"] = max(stats["max_wait_time"], wait_time)
+
+    def acquire_read(self):
+        me = threading.get_ident()
+        if self._writer == me:
+            self._writer_depth += 1
+            return
+        if self._read_depth():
+            self._local.read_depth += 1
+            return
+        start = time.perf_counter()
+        contended = False
+        with self._cond:
+            while self._writer is not None or self._waiting_writers:
+                contended = True
+                self._cond.wait()
+            self._readers += 1
+            self._record_wait("read", time.perf_counter() - start, contended)
+        self._local.read_depth = 1
+
+    def release_read(self):
+        if self._writer == threading.get_ident():
+            self._writer_depth -= 1
+            return
+        self._local.read_depth -= 1
+        if not self._local.read_depth:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    def acquire_write(self):
+        me = threading.get_ident()
+        if self._writer == me:
+            self._writer_depth += 1
+            return
+        if self._read_depth():
+            raise RuntimeError(
+                f"Can not acquire write lock {self.name} while holding its read lock."
+            )
+        start = time.perf_counter()
+        contended = False
+        with self._cond:
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    contended = True
+                    self._cond.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._writer_depth = 1
+            self._record_wait("write", time.perf_counter() - start, contended)
+
+    def release_write(self):
+        with self._cond:
+            self._writer_depth -= 1
+            if not self._writer_depth:
+                self._writer = None
+                self._cond.notify_all()
+
+    @contextmanager
+    def read_locked(self):
+        self.acquire_read()
+        try:
+            yield self
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_locked(self):
+        self.acquire_write()
+        try:
+            yield self
+        finally:
+            self.release_write()
+
+    def get_stats(self) -> dict:
+        with self._cond:
+            return {mode: dict(stats) for mode, stats in self._stats.items()}
+
+
+"""
+dictionary to store the lock of every device.
+    Key: device_ip
+    Value: ReadWriteLock
+"""
+_device_locks = {}
+_device_locks_lock = threading.Lock()
+
+
+def get_device_lock(device_ip: str) -> ReadWriteLock:
+    """
+    Returns the reader/writer lock of the given device, creates it if not exists.
+
+    Args:
+        device_ip (str): The IP address of the device.
+
+    Returns:
+        ReadWriteLock: The lock of the device.
+    """
+    if lock := _device_locks.get(device_ip):
+        return lock
+    with _device_locks_lock:
+        return _device_locks.setdefault(device_ip, ReadWriteLock(device_ip))
+
+
+def device_read_locked(device_ip: str):
+    """
+    Returns the context manager holding the read lock of the device while reading it from DB.
+    Inside a write transaction the read lock is not taken: the transaction may hold Neo4j locks
+    on nodes a writer holding the device write lock is waiting for, e.g. interfaces connected
+    to a port channel, and Neo4j can not detect a deadlock between its locks and this lock.
+    Writers take the device write lock before opening their transaction, so the order is
+    always device lock then Neo4j locks.
+
+    Args:
+        device_ip (str): The IP address of the device.
+    """
+    if in_write_transaction():
+        return nullcontext()
+    return get_device_lock(device_ip).read_locked()
+
+
+def get_lock_wait_stats(device_ip: str = None) -> dict:
+    """
+    Returns the lock wait metrics of a device, or aggregated over all devices.
+
+    Args:
+        device_ip (str, optional): The IP address of the device. Defaults to None.
+
+    Returns:
+        dict: For each mode (read/write), number of acquisitions, number of acquisitions
+        which had to wait (contended), total and max wait time in seconds.
+    """
+    if device_ip:
+        lock = _device_locks.get(device_ip)
+        return lock.get_stats() if lock else {}
+    total = {
+        mode: {"acquired": 0, "contended": 0, "wait_time": 0.0, "max_wait_time": 0.0}
+        for mode in ("read", "write")
+    }
+    for lock in list(_device_locks.values()):
+        for mode, stats in lock.get_stats().items():
+            total[mode]["acquired"] += stats["acquired"]
+            total[mode]["contended"] += stats["contended"]
+            total[mode]["wait_time"] += stats["wait_time"]
+            total[mode]["max_wait_time"] = max(
+                total[mode]["max_wait_time"], stats["max_wait_time"]
+            )
+    return total
@@ -0,0 +1,120 @@
+""" Graph DB schema (indexes) management for ORCA Network Library """
+
+from typing import List, Tuple
+
+from neomodel import db
+
+from .utils import get_logging
+
+_logger = get_logging().getLogger(__name__)
+
+"""
+Indexes required by the lookups done in the *_db modules.
+Each entry is (index name, node label, tuple of properties),
+an entry with more than one property is created as a composite index.
+
+Note: unique_index declared on the models (e.g. Interface.name, PortChannel.lag_name)
+can not be installed as uniqueness constraints because the same names exist on every device,
+hence they are declared here as plain range indexes.
+"""
+DB_INDEXES: List[Tuple[str, str, Tuple[str, ...]]] = [
+    ("orca_device_mgt_ip", "Device", ("mgt_ip",)),
+    ("orca_device_mac", "Device", ("mac",)),
+    ("orca_interface_name", "Interface", ("name",)),
+    ("orca_interface_alias", "Interface", ("alias",)),
+    ("orca_sub_interface_ip_address", "SubInterface", ("ip_address",)),
+    ("orca_port_chnl_lag_name", "PortChannel", ("lag_name",)),
+    ("orca_port_group_id", "PortGroup", ("port_group_id",)),
+    ("orca_vlan_name", "Vlan", ("name",)),
+    ("orca_vlan_vlanid", "Vlan", ("vlanid",)),
+    ("orca_mclag_domain_id", "MCLAG", ("domain_id",)),
+    ("orca_mclag_peer_addr", "MCLAG", ("peer_addr",)),
+    ("orca_mclag_peer_link", "MCLAG", ("peer_link",)),
+    ("orca_mclag_gw_mac", "MCLAG_GW_MAC", ("gateway_mac",)),
+    ("orca_bgp_local_asn", "BGP", ("local_asn",)),
+    ("orca_bgp_neighbor_neighbor_ip", "BGP_NEIGHBOR", ("neighbor_ip",)),
+    ("orca_bgp_neighbor_remote_asn", "BGP_NEIGHBOR", ("remote_asn",)),
+    ("orca_bgp_neighbor_local_asn", "BGP_NEIGHBOR", ("local_asn",)),
+    ("orca_stp_global_device_ip", "STP_GLOBAL", ("device_ip",)),
+    ("orca_stp_port_if_name", "STP_PORT", ("if_name",)),
+    ("orca_stp_vlan_vlan_id", "STP_VLAN", ("vlan_id",)),
+]
+
+
+def get_db_indexes() -> List[Tuple[str, Tuple[str, ...]]]:
+    """
+    Retrieves the node indexes present in the database.
+
+    Returns:
+        List[Tuple[str, Tuple[str, ...]]]: A list of (label, properties) of all the node indexes in DB.
+    """
+    results, _ = db.cypher_query(
+        "SHOW INDEXES YIELD entityType, labelsOrTypes, properties "
+        "WHERE entityType = 'NODE' RETURN labelsOrTypes, properties"
+    )
+    return [
+        (label, tuple(properties or []))
+        for labels, properties in results
+        for label in labels or []
+    ]
+
+
+def get_missing_db_indexes() -> List[Tuple[str, str, Tuple[str, ...]]]:
+    """
+    Detects the indexes declared in DB_INDEXES which are not present in the database.
+    An index is considered present if any index (irrespective of its name)
+    exists in DB on the same label and properties.
+
+    Returns:
+        List[Tuple[str, str, Tuple[str, ...]]]: The missing entries of DB_INDEXES.
+    """
+    existing = set(get_db_indexes())
+    return [
+        (name, label, properties)
+        for name, label, properties in DB_INDEXES
+        if (label, properties) not in existing
+    ]
+
+
+def create_db_index(name: str, label: str, properties: Tuple[str, ...]):
+    """
+    Creates an index in the database if not exists.
+
+    Args:
+        name (str): The name of the index.
+        label (str): The node label to be indexed.
+        properties (Tuple[str, ...]): The node properties to be indexed.
+
+    Returns:
+        None
+    """
+    props = ", ".join(f"n.{p}" for p in properties)
+    db.cypher_query(f"CREATE INDEX {name} IF NOT EXISTS FOR (n:{label}) ON ({props})")
+
+
+def drop_db_index(name: str):
+    """
+    Drops an index from the database if exists.
+
+    Args:
+        name (str): The name of the index.
+
+    Returns:
+        None
+    """
+    db.cypher_query(f"DROP INDEX {name} IF EXISTS")
+
+
+def install_db_schema() -> List[str]:
+    """
+    Installs the indexes declared in DB_INDEXES which are missing in the database.
+
+    Returns:
+        List[str]: Names of the indexes created.
+    """
+    created = []
+    for name, label, properties in get_missing_db_indexes():
+        _logger.info("Creating index %s on %s%s.", name, label, properties)
+        create_db_index(name, label, properties)
+        created.append(name)
+    return created
@@ -0,0 +1,151 @@
+""" Explicit write transactions for persisting the discovered features in DB """
+
+import threading
+import time
+from functools import wraps
+
+from neomodel import db
+
+from .utils import get_db_write_batch_size, get_logging
+
+_logger = get_logging().getLogger(__name__)
+
+"""
+Transaction metrics of every feature.
+    Key: feature name
+    Value: dict of transactions, commits, rollbacks, operations, commit_time and total_time (seconds)
+"""
+_transaction_stats = {}
+_stats_lock = threading.Lock()
+
+# State of the write transaction opened by the current thread.
+_tx = threading.local()
+
+
+def _get_feature_stats(feature: str) -> dict:
+    return _transaction_stats.setdefault(
+        feature,
+        {
+            "transactions": 0,
+            "commits": 0,
+            "rollbacks": 0,
+            "operations": 0,
+            "commit_time": 0.0,
+            "total_time": 0.0,
+        },
+    )
+
+
+def in_write_transaction() -> bool:
+    """
+    Returns True if the current thread runs inside a transaction opened by write_transaction.
+    """
+    return getattr(_tx, "feature", None) is not None
+
+
+def _commit():
+    start = time.perf_counter()
+    db.commit()
+    commit_time = time.perf_counter() - start
+    with _stats_lock:
+        stats = _get_feature_stats(_tx.feature)
+        stats["commits"] += 1
+        stats["commit_time"] += commit_time
+        stats["operations"] += _tx.operations
+    _tx.operations = 0
+    callbacks, _tx.after_commit = _tx.after_commit, []
+    for callback in callbacks:
+        callback()
+
+
+def checkpoint(operations: int = 1):
+    """
+    Accounts the given number of write operations to the current write transaction.
+    Once the configured db_write_batch_size is reached, the transaction is committed
+    and a new one is started, so that very large sets are not written in one huge transaction.
+    Has no effect outside a write transaction.
+
+    Args:
+        operations (int, optional): Number of write operations done. Defaults to 1.
+    """
+    if not in_write_transaction():
+        return
+    _tx.operations += operations
+    if _tx.operations >= get_db_write_batch_size():
+        _commit()
+        db.begin()
+
+
+def after_commit(callback):
+    """
+    Calls the callback once the current write transaction is committed,
+    or immediately if the current thread is not in a write transaction.
+    Useful to invalidate in-memory state derived from the DB only once the writes are visible.
+
+    Args:
+        callback (callable): Function to be called without arguments.
+    """
+    if in_write_transaction():
+        _tx.after_commit.append(callback)
+    else:
+        callback()
+
+
+def write_transaction(feature: str):
+    """
+    Decorator to run a *_db writer inside one explicit write transaction.
+    The transaction is committed when the function returns and rolled back if it raises.
+    If the current thread already runs inside a transaction, the function joins it.
+
+    Args:
+        feature (str): Name of the feature, transaction metrics are reported per feature.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if in_write_transaction() or db._active_transaction is not None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            db.begin()
+            _tx.feature = feature
+            _tx.operations = 0
+            _tx.after_commit = []
+            try:
+                result = func(*args, **kwargs)
+                _commit()
+                return result
+            except Exception:
+                if db._active_transaction is not None:
+                    db.rollback()
+                with _stats_lock:
+                    _get_feature_stats(feature)["rollbacks"] += 1
+                _logger.error("Rolled back %s transaction.", feature)
+                raise
+            finally:
+                _tx.feature = None
+                with _stats_lock:
+                    stats = _get_feature_stats(feature)
+                    stats["transactions"] += 1
+                    stats["total_time"] += time.perf_counter() - start
+
+        return wrapper
+
+    return decorator
+
+
+def get_transaction_stats(feature: str = None) -> dict:
+    """
+    Returns the write transaction metrics.
+
+    Args:
+        feature (str, optional): Name of the feature. Defaults to None, i.e. all features.
+
+    Returns:
+        dict: transactions, commits, rollbacks, operations, commit_time and total_time (seconds)
+        of the feature, or a dict of them keyed by feature name.
+    """
+    with _stats_lock:
+        if feature:
+            return dict(_transaction_stats.get(feature, {}))
+        return {name: dict(stats) for name, stats in _transaction_stats.items()}
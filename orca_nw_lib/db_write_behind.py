@@ -0,0 +1,182 @@
+""" Write-behind stage merging the interface config updates received from gNMI subscriptions """
+
+import atexit
+import threading
+import time
+
+from .interface_db import set_interface_config_in_db, set_interfaces_config_in_db_bulk
+from .metrics import observe_sink
+from .utils import (
+    get_db_write_behind_max_pending,
+    get_db_write_behind_window,
+    get_logging,
+)
+
+_logger = get_logging().getLogger(__name__)
+
+"""
+Interface config updates waiting to be written in DB.
+    Key: (device_ip, if_name)
+    Value: dict of config field -> last value received
+"""
+_pending = {}
+# Number of updates merged into _pending.
+_pending_updates = 0
+_pending_lock = threading.Lock()
+# Serializes the flushes, so that an older batch is never written after a newer one.
+_flush_lock = threading.Lock()
+_flusher = None
+_flusher_stop = threading.Event()
+
+## Max delay in seconds before retrying a failed write.
+_MAX_RETRY_DELAY = 30.0
+# Consecutive failed flushes, and monotonic time before which the flushes are not retried.
+_failed_flushes = 0
+_retry_at = 0.0
+
+_write_behind_stats = {
+    "submitted": 0,
+    "coalesced": 0,
+    "flushed": 0,
+    "written": 0,
+    "flushes": 0,
+    "failed_flushes": 0,
+    "requeued": 0,
+}
+
+
+def submit_interface_config(device_ip: str, if_name: str, **config):
+    """
+    Queues an interface config update, see set_interface_config_in_db for the config parameters.
+    Updates of the same interface received within db_write_behind_window are merged,
+    keeping the last value of every field, and written in one batch by the flusher thread.
+    If db_write_behind_window is 0 the update is written immediately.
+
+    Args:
+        device_ip (str): The IP address of the device.
+        if_name (str): The name of the interface.
+    """
+    global _pending_updates
+    window = get_db_write_behind_window()
+    if window <= 0:
+        set_interface_config_in_db(device_ip, if_name, **config)
+        return
+    config = {field: value for field, value in config.items() if value is not None}
+    with _pending_lock:
+        _pending_updates += 1
+        _write_behind_stats["submitted"] += 1
+        if (key := (device_ip, if_name)) in _pending:
+            _write_behind_stats["coalesced"] += 1
+            _pending[key].update(config)
+        else:
+            _pending[key] = config
+        full = len(_pending) >= get_db_write_behind_max_pending()
+    _start_flusher(window)
+    if full:
+        flush_write_behind()
+
+
+def flush_write_behind(force: bool = False) -> int:
+    """
+    Writes all the pending interface config updates in DB with one batched write.
+    Updates of a failed write are merged back into the pending updates, without overriding
+    the values received since, and written again once the retry delay is over.
+    The retry delay starts at db_write_behind_window and doubles after every failure
+    up to _MAX_RETRY_DELAY.
+
+    Args:
+        force (bool, optional): Writes even if the retry delay is not over. Defaults to False.
+
+    Returns:
+        int: Number of interfaces written.
+    """
+    global _pending, _pending_updates, _failed_flushes, _retry_at
+    with _flush_lock:
+        if not force and time.monotonic() < _retry_at:
+            return 0
+        with _pending_lock:
+            updates, _pending = _pending, {}
+            merged, _pending_updates = _pending_updates, 0
+        if not updates:
+            return 0
+        try:
+            with observe_sink("neo4j"):
+                set_interfaces_config_in_db_bulk(updates)
+        except Exception as e:
+            _failed_flushes += 1
+            delay = min(
+                get_db_write_behind_window() * 2 ** (_failed_flushes - 1), _MAX_RETRY_DELAY
+            )
+            _retry_at = time.monotonic() + delay
+            _logger.error(
+                "Failed to write %s interface config updates, retrying in %s seconds: %s",
+                len(updates),
+                delay,
+                e,
+            )
+            with _pending_lock:
+                for key, config in updates.items():
+                    # Values received while writing are newer than the ones of the failed batch.
+                    _pending[key] = {**config, **_pending.get(key, {})}
+                _pending_updates += merged
+                _write_behind_stats["failed_flushes"] += 1
+                _write_behind_stats["requeued"] += len(updates)
+            return 0
+        _failed_flushes = 0
+        _retry_at = 0.0
+        with _pending_lock:
+            _write_behind_stats["flushed"] += merged
+            _write_behind_stats["written"] += len(updates)
+            _write_behind_stats["flushes"] += 1
+        return len(updates)
+
+
+def _flusher_loop(window: float):
+    while not _flusher_stop.wait(window):
+        flush_write_behind()
+    flush_write_behind(force=True)
+
+
+def _start_flusher(window: float):
+    global _flusher
+    if _flusher and _flusher.is_alive():
+        return
+    with _flush_lock:
+        if _flusher and _flusher.is_alive():
+            return
+        _flusher_stop.clear()
+        _flusher = threading.Thread(
+            target=_flusher_loop, args=(window,), name="orca_db_write_behind", daemon=True
+        )
+        _flusher.start()
+        _logger.info("Started DB write-behind flusher, window %s seconds.", window)
+
+
+def stop_write_behind():
+    """
+    Stops the flusher thread after writing the pending updates.
+    """
+    global _flusher
+    if _flusher:
+        _flusher_stop.set()
+        _flusher.join()
+        _flusher = None
+
+
+def get_write_behind_stats() -> dict:
+    """
+    Returns the write-behind metrics.
+
+    Returns:
+        dict: submitted updates, coalesced updates, flushed updates, written interfaces,
+        flushes, failed_flushes, requeued interfaces, pending interfaces and coalesce_ratio,
+        i.e. flushed updates per interface written.
+    """
+    with _pending_lock:
+        stats = dict(_write_behind_stats)
+        stats["pending"] = len(_pending)
+    stats["coalesce_ratio"] = stats["flushed"] / stats["written"] if stats["written"] else 0.0
+    return stats
+
+
+atexit.register(stop_write_behind)
@@ -1,11 +1,15 @@
-from typing import List, Optional, Union
-from orca_nw_lib.device_db import get_device_db_obj, insert_devices_in_db
+from typing import Iterator, List, Optional, Tuple, Union
+from orca_nw_lib.device_db import (
+    get_device_db_obj,
+    get_devices_page_from_db,
+    insert_devices_in_db,
+)
 from orca_nw_lib.device_info_influxdb import insert_device_info_in_influxdb
 from orca_nw_lib.device_info_promdb import insert_device_info_in_prometheus
 from orca_nw_lib.device_gnmi import (get_device_details_from_device,
                                      get_device_status_from_device)
 from orca_nw_lib.graph_db_models import Device
-from orca_nw_lib.utils import get_logging, get_telemetry_db
+from orca_nw_lib.utils import get_logging, get_telemetry_db, natural_sort_key
 
 from orca_nw_lib.device_gnmi import get_image_list_from_device
 
@@ -69,7 +73,8 @@ def get_device_details(mgt_ip: Optional[str] = None) -> Union[dict, List[dict]]:
         the function returns a dictionary object containing the properties of the device.
         If no management IP address is provided,
         the function returns a list of dictionaries,
-        each containing the properties of a device. If no device is found,
+        each containing the properties of a device, in natural order of the management IP addresses,
+        e.g. 10.10.10.2 before 10.10.10.10. If no device is found,
         an empty list is returned.
     """
     if mgt_ip:
@@ -77,11 +82,50 @@ def get_device_details(mgt_ip: Optional[str] = None) -> Union[dict, List[dict]]:
         if device:
             return device.__properties__
     else:
-        op_dict: List[dict] = []
-        device_dict = get_device_db_obj()
-        for device in device_dict or []:
-            op_dict.append(device.__properties__)
-        return op_dict
+        return sorted(iter_devices(), key=lambda d: natural_sort_key(d.get("mgt_ip")))
+
+
+def get_devices_page(
+    cursor: Optional[str] = None, limit: Optional[int] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Retrieves one page of the device details, ordered by management IP address.
+
+    .. code-block:: python
+
+        devices, cursor = get_devices_page(limit=100)
+        while cursor:
+            more, cursor = get_devices_page(cursor=cursor, limit=100)
+
+    Args:
+        cursor (Optional[str]): Cursor returned with the previous page. Defaults to None, i.e. first page.
+        limit (Optional[int]): Max number of devices in the page. Defaults to db_read_page_size.
+
+    Returns:
+        Tuple[List[dict], Optional[str]]: Properties of the devices,
+        and the cursor of the next page or None if it is the last page.
+    """
+    page, next_cursor = get_devices_page_from_db(cursor, limit)
+    return [device.__properties__ for device in page], next_cursor
+
+
+def iter_devices(page_size: Optional[int] = None) -> Iterator[dict]:
+    """
+    Yields the details of all the devices, fetched page by page,
+    so that memory usage is bounded by the page size.
+
+    Args:
+        page_size (Optional[int]): Number of devices fetched per query. Defaults to db_read_page_size.
+
+    Yields:
+        dict: Properties of the device.
+    """
+    cursor = None
+    while True:
+        page, cursor = get_devices_page(cursor, page_size)
+        yield from page
+        if not cursor:
+            return
 
 
 def discover_device_basic_system_details(device_ip:str):
@@ -1,7 +1,53 @@
+import threading
+from typing import List, Optional, Tuple
+
+from neomodel import db
+
+from orca_nw_lib.db_cache import cached_db_read, invalidates_db_cache
 from orca_nw_lib.graph_db_models import Device
-from orca_nw_lib.utils import clean_db, get_logging
+from orca_nw_lib.storage_backend import storage_operation
+from orca_nw_lib.utils import (
+    clean_db,
+    get_db_read_page_size,
+    get_db_write_batch_size,
+    get_logging,
+)
 _logger = get_logging().getLogger(__name__)
 
+"""
+Relationships through which a device owns its nodes, i.e. nodes reachable from a
+device through these relationships are deleted along with the device.
+Owned nodes are at most 2 hops away from the device, e.g. Device-[:HAS]->Interface-[:HAS]->SubInterface.
+"""
+DEVICE_OWNED_RELS = "HAS|BGP_GLOBAL|AF|AF_NETWORK|AF_AGGREGATE_ADDR|BGP_NEIGHBOR_AF"
+DEVICE_OWNED_MAX_DEPTH = 2
+
+"""
+Labels of the nodes which are owned by a device.
+"""
+DEVICE_OWNED_LABELS = [
+    "Interface",
+    "SubInterface",
+    "PortChannel",
+    "MCLAG",
+    "MCLAG_GW_MAC",
+    "PortGroup",
+    "Vlan",
+    "BGP",
+    "BGP_GLOBAL_AF",
+    "BGP_GLOBAL_AF_NETWORK",
+    "BGP_GLOBAL_AF_AGGREGATE_ADDR",
+    "BGP_NEIGHBOR",
+    "BGP_NEIGHBOR_AF",
+    "STP_GLOBAL",
+    "STP_PORT",
+    "STP_VLAN",
+]
+
+_orphan_sweeper = None
+_orphan_sweeper_stop = threading.Event()
+
+@storage_operation
 def get_all_devices_ip_from_db():
     """
     Get all the IP addresses of devices from the database.
@@ -12,6 +58,8 @@ def get_all_devices_ip_from_db():
     return [device.mgt_ip for device in Device.nodes.all()]
 
 
+@storage_operation
+@cached_db_read
 def get_device_db_obj(mgt_ip: str = None):
     """
     Retrieves the device database object based on the management IP.
@@ -29,6 +77,71 @@ def get_device_db_obj(mgt_ip: str = None):
     return Device.nodes.all()
 
 
+@storage_operation
+def get_devices_page_from_db(
+    after: Optional[str] = None, limit: Optional[int] = None
+) -> Tuple[List[Device], Optional[str]]:
+    """
+    Retrieves one page of the devices, ordered by management IP.
+
+    Parameters:
+        after (str, optional): Management IP of the last device of the previous page. Defaults to None.
+        limit (int, optional): Max number of devices in the page. Defaults to db_read_page_size.
+
+    Returns:
+        Tuple[List[Device], Optional[str]]: The devices, and the cursor of the next page
+        or None if it is the last page.
+    """
+    limit = limit or get_db_read_page_size()
+    results, _ = db.cypher_query(
+        """
+        MATCH (d:Device)
+        WHERE $after IS NULL OR d.mgt_ip > $after
+        RETURN d ORDER BY d.mgt_ip LIMIT $limit
+        """,
+        {"after": after, "limit": limit},
+    )
+    page = [Device.inflate(d) for d, in results]
+    return page, page[-1].mgt_ip if len(page) == limit else None
+
+
+@storage_operation
+def delete_device_nodes_in_db(mgt_ip: str) -> int:
+    """
+    Deletes the device and all the nodes owned by it, see DEVICE_OWNED_RELS.
+    Nodes are deleted graph side in batches of db_write_batch_size, deepest nodes first,
+    so that an interrupted deletion leaves no node unreachable from the device.
+
+    Parameters:
+        mgt_ip (str): The management IP of the device.
+
+    Returns:
+        int: Number of nodes deleted, including the device node.
+    """
+    deleted = 0
+    for depth in range(DEVICE_OWNED_MAX_DEPTH, 0, -1):
+        while True:
+            results, _ = db.cypher_query(
+                f"""
+                MATCH (:Device {{mgt_ip: $mgt_ip}})-[:{DEVICE_OWNED_RELS}*{depth}]->(n)
+                WITH DISTINCT n LIMIT $batch
+                DETACH DELETE n
+                RETURN count(*)
+                """,
+                {"mgt_ip": mgt_ip, "batch": get_db_write_batch_size()},
+            )
+            count = results[0][0] if results else 0
+            deleted += count
+            if not count:
+                break
+    results, _ = db.cypher_query(
+        "MATCH (d:Device {mgt_ip: $mgt_ip}) DETACH DELETE d RETURN count(*)",
+        {"mgt_ip": mgt_ip},
+    )
+    return deleted + (results[0][0] if results else 0)
+
+
+@invalidates_db_cache
 def delete_device(mgt_ip: str = None):
     """
     Deletes the device from the database.
@@ -39,38 +152,22 @@ def delete_device(mgt_ip: str = None):
     """
     try:
         from orca_nw_lib.gnmi_sub import close_gnmi_channel
+        from orca_nw_lib.interface_db import invalidate_sub_interface_prefix_index
+        from orca_nw_lib.telemetry_store import clear_device_telemetry
         if mgt_ip:
             ## Delete Specific Device and its components, when mgt_ip is provided.
-            device = get_device_db_obj(mgt_ip)
-
-            for chnl in device.port_chnl.all() or []:
-                chnl.delete()
-
-            for mclag in device.mclags.all() or []:
-                mclag.delete()
-
-            for port_group in device.port_groups.all() or []:
-                port_group.delete()
-
-            for vlan in device.vlans.all() or []:
-                vlan.delete()
-
-            for mclag_gw_mac in device.mclag_gw_macs.all() or []:
-                mclag_gw_mac.delete()
-
-            for interface in device.interfaces.all() or []:
-                for sub in interface.subInterfaces.all() or []:
-                    sub.delete()
-                interface.delete()
-                            
-            device.delete()
+            deleted = delete_device_nodes_in_db(mgt_ip)
+            _logger.debug(f"Deleted {deleted} nodes of device {mgt_ip}.")
             close_gnmi_channel(device_ip=mgt_ip)
+            clear_device_telemetry(mgt_ip)
         else:
             ## Delete all devices and their components. When mgt_ip is not provided.
             devices = get_device_db_obj()
             for device in devices or []:
                 close_gnmi_channel(device_ip=device.mgt_ip)
-            clean_db()
+                clear_device_telemetry(device.mgt_ip)
+            delete_all_nodes_in_db()
+        invalidate_sub_interface_prefix_index()
 
         return True
     except Exception as e:
@@ -78,6 +175,106 @@ def delete_device(mgt_ip: str = None):
         return False
 
 
+@storage_operation
+def delete_all_nodes_in_db():
+    """
+    Deletes all the devices and their components from the database.
+    """
+    clean_db()
+
+
+@storage_operation
+def sweep_orphan_nodes_in_db() -> int:
+    """
+    Deletes the nodes of DEVICE_OWNED_LABELS which are not owned by any device anymore,
+    e.g. left behind by an interrupted deletion or by writers removing only the parent node.
+    Nodes staged by a topology snapshot import are not owned yet and are skipped.
+    The orphans are collected once per label, so that the label index is used,
+    and deleted in batches of db_write_batch_size, each node being checked again
+    in case it has been connected to a device meanwhile.
+    Parents are swept before their children, see DEVICE_OWNED_LABELS.
+
+    Returns:
+        int: Number of nodes deleted.
+    """
+    from orca_nw_lib.topology_snapshot import SNAPSHOT_IMPORT_LABEL
+
+    orphan = f"""
+        NOT n:{SNAPSHOT_IMPORT_LABEL}
+        AND NOT EXISTS {{
+            MATCH (:Device)-[:{DEVICE_OWNED_RELS}*1..{DEVICE_OWNED_MAX_DEPTH}]->(n)
+        }}
+    """
+    batch_size = get_db_write_batch_size()
+    deleted = 0
+    for label in DEVICE_OWNED_LABELS:
+        results, _ = db.cypher_query(
+            f"MATCH (n:{label}) WHERE {orphan} RETURN elementId(n)"
+        )
+        orphans = [node_id for node_id, in results]
+        for i in range(0, len(orphans), batch_size):
+            results, _ = db.cypher_query(
+                f"""
+                UNWIND $ids AS id
+                MATCH (n:{label}) WHERE elementId(n) = id AND {orphan}
+                DETACH DELETE n
+                RETURN count(*)
+                """,
+                {"ids": orphans[i : i + batch_size]},
+            )
+            deleted += results[0][0] if results else 0
+    if deleted:
+        from orca_nw_lib.db_cache import invalidate_db_cache
+        from orca_nw_lib.interface_db import invalidate_sub_interface_prefix_index
+
+        invalidate_db_cache()
+        invalidate_sub_interface_prefix_index()
+        _logger.info(f"Deleted {deleted} orphan nodes.")
+    return deleted
+
+
+def _orphan_sweeper_loop(interval: float):
+    while not _orphan_sweeper_stop.wait(interval):
+        try:
+            sweep_orphan_nodes_in_db()
+        except Exception as e:
+            _logger.error(f"Orphan node sweep failed, Reason: {e}")
+
+
+def start_orphan_sweeper(interval: float):
+    """
+    Starts a daemon thread which runs sweep_orphan_nodes_in_db every `interval` seconds.
+    Has no effect if the sweeper is already running.
+
+    Parameters:
+        interval (float): Seconds between two sweeps.
+    """
+    global _orphan_sweeper
+    if _orphan_sweeper and _orphan_sweeper.is_alive():
+        return
+    _orphan_sweeper_stop.clear()
+    _orphan_sweeper = threading.Thread(
+        target=_orphan_sweeper_loop,
+        args=(interval,),
+        name="orphan_sweeper",
+        daemon=True,
+    )
+    _orphan_sweeper.start()
+
+
+def stop_orphan_sweeper():
+    """
+    Stops the orphan sweeper thread if running.
+    """
+    global _orphan_sweeper
+    _orphan_sweeper_stop.set()
+    if _orphan_sweeper:
+        _orphan_sweeper.join()
+        _orphan_sweeper = None
+
+
+@storage_operation
+@invalidates_db_cache
 def insert_devices_in_db(device:Device):
     if dev:=get_device_db_obj(device.mgt_ip):
         _logger.debug(f"Device with IP {device.mgt_ip} already exists in the database.")
@@ -87,6 +284,8 @@ def insert_devices_in_db(device:Device):
         device.save()
 
 
+@storage_operation
+@invalidates_db_cache
 def update_device_status(mgt_ip: str, status: str):
     device = get_device_db_obj(mgt_ip)
     if device:
@@ -6,6 +6,7 @@ from orca_nw_lib.system import discover_system
 from .common import DiscoveryFeature
 
 from .device import discover_device_basic_system_details, get_device_details
+from .db_transaction import get_transaction_stats
 from .device_db import get_all_devices_ip_from_db
 from .gnmi_sub import gnmi_subscribe, sync_response_received
 
@@ -24,6 +25,7 @@ from .stp import discover_stp
 from .stp_port import discover_stp_port
 from .stp_vlan import discover_stp_vlan
 from .vlan import discover_vlan
+from .storage_backend import MEMORY_BACKEND, is_feature_supported
 from .utils import get_logging, get_networks, is_grpc_device_listening
 
 _logger = get_logging().getLogger(__name__)
@@ -126,8 +128,9 @@ def discover_device(device_ips: list, feature_to_discover: DiscoveryFeature = No
 
     # Discover the rest of the features
     # some links can only be created after all teh topology devices are discovered
-    for ip in get_all_devices_ip_from_db() or []:
-        create_lldp_relations_in_db(ip)
+    device_ips_in_db = get_all_devices_ip_from_db() or []
+    create_lldp_relations_in_db(device_ips_in_db)
+    for ip in device_ips_in_db:
         if feature_to_discover:
             discover_nw_features(ip, feature_to_discover)
         else:
@@ -141,6 +144,7 @@ def discover_device(device_ips: list, feature_to_discover: DiscoveryFeature = No
             discover_nw_features(ip, DiscoveryFeature.stp_port)
             discover_nw_features(ip, DiscoveryFeature.stp_vlan)
         gnmi_subscribe(ip)
+    _logger.debug("DB write transactions: %s", get_transaction_stats())
 
 
 def discover_device_from_config() -> []:
@@ -180,6 +184,12 @@ def discover_nw_features(device_ip: str, feature: DiscoveryFeature) -> None:
     Returns:
         None
     """
+    if not is_feature_supported(feature):
+        _logger.info(
+            f"{feature.name} Discovery skipped on device {device_ip}, "
+            f"not supported by the {MEMORY_BACKEND} storage backend."
+        )
+        return None
     match feature:
         case DiscoveryFeature.interface:
             try:
@@ -1,6 +1,7 @@
 from typing import List
-from .gnmi_pb2 import Subscription, SubscriptionMode
+from .gnmi_pb2 import Subscription
 from .gnmi_util import get_gnmi_path, send_gnmi_get
+from .subscription_profiles import PATH_CLASS_DOM, create_subscription
 
 
 # Digital Optical Monitoring (DOM) Path
@@ -17,12 +18,7 @@ def get_subscription_path_for_dom() -> List[Subscription]:
     subscriptions = []
 
     dom_path = get_dom_path()
-    subscriptions.append(
-        Subscription(
-            path=dom_path,
-            mode=SubscriptionMode.TARGET_DEFINED
-        )
-    )
+    subscriptions.append(create_subscription(dom_path, PATH_CLASS_DOM))
     return subscriptions
 
 
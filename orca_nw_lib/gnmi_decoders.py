@@ -0,0 +1,247 @@
+""" Declarative decoders of the leaves of gNMI subscription updates """
+
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional
+
+from .common import PortFec, Speed
+from .gnmi_pb2 import TypedValue, Update
+
+## Typed extractors of the value of a leaf.
+bool_val = attrgetter("bool_val")
+uint_val = attrgetter("uint_val")
+float_val = attrgetter("float_val")
+string_val = attrgetter("string_val")
+
+
+class LeafDecoder(NamedTuple):
+    """
+    Decodes the value of a leaf into a field.
+
+    Attributes:
+        field (str): Name of the decoded field.
+        extract (Callable): Typed extractor of the leaf value, e.g. uint_val.
+        convert (Callable, optional): Converter of the extracted value. Defaults to None.
+    """
+
+    field: str
+    extract: Callable[[TypedValue], Any]
+    convert: Optional[Callable[[Any], Any]] = None
+
+    def decode(self, val: TypedValue):
+        value = self.extract(val)
+        return self.convert(value) if self.convert else value
+
+
+def compile_decoders(entries: Iterable[tuple]) -> Dict[str, LeafDecoder]:
+    """
+    Compiles decoder entries into a dict lookup by leaf name.
+
+    Args:
+        entries (Iterable[tuple]): (leaf name, field, extractor[, converter]) entries,
+            field None meaning the leaf name.
+
+    Returns:
+        Dict[str, LeafDecoder]: Leaf name -> decoder.
+    """
+    return {
+        leaf: LeafDecoder(field or leaf, extract, *convert)
+        for leaf, field, extract, *convert in entries
+    }
+
+
+def decode_updates(
+    decoders: Dict[str, LeafDecoder], updates: Iterable[Update], fields: dict = None
+) -> dict:
+    """
+    Decodes the leaves of the updates in one pass, a leaf without decoder is ignored.
+
+    Args:
+        decoders (Dict[str, LeafDecoder]): Decoders compiled by compile_decoders.
+        updates (Iterable[Update]): Updates of a subscription response.
+        fields (dict, optional): Dict the decoded fields are added to. Defaults to None, i.e. a new dict.
+
+    Returns:
+        dict: Field -> decoded value, of the leaves present in the updates.
+    """
+    fields = {} if fields is None else fields
+    for u in updates:
+        for ele in u.path.elem:
+            if decoder := decoders.get(ele.name):
+                fields[decoder.field] = decoder.decode(u.val)
+    return fields
+
+
+def get_empty_fields(decoders: Dict[str, LeafDecoder]) -> dict:
+    """
+    Returns all the fields of the decoders set to None, for sinks expecting every field.
+    """
+    return dict.fromkeys(decoder.field for decoder in decoders.values())
+
+
+INTERFACE_CONFIG_DECODERS = compile_decoders(
+    [
+        ("enabled", "enable", bool_val),
+        ("mtu", "mtu", uint_val),
+        ("port-speed", "speed", string_val, Speed.get_enum_from_str),
+        ("description", "description", string_val),
+        ("port-fec", "fec", string_val, PortFec.get_enum_from_str),
+        ("auto-negotiate", "autoneg", bool_val),
+        ("advertised-speed", "adv_speeds", string_val),
+        ("standalone-link-training", "link_training", bool_val),
+    ]
+)
+
+STP_CONFIG_DECODERS = compile_decoders(
+    [
+        ("enabled-protocol", "enabled_protocol", string_val),
+        ("bpdu-filter", "bpdu_filter", bool_val),
+        ("loop-guard", "loop_guard", bool_val),
+        ("disabled-vlans", "disabled_vlans", string_val),
+        ("rootguard-timeout", "rootguard_timeout", uint_val),
+        ("portfast", "portfast", bool_val),
+        ("hello-time", "hello_time", uint_val),
+        ("max-age", "max_age", uint_val),
+        ("forwarding-delay", "forwarding_delay", uint_val),
+        ("bridge-priority", "bridge_priority", uint_val),
+    ]
+)
+
+STP_PORT_CONFIG_DECODERS = compile_decoders(
+    [
+        ("bpdu-guard", "bpdu_guard", bool_val),
+        ("bpdu-filter", "bpdu_filter", bool_val),
+        ("bpdu-guard-port-shutdown", "bpdu_guard_port_shutdown", bool_val),
+        ("link-type", "link_type", string_val),
+        ("guard", "guard", string_val),
+        ("edge-port", "edge_port", string_val),
+        ("name", "if_name", string_val),
+        ("portfast", "portfast", bool_val),
+        ("spanning-tree-enable", "stp_enabled", bool_val),
+        ("uplink-fast", "uplink_fast", bool_val),
+        ("cost", "cost", uint_val),
+        ("port-priority", "port_priority", uint_val),
+    ]
+)
+
+## Telemetry fields keep the leaf name, see get_prometheus_labels for the Prometheus naming.
+CRM_STATS_DECODERS = compile_decoders(
+    (f"{resource}-{usage}", None, uint_val)
+    for resource in (
+        "dnat-entries",
+        "fdb-entries",
+        "ipv4-neighbors",
+        "ipv4-nexthops",
+        "ipv4-routes",
+        "ipv6-neighbors",
+        "ipv6-nexthops",
+        "ipv6-routes",
+        "nexthop-group-members",
+        "nexthop-groups",
+        "snat-entries",
+    )
+    for usage in ("available", "used")
+)
+
+## Decoders per system metric, the metric being the prefix element of the update.
+SYSTEM_DECODERS = {
+    "dns": compile_decoders(
+        [
+            ("address", None, string_val),
+            ("address-type", None, string_val),
+        ]
+    ),
+    "memory": compile_decoders(
+        [
+            ("buff-cache", None, uint_val),
+            ("physical", None, uint_val),
+            ("reserved", None, uint_val),
+            ("unused", None, uint_val),
+        ]
+    ),
+    "event": compile_decoders(
+        [
+            ("id", None, string_val),
+            ("resource", None, string_val),
+            ("severity", None, string_val),
+            ("text", None, string_val),
+            ("time-created", None, uint_val),
+            ("type-id", None, string_val),
+        ]
+    ),
+}
+
+DOM_DECODERS = compile_decoders(
+    [
+        ("cable-length", "cable_length", float_val),
+        ("connector-type", "connector_type", string_val),
+        ("date-code", "date_code", string_val),
+        ("display-name", "display_name", string_val),
+        ("form-factor", "form_factor", string_val),
+        ("is-high-power-media", "is_high_power_media", bool_val, str),
+        ("laser-capabilities", "laser_capabilities", bool_val, str),
+        ("max-module-power", "max_module_power", float_val),
+        ("max-port-power", "max_port_power", float_val),
+        ("media-lane-count", "media_lane_count", float_val),
+        ("media-lockdown-state", "media_lockdown_state", bool_val, str),
+        ("present", "present", string_val),
+        ("qualified", "qualified", bool_val, str),
+        ("serial-no", "serial_no", string_val),
+        ("vendor", "vendor", string_val),
+        ("vendor-oui", "vendor_oui", string_val),
+        ("vendor-part", "vendor_part", string_val),
+        ("vendor-rev", "vendor_rev", string_val),
+        # Time series
+        ("input-power", "input_power", float_val),
+        ("output-power", "output_power", float_val),
+        ("laser-bias-current", "laser_bias_current", float_val),
+        ("supply-voltage", "supply_voltage", float_val),
+        ("temperature", "temperature", float_val),
+    ]
+)
+
+DOM_THRESHOLD_DECODERS = compile_decoders(
+    (leaf, leaf.replace("-", "_"), float_val)
+    for sensor in (
+        "input-power",
+        "laser-bias-current",
+        "module-temperature",
+        "output-power",
+        "supply-voltage",
+    )
+    for leaf in (f"{sensor}-lower", f"{sensor}-upper")
+)
+
+DOM_THRESHOLD_SEVERITIES = ("CRITICAL", "WARNING")
+
+
+def decode_dom_updates(updates: Iterable[Update]) -> dict:
+    """
+    Decodes the DOM leaves of the updates in one pass. Threshold leaves are decoded
+    into threshold_<severity>_<field>, the severity being the key of the threshold element of their path.
+
+    Args:
+        updates (Iterable[Update]): Updates of a DOM subscription response.
+
+    Returns:
+        dict: Field -> decoded value, of the leaves present in the updates.
+    """
+    fields = {}
+    for u in updates:
+        severity = None
+        for ele in u.path.elem:
+            if ele.name == "threshold":
+                severity = ele.key.get("severity")
+                if severity not in DOM_THRESHOLD_SEVERITIES:
+                    break
+            elif severity and (decoder := DOM_THRESHOLD_DECODERS.get(ele.name)):
+                fields[f"threshold_{severity.lower()}_{decoder.field}"] = decoder.decode(u.val)
+            elif decoder := DOM_DECODERS.get(ele.name):
+                fields[decoder.field] = decoder.decode(u.val)
+    return fields
+
+
+def get_prometheus_labels(fields: dict) -> dict:
+    """
+    Converts decoded fields into Prometheus Info labels, names with underscores and string values.
+    """
+    return {field.replace("-", "_"): str(value) for field, value in fields.items()}
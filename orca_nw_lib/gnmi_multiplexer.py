@@ -0,0 +1,279 @@
+""" Reads the gNMI subscription streams of all devices on a few asyncio event loops """
+
+import asyncio
+import threading
+import time
+import zlib
+from typing import Dict, List, Optional
+
+import grpc
+
+from .gnmi_pb2 import Subscription
+from .gnmi_pb2_grpc import gNMIStub
+from .gnmi_sub import (
+    device_sync_responses,
+    dispatch_update,
+    get_subscribe_request,
+    get_subscription_handlers,
+    wait_for_streams_ended,
+)
+from .gnmi_util import get_grpc_channel_args, is_device_ready
+from .subscription_supervisor import report_stream_lost
+from .utils import get_logging, get_subscription_event_loops
+
+_logger = get_logging().getLogger(__name__)
+
+## States of a subscription stream.
+STREAM_CONNECTING = "connecting"
+STREAM_SYNCING = "syncing"
+STREAM_STREAMING = "streaming"
+STREAM_CANCELLED = "cancelled"
+STREAM_CLOSED = "closed"
+STREAM_FAILED = "failed"
+
+
+class SubscriptionStream:
+    """
+    State of the subscription stream of one device.
+    """
+
+    def __init__(self, device_ip: str, subscriptions: List[Subscription]):
+        self.device_ip = device_ip
+        self.subscriptions = subscriptions
+        self.state = STREAM_CONNECTING
+        self.updates = 0
+        self.started_at = time.time()
+        self.last_update_at = None
+        self.error = None
+        self.task = None
+        self.cancelled = False
+        # Set once the stream has ended, whatever the reason.
+        self.ended = threading.Event()
+
+    def is_active(self) -> bool:
+        return not self.ended.is_set()
+
+    def get_state(self) -> dict:
+        return {
+            "device_ip": self.device_ip,
+            "state": self.state,
+            "updates": self.updates,
+            "started_at": self.started_at,
+            "last_update_at": self.last_update_at,
+            "error": self.error,
+        }
+
+
+class SubscriptionMultiplexer:
+    """
+    Runs the subscription streams of all devices on a fixed number of event loops,
+    every loop running in its own thread. A device is always read by the same loop.
+    Updates are handed to the subscription handlers in a thread pool executor,
+    one update at a time per stream, so that the updates of a device are handled in order
+    and the stream is not read faster than its updates are handled.
+    """
+
+    def __init__(self, loops: int):
+        self._loops = []
+        for i in range(loops):
+            loop = asyncio.new_event_loop()
+            threading.Thread(
+                target=loop.run_forever, name=f"subscription_loop_{i}", daemon=True
+            ).start()
+            self._loops.append(loop)
+        self._streams: Dict[str, SubscriptionStream] = {}
+        self._lock = threading.Lock()
+
+    def _get_loop(self, device_ip: str) -> asyncio.AbstractEventLoop:
+        return self._loops[zlib.crc32(device_ip.encode()) % len(self._loops)]
+
+    def is_subscribed(self, device_ip: str) -> bool:
+        """
+        Returns True if the device has an active subscription stream.
+        """
+        stream = self._streams.get(device_ip)
+        return stream is not None and stream.is_active()
+
+    def subscribe(self, device_ip: str, subscriptions: List[Subscription]) -> bool:
+        """
+        Starts the subscription stream of the device, if not already active.
+
+        Args:
+            device_ip (str): The IP address of the device.
+            subscriptions (List[Subscription]): The subscriptions of the stream.
+
+        Returns:
+            bool: True if the stream is started or already active.
+        """
+        with self._lock:
+            if self.is_subscribed(device_ip):
+                return True
+            stream = SubscriptionStream(device_ip, subscriptions)
+            self._streams[device_ip] = stream
+        loop = self._get_loop(device_ip)
+        loop.call_soon_threadsafe(self._start_stream, stream)
+        return True
+
+    def _start_stream(self, stream: SubscriptionStream):
+        if stream.cancelled:
+            ## Cancelled before being started.
+            stream.state = STREAM_CANCELLED
+            stream.ended.set()
+            return
+        stream.task = asyncio.get_running_loop().create_task(self._read_stream(stream))
+        stream.task.add_done_callback(lambda task: self._on_task_done(stream, task))
+
+    @staticmethod
+    def _on_task_done(stream: SubscriptionStream, task: asyncio.Task):
+        ## A task cancelled before its first step never runs _read_stream, which sets ended.
+        if task.cancelled() and not stream.ended.is_set():
+            stream.state = STREAM_CANCELLED
+            stream.ended.set()
+
+    def _cancel_task(self, stream: SubscriptionStream):
+        stream.cancelled = True
+        if stream.task:
+            stream.task.cancel()
+
+    async def _read_stream(self, stream: SubscriptionStream):
+        loop = asyncio.get_running_loop()
+        device_ip = stream.device_ip
+        channel = None
+        try:
+            await loop.run_in_executor(None, is_device_ready, device_ip)
+            target, creds, options = await loop.run_in_executor(
+                None, get_grpc_channel_args, device_ip
+            )
+            channel = grpc.aio.secure_channel(target, creds, options=options)
+            handlers = get_subscription_handlers()
+            call = gNMIStub(channel).Subscribe(
+                iter([get_subscribe_request(stream.subscriptions)])
+            )
+            stream.state = STREAM_SYNCING
+            _logger.info("Subscribed for %s gnmi notifications.", device_ip)
+            async for resp in call:
+                stream.updates += 1
+                stream.last_update_at = time.time()
+                if resp.sync_response:
+                    _logger.info("gNMI subscription sync response received from %s", device_ip)
+                    device_sync_responses[device_ip] = resp.sync_response
+                    stream.state = STREAM_STREAMING
+                else:
+                    await loop.run_in_executor(
+                        None, dispatch_update, handlers, device_ip, resp
+                    )
+            stream.state = STREAM_CLOSED
+            _logger.info("gNMI subscription stream of %s closed by device.", device_ip)
+        except asyncio.CancelledError:
+            stream.state = STREAM_CANCELLED
+            _logger.info("Cancelled gNMI subscription of %s.", device_ip)
+        except Exception as e:
+            stream.state = STREAM_FAILED
+            stream.error = str(e)
+            _logger.error("gNMI subscription of %s failed: %s", device_ip, e)
+        finally:
+            device_sync_responses.pop(device_ip, None)
+            if channel is not None:
+                await channel.close()
+            stream.ended.set()
+        if stream.state != STREAM_CANCELLED:
+            report_stream_lost(device_ip, stream.error)
+
+    def cancel_stream(self, device_ip: str) -> Optional[SubscriptionStream]:
+        """
+        Cancels the subscription stream of the device without waiting for it to end.
+
+        Args:
+            device_ip (str): The IP address of the device.
+
+        Returns:
+            SubscriptionStream: The cancelled stream, its ended event is set once it has ended.
+            None if the device has no stream.
+        """
+        with self._lock:
+            stream = self._streams.pop(device_ip, None)
+        if stream is not None:
+            self._get_loop(device_ip).call_soon_threadsafe(self._cancel_task, stream)
+        return stream
+
+    def cancel(self, device_ip: str, timeout: float = 5) -> bool:
+        """
+        Cancels the subscription stream of the device and waits until it has ended.
+
+        Args:
+            device_ip (str): The IP address of the device.
+            timeout (float, optional): Max seconds to wait for the stream to end. Defaults to 5.
+
+        Returns:
+            bool: True if the stream has ended, False if there is no stream or it did not end in time.
+        """
+        if (stream := self.cancel_stream(device_ip)) is None:
+            return False
+        return wait_for_streams_ended({device_ip: stream.ended}, timeout)
+
+    def resubscribe(
+        self, device_ip: str, subscriptions: Optional[List[Subscription]] = None
+    ) -> bool:
+        """
+        Cancels the subscription stream of the device, if any, and starts a new one.
+
+        Args:
+            device_ip (str): The IP address of the device.
+            subscriptions (List[Subscription], optional): The subscriptions of the new stream.
+                Defaults to None, i.e. the subscriptions of the cancelled stream.
+
+        Returns:
+            bool: True if the new stream is started.
+        """
+        stream = self._streams.get(device_ip)
+        subscriptions = subscriptions or (stream.subscriptions if stream else None)
+        if not subscriptions:
+            _logger.error("No subscriptions to resubscribe %s.", device_ip)
+            return False
+        self.cancel(device_ip)
+        return self.subscribe(device_ip, subscriptions)
+
+    def get_stream_states(self, device_ip: str = None):
+        """
+        Returns the state of the subscription streams.
+
+        Args:
+            device_ip (str, optional): The IP address of the device. Defaults to None, i.e. all devices.
+
+        Returns:
+            dict: device_ip, state, updates received, started_at, last_update_at and error of the stream,
+            or a dict of them keyed by device IP. None if the device has no stream.
+        """
+        if device_ip:
+            stream = self._streams.get(device_ip)
+            return stream.get_state() if stream else None
+        return {ip: stream.get_state() for ip, stream in list(self._streams.items())}
+
+    def cancel_all(self, timeout: float = 5) -> bool:
+        """
+        Cancels the subscription streams of all devices, and waits for all of them within timeout.
+
+        Returns:
+            bool: True if all the streams have ended.
+        """
+        ended = {}
+        for device_ip in list(self._streams):
+            if (stream := self.cancel_stream(device_ip)) is not None:
+                ended[device_ip] = stream.ended
+        return wait_for_streams_ended(ended, timeout)
+
+
+_multiplexer = None
+_multiplexer_lock = threading.Lock()
+
+
+def get_subscription_multiplexer() -> SubscriptionMultiplexer:
+    """
+    Returns the multiplexer of the subscription streams,
+    created on first use with subscription_event_loops event loops.
+    """
+    global _multiplexer
+    with _multiplexer_lock:
+        if _multiplexer is None:
+            _multiplexer = SubscriptionMultiplexer(get_subscription_event_loops())
+        return _multiplexer
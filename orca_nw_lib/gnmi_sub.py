@@ -1,7 +1,10 @@
+import functools
 import time
 from threading import Thread
 import threading
-from typing import List
+from typing import Callable, Dict, List, Optional
+
+import grpc
 
 from orca_nw_lib.crm_influxdb import handle_crm_stats_influxdb
 from orca_nw_lib.crm_promdb import handle_crm_stats_promdb
@@ -13,24 +16,42 @@ from orca_nw_lib.interface_promdb import handle_interface_counters_promdb
 from orca_nw_lib.system_gnmi import get_crm_stats_path, get_subscription_path_for_crm_stats, get_subscription_path_for_system, get_system_base_path
 from orca_nw_lib.system_influxdb import handle_system_influxdb
 from orca_nw_lib.system_promdb import handle_system_promdb
-from orca_nw_lib.utils import get_telemetry_db
-from .common import PortFec, Speed
+from orca_nw_lib.utils import (
+    get_subscription_mode,
+    get_subscription_paths,
+    get_telemetry_db,
+    is_telemetry_store_enabled,
+)
+from .common import DiscoveryFeature, Speed
+from .db_write_behind import submit_interface_config
 from .device_db import get_all_devices_ip_from_db, update_device_status
 from .device_gnmi import get_device_state_url
+from .gnmi_decoders import (
+    INTERFACE_CONFIG_DECODERS,
+    STP_CONFIG_DECODERS,
+    STP_PORT_CONFIG_DECODERS,
+    decode_updates,
+    get_empty_fields,
+)
 from .gnmi_pb2 import (
     Encoding,
+    PathElem,
     SubscribeRequest,
     SubscribeResponse,
     Subscription,
     SubscriptionList,
     SubscriptionMode,
 )
-from orca_nw_lib.gnmi_util import get_logging, send_gnmi_subscribe, getGrpcStubs
+from orca_nw_lib.gnmi_util import (
+    get_logging,
+    getGrpcStubs,
+    send_gnmi_get,
+    send_gnmi_subscribe,
+)
 
 from orca_nw_lib.interface_db import (
     get_all_interfaces_name_of_device_from_db,
 )
-from orca_nw_lib.interface_db import set_interface_config_in_db
 
 from orca_nw_lib.interface_gnmi import (
     get_interface_base_path,
@@ -49,10 +70,95 @@ from orca_nw_lib.portgroup_gnmi import (
 from .stp_db import set_stp_config_in_db
 from .stp_port_db import set_stp_port_config_in_db, delete_stp_port_member_from_db
 from .stp_port_gnmi import get_stp_port_path
+from .storage_backend import is_feature_supported
+from .metrics import observe_handler, record_update, timed_handler
+from .subscription_profiles import PATH_CLASS_INTERFACE_COUNTERS, create_subscription
+from .subscription_supervisor import report_stream_lost, supervise, unsupervise
+from .telemetry_store import (
+    clear_device_telemetry,
+    store_crm_stats,
+    store_dom,
+    store_interface_counters,
+    store_system_memory,
+)
+from .update_lanes import get_telemetry_lane
+from .worker_pool import get_subscription_worker_pool
 
 _logger = get_logging().getLogger(__name__)
 
+"""
+Subscription streams read by their own thread.
+    Key: device_ip
+    Value: SubscriptionHandle of the stream
+"""
 gnmi_subscriptions = {}
+_subscriptions_lock = threading.Lock()
+
+
+class SubscriptionHandle:
+    """
+    Handle of the subscription stream of a device, read by its own thread.
+    The stream is stopped by cancelling its gRPC call through the handle,
+    and waited for with join.
+    """
+
+    def __init__(self, device_ip: str, subscriptions: List[Subscription]):
+        self.device_ip = device_ip
+        self.subscriptions = subscriptions
+        self.call = None
+        self.thread = None
+        # Set once the stream has ended, whatever the reason.
+        self.ended = threading.Event()
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        self.thread = Thread(
+            name=get_subscription_thread_name(self.device_ip),
+            target=handle_update,
+            args=(self,),
+            daemon=True,
+        )
+        self.thread.start()
+
+    def set_call(self, call) -> bool:
+        """
+        Sets the gRPC call of the stream, the call is cancelled at once if the handle already is.
+
+        Returns:
+            bool: False if the handle has been cancelled.
+        """
+        with self._lock:
+            self.call = call
+            if self._cancelled.is_set():
+                if call is not None:
+                    call.cancel()
+                return False
+        return True
+
+    def cancel(self):
+        """
+        Cancels the stream without waiting for it to end.
+        """
+        with self._lock:
+            self._cancelled.set()
+            if self.call is not None:
+                self.call.cancel()
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def is_active(self) -> bool:
+        return not self._cancelled.is_set() and not self.ended.is_set()
+
+    def join(self, timeout: float = None) -> bool:
+        """
+        Waits for the stream to end.
+
+        Returns:
+            bool: True if the stream has ended, False on timeout.
+        """
+        return self.ended.wait(timeout)
 
 
 def subscribe_to_path(request):
@@ -71,56 +177,18 @@ def handle_interface_config_update(device_ip: str, resp: SubscribeResponse):
             device_ip,
         )
         return
-    enable = None
-    mtu = None
-    speed = None
-    description = None
-    fec = None
-    autoneg = None
-    adv_speeds = None
-    link_training = None
-    for u in resp.update.update:
-        for ele in u.path.elem:
-            if ele.name == "enabled":
-                enable = u.val.bool_val
-            if ele.name == "mtu":
-                mtu = u.val.uint_val
-            if ele.name == "port-speed":
-                speed = Speed.get_enum_from_str(u.val.string_val)
-            if ele.name == "description":
-                description = u.val.string_val
-            if ele.name == "port-fec":
-                fec = PortFec.get_enum_from_str(u.val.string_val)
-            if ele.name == "auto-negotiate":
-                autoneg = u.val.bool_val
-            if ele.name == "advertised-speed":
-                adv_speeds = u.val.string_val
-            if ele.name == "standalone-link-training":
-                link_training = u.val.bool_val
+    config = decode_updates(
+        INTERFACE_CONFIG_DECODERS,
+        resp.update.update,
+        get_empty_fields(INTERFACE_CONFIG_DECODERS),
+    )
     _logger.debug(
-        "updating interface config in DB, device_ip: %s, ether: %s, enable: %s, mtu: %s, speed: %s, description: %s, autoneg: %s, adv_speeds : %s, link_training: %s .",
+        "updating interface config in DB, device_ip: %s, ether: %s, config: %s .",
         device_ip,
         ether,
-        enable,
-        mtu,
-        speed,
-        description,
-        autoneg,
-        adv_speeds,
-        link_training,
-    )
-    set_interface_config_in_db(
-        device_ip=device_ip,
-        if_name=ether,
-        enable=enable,
-        mtu=mtu,
-        speed=speed,
-        description=description,
-        fec=fec,
-        autoneg=autoneg,
-        adv_speeds=adv_speeds,
-        link_training=link_training,
+        config,
     )
+    submit_interface_config(device_ip=device_ip, if_name=ether, **config)
 
 
 def handle_port_group_config_update(device_ip: str, resp: SubscribeResponse):
@@ -152,80 +220,14 @@ def handle_port_group_config_update(device_ip: str, resp: SubscribeResponse):
 
 
 def handle_stp_config(device_ip: str, resp: SubscribeResponse):
-    enabled_protocol = None
-    bpdu_filter = None
-    loop_guard = None
-    disabled_vlans = None
-    rootguard_timeout = None
-    portfast = None
-    hello_time = None
-    max_age = None
-    forwarding_delay = None
-    bridge_priority = None
-    for u in resp.update.update:
-        for ele in u.path.elem:
-            if ele.name == "enabled-protocol":
-                enabled_protocol = u.val.string_val
-            if ele.name == "bpdu-filter":
-                bpdu_filter = u.val.bool_val
-            if ele.name == "loop-guard":
-                loop_guard = u.val.bool_val
-            if ele.name == "disabled-vlans":
-                disabled_vlans = u.val.string_val
-            if ele.name == "rootguard-timeout":
-                rootguard_timeout = u.val.uint_val
-            if ele.name == "portfast":
-                portfast = u.val.bool_val
-            if ele.name == "hello-time":
-                hello_time = u.val.uint_val
-            if ele.name == "max-age":
-                max_age = u.val.uint_val
-            if ele.name == "forwarding-delay":
-                forwarding_delay = u.val.uint_val
-            if ele.name == "bridge-priority":
-                bridge_priority = u.val.uint_val
-    _logger.debug(
-        "Updating STP config on DB for device: %s, enabled_protocol: %s, bpdu_filter: %s, loop_guard: %s, disabled_vlans: %s, rootguard_timeout: %s, portfast: %s, hello_time: %s, max_age: %s, forwarding_delay: %s, bridge_priority: %s",
-        device_ip,
-        enabled_protocol,
-        bpdu_filter,
-        loop_guard,
-        disabled_vlans,
-        rootguard_timeout,
-        portfast,
-        hello_time,
-        max_age,
-        forwarding_delay,
-        bridge_priority,
-    )
-    set_stp_config_in_db(
-        device_ip=device_ip,
-        enabled_protocol=enabled_protocol,
-        bpdu_filter=bpdu_filter,
-        loop_guard=loop_guard,
-        disabled_vlans=disabled_vlans,
-        rootguard_timeout=rootguard_timeout,
-        portfast=portfast,
-        hello_time=hello_time,
-        max_age=max_age,
-        forwarding_delay=forwarding_delay,
-        bridge_priority=bridge_priority,
+    config = decode_updates(
+        STP_CONFIG_DECODERS, resp.update.update, get_empty_fields(STP_CONFIG_DECODERS)
     )
+    _logger.debug("Updating STP config on DB for device: %s, config: %s", device_ip, config)
+    set_stp_config_in_db(device_ip=device_ip, **config)
 
 
 def handle_stp_port_config(device_ip: str, resp: SubscribeResponse):
-    bpdu_guard = None
-    bpdu_filter = None
-    bpdu_guard_port_shutdown = None
-    link_type = None
-    guard = None
-    edge_port = None
-    if_name = None
-    portfast = None
-    stp_enabled = None
-    uplink_fast = None
-    cost = None
-    port_priority = None
     for del_item in resp.update.delete:
         for ele in del_item.elem:
             if ele.name == "interface":
@@ -234,50 +236,18 @@ def handle_stp_port_config(device_ip: str, resp: SubscribeResponse):
                     device_ip=device_ip, if_name=if_name
                 )
 
-    for u in resp.update.update:
-        for ele in u.path.elem:
-            if ele.name == "bpdu-guard":
-                bpdu_guard = u.val.bool_val
-            if ele.name == "bpdu-filter":
-                bpdu_filter = u.val.bool_val
-            if ele.name == "bpdu-guard-port-shutdown":
-                bpdu_guard_port_shutdown = u.val.bool_val
-            if ele.name == "link-type":
-                link_type = u.val.string_val
-            if ele.name == "guard":
-                guard = u.val.string_val
-            if ele.name == "edge-port":
-                edge_port = u.val.string_val
-            if ele.name == "name":
-                if_name = u.val.string_val
-            if ele.name == "portfast":
-                portfast = u.val.bool_val
-            if ele.name == "spanning-tree-enable":
-                stp_enabled = u.val.bool_val
-            if ele.name == "uplink-fast":
-                uplink_fast = u.val.bool_val
-            if ele.name == "cost":
-                cost = u.val.uint_val
-            if ele.name == "port-priority":
-                port_priority = u.val.uint_val
-    _logger.debug(
-        f"Updating stp port {if_name} on db for {device_ip} with config bpdu_guard: {bpdu_guard}, bpdu_filter: {bpdu_filter}, bpdu_guard_port_shutdown: {bpdu_guard_port_shutdown}, link_type: {link_type}, guard: {guard}, edge_port: {edge_port}, portfast: {portfast}, stp_enabled: {stp_enabled}, uplink_fast: {uplink_fast}, cost: {cost}, port_priority: {bpdu_guard}."
+    config = decode_updates(
+        STP_PORT_CONFIG_DECODERS,
+        resp.update.update,
+        get_empty_fields(STP_PORT_CONFIG_DECODERS),
     )
-    return set_stp_port_config_in_db(
-        device_ip=device_ip,
-        if_name=if_name,
-        bpdu_guard=bpdu_guard,
-        bpdu_filter=bpdu_filter,
-        bpdu_guard_port_shutdown=bpdu_guard_port_shutdown,
-        link_type=link_type,
-        guard=guard,
-        edge_port=edge_port,
-        portfast=portfast,
-        stp_enabled=stp_enabled,
-        uplink_fast=uplink_fast,
-        cost=cost,
-        port_priority=port_priority,
+    _logger.debug(
+        "Updating stp port %s on db for %s with config %s.",
+        config["if_name"],
+        device_ip,
+        config,
     )
+    return set_stp_port_config_in_db(device_ip=device_ip, **config)
 
 
 def handle_device_state(device_ip: str, resp: SubscribeResponse):
@@ -293,8 +263,147 @@ def handle_device_state(device_ip: str, resp: SubscribeResponse):
             update_device_status(device_ip, status)
 
 
-def handle_update(device_ip: str, subscriptions: List[Subscription]):
-    # device_gnmi_stub = getGrpcStubs(device_ip)
+def _get_prefix_key(resp: SubscribeResponse, elem_name: str, key: str):
+    for ele in resp.update.prefix.elem:
+        if ele.name == elem_name:
+            return ele.key.get(key)
+    return None
+
+
+_timed_interface_config_update = timed_handler(handle_interface_config_update)
+
+
+def submit_interface_config_update(device_ip: str, resp: SubscribeResponse):
+    # Updates of the same interface are handled in order by the same worker.
+    # The name key is on the "interface" prefix element, the top-level "interfaces" element has none.
+    get_subscription_worker_pool().submit(
+        (device_ip, _get_prefix_key(resp, "interface", "name")),
+        _timed_interface_config_update,
+        device_ip,
+        resp,
+    )
+
+
+def _get_sample_key(device_ip: str, resp: SubscribeResponse) -> tuple:
+    return (
+        device_ip,
+        tuple((ele.name, tuple(sorted(ele.key.items()))) for ele in resp.update.prefix.elem),
+        tuple(tuple(ele.name for ele in u.path.elem) for u in resp.update.update),
+    )
+
+
+def submit_telemetry_update(handler: Callable) -> Callable:
+    """
+    Wraps a telemetry db handler, so that the updates are queued on the telemetry lane
+    instead of being pushed to the telemetry db by the subscription stream.
+    A queued sample can be replaced by a later sample of the same device, prefix and update paths,
+    depending on the policy of the lane.
+
+    Args:
+        handler (Callable): Handler to be called with (device_ip, resp).
+
+    Returns:
+        Callable: Handler queuing (device_ip, resp) for the given handler.
+    """
+    timed = timed_handler(handler)
+
+    @functools.wraps(handler)
+    def submit(device_ip: str, resp: SubscribeResponse):
+        get_telemetry_lane().submit(
+            (handler.__name__,) + _get_sample_key(device_ip, resp),
+            timed,
+            device_ip,
+            resp,
+        )
+
+    # Named apart from the handler, as the run time of the submit is recorded too.
+    submit.__name__ = f"submit_{handler.__name__}"
+    return submit
+
+
+def get_subscription_handlers() -> Dict[str, List[Callable]]:
+    """
+    Builds the dispatch table of the subscription updates.
+    Built once per subscription, so that the gNMI paths and the telemetry db
+    are not evaluated again for every update received.
+
+    Returns:
+        Dict[str, List[Callable]]: Name of a prefix element of the update ->
+        handlers to be called with (device_ip, resp), in order.
+    """
+    telemetry_db = get_telemetry_db()
+    handlers = {}
+
+    def add(elem_name: str, *funcs):
+        handlers.setdefault(elem_name, []).extend(func for func in funcs if func)
+
+    def telemetry(influxdb_handler: Callable, promdb_handler: Callable):
+        handler = {
+            "influxdb": influxdb_handler,
+            "prometheus": promdb_handler,
+        }.get(telemetry_db)
+        return submit_telemetry_update(handler) if handler else None
+
+    add(
+        get_interface_base_path().elem[0].name,
+        submit_interface_config_update,
+        # Checks for Interface and inserts data to db
+        telemetry(handle_interface_counters_influxdb, handle_interface_counters_promdb),
+    )
+    add(_get_port_groups_base_path().elem[0].name, handle_port_group_config_update)
+    add(get_stp_port_path().elem[0].name, handle_stp_port_config)
+    add(get_device_state_url().elem[0].name, handle_device_state)
+    # system metric, CRM statistics and DOM are only pushed to the telemetry db.
+    add(
+        get_system_base_path().elem[0].name,
+        telemetry(handle_system_influxdb, handle_system_promdb),
+    )
+    add(
+        get_crm_stats_path().elem[1].name,
+        telemetry(handle_crm_stats_influxdb, handle_crm_stats_promdb),
+    )
+    add(
+        get_dom_path().elem[0].name,
+        telemetry(handle_dom_influxdb, handle_dom_promdb),
+    )
+    if is_telemetry_store_enabled():
+        add(get_interface_base_path().elem[0].name, store_interface_counters)
+        add(get_system_base_path().elem[0].name, store_system_memory)
+        add(get_crm_stats_path().elem[1].name, store_crm_stats)
+        add(get_dom_path().elem[0].name, store_dom)
+    return handlers
+
+
+def dispatch_update(
+    handlers: Dict[str, List[Callable]], device_ip: str, resp: SubscribeResponse
+):
+    """
+    Calls the handlers of every prefix element of the update.
+    The update and the run time of the handlers are recorded in orca_nw_lib.metrics.
+
+    Args:
+        handlers (Dict[str, List[Callable]]): Dispatch table built by get_subscription_handlers.
+        device_ip (str): The IP address of the device.
+        resp (SubscribeResponse): The update received.
+    """
+    recorded = False
+    for ele in resp.update.prefix.elem:
+        if (elem_handlers := handlers.get(ele.name)) and not recorded:
+            # Path class of the update is its first prefix element with handlers.
+            record_update(device_ip, ele.name.split(":")[-1], resp.update.timestamp)
+            recorded = True
+        for handler in elem_handlers or ():
+            _logger.debug(
+                "gNMI subscription update received from %s, calling %s -> %s",
+                device_ip,
+                handler.__name__,
+                resp,
+            )
+            with observe_handler(handler.__name__):
+                handler(device_ip, resp)
+
+
+def get_subscribe_request(subscriptions: List[Subscription]) -> SubscribeRequest:
     subscriptionlist = SubscriptionList(
         subscription=subscriptions,
         mode=SubscriptionList.Mode.Value("STREAM"),
@@ -302,103 +411,48 @@ def handle_update(device_ip: str, subscriptions: List[Subscription]):
         encoding=Encoding.Value("JSON_IETF"),
         # updates_only=True,
     )
+    return SubscribeRequest(subscribe=subscriptionlist)
 
-    sub_req = SubscribeRequest(subscribe=subscriptionlist)
-    subscription = send_gnmi_subscribe(
-        device_ip=device_ip, subscribe_request=subscribe_to_path(sub_req)
-    )
-    global gnmi_subscriptions
-    gnmi_subscriptions[device_ip] = subscription
+
+def handle_update(handle: SubscriptionHandle):
+    """
+    Reads the subscription stream of the handle until it ends,
+    the loss of the stream is reported unless the handle has been cancelled.
+    """
+    device_ip = handle.device_ip
+    sub_req = get_subscribe_request(handle.subscriptions)
+    error = None
+    try:
+        subscription = send_gnmi_subscribe(
+            device_ip=device_ip, subscribe_request=subscribe_to_path(sub_req)
+        )
+    except Exception as e:
+        _logger.error("Failed to subscribe for %s: %s", device_ip, e)
+        error = e
+    else:
+        try:
+            if handle.set_call(subscription):
+                _read_subscription(device_ip, subscription, get_subscription_handlers())
+        except Exception as e:
+            error = e
+    finally:
+        with _subscriptions_lock:
+            if gnmi_subscriptions.get(device_ip) is handle:
+                del gnmi_subscriptions[device_ip]
+        handle.ended.set()
+    if handle.is_cancelled():
+        _logger.info("Cancelled gNMI subscription of %s.", device_ip)
+        return
+    ## Stream lost, the device has to send a new sync response once resubscribed.
+    device_sync_responses.pop(device_ip, None)
+    report_stream_lost(device_ip, error)
+
+
+def _read_subscription(device_ip: str, subscription, handlers: Dict[str, List[Callable]]):
     for resp in subscription:
         try:
             if not resp.sync_response:
-                for ele in resp.update.prefix.elem:
-                    if ele.name == get_interface_base_path().elem[0].name:
-                        _logger.debug(
-                            "gNMI subscription interface config update received from %s -> %s",
-                            device_ip,
-                            resp,
-                        )
-                        thread = Thread(
-                            target=handle_interface_config_update,
-                            args=(device_ip, resp),
-                            daemon=True,
-                        )
-                        thread.start()
-                        # handle_interface_config_update(device_ip, resp)
-                        
-                        # Checks for Interface and inserts data to db  
-                        if get_telemetry_db() == "influxdb":
-                            handle_interface_counters_influxdb(device_ip, resp)
-                        elif get_telemetry_db() == "prometheus":
-                            handle_interface_counters_promdb(device_ip, resp)
-
-
-                    if ele.name == _get_port_groups_base_path().elem[0].name:
-                        ## Its a port group config update
-                        _logger.debug(
-                            "gNMI subscription port group config update received from %s -> %s",
-                            device_ip,
-                            resp,
-                        )
-                        handle_port_group_config_update(device_ip, resp)
-                    if ele.name == get_stp_port_path().elem[0].name:
-                        _logger.debug(
-                            "gNMI subscription stp config update received from %s -> %s",
-                            device_ip,
-                            resp,
-                        )
-                        handle_stp_port_config(device_ip, resp)
-                    if ele.name == get_device_state_url().elem[0].name:
-                        _logger.debug(
-                            "gNMI subscription device state update received from %s -> %s",
-                            device_ip,
-                            resp,
-                        )
-                        handle_device_state(device_ip, resp)
-
-                    # checks for system metric and inserts data to db 
-                    if ele.name == get_system_base_path().elem[0].name:
-                        _logger.debug(
-                            "gNMI subscription system metric received from %s -> %s",
-                            device_ip,
-                            resp,
-                        )
-                        # Check the telemetry db and push the data.  
-                        if get_telemetry_db() == "influxdb":
-                            handle_system_influxdb(device_ip, resp)
-                        elif get_telemetry_db() == "prometheus":
-                            handle_system_promdb(device_ip, resp)
-
-
-                    # checks for CRM Statistics and inserts data to db 
-                    if ele.name == get_crm_stats_path().elem[1].name:
-                        _logger.debug(
-                            "gNMI subscription crm statistics update received from %s -> %s",
-                            device_ip,
-                            resp,
-                        )
-                        # Check the telemetry db and push the data.
-                        if get_telemetry_db() == "influxdb":
-                            handle_crm_stats_influxdb(device_ip, resp)
-                        elif get_telemetry_db() == "prometheus":
-                            handle_crm_stats_promdb(device_ip, resp)
-
-                    # checks for DOM and inserts data to db 
-                    if ele.name == get_dom_path().elem[0].name:
-                        _logger.debug(
-                            "gNMI subscription crm statistics update received from %s -> %s",
-                            device_ip,
-                            resp,
-                        )
-                        # Check the telemetry db and push the data.
-                        if get_telemetry_db() == "influxdb":
-                            handle_dom_influxdb(device_ip, resp)
-                        elif get_telemetry_db() == "prometheus":
-                            handle_dom_promdb(device_ip, resp)
-
-                        
-
+                dispatch_update(handlers, device_ip, resp)
             elif resp.sync_response:
                 global device_sync_responses
                 _logger.info(
@@ -458,72 +512,198 @@ def get_running_thread_names():
     return thread_names
 
 
-def gnmi_subscribe(device_ip: str, force_resubscribe: bool = False):
+def gnmi_subscribe(device_ip: str, force_resubscribe: bool = False, supervised: bool = True):
     """
     Subscribe to GNMI for the given device IP.
 
     Args:
         device_ip (str): The IP address of the device.
         force_resubscribe (bool, optional): Whether to force resubscription even if already subscribed. Defaults to False.
+        supervised (bool, optional): Whether to keep the device subscribed, i.e. reconnect its stream when lost.
+            The subscription supervisor resubscribes with False, so that a device unsubscribed meanwhile
+            is not supervised again. Defaults to True.
 
     Returns:
         bool: True if subscription is successful, False otherwise.
     """
 
-    thread_name = get_subscription_thread_name(device_ip)
+    if get_subscription_mode() == "aio":
+        return _gnmi_subscribe_aio(device_ip, force_resubscribe, supervised)
+    if get_subscription_mode() == "sharded":
+        from orca_nw_lib.subscription_shards import get_shard_coordinator
+
+        return get_shard_coordinator().subscribe(device_ip, force_resubscribe)
+
     if force_resubscribe:
         _logger.info(
             "The force subscription is true, first removing the existing subscription if any."
         )
         gnmi_unsubscribe(device_ip)
 
-    if thread_name in get_running_thread_names() and not force_resubscribe:
+    if is_subscribed(device_ip):
         _logger.debug("Already subscribed for %s", device_ip)
-        _logger.debug("Currently running threads %s", get_running_thread_names())
         return True
-    else:
-        subscriptions = get_subscription_path_for_config_change(device_ip)
-        ## add get_subscription_path_for_monitoring to subscritions if telemetry_db is true
-        if get_telemetry_db():
-            subscriptions += get_subscription_path_for_monitoring(device_ip)
-            subscriptions += get_subscription_path_for_system()
-            subscriptions += get_subscription_path_for_crm_stats()
-            subscriptions += get_subscription_path_for_dom()
-        if not subscriptions:
-            _logger.warn(
-                "No subscription paths created for %s, Check if device with its components and config is discovered in DB or rediscover device.",
-                device_ip,
-            )
-            return False
-        _logger.info("Subscribing for %s", device_ip)
-        thread = Thread(
-            name=thread_name,
-            target=handle_update,
-            args=(device_ip, subscriptions),
-            daemon=True,
+    if not (subscriptions := get_device_subscriptions(device_ip)):
+        return False
+    _logger.info("Subscribing for %s", device_ip)
+    if supervised:
+        supervise(device_ip)
+    with _subscriptions_lock:
+        ## Subscribed meanwhile by another caller.
+        if (handle := gnmi_subscriptions.get(device_ip)) and handle.is_active():
+            return True
+        handle = gnmi_subscriptions[device_ip] = SubscriptionHandle(
+            device_ip, subscriptions
         )
-        thread.start()
+    handle.start()
+    _logger.debug(
+        "Subscribed for %s gnmi notifications from thread %s.",
+        device_ip,
+        handle.thread.name,
+    )
+    return True
 
-        _logger.debug("Currently running threads %s", get_running_thread_names())
-        if thread_name in get_running_thread_names():
-            _logger.debug(
-                "Subscribed for %s gnmi notifications from thread %s.",
-                device_ip,
-                thread_name,
-            )
-            return True
-        _logger.error("Failed to subscribe for %s gnmi notifications.", device_ip)
+
+def is_subscribed(device_ip: str) -> bool:
+    """
+    Returns True if the device has an active subscription stream.
+    """
+    if get_subscription_mode() == "aio":
+        from orca_nw_lib.gnmi_multiplexer import get_subscription_multiplexer
+
+        return get_subscription_multiplexer().is_subscribed(device_ip)
+    if get_subscription_mode() == "sharded":
+        from orca_nw_lib.subscription_shards import get_shard_coordinator
+
+        return get_shard_coordinator().is_subscribed(device_ip)
+    handle = gnmi_subscriptions.get(device_ip)
+    return handle is not None and handle.is_active()
+
+
+def _gnmi_subscribe_aio(device_ip: str, force_resubscribe: bool = False, supervised: bool = True):
+    from orca_nw_lib.gnmi_multiplexer import get_subscription_multiplexer
+
+    multiplexer = get_subscription_multiplexer()
+    if is_subscribed(device_ip) and not force_resubscribe:
+        _logger.debug("Already subscribed for %s", device_ip)
+        return True
+    if not (subscriptions := get_device_subscriptions(device_ip)):
         return False
+    _logger.info("Subscribing for %s", device_ip)
+    if supervised:
+        supervise(device_ip)
+    return multiplexer.resubscribe(device_ip, subscriptions)
+
+
+def get_device_subscriptions(device_ip: str) -> List[Subscription]:
+    """
+    Get all the subscriptions of the given device, config changes
+    and, when a telemetry db is configured, monitoring.
+
+    Args:
+        device_ip (str): The IP address of the device.
+
+    Returns:
+        list: A list of subscriptions, empty if the device is not discovered.
+    """
+    subscriptions = get_subscription_path_for_config_change(device_ip)
+    ## add get_subscription_path_for_monitoring to subscritions if telemetry_db or telemetry_store is enabled
+    if get_telemetry_db() or is_telemetry_store_enabled():
+        subscriptions += get_subscription_path_for_monitoring(device_ip)
+        subscriptions += get_subscription_path_for_system()
+        subscriptions += get_subscription_path_for_crm_stats()
+        subscriptions += get_subscription_path_for_dom()
+    if not subscriptions:
+        _logger.warn(
+            "No subscription paths created for %s, Check if device with its components and config is discovered in DB or rediscover device.",
+            device_ip,
+        )
+    return subscriptions
 
 
 def gnmi_subscribe_for_all_devices_in_db():
     """
     Subscribe to GNMI for all devices in the database.
     """
+    if get_subscription_mode() == "sharded":
+        from orca_nw_lib.subscription_shards import get_shard_coordinator
+
+        get_shard_coordinator().rebalance()
+        return
     for device_ip in get_all_devices_ip_from_db():
         gnmi_subscribe(device_ip)
 
 
+"""
+dictionary to store the result of the wildcard path probe of the device.
+    Key: device_ip
+    Value: True if the device accepts wildcard keyed interface paths
+"""
+wildcard_path_support = {}
+
+WILDCARD_KEY = "*"
+
+## Status codes with which a device rejects a path it does not support.
+_UNSUPPORTED_PATH_CODES = (
+    grpc.StatusCode.INVALID_ARGUMENT,
+    grpc.StatusCode.UNIMPLEMENTED,
+    grpc.StatusCode.NOT_FOUND,
+)
+
+
+def is_wildcard_path_supported(device_ip: str) -> bool:
+    """
+    Checks whether interface paths of the device are subscribed with a wildcard key,
+    i.e. interface[name=*], instead of one path per interface.
+    With subscription_paths "auto" the device is probed once with a gNMI Get
+    of a wildcard keyed path, the result is kept until the device is unsubscribed.
+
+    Args:
+        device_ip (str): The IP address of the device.
+
+    Returns:
+        bool: True if wildcard paths are used for the device.
+    """
+    mode = get_subscription_paths()
+    if mode == "wildcard":
+        return True
+    if mode != "auto":
+        return False
+    if device_ip not in wildcard_path_support:
+        path = get_intfc_config_path(WILDCARD_KEY)
+        path.elem.append(PathElem(name="name"))
+        try:
+            send_gnmi_get(device_ip=device_ip, path=[path])
+        except grpc.RpcError as e:
+            if e.code() not in _UNSUPPORTED_PATH_CODES:
+                ## Not an answer of the device about the path, probe again next time.
+                return False
+            _logger.info(
+                "Wildcard paths not supported by %s, subscribing per interface.",
+                device_ip,
+            )
+            wildcard_path_support[device_ip] = False
+        else:
+            wildcard_path_support[device_ip] = True
+    return wildcard_path_support[device_ip]
+
+
+def get_subscription_interface_names(device_ip: str) -> List[str]:
+    """
+    Get the interface names to build the interface subscription paths of the device with.
+
+    Args:
+        device_ip (str): The IP address of the device.
+
+    Returns:
+        list: [WILDCARD_KEY] if wildcard paths are used for the device,
+        otherwise the names of the interfaces of the device in DB.
+    """
+    if is_wildcard_path_supported(device_ip):
+        return [WILDCARD_KEY]
+    return get_all_interfaces_name_of_device_from_db(device_ip) or []
+
+
 def get_subscription_path_for_config_change(device_ip: str):
     """
     Get subscription path for the given device IP.
@@ -535,7 +715,7 @@ def get_subscription_path_for_config_change(device_ip: str):
         list: A list of subscription paths.
     """
     subscriptions = []
-    for eth in get_all_interfaces_name_of_device_from_db(device_ip) or []:
+    for eth in get_subscription_interface_names(device_ip):
         subscriptions.append(
             Subscription(
                 path=get_intfc_config_path(eth), mode=SubscriptionMode.ON_CHANGE
@@ -566,9 +746,10 @@ def get_subscription_path_for_config_change(device_ip: str):
     #     )
     # )
 
-    subscriptions.append(
-        Subscription(path=get_stp_port_path(), mode=SubscriptionMode.ON_CHANGE)
-    )
+    if is_feature_supported(DiscoveryFeature.stp_port):
+        subscriptions.append(
+            Subscription(path=get_stp_port_path(), mode=SubscriptionMode.ON_CHANGE)
+        )
 
     subscriptions.append(
         Subscription(
@@ -591,37 +772,69 @@ def get_subscription_path_for_monitoring(device_ip: str):
         list: A list of subscription paths.
     """
     subscriptions = []
-    for eth in get_all_interfaces_name_of_device_from_db(device_ip) or []:
+    for eth in get_subscription_interface_names(device_ip):
         subscriptions.append(
-            Subscription(
-                path=get_interface_counters_path(eth),
-                mode=SubscriptionMode.TARGET_DEFINED,
+            create_subscription(
+                get_interface_counters_path(eth), PATH_CLASS_INTERFACE_COUNTERS, eth
             )
         )
 
     return subscriptions
 
 
-def gnmi_unsubscribe_for_all_devices_in_db():
+def gnmi_unsubscribe_for_all_devices_in_db(timeout: float = 5) -> bool:
     """
-    Unsubscribes all devices in the database from GNMI.
+    Unsubscribes all devices in the database from GNMI, along with any other subscribed device.
+
+    Args:
+        timeout (float, optional): Max seconds to wait for the streams to end. Defaults to 5.
+
+    Returns:
+        bool: True if all the streams have ended.
     """
-    for device_ip in get_all_devices_ip_from_db():
-        gnmi_unsubscribe(device_ip)
+    if get_subscription_mode() == "sharded":
+        from orca_nw_lib.subscription_shards import get_shard_coordinator
+
+        return get_shard_coordinator().unsubscribe_all(timeout)
+    device_ips = set(get_all_devices_ip_from_db() or []) | set(gnmi_subscriptions)
+    if get_subscription_mode() == "aio":
+        from orca_nw_lib.gnmi_multiplexer import get_subscription_multiplexer
 
+        device_ips |= set(get_subscription_multiplexer().get_stream_states())
+    return gnmi_unsubscribe_devices(device_ips, timeout)
 
-def gnmi_unsubscribe(device_ip: str, retries: int = 5, timeout: int = 1) -> None:
+
+def gnmi_unsubscribe_devices(device_ips: List[str], timeout: float = 5) -> bool:
     """
-    Unsubscribes from the GNMI device with the specified IP address.
+    Unsubscribes the devices from GNMI.
+    All the streams are cancelled first and then waited for together,
+    so that the whole takes at most timeout seconds.
 
     Args:
-        device_ip (str): The IP address of the GNMI device.
-        retries (int, optional): The number of retries. Defaults to 5.
-        timeout (int, optional): The timeout between retries. Defaults to 1.
+        device_ips (List[str]): The IP addresses of the devices.
+        timeout (float, optional): Max seconds to wait for the streams to end. Defaults to 5.
 
     Returns:
-        None
+        bool: True if all the streams have ended.
     """
+    ended = {}
+    for device_ip in device_ips:
+        if (event := _cancel_subscription(device_ip)) is not None:
+            ended[device_ip] = event
+    stopped = wait_for_streams_ended(ended, timeout)
+    for device_ip in device_ips:
+        clear_device_telemetry(device_ip)
+    return stopped
+
+
+def _cancel_subscription(device_ip: str) -> Optional[threading.Event]:
+    """
+    Stops supervising the device and cancels its subscription stream without waiting for it to end.
+
+    Returns:
+        threading.Event: Set once the stream has ended, None if the device has no stream.
+    """
+    unsupervise(device_ip)
     sync_response = device_sync_responses.pop(device_ip, None)
     if sync_response is not None:
         _logger.debug(
@@ -631,45 +844,90 @@ def gnmi_unsubscribe(device_ip: str, retries: int = 5, timeout: int = 1) -> None
         _logger.debug(
             f"Device {device_ip} not found in device_sync_responses dictionary."
         )
+    ## Probe the wildcard path support again on next subscription, the device may have been upgraded.
+    wildcard_path_support.pop(device_ip, None)
 
-    global gnmi_subscriptions
-    subscription = gnmi_subscriptions.get(device_ip)
-    if subscription:
-        try:
-            _logger.info("Removing subscription for %s", device_ip)
-            subscription.cancel()
-            ## Remove the subscription thread
-            # Thread can only be reomved when subscription is cancelled.
-            thread_name = get_subscription_thread_name(device_ip)
-            while retries > 0:
-                _logger.info("Checking if subscription removed for %s", device_ip)
-                if thread_name in get_running_thread_names():
-                    _logger.error("Subscription thread not removed for %s", device_ip)
-                else:
-                    _logger.info("Removed subscription thread for %s", device_ip)
-                    break
-                time.sleep(timeout)
-                retries -= 1
-            _logger.debug("Currently running threads %s", get_running_thread_names())
-        except Exception as e:
-            _logger.debug("Failed to remove subscription for %s: %s", device_ip, e)
+    if get_subscription_mode() == "aio":
+        from orca_nw_lib.gnmi_multiplexer import get_subscription_multiplexer
+
+        stream = get_subscription_multiplexer().cancel_stream(device_ip)
+        return stream.ended if stream else None
 
+    with _subscriptions_lock:
+        handle = gnmi_subscriptions.pop(device_ip, None)
+    if handle is None:
+        return None
+    _logger.info("Removing subscription for %s", device_ip)
+    handle.cancel()
+    return handle.ended
 
 
-def close_gnmi_channel(device_ip: str, retries: int = 5, timeout: int = 1) -> None:
+def wait_for_streams_ended(ended: Dict[str, threading.Event], timeout: float) -> bool:
     """
-    Closes the GNMI channel for the given device IP.
+    Waits for the subscription streams to end, all within the same timeout.
+
+    Args:
+        ended (Dict[str, threading.Event]): Device IP -> event set once its stream has ended.
+        timeout (float): Max seconds to wait for all the streams.
+
+    Returns:
+        bool: True if all the streams have ended.
+    """
+    deadline = time.monotonic() + timeout
+    pending = [
+        device_ip
+        for device_ip, event in ended.items()
+        if not event.wait(max(deadline - time.monotonic(), 0))
+    ]
+    if pending:
+        _logger.error(
+            "gNMI subscriptions of %s did not end in %s seconds.", pending, timeout
+        )
+    return not pending
+
+
+def gnmi_unsubscribe(device_ip: str, timeout: float = 5) -> bool:
+    """
+    Unsubscribes from the GNMI device with the specified IP address.
+
+    Args:
+        device_ip (str): The IP address of the GNMI device.
+        timeout (float, optional): Max seconds to wait for the stream to end. Defaults to 5.
+
+    Returns:
+        bool: True if the stream has ended or the device had no stream.
+    """
+    if get_subscription_mode() == "sharded":
+        from orca_nw_lib.subscription_shards import get_shard_coordinator
+
+        return get_shard_coordinator().unsubscribe(device_ip, timeout)
+    ended = _cancel_subscription(device_ip)
+    stopped = ended is None or wait_for_streams_ended({device_ip: ended}, timeout)
+    clear_device_telemetry(device_ip)
+    return stopped
+
+
+def close_gnmi_channel(device_ip: str, timeout: float = 5) -> bool:
+    """
+    Unsubscribes the device and closes its GNMI channel, e.g. when the device is removed from DB.
 
     Args:
         device_ip (str): The IP address of the device.
-        retries (int, optional): The number of retries. Defaults to 5.
-        timeout (int, optional): The timeout in seconds. Defaults to 1.
+        timeout (float, optional): Max seconds to wait for the stream to end. Defaults to 5.
 
     Returns:
-        None
+        bool: True if the stream has ended or the device had no stream.
     """
-    # currently this function is not used.
-    # we are keeping it for future use. i.e., when remove device from db, we need to close the channel.
+    stopped = True
+    if get_subscription_mode() == "sharded":
+        from orca_nw_lib.subscription_shards import get_shard_coordinator
+
+        ## The stream and its channel are owned by the shard worker.
+        stopped = get_shard_coordinator().close(device_ip, timeout)
+        ended = None
+    else:
+        ## Cancelled first, so that the end of the stream is not reported as lost.
+        ended = _cancel_subscription(device_ip)
 
     # close gnmi channel
     device_gnmi_stub = getGrpcStubs(device_ip)
@@ -683,40 +941,10 @@ def close_gnmi_channel(device_ip: str, retries: int = 5, timeout: int = 1) -> No
     from orca_nw_lib.gnmi_util import remove_stub
     remove_stub(device_ip)
 
-    thread_name = get_subscription_thread_name(device_ip)
-    while retries > 0:
-        _logger.info("checking if channel closed for %s", device_ip)
-        if thread_name in get_running_thread_names():
-            _logger.error("Failed to close channel thread for %s", device_ip)
-        else:
-            _logger.info("Closed channel thread for %s", device_ip)
-            break
-        time.sleep(timeout)
-        retries -= 1
-    _logger.debug("Currently running threads %s", get_running_thread_names())
-
-
-def terminate_thread(thread):
-    """
-    Terminate a thread by raising a SystemExit exception in the thread.
-
-    Args:
-        thread: The thread to be terminated.
-
-    Raises:
-        ValueError: If the thread id does not exist.
-        SystemError: If PyThreadState_SetAsyncExc failed.
-    """
-    import ctypes
-
-    res = ctypes.pythonapi.PyThreadState_SetAsyncExc(
-        ctypes.c_long(thread.ident), ctypes.py_object(SystemExit)
-    )
-    if res == 0:
-        _logger.error("Failed to terminate thread %s", thread.name)
-    elif res > 1:
-        ctypes.pythonapi.PyThreadState_SetAsyncExc(thread.ident, None)
-        raise SystemError("PyThreadState_SetAsyncExc failed")
+    if ended is not None:
+        stopped = wait_for_streams_ended({device_ip: ended}, timeout)
+    clear_device_telemetry(device_ip)
+    return stopped
 
 
 def check_gnmi_subscription_and_apply_config(config_func):
@@ -30,8 +30,19 @@ _logger = get_logging().getLogger(__name__)
 stubs = {}
 
 
-def getGrpcStubs(device_ip):
-    global stubs
+def get_grpc_channel_args(device_ip: str) -> tuple:
+    """
+    Returns the arguments to open a secure gRPC channel to the device,
+    with the device certificate as root certificate and the device credentials
+    sent as metadata of every call.
+    Fetching the device certificate blocks until the device answers or request_timeout expires.
+
+    Args:
+        device_ip (str): The IP address of the device.
+
+    Returns:
+        tuple: target, channel credentials and channel options.
+    """
     port = get_device_grpc_port()
     user = get_device_username()
     passwd = get_device_password()
@@ -42,7 +53,31 @@ def getGrpcStubs(device_ip):
         raise ValueError(
             "Invalid value port : {}, user : {}, passwd : {}".format(port, user, passwd)
         )
+    sw_cert = ssl.get_server_certificate(
+        (device_ip, port), timeout=get_request_timeout()
+    ).encode("utf-8")
+
+    # Option 1
+    # creds = grpc.ssl_channel_credentials(root_certificates=sw_cert)
+    # stub.Get(GetRequest(path=[path], type=GetRequest.ALL, encoding=JSON_IETF),
+    #        metadata=[("username", user),
+    #                  ("password", passwd)], )
+
+    # Option 2, In this case need not to send user/pass in metadata in get request.
+    def auth_plugin(context, callback):
+        callback([("username", user), ("password", passwd)], None)
+
+    creds = grpc.composite_channel_credentials(
+        grpc.ssl_channel_credentials(root_certificates=sw_cert),
+        grpc.metadata_call_credentials(auth_plugin),
+    )
+
+    optns = (("grpc.ssl_target_name_override", "localhost"),)
+    return f"{device_ip}:{port}", creds, optns
+
 
+def getGrpcStubs(device_ip):
+    global stubs
     if not is_grpc_device_listening(device_ip, 10):
         raise Exception("Device %s is not reachable !!" % device_ip)
 
@@ -50,27 +85,8 @@ def getGrpcStubs(device_ip):
         return stubs.get(device_ip)
     else:
         try:
-            sw_cert = ssl.get_server_certificate(
-                (device_ip, port), timeout=get_request_timeout()
-            ).encode("utf-8")
-
-            # Option 1
-            # creds = grpc.ssl_channel_credentials(root_certificates=sw_cert)
-            # stub.Get(GetRequest(path=[path], type=GetRequest.ALL, encoding=JSON_IETF),
-            #        metadata=[("username", user),
-            #                  ("password", passwd)], )
-
-            # Option 2, In this case need not to send user/pass in metadata in get request.
-            def auth_plugin(context, callback):
-                callback([("username", user), ("password", passwd)], None)
-
-            creds = grpc.composite_channel_credentials(
-                grpc.ssl_channel_credentials(root_certificates=sw_cert),
-                grpc.metadata_call_credentials(auth_plugin),
-            )
-
-            optns = (("grpc.ssl_target_name_override", "localhost"),)
-            channel = grpc.secure_channel(f"{device_ip}:{port}", creds, options=optns)
+            target, creds, optns = get_grpc_channel_args(device_ip)
+            channel = grpc.secure_channel(target, creds, options=optns)
             stub = gNMIStubExtension(channel)
             stubs[device_ip] = stub
             return stub
@@ -172,7 +172,7 @@ class SubInterface(StructuredNode):
     Represents a sub interface in the database.
     """
 
-    ip_address = StringProperty()
+    ip_address = StringProperty(index=True)
     secondary = BooleanProperty()
     prefix = IntegerProperty()
 
@@ -2,6 +2,7 @@
 
 from influxdb_client import Point
 from influxdb_client.client.write_api import SYNCHRONOUS
+from orca_nw_lib.metrics import observe_sink
 from orca_nw_lib.utils import get_influxdb_bucket, get_influxdb_client, get_influxdb_org
 
 
@@ -31,6 +32,7 @@ def write_to_influx(point):
     bucket = get_influxdb_bucket()
     org = get_influxdb_org()
     write_api = client.write_api(write_options=SYNCHRONOUS)
-    write_api.write(bucket=bucket, record=point, org= org)
+    with observe_sink("influxdb"):
+        write_api.write(bucket=bucket, record=point, org= org)
     
 
@@ -1,5 +1,5 @@
 import datetime
-from typing import Dict, List
+from typing import Dict, Iterator, List, Optional, Tuple
 import pytz
 
 from orca_nw_lib.interface_influxdb import insert_device_interfaces_in_influxdb
@@ -11,10 +11,11 @@ from .gnmi_sub import check_gnmi_subscription_and_apply_config
 from .graph_db_models import Interface, SubInterface
 from .interface_db import (
     get_all_interfaces_name_of_device_from_db,
-    get_all_interfaces_of_device_from_db,
     get_interface_of_device_from_db,
+    get_interfaces_page_from_db,
     get_sub_interface_of_intfc_from_db,
     insert_device_interfaces_in_db, get_interface_by_alias_from_db,
+    del_interface_of_device_from_db,
 )
 from .interface_gnmi import (
     del_all_subinterfaces_of_all_interfaces_from_device,
@@ -33,7 +34,7 @@ from .portgroup_db import (
     get_port_group_id_of_device_interface_from_db,
     get_port_group_of_if_from_db,
 )
-from .utils import get_logging, get_if_alias, get_telemetry_db
+from .utils import get_logging, get_if_alias, get_telemetry_db, natural_sort_key
 
 _logger = get_logging().getLogger(__name__)
 
@@ -170,32 +171,65 @@ def get_interface(device_ip: str, intfc_name=None):
         Union[List[Dict[str, Any]], Dict[str, Any], None]: The properties of the interface
         if the interface exists, a list of properties of all interfaces on the device
         if no interface name is provided, or None if the interface does not exist.
+        The list is in natural order of the interface names, e.g. Ethernet4 before Ethernet12,
+        unlike get_interfaces_page which pages in lexicographic order.
     """
     if intfc_name:
         return (
-            _merge_interface_and_sub_interface(intfc)
+            _merge_interface_and_sub_interface(device_ip, intfc)
             if (intfc := get_interface_of_device_from_db(device_ip, intfc_name))
             else None
         )
-    return [
-        _merge_interface_and_sub_interface(intf)
-        for intf in get_all_interfaces_of_device_from_db(device_ip) or []
-        if intf
-    ]
+    return sorted(iter_interfaces(device_ip), key=lambda i: natural_sort_key(i.get("name")))
 
 
-def _merge_interface_and_sub_interface(intfc: Interface):
+def get_interfaces_page(
+    device_ip: str, cursor: Optional[str] = None, limit: Optional[int] = None
+) -> Tuple[List[dict], Optional[str]]:
     """
-    Merges the interface and sub-interface properties into a single dictionary.
+    Returns one page of the interfaces of a device, ordered by name.
+    Every page is fetched with a single query, including the sub-interfaces.
+
+    .. code-block:: python
+
+        interfaces, cursor = get_interfaces_page("10.10.10.10", limit=100)
+        while cursor:
+            more, cursor = get_interfaces_page("10.10.10.10", cursor=cursor, limit=100)
 
     Args:
-        intfc (Interface): The interface object.
+        device_ip (str): The IP address of the device.
+        cursor (str, optional): Cursor returned with the previous page. Defaults to None, i.e. first page.
+        limit (int, optional): Max number of interfaces in the page. Defaults to db_read_page_size.
 
     Returns:
-        Dict[str, Any]: The merged properties of the interface and sub-interface.
+        Tuple[List[dict], Optional[str]]: Properties of the interfaces, same as returned by get_interface,
+        and the cursor of the next page or None if it is the last page.
+    """
+    page, next_cursor = get_interfaces_page_from_db(device_ip, cursor, limit)
+    return [_get_interface_json(intfc, sub_ifs) for intfc, sub_ifs in page], next_cursor
+
+
+def iter_interfaces(device_ip: str, page_size: Optional[int] = None) -> Iterator[dict]:
+    """
+    Yields the properties of all the interfaces of a device, fetched page by page,
+    so that memory usage is bounded by the page size.
+
+    Args:
+        device_ip (str): The IP address of the device.
+        page_size (int, optional): Number of interfaces fetched per query. Defaults to db_read_page_size.
+
+    Yields:
+        dict: Properties of the interface, same as returned by get_interface.
     """
-    subinterfaces = intfc.subInterfaces.all()
-    # Extract the first subinterface IP address if it exists
+    cursor = None
+    while True:
+        page, cursor = get_interfaces_page(device_ip, cursor, page_size)
+        yield from page
+        if not cursor:
+            return
+
+
+def _get_interface_json(intfc: Interface, subinterfaces: List[SubInterface]) -> dict:
     # Only one ip address is allowed per interface
     if subinterfaces:
         return {**intfc.__properties__, "ip_address": [
@@ -208,6 +242,22 @@ def _merge_interface_and_sub_interface(intfc: Interface):
     return intfc.__properties__
 
 
+def _merge_interface_and_sub_interface(device_ip: str, intfc: Interface):
+    """
+    Merges the interface and sub-interface properties into a single dictionary.
+
+    Args:
+        device_ip (str): The IP address of the device.
+        intfc (Interface): The interface object.
+
+    Returns:
+        Dict[str, Any]: The merged properties of the interface and sub-interface.
+    """
+    return _get_interface_json(
+        intfc, get_sub_interface_of_intfc_from_db(device_ip, intfc.name)
+    )
+
+
 def get_pg_of_if(device_ip: str, intfc_name: str):
     """
     Retrieves the port group of the specified interface from the database.
@@ -528,7 +578,7 @@ def delete_interface_breakout(device_ip: str, if_alias: str):
             interface = get_interface_by_alias_from_db(device_ip=device_ip, alias=i)
             # Delete the interface entry if it exists
             if interface:
-                interface.delete()
+                del_interface_of_device_from_db(device_ip, interface.name)
         # After the loop, get the main interface using the original 'if_alias'
         interface = get_interface_by_alias_from_db(device_ip=device_ip, alias=aliases[0])
 
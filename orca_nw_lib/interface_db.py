@@ -1,30 +1,24 @@
+import ipaddress
 import threading
-from typing import List, Optional
+from contextlib import ExitStack
+from typing import Dict, List, Optional, Tuple
+
+from neomodel import db
 
 from .common import PortFec, Speed
+from .db_cache import cached_db_read, invalidate_db_cache, invalidates_db_cache
+from .db_locks import device_read_locked, get_device_lock
 from .device_db import get_device_db_obj
+from .db_transaction import after_commit, checkpoint, write_transaction
 from .graph_db_models import Device, Interface, SubInterface
-from .utils import get_logging
+from .storage_backend import storage_operation
+from .utils import get_db_read_page_size, get_logging
 
 _logger = get_logging().getLogger(__name__)
-interface_lock = threading.Lock()
-
-
-def interface_operation(func):
-    """
-    Decorator to ensure thread safety for interface operations.
-    """
-
-    def wrapper(*args, **kwargs):
-        # Acquire the lock before any interface operation
-        with interface_lock:
-            # Use a transaction to ensure atomicity
-            # with db.transaction:
-            return func(*args, **kwargs)
-
-    return wrapper
 
 
+@storage_operation
+@cached_db_read
 def get_all_interfaces_of_device_from_db(device_ip: str) -> Optional[List[Interface]]:
     """
     Get all interfaces of a device from the database.
@@ -39,10 +33,12 @@ def get_all_interfaces_of_device_from_db(device_ip: str) -> Optional[List[Interf
         _logger.error("Device IP is required.")
         return None
     device = get_device_db_obj(device_ip)
-    with interface_lock:
+    with device_read_locked(device_ip):
         return device.interfaces.all() if device else None
 
 
+@storage_operation
+@cached_db_read
 def get_interface_of_device_from_db(
     device_ip: str, interface_name: str
 ) -> Optional[Interface]:
@@ -64,10 +60,12 @@ def get_interface_of_device_from_db(
         _logger.error("Interface name is required.")
         return None
     device = get_device_db_obj(device_ip)
-    with interface_lock:
+    with device_read_locked(device_ip):
         return device.interfaces.get_or_none(name=interface_name) if device else None
 
 
+@storage_operation
+@cached_db_read
 def get_sub_interface_of_device_from_db(
     device_ip: str, sub_if_ip: str
 ) -> Optional[SubInterface]:
@@ -87,11 +85,18 @@ def get_sub_interface_of_device_from_db(
     if not sub_if_ip:
         _logger.error("Sub-interface IP is required.")
         return None
-    for intf in get_all_interfaces_of_device_from_db(device_ip) or []:
-        if si := intf.subInterfaces.get_or_none(ip_address=sub_if_ip):
-            return si
-
-
+    results, _ = db.cypher_query(
+        """
+        MATCH (:Device {mgt_ip: $device_ip})-[:HAS]->(:Interface)-[:HAS]->(si:SubInterface {ip_address: $sub_if_ip})
+        RETURN si LIMIT 1
+        """,
+        {"device_ip": device_ip, "sub_if_ip": sub_if_ip},
+    )
+    return SubInterface.inflate(results[0][0]) if results else None
+
+
+@storage_operation
+@cached_db_read
 def get_sub_interface_of_intfc_from_db(
     device_ip: str, if_name: str, sub_if_ip: Optional[str] = None
 ) -> Optional[SubInterface] | List[SubInterface]:
@@ -122,9 +127,11 @@ def get_sub_interface_of_intfc_from_db(
     return None
 
 
+@storage_operation
 def get_sub_interface_from_db(sub_if_ip: str) -> Optional[SubInterface]:
     """
     Retrieve a sub-interface from the database based on its IP address.
+    Lookup is a single query served by the index on SubInterface.ip_address.
 
     Args:
         sub_if_ip (str): The IP address of the sub-interface to retrieve.
@@ -136,10 +143,179 @@ def get_sub_interface_from_db(sub_if_ip: str) -> Optional[SubInterface]:
     if not sub_if_ip:
         _logger.error("Sub-interface IP is required.")
         return None
-    devices = get_device_db_obj()
-    for device in devices:
-        if si := get_sub_interface_of_device_from_db(device.mgt_ip, sub_if_ip):
-            return si
+    results, _ = db.cypher_query(
+        """
+        MATCH (:Device)-[:HAS]->(:Interface)-[:HAS]->(si:SubInterface {ip_address: $sub_if_ip})
+        RETURN si LIMIT 1
+        """,
+        {"sub_if_ip": sub_if_ip},
+    )
+    return SubInterface.inflate(results[0][0]) if results else None
+
+
+"""
+In-process index of all sub-interface prefixes of the fabric.
+    Key: prefix length
+    Value: dictionary of network address (int) -> (device_ip, if_name, sub_if_ip)
+The index is built lazily from DB and invalidated whenever interfaces are inserted in DB.
+Every invalidation increments the generation, the index is current if built at the current generation.
+"""
+_sub_if_prefix_index = {}
+_sub_if_prefix_index_generation = -1
+_sub_if_prefix_generation = 0
+## Guards the index and the generations.
+_sub_if_prefix_index_lock = threading.Lock()
+## Serializes the rebuilds, so that the index is not rebuilt by concurrent lookups.
+_sub_if_prefix_rebuild_lock = threading.Lock()
+
+
+def invalidate_sub_interface_prefix_index():
+    """
+    Marks the in-process sub-interface prefix index as stale,
+    It will be rebuilt from DB on next lookup.
+    """
+    global _sub_if_prefix_generation
+    with _sub_if_prefix_index_lock:
+        _sub_if_prefix_generation += 1
+
+
+def build_sub_interface_prefix_index(rows: List[tuple]) -> dict:
+    """
+    Builds the sub-interface prefix index from the given rows.
+    Every address is indexed with its prefix and as a host address,
+    so that the address of a sub-interface resolves to that sub-interface
+    and not to another sub-interface of the same subnet.
+
+    Args:
+        rows (List[tuple]): Tuples of (device_ip, if_name, sub_if_ip, prefix_len).
+
+    Returns:
+        dict: prefix length -> {network address (int): (device_ip, if_name, sub_if_ip)}
+    """
+    index = {}
+    for device_ip, if_name, sub_if_ip, prefix_len in rows:
+        try:
+            network = ipaddress.ip_network(
+                f"{sub_if_ip}/{prefix_len}" if prefix_len is not None else sub_if_ip,
+                strict=False,
+            )
+        except ValueError:
+            _logger.debug("Skipping invalid sub-interface address %s/%s of %s %s.",
+                          sub_if_ip, prefix_len, device_ip, if_name)
+            continue
+        owner = (device_ip, if_name, sub_if_ip)
+        index.setdefault((network.version, network.prefixlen), {})[
+            int(network.network_address)
+        ] = owner
+        if network.prefixlen != network.max_prefixlen:
+            host = ipaddress.ip_address(sub_if_ip)
+            index.setdefault((host.version, host.max_prefixlen), {})[int(host)] = owner
+    return index
+
+
+def lookup_sub_interface_prefix_index(index: dict, ip: str) -> Optional[tuple]:
+    """
+    Finds the longest prefix in the index containing the given IP address.
+
+    Args:
+        index (dict): Index built by build_sub_interface_prefix_index().
+        ip (str): The IP address to look up.
+
+    Returns:
+        tuple: (device_ip, if_name, sub_if_ip) of the owning sub-interface, otherwise None.
+    """
+    try:
+        addr = ipaddress.ip_address(ip)
+    except ValueError:
+        _logger.error("Invalid IP address %s.", ip)
+        return None
+    max_len = addr.max_prefixlen
+    addr_int = int(addr)
+    for version, prefix_len in sorted(index, key=lambda k: k[1], reverse=True):
+        if version != addr.version:
+            continue
+        mask = ((1 << prefix_len) - 1) << (max_len - prefix_len)
+        if owner := index[(version, prefix_len)].get(addr_int & mask):
+            return owner
+    return None
+
+
+@storage_operation
+def get_sub_interface_prefix_rows_from_db() -> List[tuple]:
+    """
+    Retrieves the addresses of all the sub-interfaces of the fabric.
+
+    Returns:
+        List[tuple]: (device_ip, if_name, sub_if_ip, prefix) of every sub-interface having an address.
+    """
+    results, _ = db.cypher_query(
+        """
+        MATCH (d:Device)-[:HAS]->(i:Interface)-[:HAS]->(si:SubInterface)
+        WHERE si.ip_address IS NOT NULL
+        RETURN d.mgt_ip, i.name, si.ip_address, si.prefix
+        """
+    )
+    return results
+
+
+def get_interface_owning_ip_from_db(ip: str) -> Optional[tuple]:
+    """
+    Resolves which interface of the fabric owns the given IP address (e.g. BGP neighbor IP),
+    by longest prefix match on the configured sub-interface addresses.
+
+    Args:
+        ip (str): The IP address to resolve.
+
+    Returns:
+        tuple: (device_ip, if_name, sub_if_ip) of the owning interface, otherwise None.
+    """
+    if not ip:
+        _logger.error("IP address is required.")
+        return None
+    return lookup_sub_interface_prefix_index(get_sub_interface_prefix_index(), ip)
+
+
+def get_sub_interface_with_ip_from_db(ip: str) -> Optional[SubInterface]:
+    """
+    Resolves the sub-interface configured with the given IP address, e.g. the peer end of a BGP neighbor,
+    with the sub-interface prefix index. The sub-interface is read from DB only if the address
+    belongs to the fabric, addresses of external peers cost no query.
+
+    Args:
+        ip (str): The IP address of the sub-interface.
+
+    Returns:
+        SubInterface: The sub-interface if found, otherwise None.
+    """
+    if not (owner := get_interface_owning_ip_from_db(ip)):
+        return None
+    device_ip, _, sub_if_ip = owner
+    if ipaddress.ip_address(sub_if_ip) != ipaddress.ip_address(ip):
+        # Only in the subnet of the sub-interface.
+        return None
+    return get_sub_interface_of_device_from_db(device_ip, sub_if_ip)
+
+
+def get_sub_interface_prefix_index() -> dict:
+    """
+    Returns the sub-interface prefix index, rebuilt from DB if it has been invalidated.
+    An invalidation during a rebuild leaves the rebuilt index stale, so that it is rebuilt again on next lookup.
+
+    Returns:
+        dict: Index built by build_sub_interface_prefix_index().
+    """
+    global _sub_if_prefix_index, _sub_if_prefix_index_generation
+    with _sub_if_prefix_rebuild_lock:
+        with _sub_if_prefix_index_lock:
+            if _sub_if_prefix_index_generation == _sub_if_prefix_generation:
+                return _sub_if_prefix_index
+            generation = _sub_if_prefix_generation
+        index = build_sub_interface_prefix_index(get_sub_interface_prefix_rows_from_db())
+        with _sub_if_prefix_index_lock:
+            _sub_if_prefix_index = index
+            ## Generation read before the rows, a later invalidation is not overwritten.
+            _sub_if_prefix_index_generation = generation
+        return index
 
 
 def copy_intfc_object_props(target_intfc: Interface, source_intfc: Interface):
@@ -180,6 +356,89 @@ def copy_intfc_object_props(target_intfc: Interface, source_intfc: Interface):
     target_intfc.breakout_status = source_intfc.breakout_status
 
 
+def apply_interface_config(
+    interface: Interface,
+    enable: Optional[bool] = None,
+    mtu: Optional[int] = None,
+    speed: Optional[Speed] = None,
+    description: Optional[str] = None,
+    fec: Optional[PortFec] = None,
+    autoneg: Optional[bool] = None,
+    adv_speeds: Optional[str] = None,
+    link_training: Optional[bool] = None,
+    lldp_nbrs: Optional[List[str]] = None,
+):
+    """
+    Updates the given interface object with the config values which are not None.
+    The object is not saved, see set_interface_config_in_db for the parameters.
+
+    Parameters:
+        interface (Interface): The interface object to be updated.
+
+    Returns:
+        None
+    """
+    if enable is not None:
+        _logger.debug(
+            "Updating interface %s enable state in DB object to %s",
+            interface,
+            enable,
+        )
+        interface.enabled = enable
+    if mtu is not None:
+        _logger.debug(
+            "Updating interface %s MTU in DB object to %s", interface, mtu
+        )
+        interface.mtu = mtu
+    if speed is not None:
+        _logger.debug(
+            "Updating interface %s speed in DB object to %s", interface, speed
+        )
+        interface.speed = str(speed)
+    if description is not None:
+        _logger.debug(
+            "Updating interface %s description in DB object to %s",
+            interface,
+            description,
+        )
+        interface.description = description
+    if fec is not None:
+        _logger.debug(
+            "Updating interface %s FEC in DB object to %s", interface, fec
+        )
+        interface.fec = str(fec)
+    if autoneg is not None:
+        _logger.debug(
+            "Updating interface %s auto-negotiate in DB object to %s",
+            interface,
+            autoneg,
+        )
+        interface.autoneg = "on" if autoneg else "off"
+    if adv_speeds is not None:
+        _logger.debug(
+            "Updating interface %s advertised-speed in DB object to %s",
+            interface,
+            adv_speeds,
+        )
+        interface.adv_speeds = str(adv_speeds)
+    if link_training is not None:
+        _logger.debug(
+            "Updating interface %s standalone-link-training in DB object to %s",
+            interface,
+            link_training,
+        )
+        interface.link_training = "on" if link_training else "off"
+    if lldp_nbrs:
+        _logger.debug(
+            "Updating interface %s LLDP neighbors in DB object to %s",
+            interface,
+            lldp_nbrs,
+        )
+        interface.lldp_nbrs = lldp_nbrs
+
+
+@storage_operation
+@invalidates_db_cache
 def set_interface_config_in_db(
     device_ip: str,
     if_name: str,
@@ -215,73 +474,97 @@ def set_interface_config_in_db(
     if not if_name:
         _logger.error("Interface name is required.")
         return None
-    interface = get_interface_of_device_from_db(device_ip, if_name)
-    with interface_lock:
+    with get_device_lock(device_ip).write_locked():
+        interface = get_interface_of_device_from_db(device_ip, if_name)
         if interface:
-            if enable is not None:
-                _logger.debug(
-                    "Updating interface %s enable state in DB object to %s",
-                    interface,
-                    enable,
-                )
-                interface.enabled = enable
-            if mtu is not None:
-                _logger.debug(
-                    "Updating interface %s MTU in DB object to %s", interface, mtu
-                )
-                interface.mtu = mtu
-            if speed is not None:
-                _logger.debug(
-                    "Updating interface %s speed in DB object to %s", interface, speed
-                )
-                interface.speed = str(speed)
-            if description is not None:
-                _logger.debug(
-                    "Updating interface %s description in DB object to %s",
-                    interface,
-                    description,
-                )
-                interface.description = description
-            if fec is not None:
-                _logger.debug(
-                    "Updating interface %s FEC in DB object to %s", interface, fec
-                )
-                interface.fec = str(fec)
-            if autoneg is not None:
-                _logger.debug(
-                    "Updating interface %s auto-negotiate in DB object to %s",
-                    interface,
-                    autoneg,
-                )
-                interface.autoneg = "on" if autoneg else "off"
-            if adv_speeds is not None:
-                _logger.debug(
-                    "Updating interface %s advertised-speed in DB object to %s",
-                    interface,
-                    adv_speeds,
-                )
-                interface.adv_speeds = str(adv_speeds)
-            if link_training is not None:
-                _logger.debug(
-                    "Updating interface %s standalone-link-training in DB object to %s",
-                    interface,
-                    link_training,
-                )
-                interface.link_training = "on" if link_training else "off"
-            if lldp_nbrs:
-                _logger.debug(
-                    "Updating interface %s LLDP neighbors in DB object to %s",
-                    interface,
-                    lldp_nbrs,
-                )
-                interface.lldp_nbrs = lldp_nbrs
+            apply_interface_config(
+                interface,
+                enable=enable,
+                mtu=mtu,
+                speed=speed,
+                description=description,
+                fec=fec,
+                autoneg=autoneg,
+                adv_speeds=adv_speeds,
+                link_training=link_training,
+                lldp_nbrs=lldp_nbrs,
+            )
             interface.save()
             _logger.debug("Saved interface config in DB %s", interface)
 
 
+def get_interface_config_props(**config) -> dict:
+    """
+    Converts interface config values, see set_interface_config_in_db for the parameters,
+    to the node properties to be set in DB. Config values which are None are skipped.
+
+    Returns:
+        dict: Property name -> value as stored in DB.
+    """
+    interface = Interface()
+    apply_interface_config(interface, **config)
+    return {
+        name: prop.deflate(value)
+        for name, prop in Interface.defined_properties(aliases=False, rels=False).items()
+        if (value := getattr(interface, name, None)) is not None
+    }
+
+
+@storage_operation
+def set_interfaces_config_in_db_bulk(updates: Dict[Tuple[str, str], dict]) -> int:
+    """
+    Sets the configuration of many interfaces in the database with one statement.
+    Unlike set_interface_config_in_db, the interfaces are not read before being updated,
+    only the given properties are set on the nodes.
+    The write locks of the devices updated are held for the whole write transaction,
+    taken in the order of the device IPs so that two bulk writes never wait on each other.
+    Waiting on the Neo4j locks of another transaction while holding them is safe,
+    as reads inside write transactions do not take the device locks, see device_read_locked.
+
+    Args:
+        updates (Dict[Tuple[str, str], dict]): (device_ip, if_name) -> config,
+            config being the keyword arguments of set_interface_config_in_db.
+
+    Returns:
+        int: Number of interfaces updated.
+    """
+    with ExitStack() as locks:
+        for device_ip in sorted({device_ip for device_ip, _ in updates}):
+            locks.enter_context(get_device_lock(device_ip).write_locked())
+        return _set_interfaces_config_in_db_bulk(updates)
+
+
+@write_transaction("interface_config")
+def _set_interfaces_config_in_db_bulk(updates: Dict[Tuple[str, str], dict]) -> int:
+    rows = [
+        {"device_ip": device_ip, "if_name": if_name, "props": props}
+        for (device_ip, if_name), config in updates.items()
+        if (props := get_interface_config_props(**config))
+    ]
+    if not rows:
+        return 0
+    results, _ = db.cypher_query(
+        """
+        UNWIND $rows AS row
+        MATCH (:Device {mgt_ip: row.device_ip})-[:HAS]->(i:Interface {name: row.if_name})
+        SET i += row.props
+        RETURN count(i)
+        """,
+        {"rows": rows},
+    )
+    checkpoint(len(rows))
+    for device_ip in {row["device_ip"] for row in rows}:
+        after_commit(lambda ip=device_ip: invalidate_db_cache(ip))
+    return results[0][0] if results else 0
+
+
+@storage_operation
+@invalidates_db_cache
 def insert_device_interfaces_in_db(device: Device, interfaces: dict):
     """
     Insert device interfaces into the database.
+    The device write lock is held for the whole write transaction, a writer holding the lock
+    waiting on the nodes written by the transaction would otherwise deadlock with it.
 
     Parameters:
         device (Device): The device object to insert interfaces for.
@@ -297,6 +580,12 @@ def insert_device_interfaces_in_db(device: Device, interfaces: dict):
     if not interfaces:
         _logger.error("Interfaces dictionary is required.")
         return None
+    with get_device_lock(device.mgt_ip).write_locked():
+        _insert_device_interfaces_in_db(device, interfaces)
+
+
+@write_transaction("interface")
+def _insert_device_interfaces_in_db(device: Device, interfaces: dict):
     for intfc, sub_intfc in interfaces.items():
         if i := get_interface_of_device_from_db(device.mgt_ip, intfc.name):
             # Update existing node
@@ -316,11 +605,14 @@ def insert_device_interfaces_in_db(device: Device, interfaces: dict):
         # received in the dictionary after discovery.
         # because current implementation always discovers all the subinterfaces,
         # hence we have uptodate subinterfaces in the dictionary.
-        for si in saved_i.subInterfaces.all():
+        old_sub_intfcs = saved_i.subInterfaces.all()
+        for si in old_sub_intfcs:
             si.delete()
         for sub_i in sub_intfc:
             sub_i.save()
             saved_i.subInterfaces.connect(sub_i) if saved_i else None
+        # Save and connect of the interface and of every new sub-interface, delete of the old ones.
+        checkpoint(2 + len(old_sub_intfcs) + 2 * len(sub_intfc))
 
         # Assuming that this function will receive either one interface or all in the param. (Nothing in between)
         # Any thing more than one is considered to be all the interfaces of the device (may be it wont be true in coming future).
@@ -334,8 +626,47 @@ def insert_device_interfaces_in_db(device: Device, interfaces: dict):
             for interface in get_all_interfaces_of_device_from_db(device.mgt_ip):
                 if interface not in interfaces:
                     interface.delete()
+                    checkpoint()
+    after_commit(invalidate_sub_interface_prefix_index)
+
+
+@storage_operation
+def get_interfaces_page_from_db(
+    device_ip: str, after: Optional[str] = None, limit: Optional[int] = None
+) -> Tuple[List[Tuple[Interface, List[SubInterface]]], Optional[str]]:
+    """
+    Retrieves one page of the interfaces of a device, ordered by name,
+    together with their sub-interfaces in a single query.
 
+    Args:
+        device_ip (str): The IP address of the device.
+        after (str, optional): Name of the last interface of the previous page. Defaults to None.
+        limit (int, optional): Max number of interfaces in the page. Defaults to db_read_page_size.
 
+    Returns:
+        Tuple[List[Tuple[Interface, List[SubInterface]]], Optional[str]]: The interfaces
+        with their sub-interfaces, and the cursor of the next page or None if it is the last page.
+    """
+    limit = limit or get_db_read_page_size()
+    results, _ = db.cypher_query(
+        """
+        MATCH (:Device {mgt_ip: $device_ip})-[:HAS]->(i:Interface)
+        WHERE $after IS NULL OR i.name > $after
+        WITH i ORDER BY i.name LIMIT $limit
+        OPTIONAL MATCH (i)-[:HAS]->(si:SubInterface)
+        RETURN i, collect(si)
+        ORDER BY i.name
+        """,
+        {"device_ip": device_ip, "after": after, "limit": limit},
+    )
+    page = [
+        (Interface.inflate(i), [SubInterface.inflate(si) for si in sub_ifs])
+        for i, sub_ifs in results
+    ]
+    return page, page[-1][0].name if len(page) == limit else None
+
+
+@cached_db_read
 def get_all_interfaces_name_of_device_from_db(device_ip: str) -> Optional[List[str]]:
     """
     Get all the interface names of a device from the database.
@@ -353,6 +684,8 @@ def get_all_interfaces_name_of_device_from_db(device_ip: str) -> Optional[List[s
     return [intfc.name for intfc in intfcs] if intfcs else None
 
 
+@storage_operation
+@cached_db_read
 def get_interface_by_alias_from_db(device_ip: str, alias: str) -> Optional[Interface]:
     """
     Get the interface object of a device by its alias.
@@ -372,3 +705,23 @@ def get_interface_by_alias_from_db(device_ip: str, alias: str) -> Optional[Inter
         return None
     device = get_device_db_obj(device_ip)
     return device.interfaces.get_or_none(alias=alias) if device else None
+
+
+@storage_operation
+@invalidates_db_cache
+def del_interface_of_device_from_db(device_ip: str, if_name: str):
+    """
+    Deletes an interface of a device and its sub-interfaces from the database.
+
+    Args:
+        device_ip (str): The IP address of the device.
+        if_name (str): The name of the interface.
+
+    Returns:
+        None
+    """
+    if interface := get_interface_of_device_from_db(device_ip, if_name):
+        for sub_if in interface.subInterfaces.all():
+            sub_if.delete()
+        interface.delete()
+    invalidate_sub_interface_prefix_index()
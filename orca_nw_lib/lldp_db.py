@@ -1,25 +1,96 @@
-from .interface_db import (
-    get_all_interfaces_of_device_from_db,
-    get_interface_of_device_from_db,
-)
+import json
+from typing import List, Union
 
+from neomodel import db
 
-def create_lldp_relations_in_db(device_ip):
+from .db_transaction import write_transaction
+from .storage_backend import storage_operation
+from .utils import get_logging
+
+_logger = get_logging().getLogger(__name__)
+
+
+@storage_operation
+def get_lldp_links_from_db(device_ips: List[str]) -> List[dict]:
+    """
+    Retrieves the LLDP links reported in the lldp_nbrs of the interfaces of the given devices.
+
+    Args:
+        device_ips (List[str]): IP addresses of the local devices.
+
+    Returns:
+        List[dict]: Links as dicts with keys local_ip, local_if, nbr_ip and nbr_if.
+    """
+    results, _ = db.cypher_query(
+        """
+        MATCH (d:Device)-[:HAS]->(i:Interface)
+        WHERE d.mgt_ip IN $device_ips AND i.lldp_nbrs IS NOT NULL
+        RETURN d.mgt_ip, i.name, i.lldp_nbrs
+        """,
+        {"device_ips": device_ips},
+    )
+    links = []
+    for local_ip, local_if, lldp_nbrs in results:
+        # lldp_nbrs is a JSONProperty, stored in the format - {nbr_ip:[Eth0,Eth1].........}
+        nbr_info = json.loads(lldp_nbrs) if isinstance(lldp_nbrs, str) else lldp_nbrs
+        for nbr_ip, nbr_ifs in (nbr_info or {}).items():
+            for nbr_if in nbr_ifs or []:
+                links.append(
+                    {
+                        "local_ip": local_ip,
+                        "local_if": local_if,
+                        "nbr_ip": nbr_ip,
+                        "nbr_if": nbr_if,
+                    }
+                )
+    return links
+
+
+def _get_lldp_link_key(link: dict) -> str:
+    return "|".join((link["local_ip"], link["local_if"], link["nbr_ip"], link["nbr_if"]))
+
+
+@storage_operation
+@write_transaction("lldp")
+def create_lldp_relations_in_db(device_ips: Union[str, List[str]]):
     """
-    Creates LLDP relations in the database based on the given topology.
+    Creates the LLDP_NBR relations between the interfaces of the given devices and their
+    neighbor interfaces, based on the lldp_nbrs of the interfaces.
+    All the relations are merged with one statement, LLDP_NBR relations of the given devices
+    which are not reported anymore are deleted.
 
     Args:
-        topology (dict): A dictionary representing the topology of devices and their neighbors.
+        device_ips (Union[str, List[str]]): IP address or list of IP addresses of the devices.
 
     Returns:
         None
     """
-    # Iterate all interfaces of local device
-    for local_if in get_all_interfaces_of_device_from_db(device_ip) or []:
-        # Retrieve neighbor json of every interface and Iterate the Json
-        if (nbr_info:=local_if.lldp_nbrs):
-            for nbr_ip, nbr_ifs in nbr_info.items():
-                for nbr_if in nbr_ifs or []:
-                    nbr_if_db_obj = get_interface_of_device_from_db(nbr_ip, nbr_if)
-                    if nbr_if_db_obj:
-                        local_if.lldp_neighbour.connect(nbr_if_db_obj)
+    device_ips = device_ips if isinstance(device_ips, list) else [device_ips]
+    if not device_ips:
+        return
+    links = get_lldp_links_from_db(device_ips)
+    db.cypher_query(
+        """
+        UNWIND $links AS link
+        MATCH (:Device {mgt_ip: link.local_ip})-[:HAS]->(li:Interface {name: link.local_if})
+        MATCH (:Device {mgt_ip: link.nbr_ip})-[:HAS]->(ni:Interface {name: link.nbr_if})
+        MERGE (li)-[:LLDP_NBR]->(ni)
+        """,
+        {"links": links},
+    )
+    results, _ = db.cypher_query(
+        """
+        MATCH (d:Device)-[:HAS]->(li:Interface)-[r:LLDP_NBR]->(ni:Interface)<-[:HAS]-(nd:Device)
+        WHERE d.mgt_ip IN $device_ips
+          AND NOT d.mgt_ip + '|' + li.name + '|' + nd.mgt_ip + '|' + ni.name IN $keys
+        DELETE r
+        RETURN count(r)
+        """,
+        {"device_ips": device_ips, "keys": [_get_lldp_link_key(link) for link in links]},
+    )
+    _logger.debug(
+        "Merged %s LLDP links, deleted %s stale links of devices %s.",
+        len(links),
+        results[0][0] if results else 0,
+        device_ips,
+    )
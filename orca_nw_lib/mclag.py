@@ -145,7 +145,7 @@ def discover_mclag(device_ip: str = None):
         except Exception as e:
             _logger.error(f"MCLAG Discovery Failed on device {device_ip}, Reason: {e}")
             raise
-    create_mclag_peer_link_rel_in_db()
+    create_mclag_peer_link_rel_in_db(device_ip)
 
 
 def discover_mclag_gw_macs(device_ip: str = None):
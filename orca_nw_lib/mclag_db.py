@@ -1,14 +1,19 @@
 from typing import List
 
+from neomodel import db
+
 from .device_db import get_device_db_obj
+from .db_transaction import write_transaction
 from .graph_db_models import MCLAG, MCLAG_GW_MAC, Device, Interface, PortChannel
 from .interface_db import get_interface_of_device_from_db
 from .port_chnl_db import get_port_chnl_of_device_from_db
+from .storage_backend import storage_operation
 from .utils import get_logging
 
 _logger = get_logging().getLogger(__name__)
 
 
+@storage_operation
 def get_mclag_of_device_from_db(device_ip: str, domain_id: int = None):
     """
     Get the MCLAG of a device from the database.
@@ -27,6 +32,7 @@ def get_mclag_of_device_from_db(device_ip: str, domain_id: int = None):
     return device.mclags.all() if device else None
 
 
+@storage_operation
 def get_mclag_gw_mac_of_device_from_db(device_ip: str, mac: str = None):
     """
     Retrieves the MCLAG gateway MAC address of a device from the database.
@@ -50,6 +56,7 @@ def get_mclag_gw_mac_of_device_from_db(device_ip: str, mac: str = None):
         return device.mclag_gw_macs.all() if device else None
 
 
+@storage_operation
 def del_mclag_gw_mac_of_device_from_db(device_ip: str, mac: str = None):
     """
     This function is responsible for deleting a specific MCLAG gateway MAC address
@@ -70,6 +77,7 @@ def del_mclag_gw_mac_of_device_from_db(device_ip: str, mac: str = None):
         gw_mac.delete()
 
 
+@storage_operation
 def del_mclag_of_device_from_db(device_ip: str, domain_id: int):
     """
     Deletes the Multi-Chassis Link Aggregation (MCLAG) for a specific device from the database.
@@ -87,49 +95,89 @@ def del_mclag_of_device_from_db(device_ip: str, domain_id: int):
         mclag.delete()
 
 
-def create_mclag_peerlink_relations_in_db():
+@storage_operation
+def get_mclag_peer_device_ips_from_db(device_ip: str) -> List[str]:
+    """
+    Retrieves the IP addresses of the MCLAG peers of a device, i.e. the peer_addr of the MCLAG
+    of the device and the devices having an MCLAG with the device as peer_addr.
+
+    Args:
+        device_ip (str): The IP address of the device.
+
+    Returns:
+        List[str]: IP addresses of the MCLAG peer devices.
+    """
+    results, _ = db.cypher_query(
+        """
+        MATCH (:Device {mgt_ip: $device_ip})-[:HAS]->(m:MCLAG)
+        WHERE m.peer_addr IS NOT NULL
+        RETURN m.peer_addr AS ip
+        UNION
+        MATCH (d:Device)-[:HAS]->(:MCLAG {peer_addr: $device_ip})
+        RETURN d.mgt_ip AS ip
+        """,
+        {"device_ip": device_ip},
+    )
+    return [ip for ip, in results]
+
+
+@storage_operation
+@write_transaction("mclag_peer_link")
+def create_mclag_peerlink_relations_in_db(device_ip: str = None):
     """
     Creates MCLAG peerlink relations in the database.
 
-    Retrieves devices from the database using the `getDeviceFromDB()` function.
-    For each device, fetches the MCLAG information using the `get_mclag_of_device_from_db()` function.
-    If the MCLAG information is available, retrieves the peer link and port channel information
-    using the `get_port_chnl_of_device_from_db()` function.
-    Connects the MCLAG peer link node to the port channel if the port channel information is available.
+    Connects the MCLAG of a device to its peer link port channel (PEER_LINK) and
+    the peer link port channel to the peer link port channel of the MCLAG peer device (peer_link).
+    Only the relations of the given device and its MCLAG peers are updated,
+    relations not matching the peer_addr and peer_link of the MCLAG on both ends anymore are deleted.
 
-    Retrieves the peer address from the MCLAG information.
-    Fetches the MCLAG information of the peer device using the `get_mclag_of_device_from_db()` function.
-    Retrieves the peer link and port channel information of the peer device.
-    Connects the port channel of the local device to the port channel of the peer device if both port channel information is available.
+    Args:
+        device_ip (str, optional): The IP address of the device. Defaults to None, i.e. all devices.
     """
-    for local_dev in get_device_db_obj() or []:
-        # there is only 1 mclag per device possible so always fetch index 0
-        mclag_local = (
-            mcl[0] if (mcl := get_mclag_of_device_from_db(local_dev.mgt_ip)) else None
-        )
-        if mclag_local:
-            peer_link_local = mclag_local.peer_link
-            port_chnl_local = get_port_chnl_of_device_from_db(
-                local_dev.mgt_ip, peer_link_local
-            )
-            if port_chnl_local:
-                mclag_local.peer_link_node.connect(port_chnl_local)
-
-            peer_addr = mclag_local.peer_addr
-            mclag_remote = (
-                mcl_r[0] if peer_addr and (mcl_r := get_mclag_of_device_from_db(peer_addr)) else None
-            )
-            peer_link_remote = mclag_remote.peer_link if mclag_remote else None
-            if peer_addr and peer_link_remote:
-                port_chnl_remote = get_port_chnl_of_device_from_db(
-                    peer_addr, peer_link_remote
-                )
-                if port_chnl_remote:
-                    mclag_remote.peer_link_node.connect(port_chnl_remote)
-
-                port_chnl_local.peer_link.connect(
-                    port_chnl_remote
-                ) if port_chnl_local and port_chnl_remote else None
+    if device_ip:
+        device_ips = [device_ip] + get_mclag_peer_device_ips_from_db(device_ip)
+        device_match = "MATCH (d:Device) WHERE d.mgt_ip IN $device_ips"
+    else:
+        device_ips = None
+        device_match = "MATCH (d:Device)"
+    params = {"device_ips": device_ips}
+    db.cypher_query(
+        f"""
+        {device_match}
+        MATCH (d)-[:HAS]->(m:MCLAG)-[r:PEER_LINK]->(pc:PortChannel)
+        WHERE NOT coalesce(pc.lag_name = m.peer_link, false)
+        DELETE r
+        """,
+        params,
+    )
+    db.cypher_query(
+        f"""
+        {device_match}
+        MATCH (d)-[:HAS]->(pc:PortChannel)-[r:peer_link]->(rpc:PortChannel)<-[:HAS]-(rd:Device)
+        WHERE NOT EXISTS {{
+            MATCH (d)-[:HAS]->(:MCLAG {{peer_link: pc.lag_name, peer_addr: rd.mgt_ip}})
+        }}
+        OR NOT EXISTS {{
+            MATCH (rd)-[:HAS]->(:MCLAG {{peer_link: rpc.lag_name}})
+        }}
+        DELETE r
+        """,
+        params,
+    )
+    db.cypher_query(
+        f"""
+        {device_match}
+        MATCH (d)-[:HAS]->(m:MCLAG)
+        MATCH (d)-[:HAS]->(pc:PortChannel {{lag_name: m.peer_link}})
+        MERGE (m)-[:PEER_LINK]->(pc)
+        WITH m, pc
+        MATCH (rd:Device {{mgt_ip: m.peer_addr}})-[:HAS]->(rm:MCLAG)
+        MATCH (rd)-[:HAS]->(rpc:PortChannel {{lag_name: rm.peer_link}})
+        MERGE (pc)-[:peer_link]->(rpc)
+        """,
+        params,
+    )
 
 
 def copy_mclag_obj_props(target_obj: MCLAG, src_obj: MCLAG):
@@ -158,6 +206,8 @@ def copy_mclag_obj_props(target_obj: MCLAG, src_obj: MCLAG):
     target_obj.fast_convergence = src_obj.fast_convergence
 
 
+@storage_operation
+@write_transaction("mclag")
 def insert_device_mclag_in_db(device: Device, mclag_to_intfc_list):
     """
     Insert the device's MCLAG information into the database.
@@ -222,6 +272,8 @@ def copy_mclag_gw_mac_props(target_obj: MCLAG_GW_MAC, src_obj: MCLAG_GW_MAC):
     target_obj.gateway_mac = src_obj.gateway_mac
 
 
+@storage_operation
+@write_transaction("mclag_gw_mac")
 def insert_device_mclag_gw_macs_in_db(
     device: Device, mclag_gw_macs: List[MCLAG_GW_MAC]
 ):
@@ -287,7 +339,7 @@ def insert_device_mclag_gw_macs_in_db(
             del_mclag_gw_mac_of_device_from_db(device.mgt_ip, gw_mac_in_db.gateway_mac)
 
 
-def create_mclag_peer_link_rel_in_db():
+def create_mclag_peer_link_rel_in_db(device_ip: str = None):
     """
     Create MCLAG peer-link relation in the database.
 
@@ -297,10 +349,11 @@ def create_mclag_peer_link_rel_in_db():
     creation of the relations.
 
     Parameters:
-        None
+        device_ip (str, optional): The IP address of the device whose relations are to be updated.
+            Defaults to None, i.e. all devices.
 
     Returns:
         None
     """
     _logger.info("Discovering MCLAG peer-link relations.")
-    create_mclag_peerlink_relations_in_db()
+    create_mclag_peerlink_relations_in_db(device_ip)
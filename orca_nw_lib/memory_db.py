@@ -0,0 +1,967 @@
+""" In-memory storage backend of the *_db operations """
+
+import atexit
+import json
+import os
+import threading
+from typing import List, Optional
+
+from . import (
+    device_db,
+    interface_db,
+    lldp_db,
+    port_chnl_db,
+    portgroup_db,
+    topology_snapshot,
+    vlan_db,
+)
+from .graph_db_models import (
+    Device,
+    Interface,
+    PortChannel,
+    PortGroup,
+    SubInterface,
+    Vlan,
+)
+from .interface_db import (
+    apply_interface_config,
+    copy_intfc_object_props,
+    invalidate_sub_interface_prefix_index,
+)
+from .port_chnl_db import copy_port_chnl_prop
+from .portgroup_db import copy_portgr_obj_prop
+from .storage_backend import memory_operation
+from .topology_snapshot import (
+    read_topology_snapshot,
+    validate_topology_snapshot,
+    write_topology_snapshot,
+)
+from .utils import get_db_read_page_size, get_logging, get_memory_snapshot_file
+from .vlan_db import copy_vlan_obj_prop, diff_vlan_members, get_vlan_members_rel
+
+_logger = get_logging().getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+
+def _get_node_props(node) -> dict:
+    return {
+        name: getattr(node, name, None)
+        for name in type(node).defined_properties(aliases=False, rels=False)
+    }
+
+
+class InMemoryStore:
+    """
+    Dict based store of the topology.
+    Every table is keyed by the device IP and then by the natural key of the node,
+    e.g. interface name, so that every lookup of the *_db operations is a dict lookup.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            # mgt_ip -> Device
+            self.devices = {}
+            # mgt_ip -> {if_name: Interface}
+            self.interfaces = {}
+            # mgt_ip -> {alias: if_name}
+            self.interface_aliases = {}
+            # mgt_ip -> {if_name: [SubInterface]}
+            self.sub_interfaces = {}
+            # sub-interface ip_address -> (mgt_ip, if_name, SubInterface)
+            self.sub_interface_ips = {}
+            # mgt_ip -> {lag_name: PortChannel}
+            self.port_chnls = {}
+            # mgt_ip -> {lag_name: [if_name]}
+            self.port_chnl_members = {}
+            # mgt_ip -> {vlan_name: Vlan}
+            self.vlans = {}
+            # mgt_ip -> {(vlan_name, rel_type, if_name): tagging_mode}
+            self.vlan_members = {}
+            # mgt_ip -> {port_group_id: PortGroup}
+            self.port_groups = {}
+            # mgt_ip -> {port_group_id: [if_name]}
+            self.port_group_members = {}
+            # mgt_ip -> {(local_if, nbr_ip, nbr_if)}
+            self.lldp_links = {}
+
+    def _device_tables(self) -> list:
+        return [
+            self.interfaces,
+            self.interface_aliases,
+            self.sub_interfaces,
+            self.port_chnls,
+            self.port_chnl_members,
+            self.vlans,
+            self.vlan_members,
+            self.port_groups,
+            self.port_group_members,
+            self.lldp_links,
+        ]
+
+    def set_sub_interfaces(self, mgt_ip: str, if_name: str, sub_ifs: list):
+        with self.lock:
+            for sub_if in self.sub_interfaces.get(mgt_ip, {}).pop(if_name, []):
+                if self.sub_interface_ips.get(sub_if.ip_address, (None,))[0] == mgt_ip:
+                    del self.sub_interface_ips[sub_if.ip_address]
+            if sub_ifs:
+                self.sub_interfaces.setdefault(mgt_ip, {})[if_name] = list(sub_ifs)
+                for sub_if in sub_ifs:
+                    if sub_if.ip_address:
+                        self.sub_interface_ips[sub_if.ip_address] = (mgt_ip, if_name, sub_if)
+
+    def put_interface(self, mgt_ip: str, interface: Interface):
+        with self.lock:
+            self.interfaces.setdefault(mgt_ip, {})[interface.name] = interface
+            if interface.alias:
+                self.interface_aliases.setdefault(mgt_ip, {})[interface.alias] = interface.name
+
+    def remove_interface(self, mgt_ip: str, if_name: str):
+        """
+        Removes an interface with its sub-interfaces and all the relations to it.
+        """
+        with self.lock:
+            interface = self.interfaces.get(mgt_ip, {}).pop(if_name, None)
+            if interface and interface.alias:
+                self.interface_aliases.get(mgt_ip, {}).pop(interface.alias, None)
+            self.set_sub_interfaces(mgt_ip, if_name, None)
+            for members in self.port_chnl_members.get(mgt_ip, {}).values():
+                if if_name in members:
+                    members.remove(if_name)
+            for members in self.port_group_members.get(mgt_ip, {}).values():
+                if if_name in members:
+                    members.remove(if_name)
+            self.remove_vlan_members(mgt_ip, lambda key: key[2] == if_name)
+            self.remove_lldp_links(
+                lambda ip, link: (ip == mgt_ip and link[0] == if_name)
+                or (link[1] == mgt_ip and link[2] == if_name)
+            )
+
+    def remove_port_chnl(self, mgt_ip: str, lag_name: str):
+        with self.lock:
+            self.port_chnls.get(mgt_ip, {}).pop(lag_name, None)
+            self.port_chnl_members.get(mgt_ip, {}).pop(lag_name, None)
+            self.remove_vlan_members(mgt_ip, lambda key: key[2] == lag_name)
+
+    def remove_vlan(self, mgt_ip: str, vlan_name: str):
+        with self.lock:
+            self.vlans.get(mgt_ip, {}).pop(vlan_name, None)
+            self.remove_vlan_members(mgt_ip, lambda key: key[0] == vlan_name)
+
+    def remove_vlan_members(self, mgt_ip: str, predicate):
+        with self.lock:
+            members = self.vlan_members.get(mgt_ip, {})
+            for key in [key for key in members if predicate(key)]:
+                del members[key]
+
+    def remove_lldp_links(self, predicate):
+        with self.lock:
+            for ip, links in self.lldp_links.items():
+                links.difference_update({link for link in links if predicate(ip, link)})
+
+    def delete_device(self, mgt_ip: str) -> int:
+        """
+        Removes a device and all its components, returns the number of nodes removed.
+        """
+        with self.lock:
+            if mgt_ip not in self.devices:
+                return 0
+            count = 1 + sum(
+                len(table.get(mgt_ip, {}))
+                for table in (self.interfaces, self.port_chnls, self.vlans, self.port_groups)
+            )
+            count += sum(len(sub_ifs) for sub_ifs in self.sub_interfaces.get(mgt_ip, {}).values())
+            for if_name in list(self.interfaces.get(mgt_ip, {})):
+                self.set_sub_interfaces(mgt_ip, if_name, None)
+            for table in self._device_tables():
+                table.pop(mgt_ip, None)
+            self.remove_lldp_links(lambda ip, link: link[1] == mgt_ip)
+            del self.devices[mgt_ip]
+            return count
+
+    def to_snapshot(self) -> dict:
+        """
+        Returns the content of the store as a JSON serializable dict.
+        """
+        with self.lock:
+            return {
+                "version": SNAPSHOT_VERSION,
+                "devices": [
+                    {
+                        "device": _get_node_props(device),
+                        "interfaces": [
+                            {
+                                "props": _get_node_props(interface),
+                                "sub_interfaces": [
+                                    _get_node_props(sub_if)
+                                    for sub_if in self.sub_interfaces.get(mgt_ip, {}).get(if_name, [])
+                                ],
+                            }
+                            for if_name, interface in self.interfaces.get(mgt_ip, {}).items()
+                        ],
+                        "port_chnls": [
+                            {
+                                "props": _get_node_props(chnl),
+                                "members": self.port_chnl_members.get(mgt_ip, {}).get(lag_name, []),
+                            }
+                            for lag_name, chnl in self.port_chnls.get(mgt_ip, {}).items()
+                        ],
+                        "vlans": [_get_node_props(vlan) for vlan in self.vlans.get(mgt_ip, {}).values()],
+                        "vlan_members": [
+                            [*key, tagging_mode]
+                            for key, tagging_mode in self.vlan_members.get(mgt_ip, {}).items()
+                        ],
+                        "port_groups": [
+                            {
+                                "props": _get_node_props(pg),
+                                "members": self.port_group_members.get(mgt_ip, {}).get(pg_id, []),
+                            }
+                            for pg_id, pg in self.port_groups.get(mgt_ip, {}).items()
+                        ],
+                        "lldp_links": sorted(self.lldp_links.get(mgt_ip, set())),
+                    }
+                    for mgt_ip, device in self.devices.items()
+                ],
+            }
+
+    def from_snapshot(self, snapshot: dict):
+        """
+        Replaces the content of the store with the given snapshot.
+        """
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported snapshot version {snapshot.get('version')}.")
+        with self.lock:
+            self.clear()
+            for dev in snapshot.get("devices", []):
+                device = Device(**dev["device"])
+                mgt_ip = device.mgt_ip
+                self.devices[mgt_ip] = device
+                for intf in dev.get("interfaces", []):
+                    interface = Interface(**intf["props"])
+                    self.put_interface(mgt_ip, interface)
+                    self.set_sub_interfaces(
+                        mgt_ip,
+                        interface.name,
+                        [SubInterface(**props) for props in intf.get("sub_interfaces", [])],
+                    )
+                for chnl in dev.get("port_chnls", []):
+                    port_chnl = PortChannel(**chnl["props"])
+                    self.port_chnls.setdefault(mgt_ip, {})[port_chnl.lag_name] = port_chnl
+                    self.port_chnl_members.setdefault(mgt_ip, {})[port_chnl.lag_name] = list(
+                        chnl.get("members", [])
+                    )
+                for props in dev.get("vlans", []):
+                    vlan = Vlan(**props)
+                    self.vlans.setdefault(mgt_ip, {})[vlan.name] = vlan
+                self.vlan_members[mgt_ip] = {
+                    (vlan_name, rel_type, if_name): tagging_mode
+                    for vlan_name, rel_type, if_name, tagging_mode in dev.get("vlan_members", [])
+                }
+                for pg in dev.get("port_groups", []):
+                    port_group = PortGroup(**pg["props"])
+                    self.port_groups.setdefault(mgt_ip, {})[port_group.port_group_id] = port_group
+                    self.port_group_members.setdefault(mgt_ip, {})[port_group.port_group_id] = list(
+                        pg.get("members", [])
+                    )
+                self.lldp_links[mgt_ip] = {tuple(link) for link in dev.get("lldp_links", [])}
+
+
+    def to_graph(self) -> tuple:
+        """
+        Returns the nodes and relationships of the store as topology snapshot items,
+        with the labels and relationship types of the Neo4j backend.
+        """
+        nodes = []
+        rels = []
+        ids = {}
+
+        def add_node(key: tuple, node) -> str:
+            ids[key] = node_id = f"m:{len(nodes)}"
+            nodes.append(
+                {"id": node_id, "labels": [type(node).__label__], "props": _get_node_props(node)}
+            )
+            return node_id
+
+        def add_rel(rel_type: str, start: str, end: str, props: dict = None):
+            rels.append(
+                {
+                    "id": f"m:r:{len(rels)}",
+                    "rel_type": rel_type,
+                    "start": start,
+                    "end": end,
+                    "props": props or {},
+                }
+            )
+
+        with self.lock:
+            for mgt_ip, device in self.devices.items():
+                device_id = add_node(("Device", mgt_ip), device)
+                for if_name, interface in self.interfaces.get(mgt_ip, {}).items():
+                    if_id = add_node(("Interface", mgt_ip, if_name), interface)
+                    add_rel("HAS", device_id, if_id)
+                    for index, sub_if in enumerate(
+                        self.sub_interfaces.get(mgt_ip, {}).get(if_name, [])
+                    ):
+                        add_rel("HAS", if_id, add_node(("SubInterface", mgt_ip, if_name, index), sub_if))
+                for lag_name, chnl in self.port_chnls.get(mgt_ip, {}).items():
+                    chnl_id = add_node(("PortChannel", mgt_ip, lag_name), chnl)
+                    add_rel("HAS", device_id, chnl_id)
+                    for if_name in self.port_chnl_members.get(mgt_ip, {}).get(lag_name, []):
+                        if if_id := ids.get(("Interface", mgt_ip, if_name)):
+                            add_rel("HAS_MEMBER", chnl_id, if_id)
+                for vlan_name, vlan in self.vlans.get(mgt_ip, {}).items():
+                    add_rel("HAS", device_id, add_node(("Vlan", mgt_ip, vlan_name), vlan))
+                for (vlan_name, rel_type, if_name), tagging_mode in self.vlan_members.get(
+                    mgt_ip, {}
+                ).items():
+                    label = "Interface" if rel_type == "MEMBER_IF" else "PortChannel"
+                    member_id = ids.get((label, mgt_ip, if_name))
+                    if (vlan_id := ids.get(("Vlan", mgt_ip, vlan_name))) and member_id:
+                        add_rel(rel_type, vlan_id, member_id, {"tagging_mode": tagging_mode})
+                for pg_id, pg in self.port_groups.get(mgt_ip, {}).items():
+                    pg_node_id = add_node(("PortGroup", mgt_ip, pg_id), pg)
+                    add_rel("HAS", device_id, pg_node_id)
+                    for if_name in self.port_group_members.get(mgt_ip, {}).get(pg_id, []):
+                        if if_id := ids.get(("Interface", mgt_ip, if_name)):
+                            add_rel("MEMBER_IF", pg_node_id, if_id)
+            for mgt_ip, links in self.lldp_links.items():
+                for local_if, nbr_ip, nbr_if in sorted(links):
+                    local_id = ids.get(("Interface", mgt_ip, local_if))
+                    if local_id and (nbr_id := ids.get(("Interface", nbr_ip, nbr_if))):
+                        add_rel("LLDP_NBR", local_id, nbr_id)
+        return nodes, rels
+
+
+"""
+Node models kept by the in-memory store, by their label.
+Nodes of the other labels, e.g. BGP, MCLAG and STP, are skipped when a topology snapshot is imported.
+"""
+_GRAPH_MODELS = {
+    model.__label__: model
+    for model in (Device, Interface, SubInterface, PortChannel, Vlan, PortGroup)
+}
+
+
+def _graph_to_snapshot(items) -> tuple:
+    """
+    Converts topology snapshot items to the snapshot format of the store.
+
+    Returns:
+        tuple: The store snapshot dict, the number of nodes and relationships kept
+        and the number of nodes and relationships skipped.
+    """
+    nodes = {}
+    rels = []
+    skipped = {"nodes": 0, "relationships": 0}
+    for item in items:
+        if item["type"] == "node":
+            label = next((label for label in item["labels"] if label in _GRAPH_MODELS), None)
+            if not label:
+                skipped["nodes"] += 1
+                continue
+            model = _GRAPH_MODELS[label]
+            props = {
+                name: value
+                for name, value in item["props"].items()
+                if name in model.defined_properties(aliases=False, rels=False)
+            }
+            nodes[item["id"]] = (label, props)
+        else:
+            rels.append(item)
+
+    devices = {}
+    owners = {}
+    sub_ifs = {}
+    members = {}
+    links = []
+    kept_rels = 0
+    for rel in rels:
+        start, end = nodes.get(rel["start"]), nodes.get(rel["end"])
+        kinds = (start[0] if start else None, rel["rel_type"], end[0] if end else None)
+        if kinds[0] == "Device" and kinds[1] == "HAS" and kinds[2] in (
+            "Interface",
+            "PortChannel",
+            "Vlan",
+            "PortGroup",
+        ):
+            owners[rel["end"]] = start[1]["mgt_ip"]
+        elif kinds == ("Interface", "HAS", "SubInterface"):
+            sub_ifs.setdefault(rel["start"], []).append(end[1])
+        elif kinds in (
+            ("PortChannel", "HAS_MEMBER", "Interface"),
+            ("Vlan", "MEMBER_IF", "Interface"),
+            ("Vlan", "MEMBER_PORT_CHANNEL", "PortChannel"),
+            ("PortGroup", "MEMBER_IF", "Interface"),
+        ):
+            members.setdefault(rel["start"], []).append(rel)
+        elif kinds == ("Interface", "LLDP_NBR", "Interface"):
+            links.append(rel)
+        else:
+            skipped["relationships"] += 1
+            continue
+        kept_rels += 1
+
+    for node_id, (label, props) in nodes.items():
+        if label == "Device":
+            devices[props["mgt_ip"]] = {
+                "device": props,
+                "interfaces": [],
+                "port_chnls": [],
+                "vlans": [],
+                "vlan_members": [],
+                "port_groups": [],
+                "lldp_links": [],
+            }
+    kept_nodes = len(devices)
+    for node_id, mgt_ip in owners.items():
+        if mgt_ip not in devices:
+            continue
+        label, props = nodes[node_id]
+        dev = devices[mgt_ip]
+        member_rels = members.get(node_id, [])
+        if label == "Interface":
+            dev["interfaces"].append({"props": props, "sub_interfaces": sub_ifs.get(node_id, [])})
+            kept_nodes += 1 + len(sub_ifs.get(node_id, []))
+        elif label == "PortChannel":
+            dev["port_chnls"].append(
+                {"props": props, "members": [nodes[rel["end"]][1]["name"] for rel in member_rels]}
+            )
+            kept_nodes += 1
+        elif label == "Vlan":
+            dev["vlans"].append(props)
+            dev["vlan_members"].extend(
+                [
+                    props["name"],
+                    rel["rel_type"],
+                    nodes[rel["end"]][1]["name" if rel["rel_type"] == "MEMBER_IF" else "lag_name"],
+                    rel["props"].get("tagging_mode"),
+                ]
+                for rel in member_rels
+            )
+            kept_nodes += 1
+        elif label == "PortGroup":
+            dev["port_groups"].append(
+                {"props": props, "members": [nodes[rel["end"]][1]["name"] for rel in member_rels]}
+            )
+            kept_nodes += 1
+    for rel in links:
+        mgt_ip = owners.get(rel["start"])
+        if mgt_ip in devices and (nbr_ip := owners.get(rel["end"])):
+            devices[mgt_ip]["lldp_links"].append(
+                [nodes[rel["start"]][1]["name"], nbr_ip, nodes[rel["end"]][1]["name"]]
+            )
+    skipped["nodes"] += len(nodes) - kept_nodes
+    snapshot = {"version": SNAPSHOT_VERSION, "devices": list(devices.values())}
+    return snapshot, {"nodes": kept_nodes, "relationships": kept_rels}, skipped
+
+
+_store = InMemoryStore()
+
+
+def get_memory_store() -> InMemoryStore:
+    """
+    Returns the store used by the in-memory storage backend.
+    """
+    return _store
+
+
+def save_memory_snapshot(path: str):
+    """
+    Saves the content of the in-memory store to a JSON file.
+    The file is written to a temporary file first and then renamed,
+    so that an interrupted save does not corrupt an existing snapshot.
+
+    Args:
+        path (str): Path of the snapshot file.
+    """
+    snapshot = _store.to_snapshot()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(snapshot, f)
+    os.replace(tmp_path, path)
+    _logger.info(f"Saved {len(snapshot['devices'])} devices to snapshot {path}.")
+
+
+def load_memory_snapshot(path: str):
+    """
+    Replaces the content of the in-memory store with the content of a JSON snapshot file.
+
+    Args:
+        path (str): Path of the snapshot file.
+    """
+    with open(path, "r") as f:
+        _store.from_snapshot(json.load(f))
+    invalidate_sub_interface_prefix_index()
+    _logger.info(f"Loaded {len(_store.devices)} devices from snapshot {path}.")
+
+
+def init_memory_store():
+    """
+    Loads the configured memory_snapshot_file, if exists,
+    and registers saving the store to it at exit.
+    """
+    if not (path := get_memory_snapshot_file()):
+        return
+    if os.path.exists(path):
+        load_memory_snapshot(path)
+    atexit.register(save_memory_snapshot, path)
+
+
+def _get_page(items: dict, after: Optional[str], limit: Optional[int]):
+    """
+    Returns the keys of one page of the items ordered by key, and the cursor of the next page.
+    """
+    limit = limit or get_db_read_page_size()
+    keys = sorted(key for key in items if after is None or key > after)[:limit]
+    return keys, keys[-1] if len(keys) == limit else None
+
+
+## device_db
+
+
+@memory_operation(device_db.get_all_devices_ip_from_db)
+def _get_all_devices_ip():
+    return list(_store.devices)
+
+
+@memory_operation(device_db.get_device_db_obj)
+def _get_device(mgt_ip: str = None):
+    if mgt_ip:
+        return _store.devices.get(mgt_ip)
+    return list(_store.devices.values())
+
+
+@memory_operation(device_db.get_devices_page_from_db)
+def _get_devices_page(after: str = None, limit: int = None):
+    with _store.lock:
+        keys, next_cursor = _get_page(_store.devices, after, limit)
+        return [_store.devices[key] for key in keys], next_cursor
+
+
+@memory_operation(device_db.delete_device_nodes_in_db)
+def _delete_device_nodes(mgt_ip: str) -> int:
+    return _store.delete_device(mgt_ip)
+
+
+@memory_operation(device_db.delete_all_nodes_in_db)
+def _delete_all_nodes():
+    _store.clear()
+
+
+@memory_operation(device_db.sweep_orphan_nodes_in_db)
+def _sweep_orphan_nodes() -> int:
+    deleted = 0
+    with _store.lock:
+        for table in _store._device_tables():
+            for mgt_ip in [ip for ip in table if ip not in _store.devices]:
+                deleted += len(table.pop(mgt_ip))
+        for ip, (mgt_ip, _, _) in list(_store.sub_interface_ips.items()):
+            if mgt_ip not in _store.devices:
+                del _store.sub_interface_ips[ip]
+    return deleted
+
+
+@memory_operation(device_db.insert_devices_in_db)
+def _insert_device(device: Device):
+    with _store.lock:
+        if dev := _store.devices.get(device.mgt_ip):
+            dev.copy_properties(device)
+        else:
+            _store.devices[device.mgt_ip] = device
+
+
+@memory_operation(device_db.update_device_status)
+def _update_device_status(mgt_ip: str, status: str):
+    if device := _store.devices.get(mgt_ip):
+        device.status = status
+
+
+## interface_db
+
+
+@memory_operation(interface_db.get_all_interfaces_of_device_from_db)
+def _get_all_interfaces(device_ip: str) -> Optional[List[Interface]]:
+    if device_ip not in _store.devices:
+        return None
+    return list(_store.interfaces.get(device_ip, {}).values())
+
+
+@memory_operation(interface_db.get_interfaces_page_from_db)
+def _get_interfaces_page(device_ip: str, after: str = None, limit: int = None):
+    with _store.lock:
+        interfaces = _store.interfaces.get(device_ip, {})
+        keys, next_cursor = _get_page(interfaces, after, limit)
+        sub_ifs = _store.sub_interfaces.get(device_ip, {})
+        return [
+            (interfaces[key], list(sub_ifs.get(key, []))) for key in keys
+        ], next_cursor
+
+
+@memory_operation(interface_db.get_interface_of_device_from_db)
+def _get_interface(device_ip: str, interface_name: str) -> Optional[Interface]:
+    return _store.interfaces.get(device_ip, {}).get(interface_name)
+
+
+@memory_operation(interface_db.get_interface_by_alias_from_db)
+def _get_interface_by_alias(device_ip: str, alias: str) -> Optional[Interface]:
+    if_name = _store.interface_aliases.get(device_ip, {}).get(alias)
+    return _store.interfaces.get(device_ip, {}).get(if_name)
+
+
+@memory_operation(interface_db.get_sub_interface_of_device_from_db)
+def _get_sub_interface_of_device(device_ip: str, sub_if_ip: str) -> Optional[SubInterface]:
+    for sub_ifs in _store.sub_interfaces.get(device_ip, {}).values():
+        for sub_if in sub_ifs:
+            if sub_if.ip_address == sub_if_ip:
+                return sub_if
+    return None
+
+
+@memory_operation(interface_db.get_sub_interface_of_intfc_from_db)
+def _get_sub_interface_of_intfc(device_ip: str, if_name: str, sub_if_ip: str = None):
+    if if_name not in _store.interfaces.get(device_ip, {}):
+        return None
+    sub_ifs = _store.sub_interfaces.get(device_ip, {}).get(if_name, [])
+    if sub_if_ip:
+        return next((si for si in sub_ifs if si.ip_address == sub_if_ip), None)
+    return list(sub_ifs)
+
+
+@memory_operation(interface_db.get_sub_interface_from_db)
+def _get_sub_interface(sub_if_ip: str) -> Optional[SubInterface]:
+    return entry[2] if (entry := _store.sub_interface_ips.get(sub_if_ip)) else None
+
+
+@memory_operation(interface_db.get_sub_interface_prefix_rows_from_db)
+def _get_sub_interface_prefix_rows() -> List[tuple]:
+    with _store.lock:
+        return [
+            (mgt_ip, if_name, sub_if.ip_address, sub_if.prefix)
+            for mgt_ip, if_name, sub_if in _store.sub_interface_ips.values()
+        ]
+
+
+@memory_operation(interface_db.set_interface_config_in_db)
+def _set_interface_config(device_ip: str, if_name: str, *args, **kwargs):
+    with _store.lock:
+        if interface := _store.interfaces.get(device_ip, {}).get(if_name):
+            apply_interface_config(interface, *args, **kwargs)
+
+
+@memory_operation(interface_db.set_interfaces_config_in_db_bulk)
+def _set_interfaces_config_bulk(updates: dict) -> int:
+    updated = 0
+    with _store.lock:
+        for (device_ip, if_name), config in updates.items():
+            if interface := _store.interfaces.get(device_ip, {}).get(if_name):
+                apply_interface_config(interface, **config)
+                updated += 1
+    return updated
+
+
+@memory_operation(interface_db.insert_device_interfaces_in_db)
+def _insert_device_interfaces(device: Device, interfaces: dict):
+    if not device or not interfaces:
+        return None
+    with _store.lock:
+        for intfc, sub_intfc in interfaces.items():
+            if i := _store.interfaces.get(device.mgt_ip, {}).get(intfc.name):
+                copy_intfc_object_props(i, intfc)
+                _store.put_interface(device.mgt_ip, i)
+            else:
+                _store.put_interface(device.mgt_ip, intfc)
+            _store.set_sub_interfaces(device.mgt_ip, intfc.name, sub_intfc)
+        # Same as the Neo4j backend, more than one interface means all the interfaces of the device.
+        if len(interfaces) > 1:
+            for if_name in list(_store.interfaces.get(device.mgt_ip, {})):
+                if Interface(name=if_name) not in interfaces:
+                    _store.remove_interface(device.mgt_ip, if_name)
+    invalidate_sub_interface_prefix_index()
+
+
+@memory_operation(interface_db.del_interface_of_device_from_db)
+def _del_interface(device_ip: str, if_name: str):
+    _store.remove_interface(device_ip, if_name)
+    invalidate_sub_interface_prefix_index()
+
+
+## port_chnl_db
+
+
+@memory_operation(port_chnl_db.get_port_chnl_of_device_from_db)
+def _get_port_chnl(device_ip: str, port_chnl_name: str) -> Optional[PortChannel]:
+    return _store.port_chnls.get(device_ip, {}).get(port_chnl_name)
+
+
+@memory_operation(port_chnl_db.get_all_port_chnl_of_device_from_db)
+def _get_all_port_chnls(device_ip: str) -> Optional[List[PortChannel]]:
+    if device_ip not in _store.devices:
+        return None
+    return list(_store.port_chnls.get(device_ip, {}).values())
+
+
+@memory_operation(port_chnl_db.del_port_chnl_of_device_from_db)
+def _del_port_chnl(device_ip: str, port_chnl_name: str):
+    _store.remove_port_chnl(device_ip, port_chnl_name)
+
+
+@memory_operation(port_chnl_db.get_port_chnl_members_from_db)
+def _get_port_chnl_members(device_ip: str, port_chnl_name: str, if_name: str = None):
+    if port_chnl_name not in _store.port_chnls.get(device_ip, {}):
+        return None
+    interfaces = _store.interfaces.get(device_ip, {})
+    members = _store.port_chnl_members.get(device_ip, {}).get(port_chnl_name, [])
+    if if_name:
+        return interfaces.get(if_name) if if_name in members else None
+    return [interfaces[name] for name in members if name in interfaces]
+
+
+@memory_operation(port_chnl_db.insert_device_port_chnl_in_db)
+def _insert_device_port_chnls(device: Device, portchnl_to_mem_list):
+    mgt_ip = device.mgt_ip
+    with _store.lock:
+        chnls = _store.port_chnls.setdefault(mgt_ip, {})
+        for chnl, mem_list in portchnl_to_mem_list.items() or []:
+            if p_chnl := chnls.get(chnl.lag_name):
+                copy_port_chnl_prop(p_chnl, chnl)
+            else:
+                chnls[chnl.lag_name] = chnl
+            interfaces = _store.interfaces.get(mgt_ip, {})
+            _store.port_chnl_members.setdefault(mgt_ip, {})[chnl.lag_name] = [
+                if_name for if_name in mem_list or [] if if_name in interfaces
+            ]
+        for lag_name in list(chnls):
+            if PortChannel(lag_name=lag_name) not in portchnl_to_mem_list:
+                _store.remove_port_chnl(mgt_ip, lag_name)
+
+
+## vlan_db
+
+
+@memory_operation(vlan_db.get_vlan_obj_from_db)
+def _get_vlan(device_ip, vlan_name: str = None):
+    if device_ip not in _store.devices:
+        return None
+    vlans = _store.vlans.get(device_ip, {})
+    return vlans.get(vlan_name) if vlan_name else list(vlans.values())
+
+
+@memory_operation(vlan_db.get_vlan_obj_from_db_using_id)
+def _get_vlan_using_id(device_ip, vlan_id: int = None):
+    if device_ip not in _store.devices:
+        return None
+    vlans = _store.vlans.get(device_ip, {}).values()
+    if not vlan_id:
+        return list(vlans)
+    return next((vlan for vlan in vlans if vlan.vlanid == vlan_id), None)
+
+
+@memory_operation(vlan_db.get_vlans_page_from_db)
+def _get_vlans_page(device_ip: str, after: str = None, limit: int = None):
+    with _store.lock:
+        vlans = _store.vlans.get(device_ip, {})
+        keys, next_cursor = _get_page(vlans, after, limit)
+        return [
+            (vlans[key], [i.name for i in _get_vlan_mem_ifcs(device_ip, key)])
+            for key in keys
+        ], next_cursor
+
+
+@memory_operation(vlan_db.del_vlan_from_db)
+def _del_vlan(device_ip, vlan_name: str = None):
+    _store.remove_vlan(device_ip, vlan_name)
+
+
+def _get_vlan_member_nodes(device_ip: str, vlan_name: str, rel_type: str, table: dict):
+    if vlan_name not in _store.vlans.get(device_ip, {}):
+        return None
+    nodes = table.get(device_ip, {})
+    return [
+        nodes[if_name]
+        for (v_name, r_type, if_name) in _store.vlan_members.get(device_ip, {})
+        if v_name == vlan_name and r_type == rel_type and if_name in nodes
+    ]
+
+
+@memory_operation(vlan_db.get_vlan_mem_ifcs_from_db)
+def _get_vlan_mem_ifcs(device_ip: str, vlan_name: str):
+    return _get_vlan_member_nodes(device_ip, vlan_name, "MEMBER_IF", _store.interfaces)
+
+
+@memory_operation(vlan_db.get_vlan_member_port_channels_from_db)
+def _get_vlan_member_port_channels(device_ip: str, vlan_name: str):
+    return _get_vlan_member_nodes(
+        device_ip, vlan_name, "MEMBER_PORT_CHANNEL", _store.port_chnls
+    )
+
+
+@memory_operation(vlan_db.get_vlan_members_rel_from_db)
+def _get_vlan_members_rel(device_ip: str) -> dict:
+    return dict(_store.vlan_members.get(device_ip, {}))
+
+
+@memory_operation(vlan_db.sync_vlan_members_in_db)
+def _sync_vlan_members(device_ip: str, vlan_name_vs_mem: dict):
+    with _store.lock:
+        members = _store.vlan_members.setdefault(device_ip, {})
+        to_remove, to_upsert = diff_vlan_members(
+            members, get_vlan_members_rel(vlan_name_vs_mem)
+        )
+        for key in to_remove:
+            del members[key]
+        vlans = _store.vlans.get(device_ip, {})
+        for (vlan_name, rel_type, if_name), tagging_mode in to_upsert:
+            nodes = _store.interfaces if rel_type == "MEMBER_IF" else _store.port_chnls
+            if vlan_name in vlans and if_name in nodes.get(device_ip, {}):
+                members[(vlan_name, rel_type, if_name)] = tagging_mode
+
+
+@memory_operation(vlan_db.insert_vlan_in_db)
+def _insert_vlans(device: Device, vlans_obj_vs_mem):
+    mgt_ip = device.mgt_ip
+    with _store.lock:
+        vlans = _store.vlans.setdefault(mgt_ip, {})
+        for vlan in vlans_obj_vs_mem or {}:
+            if v := vlans.get(vlan.name):
+                copy_vlan_obj_prop(v, vlan)
+            else:
+                vlans[vlan.name] = vlan
+        _sync_vlan_members(
+            mgt_ip,
+            {vlan.name: members for vlan, members in (vlans_obj_vs_mem or {}).items()},
+        )
+        for vlan_name, vlan in list(vlans.items()):
+            if vlan not in (vlans_obj_vs_mem or {}):
+                _store.remove_vlan(mgt_ip, vlan_name)
+
+
+## portgroup_db
+
+
+@memory_operation(portgroup_db.get_port_group_from_db)
+def _get_port_group(device_ip: str, group_id=None):
+    if device_ip not in _store.devices:
+        return None
+    port_groups = _store.port_groups.get(device_ip, {})
+    return port_groups.get(group_id) if group_id else list(port_groups.values())
+
+
+@memory_operation(portgroup_db.insert_device_port_groups_in_db)
+def _insert_device_port_groups(device: Device = None, port_groups: dict = None):
+    mgt_ip = device.mgt_ip
+    with _store.lock:
+        pgs = _store.port_groups.setdefault(mgt_ip, {})
+        interfaces = _store.interfaces.get(mgt_ip, {})
+        for pg, mem_intfcs in port_groups.items():
+            if p := pgs.get(pg.port_group_id):
+                copy_portgr_obj_prop(p, pg)
+            else:
+                pgs[pg.port_group_id] = pg
+            members = _store.port_group_members.setdefault(mgt_ip, {}).setdefault(
+                pg.port_group_id, []
+            )
+            members.extend(
+                if_name
+                for if_name in mem_intfcs
+                if if_name in interfaces and if_name not in members
+            )
+
+
+@memory_operation(portgroup_db.set_port_group_speed_in_db)
+def _set_port_group_speed(device_ip: str, group_id: str, speed):
+    if port_group := _store.port_groups.get(device_ip, {}).get(group_id):
+        port_group.speed = str(speed)
+
+
+@memory_operation(portgroup_db.get_port_group_member_from_db)
+def _get_port_group_members(device_ip: str, group_id) -> Optional[List[Interface]]:
+    if group_id not in _store.port_groups.get(device_ip, {}):
+        return None
+    interfaces = _store.interfaces.get(device_ip, {})
+    return [
+        interfaces[if_name]
+        for if_name in _store.port_group_members.get(device_ip, {}).get(group_id, [])
+        if if_name in interfaces
+    ]
+
+
+@memory_operation(portgroup_db.get_port_group_of_if_from_db)
+def _get_port_group_of_if(device_ip: str, interface_name: str) -> Optional[PortGroup]:
+    for pg_id, members in _store.port_group_members.get(device_ip, {}).items():
+        if interface_name in members:
+            return _store.port_groups.get(device_ip, {}).get(pg_id)
+    return None
+
+
+## lldp_db
+
+
+@memory_operation(lldp_db.get_lldp_links_from_db)
+def _get_lldp_links(device_ips: List[str]) -> List[dict]:
+    with _store.lock:
+        return [
+            {"local_ip": local_ip, "local_if": if_name, "nbr_ip": nbr_ip, "nbr_if": nbr_if}
+            for local_ip in device_ips
+            for if_name, interface in _store.interfaces.get(local_ip, {}).items()
+            for nbr_ip, nbr_ifs in (interface.lldp_nbrs or {}).items()
+            for nbr_if in nbr_ifs or []
+        ]
+
+
+@memory_operation(lldp_db.create_lldp_relations_in_db)
+def _create_lldp_relations(device_ips):
+    device_ips = device_ips if isinstance(device_ips, list) else [device_ips]
+    with _store.lock:
+        links = _get_lldp_links(device_ips)
+        for device_ip in device_ips:
+            _store.lldp_links[device_ip] = set()
+        for link in links:
+            if link["nbr_if"] in _store.interfaces.get(link["nbr_ip"], {}):
+                _store.lldp_links[link["local_ip"]].add(
+                    (link["local_if"], link["nbr_ip"], link["nbr_if"])
+                )
+
+
+## topology_snapshot
+
+
+@memory_operation(topology_snapshot.export_topology_snapshot)
+def _export_topology_snapshot(path: str, compress: Optional[bool] = None) -> dict:
+    nodes, rels = _store.to_graph()
+    return write_topology_snapshot(path, compress, nodes, rels)
+
+
+@memory_operation(topology_snapshot.import_topology_snapshot)
+def _import_topology_snapshot(
+    path: str, compress: Optional[bool] = None, clean: bool = True
+) -> dict:
+    validate_topology_snapshot(path, compress)
+    snapshot, counts, skipped = _graph_to_snapshot(read_topology_snapshot(path, compress))
+    with _store.lock:
+        if not clean:
+            imported = {dev["device"]["mgt_ip"] for dev in snapshot["devices"]}
+            snapshot["devices"] = [
+                dev
+                for dev in _store.to_snapshot()["devices"]
+                if dev["device"]["mgt_ip"] not in imported
+            ] + snapshot["devices"]
+        _store.from_snapshot(snapshot)
+    invalidate_sub_interface_prefix_index()
+    if skipped["nodes"] or skipped["relationships"]:
+        _logger.warning(
+            "Skipped %s nodes and %s relationships of snapshot %s not kept by the in-memory store.",
+            skipped["nodes"],
+            skipped["relationships"],
+            path,
+        )
+    _logger.info(
+        "Imported %s nodes and %s relationships from snapshot %s.",
+        counts["nodes"],
+        counts["relationships"],
+        path,
+    )
+    return counts
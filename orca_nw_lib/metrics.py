@@ -0,0 +1,368 @@
+""" Metrics of the gNMI subscription pipeline, exposed in the Prometheus text format or as a dict """
+
+import functools
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    start_http_server,
+)
+from prometheus_client.core import GaugeMetricFamily, Metric
+
+from .utils import (
+    get_logging,
+    get_metrics_port,
+    get_subscription_mode,
+    is_telemetry_store_enabled,
+)
+
+_logger = get_logging().getLogger(__name__)
+
+## Registry of the pipeline metrics, separate from the registries of the telemetry pushed to Prometheus.
+metrics_registry = CollectorRegistry()
+
+## Time constant in seconds of the messages per second rates.
+_RATE_WINDOW = 10.0
+
+_LAG_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+_LATENCY_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+
+subscription_messages = Counter(
+    "orca_subscription_messages",
+    "gNMI subscription updates received",
+    labelnames=["device_ip", "path_class"],
+    registry=metrics_registry,
+)
+subscription_update_lag = Histogram(
+    "orca_subscription_update_lag_seconds",
+    "Time from the device timestamp of an update to its dispatch",
+    labelnames=["path_class"],
+    buckets=_LAG_BUCKETS,
+    registry=metrics_registry,
+)
+subscription_handler_latency = Histogram(
+    "orca_subscription_handler_seconds",
+    "Run time of the subscription update handlers",
+    labelnames=["handler"],
+    buckets=_LATENCY_BUCKETS,
+    registry=metrics_registry,
+)
+subscription_handler_errors = Counter(
+    "orca_subscription_handler_errors",
+    "Exceptions raised by the subscription update handlers",
+    labelnames=["handler"],
+    registry=metrics_registry,
+)
+sink_write_latency = Histogram(
+    "orca_sink_write_seconds",
+    "Write time of the sinks of the subscription updates",
+    labelnames=["sink"],
+    buckets=_LATENCY_BUCKETS,
+    registry=metrics_registry,
+)
+sink_write_errors = Counter(
+    "orca_sink_write_errors",
+    "Failed writes of the sinks of the subscription updates",
+    labelnames=["sink"],
+    registry=metrics_registry,
+)
+
+_lock = threading.Lock()
+## (device_ip, path_class) -> (messages per second, time of the last message)
+_rates: Dict[tuple, tuple] = {}
+## device_ip -> lag in seconds of the last update with a device timestamp
+_device_lags: Dict[str, float] = {}
+
+
+def record_update(device_ip: str, path_class: str, timestamp: int = 0):
+    """
+    Records an update received from a device.
+
+    Args:
+        device_ip (str): The IP address of the device.
+        path_class (str): Class of the update path, e.g. the name of its first prefix element.
+        timestamp (int, optional): Device timestamp of the update in nanoseconds since epoch,
+            the lag is not recorded if 0. Defaults to 0.
+    """
+    subscription_messages.labels(device_ip, path_class).inc()
+    now = time.time()
+    key = (device_ip, path_class)
+    with _lock:
+        # Exponentially decaying rate, so that a rate is kept without keeping the message times.
+        rate, last = _rates.get(key, (0.0, now))
+        _rates[key] = (
+            rate * math.exp(-(now - last) / _RATE_WINDOW) + 1 / _RATE_WINDOW,
+            now,
+        )
+        if timestamp:
+            lag = max(now - timestamp / 1e9, 0.0)
+            _device_lags[device_ip] = lag
+    if timestamp:
+        subscription_update_lag.labels(path_class).observe(lag)
+
+
+def get_message_rates() -> Dict[tuple, float]:
+    """
+    Returns the messages per second received in the last seconds.
+
+    Returns:
+        Dict[tuple, float]: (device_ip, path_class) -> messages per second.
+    """
+    now = time.time()
+    with _lock:
+        return {
+            key: rate * math.exp(-(now - last) / _RATE_WINDOW)
+            for key, (rate, last) in _rates.items()
+        }
+
+
+@contextmanager
+def observe_handler(name: str):
+    """
+    Records the run time of a handler, and the exception it raises if any.
+
+    Args:
+        name (str): The name of the handler.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        subscription_handler_errors.labels(name).inc()
+        raise
+    finally:
+        subscription_handler_latency.labels(name).observe(time.perf_counter() - start)
+
+
+def timed_handler(handler: Callable) -> Callable:
+    """
+    Wraps a handler, so that its run time and exceptions are recorded under its name.
+    """
+
+    @functools.wraps(handler)
+    def timed(*args, **kwargs):
+        with observe_handler(handler.__name__):
+            return handler(*args, **kwargs)
+
+    return timed
+
+
+@contextmanager
+def observe_sink(sink: str):
+    """
+    Records the write time of a sink of the subscription updates, and the failed writes.
+
+    Args:
+        sink (str): The name of the sink, e.g. influxdb.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        sink_write_errors.labels(sink).inc()
+        raise
+    finally:
+        sink_write_latency.labels(sink).observe(time.perf_counter() - start)
+
+
+def _add_stats(family: GaugeMetricFamily, labels: list, stats: dict):
+    for stat, value in stats.items():
+        if isinstance(value, (int, float)):
+            family.add_metric(labels + [stat], value)
+
+
+def _gauge(name: str, documentation: str, stats: dict) -> GaugeMetricFamily:
+    family = GaugeMetricFamily(name, documentation, labels=["stat"])
+    _add_stats(family, [], stats)
+    return family
+
+
+class _PipelineCollector:
+    """
+    Collects the rates and lags of the devices, and the statistics of the pipeline stages
+    at scrape time.
+    """
+
+    def collect(self):
+        # Imported at scrape time, as the pipeline stages import the modules recording these metrics.
+        from .db_write_behind import get_write_behind_stats
+        from .subscription_supervisor import get_subscription_gap_stats
+        from .update_lanes import get_lane_stats
+
+        rates = GaugeMetricFamily(
+            "orca_subscription_messages_per_second",
+            "gNMI subscription updates received per second",
+            labels=["device_ip", "path_class"],
+        )
+        for (device_ip, path_class), rate in get_message_rates().items():
+            rates.add_metric([device_ip, path_class], rate)
+        yield rates
+        lags = GaugeMetricFamily(
+            "orca_subscription_last_lag_seconds",
+            "Lag of the last update with a device timestamp",
+            labels=["device_ip"],
+        )
+        with _lock:
+            device_lags = dict(_device_lags)
+        for device_ip, lag in device_lags.items():
+            lags.add_metric([device_ip], lag)
+        yield lags
+
+        lanes = GaugeMetricFamily(
+            "orca_lane", "Subscription lane statistics", labels=["lane", "stat"]
+        )
+        depths = GaugeMetricFamily(
+            "orca_lane_queue_depth", "Tasks queued per lane shard", labels=["lane", "shard"]
+        )
+        for lane, stats in get_lane_stats().items():
+            _add_stats(lanes, [lane], stats)
+            for shard, queued in enumerate(stats["queue_depths"]):
+                depths.add_metric([lane, str(shard)], queued)
+        yield lanes
+        yield depths
+        yield _gauge("orca_db_write_behind", "DB write-behind statistics", get_write_behind_stats())
+        gaps = GaugeMetricFamily(
+            "orca_subscription_gap",
+            "Subscription stream loss statistics",
+            labels=["device_ip", "stat"],
+        )
+        for device_ip, stats in get_subscription_gap_stats().items():
+            _add_stats(gaps, [device_ip], stats)
+        yield gaps
+        if is_telemetry_store_enabled():
+            from .telemetry_store import get_telemetry_store
+
+            yield _gauge(
+                "orca_telemetry_store", "Telemetry store statistics", get_telemetry_store().get_stats()
+            )
+        if get_subscription_mode() == "aio":
+            from .gnmi_multiplexer import get_subscription_multiplexer
+
+            states = GaugeMetricFamily(
+                "orca_subscription_streams", "Subscription streams per state", labels=["state"]
+            )
+            counts = {}
+            for state in get_subscription_multiplexer().get_stream_states().values():
+                counts[state["state"]] = counts.get(state["state"], 0) + 1
+            for state, count in counts.items():
+                states.add_metric([state], count)
+            yield states
+
+
+metrics_registry.register(_PipelineCollector())
+
+"""
+Sources of the metrics of other processes, e.g. of the subscription shard workers.
+    Key: process name, the process label of its samples
+    Value: callable returning the metric families collected in the process
+"""
+_metric_sources: Dict[str, Callable[[], Iterable[Metric]]] = {}
+
+
+def add_metric_source(process: str, source: Callable[[], Iterable[Metric]]):
+    """
+    Adds the metrics of another process to the exposed metrics.
+    Once a source is added, every sample is labelled with the process it comes from,
+    "main" for the samples of this process.
+
+    Args:
+        process (str): The process name.
+        source (Callable[[], Iterable[Metric]]): Returns the metric families collected in the process.
+    """
+    _metric_sources[process] = source
+
+
+def remove_metric_source(process: str):
+    _metric_sources.pop(process, None)
+
+
+class _ExposedCollector:
+    """
+    Collects the metrics of this process merged with those of the metric sources, by metric name.
+    """
+
+    def collect(self):
+        if not _metric_sources:
+            yield from metrics_registry.collect()
+            return
+        merged = {}
+
+        def add(families: Iterable[Metric], process: str):
+            for family in families:
+                if (target := merged.get(family.name)) is None:
+                    target = merged[family.name] = Metric(
+                        family.name, family.documentation, family.type, family.unit
+                    )
+                target.samples.extend(
+                    sample._replace(labels=dict(sample.labels, process=process))
+                    for sample in family.samples
+                )
+
+        add(metrics_registry.collect(), "main")
+        for process, source in list(_metric_sources.items()):
+            try:
+                add(source(), process)
+            except Exception as e:
+                _logger.error("Failed to collect the metrics of %s: %s", process, e)
+        yield from merged.values()
+
+
+## Registry served and dumped, with the metrics of the other processes.
+_exposed_registry = CollectorRegistry()
+_exposed_registry.register(_ExposedCollector())
+
+
+def get_metrics_text() -> str:
+    """
+    Returns the pipeline metrics in the Prometheus text format.
+    """
+    return generate_latest(_exposed_registry).decode()
+
+
+def get_metrics() -> Dict[str, list]:
+    """
+    Returns the pipeline metrics.
+
+    Returns:
+        Dict[str, list]: Sample name -> list of (labels, value),
+        e.g. "orca_subscription_messages_total" -> [({"device_ip": ..., "path_class": ...}, 42.0)].
+    """
+    metrics = {}
+    for family in _exposed_registry.collect():
+        for sample in family.samples:
+            metrics.setdefault(sample.name, []).append((sample.labels, sample.value))
+    return metrics
+
+
+_metrics_server_started = False
+_metrics_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int = None) -> bool:
+    """
+    Serves the pipeline metrics over HTTP for Prometheus to scrape, once per process.
+
+    Args:
+        port (int, optional): The port to listen on. Defaults to None, i.e. metrics_port.
+
+    Returns:
+        bool: True if the server is running, False if no port is configured.
+    """
+    global _metrics_server_started
+    port = get_metrics_port() if port is None else port
+    with _metrics_server_lock:
+        if _metrics_server_started:
+            return True
+        if not port:
+            return False
+        start_http_server(port, registry=_exposed_registry)
+        _metrics_server_started = True
+        _logger.info("Serving subscription pipeline metrics on port %s.", port)
+        return True
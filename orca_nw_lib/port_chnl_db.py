@@ -1,11 +1,15 @@
 from typing import List
+from .db_cache import invalidates_db_cache
 from .device_db import get_device_db_obj
+from .db_transaction import write_transaction
 from .graph_db_models import Device, Interface, PortChannel
+from .storage_backend import storage_operation
 from .interface_db import get_interface_of_device_from_db
 from .utils import get_logging
 
 _logger = get_logging().getLogger(__name__)
 
+@storage_operation
 def get_port_chnl_of_device_from_db(device_ip: str, port_chnl_name: str) -> PortChannel:
     """
     Get the port channel of a device from the database.
@@ -22,6 +26,8 @@ def get_port_chnl_of_device_from_db(device_ip: str, port_chnl_name: str) -> Port
     return device.port_chnl.get_or_none(lag_name=port_chnl_name) if device else None
 
 
+@storage_operation
+@invalidates_db_cache
 def del_port_chnl_of_device_from_db(device_ip: str, port_chnl_name: str):
     """
     Deletes the specified port channel of a device from the database.
@@ -39,6 +45,7 @@ def del_port_chnl_of_device_from_db(device_ip: str, port_chnl_name: str):
         chnl.delete()
 
 
+@storage_operation
 def get_all_port_chnl_of_device_from_db(device_ip: str) -> List[PortChannel]:
     """
     Retrieve all port channels associated with a device from the database.
@@ -53,6 +60,7 @@ def get_all_port_chnl_of_device_from_db(device_ip: str) -> List[PortChannel]:
     return device.port_chnl.all() if device else None
 
 
+@storage_operation
 def get_port_chnl_members_from_db(
     device_ip: str, port_chnl_name: str, if_name: str = None
 ) -> Interface | List[Interface]:
@@ -112,6 +120,9 @@ def copy_port_chnl_prop(target_obj: PortChannel, src_obj: PortChannel):
     target_obj.vlan_members = src_obj.vlan_members
 
 
+@storage_operation
+@invalidates_db_cache
+@write_transaction("port_channel")
 def insert_device_port_chnl_in_db(device: Device, portchnl_to_mem_list):
     """
     Inserts device port channels into the database.
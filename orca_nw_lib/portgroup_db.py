@@ -1,8 +1,11 @@
 from typing import List
 from orca_nw_lib.common import Speed
+from orca_nw_lib.db_cache import cached_db_read, invalidates_db_cache
 from orca_nw_lib.device_db import get_device_db_obj
+from orca_nw_lib.db_transaction import checkpoint, write_transaction
 import orca_nw_lib.interface_db as orca_interfaces
 from orca_nw_lib.graph_db_models import Device, Interface, PortGroup
+from orca_nw_lib.storage_backend import storage_operation
 
 
 def copy_portgr_obj_prop(target_obj: PortGroup, src_obj: PortGroup):
@@ -22,6 +25,8 @@ def copy_portgr_obj_prop(target_obj: PortGroup, src_obj: PortGroup):
     target_obj.default_speed = src_obj.default_speed
 
 
+@storage_operation
+@cached_db_read
 def get_port_group_from_db(device_ip: str, group_id=None):
     device: Device = get_device_db_obj(device_ip)
     if device:
@@ -32,12 +37,16 @@ def get_port_group_from_db(device_ip: str, group_id=None):
         )
 
 
+@cached_db_read
 def get_all_port_group_ids_from_db(device_ip: str):
     device: Device = get_device_db_obj(device_ip)
     if device:
         return [pg.port_group_id for pg in get_port_group_from_db(device_ip) or []]
 
 
+@storage_operation
+@invalidates_db_cache
+@write_transaction("port_group")
 def insert_device_port_groups_in_db(device: Device = None, port_groups: dict = None):
     """
     Insert device port groups in the database.
@@ -50,6 +59,7 @@ def insert_device_port_groups_in_db(device: Device = None, port_groups: dict = N
         None
     """
     for pg, mem_intfcs in port_groups.items():
+        checkpoint()
         if p := get_port_group_from_db(device.mgt_ip, pg.port_group_id):
             copy_portgr_obj_prop(p, pg)
             p.save()
@@ -73,6 +83,8 @@ def insert_device_port_groups_in_db(device: Device = None, port_groups: dict = N
             )
 
 
+@storage_operation
+@invalidates_db_cache
 def set_port_group_speed_in_db(device_ip: str, group_id: str, speed: Speed):
     """
     Set the speed of a port group in the database.
@@ -91,6 +103,8 @@ def set_port_group_speed_in_db(device_ip: str, group_id: str, speed: Speed):
         port_group_obj.save()
 
 
+@storage_operation
+@cached_db_read
 def get_port_group_member_from_db(device_ip: str, group_id) -> List[Interface]:
     """
     Get the port group member interfaces from the database.
@@ -107,6 +121,7 @@ def get_port_group_member_from_db(device_ip: str, group_id) -> List[Interface]:
     return port_group_obj.memberInterfaces.all() if port_group_obj else None
 
 
+@cached_db_read
 def get_port_group_member_names_from_db(device_ip: str, group_id) -> List[str]:
     """
     Retrieve the names of the port group members from the database.
@@ -122,6 +137,8 @@ def get_port_group_member_names_from_db(device_ip: str, group_id) -> List[str]:
     return [intf.name for intf in intfcs or []]
 
 
+@storage_operation
+@cached_db_read
 def get_port_group_of_if_from_db(device_ip: str, interface_name: str) -> PortGroup:
     """
     Retrieve the port group object of an interface from the database.
@@ -143,6 +160,7 @@ def get_port_group_of_if_from_db(device_ip: str, interface_name: str) -> PortGro
     return None
 
 
+@cached_db_read
 def get_port_group_id_of_device_interface_from_db(device_ip: str, inertface_name: str):
     return (
         pg.port_group_id
@@ -1,6 +1,7 @@
 """ Utils for Prometheus """
 
 from prometheus_client import CollectorRegistry, push_to_gateway
+from orca_nw_lib.metrics import observe_sink
 from orca_nw_lib.utils import get_prometheus_job, get_prometheus_url
 
 
@@ -13,8 +14,9 @@ def write_to_prometheus(registry: CollectorRegistry = None):
     Returns:
         None
     """
-    push_to_gateway(
-         gateway= get_prometheus_url(), 
-        job= get_prometheus_job(), 
-        registry= registry
-    )
+    with observe_sink("prometheus"):
+        push_to_gateway(
+             gateway= get_prometheus_url(), 
+            job= get_prometheus_job(), 
+            registry= registry
+        )
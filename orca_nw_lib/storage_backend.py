@@ -0,0 +1,89 @@
+"""
+Pluggable storage backends of the *_db operations.
+Neo4j is the storage backend of orca_nw_lib, the in-memory backend is meant for tests and benchmarks,
+it is selected with the storage_backend environment variable and does not keep BGP, MCLAG and STP.
+"""
+
+from functools import wraps
+
+from .utils import get_logging, get_storage_backend
+
+_logger = get_logging().getLogger(__name__)
+
+NEO4J_BACKEND = "neo4j"
+MEMORY_BACKEND = "memory"
+
+## Names of the DiscoveryFeature not kept by the in-memory backend,
+## they are not discovered nor subscribed with it.
+MEMORY_UNSUPPORTED_FEATURES = frozenset(
+    ("mclag", "mclag_gw_macs", "bgp", "bgp_neighbors", "stp", "stp_port", "stp_vlan")
+)
+
+"""
+Implementations of the *_db operations by the in-memory backend.
+    Key: "<module>.<function name>" of the *_db operation
+    Value: function implementing the operation on the in-memory store
+"""
+_memory_operations = {}
+
+
+def _get_operation_key(func) -> str:
+    return f"{func.__module__}.{func.__name__}"
+
+
+def is_memory_backend() -> bool:
+    """
+    Returns True if the *_db operations are served by the in-memory backend.
+    """
+    return get_storage_backend() == MEMORY_BACKEND
+
+
+def is_feature_supported(feature) -> bool:
+    """
+    Returns True if the discovered data of the feature is kept by the configured storage backend.
+
+    Args:
+        feature (DiscoveryFeature): The feature.
+    """
+    return not is_memory_backend() or feature.name not in MEMORY_UNSUPPORTED_FEATURES
+
+
+def storage_operation(func):
+    """
+    Decorator for the *_db operations which access the storage directly.
+    With the neo4j backend (default) the decorated function is called as is,
+    with the memory backend the call is dispatched to the implementation registered
+    with `memory_operation`.
+    """
+    key = _get_operation_key(func)
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        if not is_memory_backend():
+            return func(*args, **kwargs)
+        if not _memory_operations:
+            # Registers the in-memory implementations.
+            from . import memory_db  # noqa: F401
+        if impl := _memory_operations.get(key):
+            return impl(*args, **kwargs)
+        raise NotImplementedError(
+            f"{func.__name__} is not supported by the {MEMORY_BACKEND} storage backend."
+        )
+
+    wrapper.storage_operation_key = key
+    return wrapper
+
+
+def memory_operation(operation):
+    """
+    Decorator registering the in-memory implementation of a *_db operation.
+
+    Args:
+        operation (callable): The *_db function decorated with `storage_operation`.
+    """
+
+    def decorator(impl):
+        _memory_operations[operation.storage_operation_key] = impl
+        return impl
+
+    return decorator
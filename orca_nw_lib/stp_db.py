@@ -1,4 +1,6 @@
 from orca_nw_lib.device_db import get_device_db_obj
+from orca_nw_lib.db_transaction import write_transaction
+from orca_nw_lib.storage_backend import storage_operation
 from orca_nw_lib.graph_db_models import STP_GLOBAL, Device
 
 from orca_nw_lib.utils import get_logging
@@ -6,6 +8,8 @@ from orca_nw_lib.utils import get_logging
 _logger = get_logging().getLogger(__name__)
 
 
+@storage_operation
+@write_transaction("stp")
 def insert_device_stp_in_db(device: Device, stp_obj: dict):
     """
     Inserts the STP (Spanning Tree Protocol) configuration for a given device into the database.
@@ -56,6 +60,7 @@ def copy_stp_global_obj(target_obj: STP_GLOBAL, src_obj: STP_GLOBAL):
     target_obj.bridge_priority = src_obj.bridge_priority
 
 
+@storage_operation
 def get_stp_global_from_db(device_ip: str):
     """
     Returns the STP_GLOBAL object for the specified device from the database.
@@ -70,6 +75,7 @@ def get_stp_global_from_db(device_ip: str):
     return device.stp_global.get_or_none(device_ip=device_ip) if device else None
 
 
+@storage_operation
 def delete_stp_global_from_db(device_ip: str):
     """
     Deletes the STP_GLOBAL object for the specified device from the database.
@@ -85,6 +91,7 @@ def delete_stp_global_from_db(device_ip: str):
         stp_obj.delete()
 
 
+@storage_operation
 def set_stp_config_in_db(
         device_ip: str, enabled_protocol: list | None, bpdu_filter: bool, bridge_priority: int,
         max_age: int, hello_time: int, forwarding_delay: int, disabled_vlans: list[int] = None,
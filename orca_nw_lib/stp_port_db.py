@@ -7,10 +7,13 @@ from orca_nw_lib.graph_db_models import Device, STP_PORT
 from orca_nw_lib.utils import get_logging
 
 from orca_nw_lib.device_db import get_device_db_obj
+from orca_nw_lib.db_transaction import checkpoint, write_transaction
+from orca_nw_lib.storage_backend import storage_operation
 
 _logger = get_logging().getLogger(__name__)
 
 
+@storage_operation
 def set_stp_port_config_in_db(
         device_ip: str, if_name: str = None, edge_port: str = None, link_type: str = None, guard: str = None,
         bpdu_guard: bool = None, bpdu_filter: bool = None, portfast: bool = None, uplink_fast: bool = None,
@@ -57,6 +60,7 @@ def set_stp_port_config_in_db(
             )
 
 
+@storage_operation
 def get_stp_port_members_from_db(device_ip: str, if_name: str = None):
     """
     Gets the STP port channel members from a device.
@@ -72,6 +76,7 @@ def get_stp_port_members_from_db(device_ip: str, if_name: str = None):
         return device.stp_port.get_or_none(if_name=if_name) if device else None
 
 
+@storage_operation
 def save_to_db(device_ip: str, stp_port_obj: STP_PORT):
     """
     Saves the STP port channel members to a device.
@@ -117,6 +122,8 @@ def copy_stp_port_obj(target_obj: STP_PORT, src_obj: STP_PORT):
     target_obj.stp_enabled = src_obj.stp_enabled
 
 
+@storage_operation
+@write_transaction("stp_port")
 def insert_device_stp_port_in_db(device: Device, stp_port_obj: dict):
     """
     Insert the STP_PORT object in the database.
@@ -127,6 +134,7 @@ def insert_device_stp_port_in_db(device: Device, stp_port_obj: dict):
     """
     _logger.info(f"Inserting STP Port on device {device.mgt_ip}.")
     for stp_port, members in stp_port_obj.items():
+        checkpoint()
         if existing_stp_port := get_stp_port_members_from_db(device.mgt_ip, stp_port.if_name):
             # updating stp port node in db
             copy_stp_port_obj(existing_stp_port, stp_port)
@@ -154,6 +162,7 @@ def insert_device_stp_port_in_db(device: Device, stp_port_obj: dict):
             delete_stp_port_member_from_db(device_ip=device.mgt_ip, if_name=existing_port_in_db.if_name)
 
 
+@storage_operation
 def delete_stp_port_member_from_db(device_ip: str, if_name: str):
     """
     device_ip (str): The IP address of the device.
@@ -1,4 +1,6 @@
 from orca_nw_lib.device_db import get_device_db_obj
+from orca_nw_lib.db_transaction import write_transaction
+from orca_nw_lib.storage_backend import storage_operation
 
 from orca_nw_lib.utils import get_logging
 
@@ -26,6 +28,8 @@ def copy_stp_vlan_obj(target_obj: STP_VLAN, src_obj: STP_VLAN):
     target_obj.max_age = src_obj.max_age
 
 
+@storage_operation
+@write_transaction("stp_vlan")
 def insert_device_stp_vlan_in_db(device: Device, stp_vlan_obj: dict):
     """
     Inserts the given STP VLAN object into the database for the specified device.
@@ -63,6 +67,7 @@ def insert_device_stp_vlan_in_db(device: Device, stp_vlan_obj: dict):
             delete_stp_vlan_from_db(device_ip=device.mgt_ip, vlan_id=existing_vlan_in_db.vlan_id)
 
 
+@storage_operation
 def get_stp_vlan_from_db(device_ip: str, vlan_id: int = None):
     """
     Retrieves the STP VLAN object from the database based on the device IP and VLAN ID.
@@ -80,6 +85,7 @@ def get_stp_vlan_from_db(device_ip: str, vlan_id: int = None):
         return device.stp_vlan.get_or_none(vlan_id=vlan_id) if vlan_id else device.stp_vlan.all()
 
 
+@storage_operation
 def delete_stp_vlan_from_db(device_ip: str, vlan_id: int = None):
     """
     Deletes a STP VLAN object from the database based on the device IP and VLAN ID.
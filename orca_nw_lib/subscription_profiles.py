@@ -0,0 +1,99 @@
+""" Subscription mode and cadence of the monitoring paths, per path class and interface """
+
+import re
+from typing import List, Optional
+
+from .gnmi_pb2 import Path, Subscription, SubscriptionMode
+from .utils import get_logging, get_subscription_profiles
+
+_logger = get_logging().getLogger(__name__)
+
+## Path classes of the monitoring subscriptions.
+PATH_CLASS_INTERFACE_COUNTERS = "interface_counters"
+PATH_CLASS_DOM = "dom"
+PATH_CLASS_CRM = "crm"
+PATH_CLASS_SYSTEM = "system"
+
+PATH_CLASSES = (
+    PATH_CLASS_INTERFACE_COUNTERS,
+    PATH_CLASS_DOM,
+    PATH_CLASS_CRM,
+    PATH_CLASS_SYSTEM,
+)
+
+_NS_PER_SECOND = 1_000_000_000
+
+
+def get_profile_rules(path_class: str) -> List[dict]:
+    """
+    Returns the profile rules of a path class from the subscription_profiles config,
+    a single rule may be given as a dict instead of a list.
+    """
+    rules = get_subscription_profiles().get(path_class) or []
+    return [rules] if isinstance(rules, dict) else list(rules)
+
+
+def get_subscription_profile(path_class: str, if_name: str = None) -> Optional[dict]:
+    """
+    Returns the first profile rule of the path class matching the interface.
+    A rule with an "interfaces" regex matches only the interfaces whose name fully matches it,
+    a wildcard path ("*") or a path without interface is matched by rules without "interfaces" only.
+
+    Args:
+        path_class (str): One of PATH_CLASSES.
+        if_name (str, optional): The interface name of the path. Defaults to None.
+
+    Returns:
+        dict: The matching rule, None if no rule matches.
+    """
+    for rule in get_profile_rules(path_class):
+        selector = rule.get("interfaces")
+        if not selector:
+            return rule
+        if if_name and if_name != "*" and re.fullmatch(selector, if_name):
+            return rule
+    return None
+
+
+def create_subscription(
+    path: Path,
+    path_class: str,
+    if_name: str = None,
+    default_mode: int = SubscriptionMode.TARGET_DEFINED,
+) -> Subscription:
+    """
+    Creates the subscription of a monitoring path with the profile of its path class.
+    Intervals of the profile are given in seconds, and sent to the device in nanoseconds.
+
+    Args:
+        path (Path): The path to subscribe.
+        path_class (str): One of PATH_CLASSES.
+        if_name (str, optional): The interface name of the path, matched against the "interfaces" selectors.
+            Defaults to None.
+        default_mode (int, optional): Mode when no profile matches.
+            Defaults to SubscriptionMode.TARGET_DEFINED.
+
+    Returns:
+        Subscription: The subscription of the path.
+    """
+    profile = get_subscription_profile(path_class, if_name)
+    if not profile:
+        return Subscription(path=path, mode=default_mode)
+    try:
+        mode = SubscriptionMode.Value(str(profile.get("mode", "SAMPLE")).upper())
+    except ValueError:
+        _logger.error(
+            "Invalid mode %s in subscription profile of %s, using default mode.",
+            profile.get("mode"),
+            path_class,
+        )
+        return Subscription(path=path, mode=default_mode)
+    return Subscription(
+        path=path,
+        mode=mode,
+        sample_interval=int(float(profile.get("sample_interval", 0)) * _NS_PER_SECOND),
+        suppress_redundant=bool(profile.get("suppress_redundant", False)),
+        heartbeat_interval=int(
+            float(profile.get("heartbeat_interval", 0)) * _NS_PER_SECOND
+        ),
+    )
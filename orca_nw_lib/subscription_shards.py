@@ -0,0 +1,559 @@
+"""
+Subscription streams of the devices spread over worker processes, by consistent hashing of
+their management IP. Every shard worker owns the gNMI channels, the subscription streams and
+the handlers of its devices, so that decoding the updates is not bound to the GIL of one process.
+
+The workers are spawned processes, the main module of the application must therefore be
+importable without side effects, i.e. guarded with if __name__ == "__main__".
+"""
+
+import atexit
+import bisect
+import hashlib
+import itertools
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+from . import constants as const
+from .gnmi_sub import device_sync_responses
+from .metrics import add_metric_source, remove_metric_source
+from .orca_exceptions import OrcaException
+from .utils import (
+    get_logging,
+    get_orca_config_file,
+    get_subscription_shard_status_interval,
+    get_subscription_shards,
+    load_orca_config,
+)
+
+_logger = get_logging().getLogger(__name__)
+
+## Points of every shard on the ring, so that the devices are evenly spread.
+_RING_REPLICAS = 128
+## Max seconds to wait for a shard worker to answer a command.
+_CALL_TIMEOUT = 30
+
+_context = multiprocessing.get_context("spawn")
+
+
+def _hash(key: str) -> int:
+    ## Not hash(), which differs between processes.
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+class HashRing:
+    """
+    Consistent hash ring of the shards.
+    Adding or removing a shard only moves the devices of the ring segments it takes or gives back,
+    i.e. about 1/N of the devices.
+    """
+
+    def __init__(self, shards: List[int] = (), replicas: int = _RING_REPLICAS):
+        self.replicas = replicas
+        self._points: List[int] = []
+        ## point -> shard
+        self._shards: Dict[int, int] = {}
+        for shard in shards:
+            self.add(shard)
+
+    def _get_points(self, shard: int):
+        return (_hash(f"shard_{shard}_{i}") for i in range(self.replicas))
+
+    def add(self, shard: int):
+        for point in self._get_points(shard):
+            if point not in self._shards:
+                bisect.insort(self._points, point)
+                self._shards[point] = shard
+
+    def remove(self, shard: int):
+        for point in self._get_points(shard):
+            if self._shards.get(point) == shard:
+                del self._shards[point]
+                self._points.pop(bisect.bisect_left(self._points, point))
+
+    def get_shard(self, key: str) -> int:
+        """
+        Returns the shard owning the key, the first shard point clockwise from the key hash.
+
+        Raises:
+            OrcaException: If the ring has no shard.
+        """
+        if not self._points:
+            raise OrcaException("No subscription shard on the ring.")
+        indx = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._shards[self._points[indx]]
+
+    def get_shards(self) -> List[int]:
+        return sorted(set(self._shards.values()))
+
+
+def _worker_main(conn, orca_config_file: str):
+    """
+    Main loop of a shard worker, answers the commands of the coordinator until stopped.
+    The package is imported by the spawned process, but does not subscribe all the devices in DB,
+    the worker subscribes only the devices assigned to it.
+
+    Args:
+        conn: Pipe to the coordinator.
+        orca_config_file (str): Configuration file loaded by the coordinator. The import of the
+            package loads the default one, the worker reloads the coordinator's one if it differs.
+    """
+    if orca_config_file != get_orca_config_file():
+        load_orca_config(orca_config_file)
+    from .gnmi_sub import (
+        close_gnmi_channel,
+        gnmi_subscribe,
+        gnmi_unsubscribe_devices,
+        is_subscribed,
+    )
+    from .metrics import metrics_registry
+
+    devices = set()
+
+    def subscribe_all(device_ips: List[str], force_resubscribe: bool = False) -> Dict[str, bool]:
+        devices.update(device_ips)
+        return {ip: gnmi_subscribe(ip, force_resubscribe) for ip in device_ips}
+
+    def unsubscribe_all(device_ips: List[str], timeout: float) -> bool:
+        devices.difference_update(device_ips)
+        return gnmi_unsubscribe_devices(device_ips, timeout)
+
+    def close(device_ip: str, timeout: float) -> bool:
+        devices.discard(device_ip)
+        return close_gnmi_channel(device_ip, timeout)
+
+    def get_status() -> Dict[str, dict]:
+        return {
+            ip: {
+                "subscribed": is_subscribed(ip),
+                "ready": bool(device_sync_responses.get(ip)),
+            }
+            for ip in devices
+        }
+
+    commands = {
+        "subscribe_all": subscribe_all,
+        "unsubscribe_all": unsubscribe_all,
+        "close": close,
+        "status": get_status,
+        "metrics": lambda: list(metrics_registry.collect()),
+    }
+    while True:
+        try:
+            call_id, command, args = conn.recv()
+        except (EOFError, OSError):
+            ## Coordinator gone.
+            command, args = "stop", (5,)
+            call_id = None
+        if command == "stop":
+            unsubscribe_all(list(devices), *args)
+            if call_id is not None:
+                conn.send((call_id, True, True))
+            return
+        try:
+            reply = (call_id, True, commands[command](*args))
+        except Exception as e:
+            _logger.error("Subscription shard command %s failed: %s", command, e)
+            reply = (call_id, False, str(e))
+        conn.send(reply)
+
+
+class ShardWorker:
+    """
+    Process of a subscription shard, and the pipe to send it commands.
+    """
+
+    def __init__(self, shard: int):
+        self.shard = shard
+        self.process = None
+        self._conn = None
+        self._lock = threading.Lock()
+        self._call_ids = itertools.count()
+
+    def start(self):
+        parent_conn, child_conn = _context.Pipe()
+        ## The process name tells the package, once imported by the worker, that it is a shard worker.
+        self.process = _context.Process(
+            target=_worker_main,
+            args=(child_conn, get_orca_config_file()),
+            name=f"{const.subscription_shard_process_name}_{self.shard}",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self._conn = parent_conn
+        _logger.info("Started subscription shard %s, pid %s.", self.shard, self.process.pid)
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def call(self, command: str, *args, timeout: float = _CALL_TIMEOUT):
+        """
+        Sends a command to the worker and waits for its result.
+
+        Raises:
+            OrcaException: If the command failed or the worker did not answer within timeout.
+        """
+        with self._lock:
+            call_id = next(self._call_ids)
+            self._conn.send((call_id, command, args))
+            deadline = time.monotonic() + timeout
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._conn.poll(remaining):
+                    raise OrcaException(
+                        f"Subscription shard {self.shard} did not answer {command} in {timeout} seconds."
+                    )
+                reply_id, ok, result = self._conn.recv()
+                ## Older replies are those of timed out commands.
+                if reply_id == call_id:
+                    break
+        if not ok:
+            raise OrcaException(f"Subscription shard {self.shard} {command} failed: {result}")
+        return result
+
+    def stop(self, timeout: float = 5):
+        """
+        Stops the worker after it has unsubscribed its devices, kills it if it does not stop in time.
+        """
+        if not self.is_alive():
+            return
+        try:
+            self.call("stop", timeout, timeout=timeout + 1)
+        except Exception as e:
+            _logger.error("Failed to stop subscription shard %s: %s", self.shard, e)
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self._conn.close()
+
+
+class ShardCoordinator:
+    """
+    Assigns the devices to the shard workers by consistent hashing of their management IP,
+    restarts the workers which died, and keeps the readiness of the devices reported by the workers.
+    """
+
+    def __init__(self, shards: int):
+        self.shards = shards
+        self._lock = threading.RLock()
+        self._ring = HashRing()
+        self._workers: Dict[int, ShardWorker] = {}
+        ## device_ip -> shard
+        self._assignments: Dict[str, int] = {}
+        ## device_ip -> status last reported by its worker
+        self._status: Dict[str, dict] = {}
+        self._stopped = threading.Event()
+        self._monitor = None
+
+    def start(self):
+        with self._lock:
+            for shard in range(self.shards):
+                self._start_worker(shard)
+        self._monitor = threading.Thread(
+            target=self._monitor_loop, name="orca_subscription_shard_monitor", daemon=True
+        )
+        self._monitor.start()
+
+    def _start_worker(self, shard: int):
+        worker = ShardWorker(shard)
+        worker.start()
+        self._workers[shard] = worker
+        self._ring.add(shard)
+        add_metric_source(
+            f"shard_{shard}", lambda: worker.call("metrics", timeout=5)
+        )
+
+    def _call(self, shard: int, command: str, *args):
+        if (worker := self._workers.get(shard)) is None:
+            return None
+        try:
+            return worker.call(command, *args)
+        except Exception as e:
+            _logger.error(e)
+            return None
+
+    def _call_shards(self, command: str, args: Dict[int, tuple]) -> Dict[int, object]:
+        """
+        Sends a command to several workers in parallel.
+
+        Args:
+            command (str): The command.
+            args (Dict[int, tuple]): Shard -> arguments of the command.
+
+        Returns:
+            Dict[int, object]: Shard -> result of the command, None if it failed.
+        """
+        if not args:
+            return {}
+        with ThreadPoolExecutor(len(args)) as executor:
+            futures = {
+                shard: executor.submit(self._call, shard, command, *shard_args)
+                for shard, shard_args in args.items()
+            }
+            return {shard: future.result() for shard, future in futures.items()}
+
+    @staticmethod
+    def _group(assignments: Dict[str, int]) -> Dict[int, List[str]]:
+        groups = {}
+        for device_ip, shard in assignments.items():
+            groups.setdefault(shard, []).append(device_ip)
+        return groups
+
+    def get_shard(self, device_ip: str) -> int:
+        return self._ring.get_shard(device_ip)
+
+    def subscribe(self, device_ip: str, force_resubscribe: bool = False) -> bool:
+        """
+        Subscribes the device in the worker of its shard.
+
+        Returns:
+            bool: True if the worker has subscribed the device.
+        """
+        with self._lock:
+            shard = self._ring.get_shard(device_ip)
+            previous = self._assignments.get(device_ip)
+            self._assignments[device_ip] = shard
+        if previous is not None and previous != shard:
+            self._call(previous, "unsubscribe_all", [device_ip], 5)
+        result = self._call(shard, "subscribe_all", [device_ip], force_resubscribe)
+        return bool(result and result.get(device_ip))
+
+    def _forget(self, device_ip: str):
+        with self._lock:
+            shard = self._assignments.pop(device_ip, None)
+            self._status.pop(device_ip, None)
+        device_sync_responses.pop(device_ip, None)
+        return shard
+
+    def unsubscribe(self, device_ip: str, timeout: float = 5) -> bool:
+        """
+        Unsubscribes the device in the worker of its shard.
+
+        Returns:
+            bool: True if the stream has ended or the device had no shard.
+        """
+        if (shard := self._forget(device_ip)) is None:
+            return True
+        return bool(self._call(shard, "unsubscribe_all", [device_ip], timeout))
+
+    def close(self, device_ip: str, timeout: float = 5) -> bool:
+        """
+        Unsubscribes the device and closes its channel in the worker of its shard.
+        """
+        if (shard := self._forget(device_ip)) is None:
+            return True
+        return bool(self._call(shard, "close", device_ip, timeout))
+
+    def unsubscribe_all(self, timeout: float = 5) -> bool:
+        """
+        Unsubscribes all the devices, the workers unsubscribe their devices in parallel.
+
+        Returns:
+            bool: True if all the streams have ended.
+        """
+        with self._lock:
+            groups = self._group(self._assignments)
+            self._assignments = {}
+            self._status = {}
+        for device_ips in groups.values():
+            for device_ip in device_ips:
+                device_sync_responses.pop(device_ip, None)
+        results = self._call_shards(
+            "unsubscribe_all",
+            {shard: (device_ips, timeout) for shard, device_ips in groups.items()},
+        )
+        return all(results.values())
+
+    def rebalance(self, device_ips: List[str] = None) -> int:
+        """
+        Assigns the devices to the shards of the ring. Devices which are no longer given are
+        unsubscribed, new devices and devices whose shard has changed are subscribed in their shard,
+        the other devices are left untouched.
+
+        Args:
+            device_ips (List[str], optional): The devices to subscribe. Defaults to None, i.e. the devices in DB.
+
+        Returns:
+            int: The number of devices subscribed in a new shard.
+        """
+        if device_ips is None:
+            from .device_db import get_all_devices_ip_from_db
+
+            device_ips = get_all_devices_ip_from_db() or []
+        with self._lock:
+            wanted = {ip: self._ring.get_shard(ip) for ip in device_ips}
+            removed = {
+                ip: shard
+                for ip, shard in self._assignments.items()
+                if wanted.get(ip) != shard
+            }
+            added = {
+                ip: shard
+                for ip, shard in wanted.items()
+                if self._assignments.get(ip) != shard
+            }
+            self._assignments = wanted
+            for device_ip in removed:
+                self._status.pop(device_ip, None)
+        for device_ip in removed:
+            if device_ip not in wanted:
+                device_sync_responses.pop(device_ip, None)
+        ## Removed first, so that a moved device is not streamed by two shards.
+        self._call_shards(
+            "unsubscribe_all",
+            {shard: (ips, 5) for shard, ips in self._group(removed).items()},
+        )
+        self._call_shards(
+            "subscribe_all", {shard: (ips,) for shard, ips in self._group(added).items()}
+        )
+        if added or removed:
+            _logger.info(
+                "Rebalanced subscription shards, %s devices subscribed, %s unsubscribed.",
+                len(added),
+                len(removed),
+            )
+        return len(added)
+
+    def resize(self, shards: int) -> int:
+        """
+        Changes the number of shard workers, and moves the devices whose shard has changed.
+
+        Returns:
+            int: The number of devices moved.
+        """
+        with self._lock:
+            for shard in range(self.shards, shards):
+                self._start_worker(shard)
+            stopping = [self._workers.pop(shard) for shard in range(shards, self.shards)]
+            for worker in stopping:
+                self._ring.remove(worker.shard)
+                remove_metric_source(f"shard_{worker.shard}")
+            self.shards = shards
+            device_ips = list(self._assignments)
+        for worker in stopping:
+            worker.stop()
+        return self.rebalance(device_ips)
+
+    def _monitor_loop(self):
+        while not self._stopped.wait(get_subscription_shard_status_interval()):
+            try:
+                self.check_workers()
+            except Exception as e:
+                _logger.error("Failed to check the subscription shards: %s", e)
+
+    def check_workers(self):
+        """
+        Restarts the workers which died and resubscribes their devices,
+        and updates the readiness of the devices of the other workers.
+        """
+        with self._lock:
+            workers = dict(self._workers)
+            groups = self._group(self._assignments)
+        for shard, worker in workers.items():
+            if worker.is_alive():
+                continue
+            _logger.error(
+                "Subscription shard %s exited with code %s, restarting it.",
+                shard,
+                worker.process.exitcode,
+            )
+            worker.start()
+            self._call(shard, "subscribe_all", groups.get(shard, []))
+        statuses = self._call_shards("status", {shard: () for shard in workers})
+        with self._lock:
+            for shard, status in statuses.items():
+                for device_ip, device_status in (status or {}).items():
+                    if self._assignments.get(device_ip) != shard:
+                        continue
+                    self._status[device_ip] = device_status
+                    ## Seen by sync_response_received of this process.
+                    if device_status["ready"]:
+                        device_sync_responses[device_ip] = True
+                    else:
+                        device_sync_responses.pop(device_ip, None)
+
+    def is_subscribed(self, device_ip: str) -> bool:
+        with self._lock:
+            return device_ip in self._assignments and self._status.get(
+                device_ip, {}
+            ).get("subscribed", True)
+
+    def get_readiness(self, device_ip: str = None) -> dict:
+        """
+        Returns the readiness of the devices, as last reported by their workers.
+
+        Args:
+            device_ip (str, optional): The IP address of the device. Defaults to None, i.e. all devices.
+
+        Returns:
+            dict: shard, subscribed and ready (sync response received) of the device,
+            or a dict of them keyed by device IP. Empty if the device is not assigned.
+        """
+        with self._lock:
+            readiness = {
+                ip: {
+                    "shard": shard,
+                    "subscribed": self._status.get(ip, {}).get("subscribed", False),
+                    "ready": self._status.get(ip, {}).get("ready", False),
+                }
+                for ip, shard in self._assignments.items()
+            }
+        if device_ip:
+            return readiness.get(device_ip, {})
+        return readiness
+
+    def get_shard_states(self) -> Dict[int, dict]:
+        """
+        Returns pid, alive and the number of devices of every shard worker.
+        """
+        with self._lock:
+            groups = self._group(self._assignments)
+            return {
+                shard: {
+                    "pid": worker.process.pid if worker.process else None,
+                    "alive": worker.is_alive(),
+                    "devices": len(groups.get(shard, [])),
+                }
+                for shard, worker in self._workers.items()
+            }
+
+    def stop(self, timeout: float = 5):
+        """
+        Stops the monitor and the workers, the workers unsubscribe their devices in parallel.
+        """
+        self._stopped.set()
+        if self._monitor:
+            self._monitor.join()
+        with self._lock:
+            workers = list(self._workers.values())
+            self._workers = {}
+            self._assignments = {}
+            self._status = {}
+        for worker in workers:
+            remove_metric_source(f"shard_{worker.shard}")
+        if workers:
+            with ThreadPoolExecutor(len(workers)) as executor:
+                list(executor.map(lambda worker: worker.stop(timeout), workers))
+
+
+_shard_coordinator = None
+_shard_coordinator_lock = threading.Lock()
+
+
+def get_shard_coordinator() -> ShardCoordinator:
+    """
+    Returns the coordinator of the subscription shards,
+    started on first use with subscription_shards workers.
+    """
+    global _shard_coordinator
+    with _shard_coordinator_lock:
+        if _shard_coordinator is None:
+            _shard_coordinator = ShardCoordinator(get_subscription_shards())
+            _shard_coordinator.start()
+            atexit.register(_shard_coordinator.stop)
+        return _shard_coordinator
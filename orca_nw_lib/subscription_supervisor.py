@@ -0,0 +1,218 @@
+""" Resubscribes devices whose gNMI subscription stream is lost """
+
+import random
+import threading
+import time
+from typing import Dict
+
+from .common import DiscoveryFeature
+from .utils import (
+    get_logging,
+    get_subscription_reconnect_backoff,
+    get_subscription_reconnect_max_backoff,
+    get_subscription_resync_features,
+    get_subscription_sync_timeout,
+)
+
+_logger = get_logging().getLogger(__name__)
+
+## Devices to be kept subscribed -> event set when the device is unsubscribed.
+_supervised: Dict[str, threading.Event] = {}
+## Devices being reconnected -> reconnect thread.
+_reconnecting: Dict[str, threading.Thread] = {}
+## Per device gap statistics.
+_gap_stats: Dict[str, dict] = {}
+_lock = threading.Lock()
+
+
+def supervise(device_ip: str):
+    """
+    Keeps the device subscribed, its subscription stream is reconnected when lost.
+    Called once the device is subscribed.
+
+    Args:
+        device_ip (str): The IP address of the device.
+    """
+    with _lock:
+        if device_ip not in _supervised:
+            _supervised[device_ip] = threading.Event()
+
+
+def unsupervise(device_ip: str):
+    """
+    Stops keeping the device subscribed, a pending reconnect of the device is abandoned.
+    Called when the device is unsubscribed on purpose.
+
+    Args:
+        device_ip (str): The IP address of the device.
+    """
+    with _lock:
+        stopped = _supervised.pop(device_ip, None)
+    if stopped:
+        stopped.set()
+
+
+def is_supervised(device_ip: str) -> bool:
+    return device_ip in _supervised
+
+
+def report_stream_lost(device_ip: str, error=None):
+    """
+    Called by the subscription stream of the device when it ends without being cancelled.
+    Starts reconnecting the device if it is supervised and not already being reconnected.
+
+    Args:
+        device_ip (str): The IP address of the device.
+        error (optional): The error the stream ended with. Defaults to None, i.e. closed by the device.
+    """
+    with _lock:
+        stopped = _supervised.get(device_ip)
+        if stopped is None or device_ip in _reconnecting:
+            return
+        stats = _gap_stats.setdefault(
+            device_ip,
+            {
+                "lost": 0,
+                "reconnects": 0,
+                "attempts": 0,
+                "lost_at": None,
+                "last_gap": None,
+                "max_gap": 0,
+                "total_gap": 0,
+                "last_error": None,
+            },
+        )
+        stats["lost"] += 1
+        stats["lost_at"] = time.time()
+        stats["last_error"] = str(error) if error else None
+        thread = threading.Thread(
+            target=_reconnect,
+            args=(device_ip, stopped),
+            name=f"subscription_reconnect_{device_ip}",
+            daemon=True,
+        )
+        _reconnecting[device_ip] = thread
+    _logger.error(
+        "gNMI subscription stream of %s lost%s, reconnecting.",
+        device_ip,
+        f": {error}" if error else "",
+    )
+    thread.start()
+
+
+def _wait_for_sync(device_ip: str, stopped: threading.Event) -> bool:
+    from .gnmi_sub import device_sync_responses
+
+    deadline = time.monotonic() + get_subscription_sync_timeout()
+    while not device_sync_responses.get(device_ip):
+        if time.monotonic() > deadline or stopped.wait(0.1):
+            return False
+    return True
+
+
+def _is_registered(device_ip: str, stopped: threading.Event) -> bool:
+    # The event of the supervision is its registration, a device unsubscribed
+    # and subscribed again has a new one.
+    return not stopped.is_set() and _supervised.get(device_ip) is stopped
+
+
+def _resubscribe(device_ip: str, stopped: threading.Event) -> bool:
+    """
+    Subscribes the device again, unless it has been unsubscribed.
+    The subscription is made without holding the lock, as it reads the DB and may wait
+    for the device for up to request_timeout. The registration of the device is checked
+    again once subscribed, and the new stream is cancelled if the device has been unsubscribed meanwhile.
+    """
+    from .gnmi_sub import gnmi_subscribe, gnmi_unsubscribe
+
+    with _lock:
+        if not _is_registered(device_ip, stopped):
+            return False
+    subscribed = gnmi_subscribe(device_ip, supervised=False)
+    with _lock:
+        if _is_registered(device_ip, stopped):
+            return subscribed
+        unsubscribed = device_ip not in _supervised
+    if unsubscribed:
+        _logger.info("Cancelling resubscription of %s, device unsubscribed.", device_ip)
+        gnmi_unsubscribe(device_ip)
+    # Otherwise subscribed again meanwhile, the stream is kept by the new supervision.
+    return False
+
+
+def _reconnect(device_ip: str, stopped: threading.Event):
+    stats = _gap_stats[device_ip]
+    delay = get_subscription_reconnect_backoff()
+    try:
+        while True:
+            # Jitter, so that the devices lost together, e.g. on a controller network outage,
+            # are not resubscribed all at once.
+            if stopped.wait(delay * random.uniform(0.5, 1.5)):
+                _logger.info("Reconnect of %s abandoned, device unsubscribed.", device_ip)
+                return
+            stats["attempts"] += 1
+            try:
+                if _resubscribe(device_ip, stopped) and _wait_for_sync(device_ip, stopped):
+                    break
+            except Exception as e:
+                stats["last_error"] = str(e)
+                _logger.debug("Reconnect attempt of %s failed: %s", device_ip, e)
+            delay = min(delay * 2, get_subscription_reconnect_max_backoff())
+        gap = time.time() - stats["lost_at"]
+        stats["reconnects"] += 1
+        stats["last_gap"] = gap
+        stats["max_gap"] = max(stats["max_gap"], gap)
+        stats["total_gap"] += gap
+        _logger.info(
+            "Resubscribed %s after a gap of %.1f seconds, rediscovering %s.",
+            device_ip,
+            gap,
+            get_subscription_resync_features(),
+        )
+    finally:
+        with _lock:
+            _reconnecting.pop(device_ip, None)
+    if stopped.is_set():
+        _logger.info("Resync of %s abandoned, device unsubscribed.", device_ip)
+        return
+    resync_device(device_ip)
+
+
+def resync_device(device_ip: str):
+    """
+    Rediscovers the features of the device whose changes may have been missed
+    while its subscription stream was down, see subscription_resync_features.
+
+    Args:
+        device_ip (str): The IP address of the device.
+    """
+    # discovery imports gnmi_sub, which imports this module.
+    from .discovery import discover_nw_features
+
+    for name in get_subscription_resync_features():
+        if (feature := DiscoveryFeature.get_enum_from_str(name.strip())) is None:
+            _logger.error("Invalid resync feature %s.", name)
+            continue
+        discover_nw_features(device_ip, feature)
+
+
+def get_subscription_gap_stats(device_ip: str = None) -> dict:
+    """
+    Returns the statistics of the subscription stream losses.
+
+    Args:
+        device_ip (str, optional): The IP address of the device. Defaults to None, i.e. all devices.
+
+    Returns:
+        dict: lost (stream losses), reconnects, attempts, lost_at (time of the last loss),
+        last_gap, max_gap and total_gap in seconds, last_error and reconnecting of the device,
+        or a dict of them keyed by device IP. Empty if the device has never lost its stream.
+    """
+    with _lock:
+        stats = {
+            ip: dict(device_stats, reconnecting=ip in _reconnecting)
+            for ip, device_stats in _gap_stats.items()
+        }
+    if device_ip:
+        return stats.get(device_ip, {})
+    return stats
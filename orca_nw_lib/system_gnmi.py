@@ -1,6 +1,11 @@
 from typing import List
-from .gnmi_pb2 import Path, PathElem, Subscription, SubscriptionMode
+from .gnmi_pb2 import Path, PathElem, Subscription
 from .gnmi_util import get_gnmi_path, send_gnmi_get
+from .subscription_profiles import (
+    PATH_CLASS_CRM,
+    PATH_CLASS_SYSTEM,
+    create_subscription,
+)
 
 
 def get_system_base_path() -> Path:
@@ -58,30 +63,15 @@ def get_subscription_path_for_system() -> List[Subscription]:
 
     # DNS Path /openconfig-system:system/dns/servers/server
     dns_path = get_gnmi_path("openconfig-system:system/dns/servers/server")
-    subscriptions.append(
-        Subscription(
-            path=dns_path,
-            mode=SubscriptionMode.TARGET_DEFINED
-        )
-    )
+    subscriptions.append(create_subscription(dns_path, PATH_CLASS_SYSTEM))
 
     # Events Path /openconfig-system:system/openconfig-events:events/event
     events_path = get_gnmi_path("openconfig-system:system/openconfig-events:events/event")
-    subscriptions.append(
-        Subscription(
-            path=events_path,
-            mode=SubscriptionMode.TARGET_DEFINED
-        )
-    )
+    subscriptions.append(create_subscription(events_path, PATH_CLASS_SYSTEM))
 
     # Memory State Path /openconfig-system:system/memory/state
     memory_path = get_gnmi_path("/openconfig-system:system/memory/state")
-    subscriptions.append(
-        Subscription(
-            path=memory_path,
-            mode=SubscriptionMode.TARGET_DEFINED
-        )
-    )
+    subscriptions.append(create_subscription(memory_path, PATH_CLASS_SYSTEM))
     return subscriptions
 
 
@@ -98,12 +88,7 @@ def get_subscription_path_for_crm_stats() -> List[Subscription]:
     subscriptions = []
 
     crm_stats = get_crm_stats_path()
-    subscriptions.append(
-        Subscription(
-            path=crm_stats,
-            mode=SubscriptionMode.TARGET_DEFINED
-        )
-    )
+    subscriptions.append(create_subscription(crm_stats, PATH_CLASS_CRM))
     return subscriptions
 
 
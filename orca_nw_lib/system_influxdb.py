@@ -1,6 +1,7 @@
 import datetime
 
 from orca_nw_lib.influxdb_utils import create_point, write_to_influx
+from .gnmi_decoders import SYSTEM_DECODERS, decode_updates
 from .gnmi_pb2 import SubscribeResponse
 from .gnmi_util import get_logging
 
@@ -44,40 +45,11 @@ def handle_system_influxdb(device_ip: str, resp: SubscribeResponse):
         _logger.debug("System Info not found in gNMI subscription response from %s",device_ip,)
         return
 
-    for u in resp.update.update:
-        for ele in u.path.elem:
-
-            # System dns
-            if ele.name == "address" and sys_metric == 'dns': 
-                sys_metric_pnt.field(ele.name, u.val.string_val)
-            if ele.name == "address-type" and sys_metric == 'dns': 
-                sys_metric_pnt.field(ele.name, u.val.string_val)
-            
-            # System memory
-            if ele.name == "reserved" and sys_metric == 'memory': 
-                sys_metric_pnt.field(ele.name, int(u.val.uint_val))
-            if ele.name == "buff-cache" and sys_metric == 'memory':
-                sys_metric_pnt.field(ele.name, int(u.val.uint_val))
-            if ele.name == "physical" and sys_metric == 'memory':
-                sys_metric_pnt.field(ele.name, int(u.val.uint_val))
-            if ele.name == "reserved" and sys_metric == 'memory':
-                sys_metric_pnt.field(ele.name, int(u.val.uint_val))
-            if ele.name == "unused" and sys_metric == 'memory':
-                sys_metric_pnt.field(ele.name, int(u.val.uint_val))
-
-            # System event
-            if ele.name == "id" and sys_metric == 'event': 
-                sys_metric_event_id.field(ele.name, u.val.string_val)
-            if ele.name == "resource" and sys_metric == 'event':
-                sys_metric_event_id.field(ele.name, u.val.string_val)
-            if ele.name == "severity" and sys_metric == 'event':
-                sys_metric_event_id.field(ele.name, u.val.string_val)
-            if ele.name == "text" and sys_metric == 'event':
-                sys_metric_event_id.field(ele.name, u.val.string_val)
-            if ele.name == "time-created" and sys_metric == 'event': 
-                sys_metric_event_id.field(ele.name, u.val.uint_val)
-            if ele.name == "type-id" and sys_metric == 'event':
-                sys_metric_event_id.field(ele.name, u.val.string_val)
+    metric_pnt = sys_metric_event_id if sys_metric == "event" else sys_metric_pnt
+    for field, value in decode_updates(
+        SYSTEM_DECODERS[sys_metric], resp.update.update
+    ).items():
+        metric_pnt.field(field, value)
 
     point.time(datetime.datetime.now(datetime.timezone.utc))
     write_to_influx(point=point)
@@ -2,6 +2,7 @@
 from prometheus_client import CollectorRegistry, Gauge, Info
 
 from orca_nw_lib.promdb_utils import write_to_prometheus
+from .gnmi_decoders import SYSTEM_DECODERS, decode_updates, get_prometheus_labels
 from .gnmi_pb2 import SubscribeResponse
 from .gnmi_util import get_logging
 
@@ -51,39 +52,13 @@ def handle_system_promdb(device_ip: str, resp: SubscribeResponse):
         return
 
 
-    for u in resp.update.update:
-        for ele in u.path.elem:
-
-            # System dns
-            if ele.name == "address" and sys_metric == 'dns':
-                sys_dict["address"] = u.val.string_val
-            if ele.name == "address-type" and sys_metric == 'dns':
-                sys_dict["address_type"] = u.val.string_val
-            
-            # System memory
-            if ele.name == "buff-cache" and sys_metric == 'memory':
-                sys_dict["buff_cache"] = str(u.val.uint_val)
-            if ele.name == "physical" and sys_metric == 'memory':
-                sys_dict["physical"]= str(u.val.uint_val)
-            if ele.name == "reserved" and sys_metric == 'memory':
-                sys_dict["reserved"]= str(u.val.uint_val) 
-            if ele.name == "unused" and sys_metric == 'memory':
-                sys_dict["unused"]= str(u.val.uint_val)
-
-            # System event
-            if ele.name == "id" and sys_metric == 'event':
-                sys_event_dict["id"] = u.val.string_val
-            if ele.name == "resource" and sys_metric == 'event':
-                sys_event_dict["resource"] = u.val.string_val
-            if ele.name == "severity" and sys_metric == 'event':
-                sys_event_dict["severity"] = u.val.string_val
-            if ele.name == "text" and sys_metric == 'event':
-                sys_event_dict["text"]= u.val.string_val
-            if ele.name == "time-created" and sys_metric == 'event': 
-                sys_event_dict["time_created"]= str(u.val.uint_val)
-            if ele.name == "type-id" and sys_metric == 'event':
-                sys_event_dict["type_id"]= u.val.string_val
-
+    fields = get_prometheus_labels(
+        decode_updates(SYSTEM_DECODERS[sys_metric], resp.update.update)
+    )
+    if sys_metric == "event":
+        sys_event_dict.update(fields)
+    else:
+        sys_dict.update(fields)
 
     if sys_metric == "dns" or sys_metric == "memory":
         system_info_sub.labels(device_ip=device_ip,sys_metric=sys_metric).info(sys_dict)
@@ -0,0 +1,307 @@
+""" Process local store of the latest values of the telemetry streamed by gNMI subscriptions """
+
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional
+
+from .gnmi_decoders import decode_dom_updates
+from .gnmi_pb2 import SubscribeResponse
+from .utils import get_logging, get_telemetry_store_max_series
+
+_logger = get_logging().getLogger(__name__)
+
+## Groups of series, a series is identified by (device_ip, group, entity, field).
+GROUP_INTERFACE = "interface"
+GROUP_DOM = "dom"
+GROUP_CRM = "crm"
+GROUP_SYSTEM = "system"
+
+
+class TelemetryStore:
+    """
+    Latest value and timestamp of every telemetry series.
+    Values are kept in compact arrays, a column of signed 64 bit integers for counters and
+    a column of doubles for readings, so that a series takes 16 bytes plus its index entry.
+    A series is a slot in one of the columns, slots >= 0 index the integer column and
+    slots < 0 the float column at ~slot. Slots of cleared devices are reused.
+    """
+
+    def __init__(self, max_series: int):
+        self.max_series = max_series
+        self._lock = threading.Lock()
+        ## (device_ip, group, entity) -> field -> slot
+        self._index: Dict[tuple, Dict[str, int]] = {}
+        self._int_values = array("q")
+        self._int_times = array("q")
+        self._float_values = array("d")
+        self._float_times = array("q")
+        self._free_int_slots: List[int] = []
+        self._free_float_slots: List[int] = []
+        self._series = 0
+        self._rejected = 0
+
+    def _allocate(self, is_float: bool) -> Optional[int]:
+        if self._series >= self.max_series:
+            self._rejected += 1
+            return None
+        self._series += 1
+        if is_float:
+            if self._free_float_slots:
+                return ~self._free_float_slots.pop()
+            self._float_values.append(0.0)
+            self._float_times.append(0)
+            return ~(len(self._float_values) - 1)
+        if self._free_int_slots:
+            return self._free_int_slots.pop()
+        self._int_values.append(0)
+        self._int_times.append(0)
+        return len(self._int_values) - 1
+
+    def record(self, device_ip: str, group: str, entity: str, fields: dict, timestamp: int):
+        """
+        Records the latest values of the fields of an entity.
+        New series beyond max_series are rejected.
+
+        Args:
+            device_ip (str): The IP address of the device.
+            group (str): Group of the series, e.g. GROUP_INTERFACE.
+            entity (str): Entity of the series, e.g. the interface name.
+            fields (dict): Field -> int or float value.
+            timestamp (int): Timestamp of the values in nanoseconds since epoch.
+        """
+        key = (device_ip, group, entity)
+        with self._lock:
+            slots = self._index.setdefault(key, {})
+            for field, value in fields.items():
+                slot = slots.get(field)
+                if slot is None:
+                    if (slot := self._allocate(isinstance(value, float))) is None:
+                        continue
+                    slots[field] = slot
+                try:
+                    if slot >= 0:
+                        self._int_values[slot] = int(value)
+                        self._int_times[slot] = timestamp
+                    else:
+                        self._float_values[~slot] = float(value)
+                        self._float_times[~slot] = timestamp
+                except OverflowError:
+                    _logger.debug("Value %s of %s %s out of range.", value, key, field)
+            if not slots:
+                del self._index[key]
+
+    def get(self, device_ip: str, group: str, entity: str) -> Dict[str, tuple]:
+        """
+        Returns the latest values of the fields of an entity.
+
+        Returns:
+            Dict[str, tuple]: Field -> (value, timestamp in nanoseconds since epoch),
+            empty if no value has been recorded for the entity.
+        """
+        with self._lock:
+            slots = self._index.get((device_ip, group, entity))
+            if not slots:
+                return {}
+            return {
+                field: (
+                    (self._int_values[slot], self._int_times[slot])
+                    if slot >= 0
+                    else (self._float_values[~slot], self._float_times[~slot])
+                )
+                for field, slot in slots.items()
+            }
+
+    def get_entities(self, device_ip: str, group: str) -> List[str]:
+        """
+        Returns the entities of the group with recorded values, e.g. the interface names.
+        """
+        with self._lock:
+            return [
+                entity
+                for ip, grp, entity in self._index
+                if ip == device_ip and grp == group
+            ]
+
+    def clear_device(self, device_ip: str):
+        """
+        Removes all the series of the device, their slots are reused by new series.
+        """
+        with self._lock:
+            for key in [key for key in self._index if key[0] == device_ip]:
+                for slot in self._index.pop(key).values():
+                    if slot >= 0:
+                        self._free_int_slots.append(slot)
+                    else:
+                        self._free_float_slots.append(~slot)
+                    self._series -= 1
+
+    def get_stats(self) -> dict:
+        """
+        Returns the store metrics.
+
+        Returns:
+            dict: series, max_series, rejected (new series over max_series), entities,
+            and bytes used by the value columns.
+        """
+        with self._lock:
+            return {
+                "series": self._series,
+                "max_series": self.max_series,
+                "rejected": self._rejected,
+                "entities": len(self._index),
+                "bytes": sum(
+                    col.buffer_info()[1] * col.itemsize
+                    for col in (
+                        self._int_values,
+                        self._int_times,
+                        self._float_values,
+                        self._float_times,
+                    )
+                ),
+            }
+
+
+_telemetry_store = None
+_telemetry_store_lock = threading.Lock()
+
+
+def get_telemetry_store() -> TelemetryStore:
+    """
+    Returns the telemetry store, created on first use with telemetry_store_max_series.
+    """
+    global _telemetry_store
+    with _telemetry_store_lock:
+        if _telemetry_store is None:
+            _telemetry_store = TelemetryStore(get_telemetry_store_max_series())
+        return _telemetry_store
+
+
+def clear_device_telemetry(device_ip: str):
+    """
+    Removes the series of a device unsubscribed or deleted, if the telemetry store is in use.
+    Called once the subscription stream of the device has ended, so that no update recreates them.
+    """
+    if _telemetry_store is not None:
+        _telemetry_store.clear_device(device_ip)
+
+
+def _get_timestamp(resp: SubscribeResponse) -> int:
+    return resp.update.timestamp or time.time_ns()
+
+
+def _get_numeric_fields(resp: SubscribeResponse) -> dict:
+    fields = {}
+    for u in resp.update.update:
+        if not u.path.elem:
+            continue
+        kind = u.val.WhichOneof("value")
+        if kind in ("uint_val", "int_val"):
+            fields[u.path.elem[-1].name] = getattr(u.val, kind)
+        elif kind in ("float_val", "double_val"):
+            fields[u.path.elem[-1].name] = float(getattr(u.val, kind))
+    return fields
+
+
+def _get_prefix_elem(resp: SubscribeResponse, name: str):
+    for ele in resp.update.prefix.elem:
+        if ele.name == name:
+            return ele
+    return None
+
+
+def store_interface_counters(device_ip: str, resp: SubscribeResponse):
+    """
+    Records the interface counters of a subscription update, other interface updates are ignored.
+    """
+    if (intfc := _get_prefix_elem(resp, "interface")) is None:
+        return
+    if not any(
+        ele.name == "counters"
+        for ele in list(resp.update.prefix.elem)
+        + [ele for u in resp.update.update for ele in u.path.elem]
+    ):
+        return
+    if fields := _get_numeric_fields(resp):
+        get_telemetry_store().record(
+            device_ip, GROUP_INTERFACE, intfc.key.get("name"), fields, _get_timestamp(resp)
+        )
+
+
+def store_dom(device_ip: str, resp: SubscribeResponse):
+    """
+    Records the numeric DOM readings and thresholds of a subscription update.
+    """
+    component = _get_prefix_elem(resp, "component")
+    if component is None or not component.key.get("name", "").startswith("Ethernet"):
+        return
+    fields = {
+        field: value
+        for field, value in decode_dom_updates(resp.update.update).items()
+        if isinstance(value, (int, float)) and not isinstance(value, bool)
+    }
+    if fields:
+        get_telemetry_store().record(
+            device_ip, GROUP_DOM, component.key.get("name"), fields, _get_timestamp(resp)
+        )
+
+
+def store_crm_stats(device_ip: str, resp: SubscribeResponse):
+    """
+    Records the CRM statistics of a subscription update.
+    """
+    if _get_prefix_elem(resp, "statistics") is None:
+        return
+    if fields := _get_numeric_fields(resp):
+        get_telemetry_store().record(
+            device_ip, GROUP_CRM, "statistics", fields, _get_timestamp(resp)
+        )
+
+
+def store_system_memory(device_ip: str, resp: SubscribeResponse):
+    """
+    Records the system memory of a subscription update, other system updates are ignored.
+    """
+    if _get_prefix_elem(resp, "memory") is None:
+        return
+    if fields := _get_numeric_fields(resp):
+        get_telemetry_store().record(
+            device_ip, GROUP_SYSTEM, "memory", fields, _get_timestamp(resp)
+        )
+
+
+def get_live_counters(device_ip: str, if_name: str) -> Dict[str, tuple]:
+    """
+    Returns the latest counters of an interface received by subscription.
+
+    Args:
+        device_ip (str): The IP address of the device.
+        if_name (str): The name of the interface.
+
+    Returns:
+        Dict[str, tuple]: Counter name, e.g. in-octets -> (value, timestamp in nanoseconds since epoch),
+        empty if no counters have been received for the interface.
+    """
+    return get_telemetry_store().get(device_ip, GROUP_INTERFACE, if_name)
+
+
+def get_live_dom(device_ip: str, if_name: str) -> Dict[str, tuple]:
+    """
+    Returns the latest DOM readings and thresholds of the transceiver of an interface,
+    see get_live_counters for the format.
+    """
+    return get_telemetry_store().get(device_ip, GROUP_DOM, if_name)
+
+
+def get_live_crm_stats(device_ip: str) -> Dict[str, tuple]:
+    """
+    Returns the latest CRM statistics of the device, see get_live_counters for the format.
+    """
+    return get_telemetry_store().get(device_ip, GROUP_CRM, "statistics")
+
+
+def get_live_system_memory(device_ip: str) -> Dict[str, tuple]:
+    """
+    Returns the latest system memory of the device, see get_live_counters for the format.
+    """
+    return get_telemetry_store().get(device_ip, GROUP_SYSTEM, "memory")
@@ -0,0 +1,347 @@
+""" Export and import of the whole topology graph as a compact snapshot file """
+
+import gzip
+import json
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Optional
+
+from neomodel import db
+
+from .db_cache import invalidate_db_cache
+from .db_schema import create_db_index, drop_db_index
+from .db_transaction import checkpoint, write_transaction
+from .interface_db import invalidate_sub_interface_prefix_index
+from .storage_backend import storage_operation
+from .utils import get_db_write_batch_size, get_logging
+
+_logger = get_logging().getLogger(__name__)
+
+SNAPSHOT_FORMAT = "orca_topology_snapshot"
+SNAPSHOT_VERSION = 1
+
+## Temporary label and property used to resolve the relationships to the imported nodes.
+## Staged nodes are not owned by a device yet, the orphan sweeper skips them.
+SNAPSHOT_IMPORT_LABEL = "OrcaSnapshotImport"
+_IMPORT_ID = "_snapshot_id"
+_IMPORT_INDEX = "orca_snapshot_import_id"
+
+
+def _open_snapshot(path: str, mode: str, compress: Optional[bool] = None):
+    """
+    Opens a snapshot file in text mode, gzip compressed if compress is True
+    or, when compress is None, if the path ends with ".gz".
+    """
+    if compress is None:
+        compress = path.endswith(".gz")
+    if compress:
+        return gzip.open(path, f"{mode}t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _escape(name: str) -> str:
+    return "`" + name.replace("`", "``") + "`"
+
+
+def _iter_nodes(batch_size: int) -> Iterator[dict]:
+    after = ""
+    while True:
+        results, _ = db.cypher_query(
+            """
+            MATCH (n) WHERE elementId(n) > $after
+            RETURN elementId(n) AS id, labels(n), properties(n)
+            ORDER BY id LIMIT $batch
+            """,
+            {"after": after, "batch": batch_size},
+        )
+        for node_id, labels, props in results:
+            yield {"id": node_id, "labels": sorted(labels), "props": props}
+        if len(results) < batch_size:
+            return
+        after = results[-1][0]
+
+
+def _iter_relationships(batch_size: int) -> Iterator[dict]:
+    after = ""
+    while True:
+        results, _ = db.cypher_query(
+            """
+            MATCH (a)-[r]->(b) WHERE elementId(r) > $after
+            RETURN elementId(r) AS id, type(r), elementId(a), elementId(b), properties(r)
+            ORDER BY id LIMIT $batch
+            """,
+            {"after": after, "batch": batch_size},
+        )
+        for rel_id, rel_type, start, end, props in results:
+            yield {
+                "id": rel_id,
+                "rel_type": rel_type,
+                "start": start,
+                "end": end,
+                "props": props,
+            }
+        if len(results) < batch_size:
+            return
+        after = results[-1][0]
+
+
+def write_topology_snapshot(
+    path: str, compress: Optional[bool], nodes: Iterable[dict], relationships: Iterable[dict]
+) -> dict:
+    """
+    Writes the header, the node and relationship items and the footer of a snapshot file.
+
+    Args:
+        path (str): Path of the snapshot file.
+        compress (bool, optional): Whether to gzip the file, None if the path ends with ".gz".
+        nodes (Iterable[dict]): Node items, with id, labels and props.
+        relationships (Iterable[dict]): Relationship items, with id, rel_type, start, end and props.
+
+    Returns:
+        dict: Number of nodes and relationships written.
+    """
+    counts = {"nodes": 0, "relationships": 0}
+    with _open_snapshot(path, "w", compress) as f:
+        header = {
+            "type": "header",
+            "format": SNAPSHOT_FORMAT,
+            "version": SNAPSHOT_VERSION,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        }
+        f.write(json.dumps(header) + "\n")
+        for node in nodes:
+            f.write(json.dumps({"type": "node", **node}, default=str) + "\n")
+            counts["nodes"] += 1
+        for rel in relationships:
+            f.write(json.dumps({"type": "rel", **rel}, default=str) + "\n")
+            counts["relationships"] += 1
+        f.write(json.dumps({"type": "footer", **counts}) + "\n")
+    _logger.info(
+        "Exported %s nodes and %s relationships to snapshot %s.",
+        counts["nodes"],
+        counts["relationships"],
+        path,
+    )
+    return counts
+
+
+def read_topology_snapshot(path: str, compress: Optional[bool]) -> Iterator[dict]:
+    """
+    Streams the node and relationship items of a snapshot file,
+    to be called once the file is checked with validate_topology_snapshot.
+    """
+    with _open_snapshot(path, "r", compress) as f:
+        f.readline()
+        for line in f:
+            if line.strip() and (item := json.loads(line))["type"] in ("node", "rel"):
+                yield item
+
+
+@storage_operation
+def export_topology_snapshot(path: str, compress: Optional[bool] = None) -> dict:
+    """
+    Streams the whole topology graph, i.e. all the nodes and relationships, to a snapshot file.
+    The file is newline-delimited JSON, a header line with the format and version,
+    then one line per node, one line per relationship and a footer line with the counts.
+    Nodes and relationships are read in pages of db_write_batch_size.
+
+    Args:
+        path (str): Path of the snapshot file.
+        compress (bool, optional): Whether to gzip the file.
+            Defaults to None, i.e. compressed if the path ends with ".gz".
+
+    Returns:
+        dict: Number of nodes and relationships exported.
+    """
+    batch_size = get_db_write_batch_size()
+    return write_topology_snapshot(
+        path, compress, _iter_nodes(batch_size), _iter_relationships(batch_size)
+    )
+
+
+def _create_nodes(labels: tuple, rows: list) -> int:
+    results, _ = db.cypher_query(
+        f"""
+        UNWIND $rows AS row
+        CREATE (n:{":".join(_escape(label) for label in (*labels, SNAPSHOT_IMPORT_LABEL))})
+        SET n = row.props, n.{_IMPORT_ID} = row.id
+        RETURN count(*)
+        """,
+        {"rows": rows},
+    )
+    checkpoint(len(rows))
+    return results[0][0] if results else 0
+
+
+def _create_relationships(rel_type: str, rows: list) -> int:
+    # Rows whose end nodes are not found create nothing, they are not counted.
+    results, _ = db.cypher_query(
+        f"""
+        UNWIND $rows AS row
+        MATCH (a:{SNAPSHOT_IMPORT_LABEL} {{{_IMPORT_ID}: row.start}})
+        MATCH (b:{SNAPSHOT_IMPORT_LABEL} {{{_IMPORT_ID}: row.end}})
+        CREATE (a)-[r:{_escape(rel_type)}]->(b)
+        SET r = row.props
+        RETURN count(*)
+        """,
+        {"rows": rows},
+    )
+    checkpoint(len(rows))
+    return results[0][0] if results else 0
+
+
+def validate_topology_snapshot(path: str, compress: Optional[bool]) -> dict:
+    """
+    Reads the whole snapshot file and checks its header, footer and counts,
+    so that nothing is written in DB for an unsupported or truncated snapshot.
+
+    Returns:
+        dict: Number of nodes and relationships in the snapshot.
+
+    Raises:
+        ValueError: If the file is not a snapshot of a supported version or is truncated.
+    """
+    counts = {"nodes": 0, "relationships": 0}
+    footer = None
+    with _open_snapshot(path, "r", compress) as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get("format") != SNAPSHOT_FORMAT or header.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(
+                f"Unsupported snapshot {header.get('format')} version {header.get('version')}."
+            )
+        for line in f:
+            if not line.strip():
+                continue
+            if footer is not None:
+                raise ValueError("Snapshot has lines after the footer.")
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Snapshot is truncated or corrupted: {e}") from e
+            if item.get("type") == "node":
+                counts["nodes"] += 1
+            elif item.get("type") == "rel":
+                counts["relationships"] += 1
+            elif item.get("type") == "footer":
+                footer = item
+    if footer is None:
+        raise ValueError("Snapshot is truncated, footer is missing.")
+    if (footer.get("nodes"), footer.get("relationships")) != (
+        counts["nodes"],
+        counts["relationships"],
+    ):
+        raise ValueError(f"Snapshot counts {counts} do not match footer {footer}.")
+    return counts
+
+
+@write_transaction("topology_snapshot")
+def _import_snapshot_items(items: Iterable[dict], batch_size: int) -> dict:
+    """
+    Creates the nodes and relationships of the snapshot items,
+    grouped per label set and relationship type in batches of batch_size.
+    The nodes are staged under SNAPSHOT_IMPORT_LABEL, so that the batches committed on the way
+    can be told apart from the existing nodes until the import is swapped in.
+
+    Returns:
+        dict: Number of nodes and relationships created in DB.
+    """
+    counts = {"nodes": 0, "relationships": 0}
+    node_batches = {}
+    rel_batches = {}
+    for item in items:
+        if item["type"] == "node":
+            labels = tuple(item["labels"])
+            rows = node_batches.setdefault(labels, [])
+            rows.append({"id": item["id"], "props": item["props"]})
+            if len(rows) >= batch_size:
+                counts["nodes"] += _create_nodes(labels, node_batches.pop(labels))
+        elif item["type"] == "rel":
+            # Nodes are exported before the relationships,
+            # create the remaining nodes before the first relationship.
+            for labels, rows in node_batches.items():
+                counts["nodes"] += _create_nodes(labels, rows)
+            node_batches = {}
+            rows = rel_batches.setdefault(item["rel_type"], [])
+            rows.append({"start": item["start"], "end": item["end"], "props": item["props"]})
+            if len(rows) >= batch_size:
+                counts["relationships"] += _create_relationships(
+                    item["rel_type"], rel_batches.pop(item["rel_type"])
+                )
+    for labels, rows in node_batches.items():
+        counts["nodes"] += _create_nodes(labels, rows)
+    for rel_type, rows in rel_batches.items():
+        counts["relationships"] += _create_relationships(rel_type, rows)
+    return counts
+
+
+@write_transaction("topology_snapshot")
+def _swap_imported_nodes(clean: bool):
+    """
+    Makes the staged nodes the topology, in one transaction without checkpoints,
+    deleting the existing nodes first if clean.
+    """
+    if clean:
+        db.cypher_query(f"MATCH (n) WHERE NOT n:{SNAPSHOT_IMPORT_LABEL} DETACH DELETE n")
+    db.cypher_query(f"MATCH (n:{SNAPSHOT_IMPORT_LABEL}) REMOVE n:{SNAPSHOT_IMPORT_LABEL}, n.{_IMPORT_ID}")
+
+
+def _delete_imported_nodes(batch_size: int):
+    while True:
+        results, _ = db.cypher_query(
+            f"""
+            MATCH (n:{SNAPSHOT_IMPORT_LABEL}) WITH n LIMIT $batch
+            DETACH DELETE n
+            RETURN count(n)
+            """,
+            {"batch": batch_size},
+        )
+        if not results or not results[0][0]:
+            return
+
+
+@storage_operation
+def import_topology_snapshot(
+    path: str, compress: Optional[bool] = None, clean: bool = True
+) -> dict:
+    """
+    Loads a snapshot file created by export_topology_snapshot into the database.
+    The file is validated first, then streamed, nodes and relationships are created with one
+    UNWIND statement per batch of db_write_batch_size items of the same labels or relationship type.
+    The import is all-or-nothing: the created nodes are staged and swapped in with the deletion
+    of the existing nodes in one transaction, or deleted if the import fails,
+    e.g. if fewer nodes or relationships than validated were created.
+
+    Args:
+        path (str): Path of the snapshot file.
+        compress (bool, optional): Whether the file is gzipped.
+            Defaults to None, i.e. compressed if the path ends with ".gz".
+        clean (bool, optional): Whether the snapshot replaces all the nodes in the database.
+            Defaults to True.
+
+    Returns:
+        dict: Number of nodes and relationships imported.
+
+    Raises:
+        ValueError: If the file is not a snapshot of a supported version or is truncated.
+    """
+    batch_size = get_db_write_batch_size()
+    expected = validate_topology_snapshot(path, compress)
+    create_db_index(_IMPORT_INDEX, SNAPSHOT_IMPORT_LABEL, (_IMPORT_ID,))
+    try:
+        counts = _import_snapshot_items(read_topology_snapshot(path, compress), batch_size)
+        if counts != expected:
+            raise ValueError(f"Created {counts} of the {expected} in the snapshot.")
+        _swap_imported_nodes(clean)
+    except Exception:
+        _delete_imported_nodes(batch_size)
+        raise
+    finally:
+        drop_db_index(_IMPORT_INDEX)
+        invalidate_db_cache()
+        invalidate_sub_interface_prefix_index()
+    _logger.info(
+        "Imported %s nodes and %s relationships from snapshot %s.",
+        counts["nodes"],
+        counts["relationships"],
+        path,
+    )
+    return counts
@@ -0,0 +1,45 @@
+""" Bounded lanes between the gNMI subscription streams and the update handlers """
+
+import threading
+
+from .utils import (
+    get_telemetry_lane_policy,
+    get_telemetry_lane_queue_size,
+    get_telemetry_lane_workers,
+)
+from .worker_pool import ShardedWorkerPool, get_subscription_worker_pool
+
+_telemetry_lane = None
+_telemetry_lane_lock = threading.Lock()
+
+
+def get_telemetry_lane() -> ShardedWorkerPool:
+    """
+    Returns the lane of the telemetry samples pushed to the telemetry db, created on first use
+    with telemetry_lane_policy, telemetry_lane_workers and telemetry_lane_queue_size.
+    """
+    global _telemetry_lane
+    with _telemetry_lane_lock:
+        if _telemetry_lane is None:
+            _telemetry_lane = ShardedWorkerPool(
+                "telemetry_lane",
+                get_telemetry_lane_workers(),
+                get_telemetry_lane_queue_size(),
+                get_telemetry_lane_policy(),
+            )
+        return _telemetry_lane
+
+
+def get_lane_stats() -> dict:
+    """
+    Returns the metrics of the lanes of the subscription updates.
+    Config updates are handled by the subscription worker pool with the block policy,
+    telemetry samples by the telemetry lane with telemetry_lane_policy.
+
+    Returns:
+        dict: "config" -> metrics of the subscription worker pool, "telemetry" -> metrics of the telemetry lane.
+    """
+    return {
+        "config": get_subscription_worker_pool().get_stats(),
+        "telemetry": get_telemetry_lane().get_stats(),
+    }
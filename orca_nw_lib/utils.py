@@ -1,5 +1,7 @@
 """ Utils for ORCA Network Library """
 
+import json
+import multiprocessing
 import os
 import re
 import ipaddress
@@ -12,6 +14,7 @@ from influxdb_client import InfluxDBClient
 from . import constants as const
 
 _settings = {}
+_orca_config_file = None
 _influxdb_client = None
 _prometheus_url = ""
 
@@ -101,6 +104,246 @@ def get_device_grpc_port():
     )
 
 
+def get_storage_backend():
+    # Not read from orca_nw_lib.yml, the memory backend is meant for tests and benchmarks only.
+    return str(os.environ.get(const.storage_backend, "neo4j")).lower()
+
+
+def get_memory_snapshot_file():
+    return os.environ.get(const.memory_snapshot_file)
+
+
+def get_db_cache_enabled():
+    return str(
+        os.environ.get(const.db_cache_enabled, _settings.get(const.db_cache_enabled))
+    ).lower() in ["true", "1", "yes"]
+
+
+def get_db_cache_max_entries():
+    return int(
+        os.environ.get(
+            const.db_cache_max_entries, _settings.get(const.db_cache_max_entries, 10000)
+        )
+    )
+
+
+def get_db_read_page_size():
+    return int(
+        os.environ.get(
+            const.db_read_page_size, _settings.get(const.db_read_page_size, 500)
+        )
+    )
+
+
+def get_db_write_batch_size():
+    return int(
+        os.environ.get(
+            const.db_write_batch_size, _settings.get(const.db_write_batch_size, 5000)
+        )
+    )
+
+
+def get_db_write_behind_window():
+    return float(
+        os.environ.get(
+            const.db_write_behind_window, _settings.get(const.db_write_behind_window, 0.2)
+        )
+    )
+
+
+def get_db_write_behind_max_pending():
+    return int(
+        os.environ.get(
+            const.db_write_behind_max_pending,
+            _settings.get(const.db_write_behind_max_pending, 10000),
+        )
+    )
+
+
+def get_subscription_workers():
+    return int(
+        os.environ.get(
+            const.subscription_workers, _settings.get(const.subscription_workers, 8)
+        )
+    )
+
+
+def get_subscription_queue_size():
+    return int(
+        os.environ.get(
+            const.subscription_queue_size,
+            _settings.get(const.subscription_queue_size, 1000),
+        )
+    )
+
+
+def get_subscription_mode():
+    mode = str(
+        os.environ.get(
+            const.subscription_mode, _settings.get(const.subscription_mode, "thread")
+        )
+    ).lower()
+    ## The shard workers read their own streams.
+    if mode == "sharded" and is_subscription_shard_worker():
+        return get_subscription_shard_mode()
+    return mode
+
+
+def is_subscription_shard_worker():
+    return multiprocessing.current_process().name.startswith(
+        const.subscription_shard_process_name
+    )
+
+
+def get_subscription_shards():
+    return int(
+        os.environ.get(
+            const.subscription_shards, _settings.get(const.subscription_shards, 4)
+        )
+    )
+
+
+def get_subscription_shard_mode():
+    return str(
+        os.environ.get(
+            const.subscription_shard_mode,
+            _settings.get(const.subscription_shard_mode, "thread"),
+        )
+    ).lower()
+
+
+def get_subscription_shard_status_interval():
+    return float(
+        os.environ.get(
+            const.subscription_shard_status_interval,
+            _settings.get(const.subscription_shard_status_interval, 1),
+        )
+    )
+
+
+def get_subscription_event_loops():
+    return int(
+        os.environ.get(
+            const.subscription_event_loops,
+            _settings.get(const.subscription_event_loops, 1),
+        )
+    )
+
+
+def get_subscription_paths():
+    return str(
+        os.environ.get(
+            const.subscription_paths,
+            _settings.get(const.subscription_paths, "per_interface"),
+        )
+    ).lower()
+
+
+def get_telemetry_lane_policy():
+    return str(
+        os.environ.get(
+            const.telemetry_lane_policy,
+            _settings.get(const.telemetry_lane_policy, "keep_latest"),
+        )
+    ).lower()
+
+
+def get_telemetry_lane_workers():
+    return int(
+        os.environ.get(
+            const.telemetry_lane_workers,
+            _settings.get(const.telemetry_lane_workers, 2),
+        )
+    )
+
+
+def get_telemetry_lane_queue_size():
+    return int(
+        os.environ.get(
+            const.telemetry_lane_queue_size,
+            _settings.get(const.telemetry_lane_queue_size, 10000),
+        )
+    )
+
+
+def get_subscription_reconnect_backoff():
+    return float(
+        os.environ.get(
+            const.subscription_reconnect_backoff,
+            _settings.get(const.subscription_reconnect_backoff, 1),
+        )
+    )
+
+
+def get_subscription_reconnect_max_backoff():
+    return float(
+        os.environ.get(
+            const.subscription_reconnect_max_backoff,
+            _settings.get(const.subscription_reconnect_max_backoff, 60),
+        )
+    )
+
+
+def get_subscription_sync_timeout():
+    return float(
+        os.environ.get(
+            const.subscription_sync_timeout,
+            _settings.get(const.subscription_sync_timeout, 30),
+        )
+    )
+
+
+def get_subscription_resync_features():
+    return (
+        features.split(",")
+        if (features := os.environ.get(const.subscription_resync_features))
+        else _settings.get(
+            const.subscription_resync_features,
+            ["interface", "port_group", "stp_port", "device_info"],
+        )
+    )
+
+
+def is_telemetry_store_enabled():
+    return (
+        str(
+            os.environ.get(
+                const.telemetry_store, _settings.get(const.telemetry_store, False)
+            )
+        ).lower()
+        == "true"
+    )
+
+
+def get_telemetry_store_max_series():
+    return int(
+        os.environ.get(
+            const.telemetry_store_max_series,
+            _settings.get(const.telemetry_store_max_series, 200000),
+        )
+    )
+
+
+def get_subscription_profiles():
+    return (
+        json.loads(profiles)
+        if (profiles := os.environ.get(const.subscription_profiles))
+        else _settings.get(const.subscription_profiles) or {}
+    )
+
+
+def get_metrics_port():
+    return int(os.environ.get(const.metrics_port, _settings.get(const.metrics_port, 0)))
+
+
+def get_orphan_sweep_interval():
+    return float(
+        os.environ.get(
+            const.orphan_sweep_interval, _settings.get(const.orphan_sweep_interval, 0)
+        )
+    )
+
+
 def get_telemetry_db():
         """
         Reads the telemetry_db parameter from the configuration and environment variables.
@@ -153,14 +396,34 @@ def load_orca_config(orca_config_file: str = default_orca_nw_lib_config):
     Returns:
         dict: The parsed settings from the Orca configuration file.
     """
-    global _settings
+    global _settings, _orca_config_file
     with open(orca_config_file, "r") as stream:
         try:
             _settings = yaml.safe_load(stream)
+            _orca_config_file = orca_config_file
             print("Loaded ORCA config from {0}".format(orca_config_file))
         except yaml.YAMLError as exc:
             print(exc)
+    validate_orca_config()
     init_db_connection()
+    try:
+        if get_storage_backend() == "memory":
+            # Load the topology kept by the in-memory storage backend, if configured.
+            from .memory_db import init_memory_store
+            init_memory_store()
+            print("Using in-memory storage backend.")
+        elif not is_subscription_shard_worker():
+            # The coordinating process manages the DB, not the subscription shard workers.
+            # Install the indexes used by the DB lookups, if missing.
+            from .db_schema import install_db_schema
+            if created := install_db_schema():
+                print("Created DB indexes {0}".format(created))
+            # Periodically delete the nodes not owned by any device, if configured.
+            if interval := get_orphan_sweep_interval():
+                from .device_db import start_orphan_sweeper
+                start_orphan_sweeper(interval)
+    except Exception as e:
+        print(e)
     try:
         # Init influxdb
         if get_telemetry_db() == "influxdb":
@@ -174,6 +437,43 @@ def load_orca_config(orca_config_file: str = default_orca_nw_lib_config):
         print(e)
     return _settings
 
+
+def get_orca_config_file():
+    """
+    Returns the path of the Orca configuration file last loaded by load_orca_config,
+    or the default one if none was loaded yet.
+    """
+    return _orca_config_file or default_orca_nw_lib_config
+
+def validate_orca_config():
+    """
+    Checks that the configured features can be used together.
+
+    Raises:
+        ValueError: If the subscription_mode "sharded" is used with a feature keeping its state
+            in the process, as the shard workers write it in their own process:
+            the memory storage_backend, db_cache_enabled or telemetry_store.
+    """
+    mode = str(
+        os.environ.get(const.subscription_mode, _settings.get(const.subscription_mode, "thread"))
+    ).lower()
+    if mode == "sharded":
+        unsupported = [
+            name
+            for name, enabled in (
+                (f"{const.storage_backend}: memory", get_storage_backend() == "memory"),
+                (const.db_cache_enabled, get_db_cache_enabled()),
+                (const.telemetry_store, is_telemetry_store_enabled()),
+            )
+            if enabled
+        ]
+        if unsupported:
+            raise ValueError(
+                f"{const.subscription_mode} sharded can not be used with {', '.join(unsupported)}, "
+                "their state is kept per process and would not be shared with the shard workers."
+            )
+
+
 _logging_initialized: bool = False
 
 
@@ -292,3 +592,20 @@ def get_if_alias(if_alias):
 def get_number_of_breakouts_and_speed(breakout_mode: str):
     breakout_mode_split = breakout_mode.split("x")
     return int(breakout_mode_split[0]), breakout_mode_split[1]
+
+
+def natural_sort_key(name: str) -> tuple:
+    """
+    Returns the key sorting names by their numbers in numeric order,
+    e.g. Ethernet4 before Ethernet12 and 10.10.10.2 before 10.10.10.10.
+
+    Args:
+        name (str): The name to sort, e.g. an interface name, a VLAN name or an IP address.
+
+    Returns:
+        tuple: Alternating text and integer parts of the name.
+    """
+    return tuple(
+        int(part) if part.isdigit() else part.lower()
+        for part in re.split(r"(\d+)", name or "")
+    )
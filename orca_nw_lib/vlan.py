@@ -1,3 +1,5 @@
+from typing import Iterator, List, Optional, Tuple
+
 from orca_nw_lib.vlan_gnmi import get_vlan_details_from_device
 
 from .common import IFMode, VlanAutoState
@@ -8,6 +10,7 @@ from .vlan_db import (
     get_vlan_member_port_channels_from_db,
     get_vlan_obj_from_db,
     get_vlan_mem_ifcs_from_db,
+    get_vlans_page_from_db,
     insert_vlan_in_db,
 )
 from .vlan_gnmi import (
@@ -19,7 +22,7 @@ from .vlan_gnmi import (
     add_vlan_members_on_device,
     delete_vlan_members_on_device,
 )
-from .utils import get_logging
+from .utils import get_logging, natural_sort_key
 from .graph_db_models import Vlan
 
 _logger = get_logging().getLogger(__name__)
@@ -93,10 +96,14 @@ def _create_vlan_db_obj(device_ip: str, vlan_name: str = None):
 
 
 def _getJson(device_ip: str, v: Vlan):
+    return _get_vlan_json(
+        v, [mem.name for mem in get_vlan_mem_ifcs_from_db(device_ip, v.name) or []]
+    )
+
+
+def _get_vlan_json(v: Vlan, members: List[str]) -> dict:
     temp = v.__properties__
-    temp["members"] = [
-        mem.name for mem in get_vlan_mem_ifcs_from_db(device_ip, temp.get("name")) or []
-    ]
+    temp["members"] = members
     return temp
 
 
@@ -109,16 +116,56 @@ def get_vlan(device_ip, vlan_name: str = None):
         vlan_name (str, optional): The name of the VLAN. Defaults to None.
 
     Returns:
-        list: A list of JSON objects representing the VLAN information.
+        list: A list of JSON objects representing the VLAN information,
+        in natural order of the VLAN names, e.g. Vlan4 before Vlan12,
+        unlike get_vlans_page which pages in lexicographic order.
     """
-    vlans = get_vlan_obj_from_db(device_ip, vlan_name)
-    if vlans is None:
+    if vlan_name:
+        vlan = get_vlan_obj_from_db(device_ip, vlan_name)
+        return _getJson(device_ip, vlan) if vlan else None
+    if get_device_db_obj(device_ip) is None:
         return None
+    return sorted(iter_vlans(device_ip), key=lambda v: natural_sort_key(v.get("name")))
+
+
+def get_vlans_page(
+    device_ip: str, cursor: Optional[str] = None, limit: Optional[int] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    Get one page of the VLANs of a device, ordered by name.
+    Every page is fetched with a single query, including the VLAN members.
+
+    Parameters:
+        device_ip (str): The IP address of the device.
+        cursor (str, optional): Cursor returned with the previous page. Defaults to None, i.e. first page.
+        limit (int, optional): Max number of VLANs in the page. Defaults to db_read_page_size.
 
-    if isinstance(vlans, list):
-        return [_getJson(device_ip, v) for v in vlans]
+    Returns:
+        Tuple[List[dict], Optional[str]]: JSON objects of the VLANs, same as returned by get_vlan,
+        and the cursor of the next page or None if it is the last page.
+    """
+    page, next_cursor = get_vlans_page_from_db(device_ip, cursor, limit)
+    return [_get_vlan_json(v, members) for v, members in page], next_cursor
+
+
+def iter_vlans(device_ip: str, page_size: Optional[int] = None) -> Iterator[dict]:
+    """
+    Yields the VLANs of a device, fetched page by page,
+    so that memory usage is bounded by the page size.
 
-    return _getJson(device_ip, vlans)
+    Parameters:
+        device_ip (str): The IP address of the device.
+        page_size (int, optional): Number of VLANs fetched per query. Defaults to db_read_page_size.
+
+    Yields:
+        dict: JSON object of the VLAN, same as returned by get_vlan.
+    """
+    cursor = None
+    while True:
+        page, cursor = get_vlans_page(device_ip, cursor, page_size)
+        yield from page
+        if not cursor:
+            return
 
 
 def del_vlan(device_ip, vlan_name: str):
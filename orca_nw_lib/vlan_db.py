@@ -1,11 +1,19 @@
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
-from orca_nw_lib.port_chnl_db import get_port_chnl_of_device_from_db
+from neomodel import db
+
+from .db_cache import cached_db_read, invalidates_db_cache
 from .device_db import get_device_db_obj
+from .db_transaction import write_transaction
 from .graph_db_models import Device, Vlan
-from .interface_db import get_interface_of_device_from_db
+from .storage_backend import storage_operation
+from .utils import get_db_read_page_size, get_logging
+
+_logger = get_logging().getLogger(__name__)
 
 
+@storage_operation
+@invalidates_db_cache
 def del_vlan_from_db(device_ip, vlan_name: str = None):
     """
     Deletes a VLAN from the database.
@@ -23,6 +31,8 @@ def del_vlan_from_db(device_ip, vlan_name: str = None):
         vlan.delete()
 
 
+@storage_operation
+@cached_db_read
 def get_vlan_obj_from_db(device_ip, vlan_name: str = None):
     """
     Get the VLAN object from the database.
@@ -42,6 +52,8 @@ def get_vlan_obj_from_db(device_ip, vlan_name: str = None):
     )
 
 
+@storage_operation
+@cached_db_read
 def get_vlan_mem_ifcs_from_db(device_ip: str, vlan_name: str) -> Optional[List[str]]:
     """
     Retrieves the member interfaces of a specific VLAN from the device database.
@@ -63,6 +75,8 @@ def get_vlan_mem_ifcs_from_db(device_ip: str, vlan_name: str) -> Optional[List[s
     )
 
 
+@storage_operation
+@cached_db_read
 def get_vlan_member_port_channels_from_db(device_ip: str, vlan_name: str) -> Optional[List[str]]:
     """
     Retrieves the member port channels of a specific VLAN from the device database.
@@ -105,6 +119,151 @@ def copy_vlan_obj_prop(target_vlan_obj: Vlan, source_vlan_obj: Vlan):
     target_vlan_obj.description = source_vlan_obj.description
 
 
+def _get_vlan_member_rel_type(if_name: str) -> str:
+    """
+    Returns the relationship type used to connect a VLAN to its member.
+
+    Args:
+        if_name (str): The name of the member interface or port channel.
+
+    Returns:
+        str: MEMBER_IF for ethernet interfaces, MEMBER_PORT_CHANNEL otherwise.
+    """
+    return "MEMBER_IF" if "ethernet" in if_name.lower() else "MEMBER_PORT_CHANNEL"
+
+
+@storage_operation
+def get_vlan_members_rel_from_db(device_ip: str) -> dict:
+    """
+    Retrieves all VLAN membership relationships of a device in a single query.
+
+    Args:
+        device_ip (str): The IP address of the device.
+
+    Returns:
+        dict: A dictionary mapping (vlan_name, rel_type, if_name) to the tagging mode
+        stored on the relationship. Port channels are keyed by lag_name, their name being the protocol.
+    """
+    results, _ = db.cypher_query(
+        """
+        MATCH (:Device {mgt_ip: $device_ip})-[:HAS]->(v:Vlan)-[r:MEMBER_IF|MEMBER_PORT_CHANNEL]->(m)
+        RETURN v.name, type(r),
+               CASE type(r) WHEN 'MEMBER_PORT_CHANNEL' THEN m.lag_name ELSE m.name END,
+               r.tagging_mode
+        """,
+        {"device_ip": device_ip},
+    )
+    return {
+        (vlan_name, rel_type, if_name): tagging_mode
+        for vlan_name, rel_type, if_name, tagging_mode in results
+    }
+
+
+def get_vlan_members_rel(vlan_name_vs_mem: dict) -> dict:
+    """
+    Converts the VLAN members received from device to the format of get_vlan_members_rel_from_db.
+
+    Args:
+        vlan_name_vs_mem (dict): A dictionary mapping VLAN names to a list of members,
+        every member being a dict with keys ifname and tagging_mode.
+
+    Returns:
+        dict: A dictionary mapping (vlan_name, rel_type, if_name) to the tagging mode.
+    """
+    return {
+        (vlan_name, _get_vlan_member_rel_type(mem.get("ifname")), mem.get("ifname")): mem.get("tagging_mode")
+        for vlan_name, members in vlan_name_vs_mem.items()
+        for mem in members or []
+        if mem.get("ifname")
+    }
+
+
+def diff_vlan_members(existing: dict, desired: dict):
+    """
+    Computes the VLAN membership changes required to move from existing to desired state.
+
+    Args:
+        existing (dict): (vlan_name, rel_type, if_name) -> tagging_mode present in DB.
+        desired (dict): (vlan_name, rel_type, if_name) -> tagging_mode present on device.
+
+    Returns:
+        Tuple[list, list]: Membership keys to be removed and
+        (key, tagging_mode) pairs to be created or updated.
+    """
+    to_remove = [key for key in existing if key not in desired]
+    to_upsert = [
+        (key, tagging_mode)
+        for key, tagging_mode in desired.items()
+        if key not in existing or existing[key] != tagging_mode
+    ]
+    return to_remove, to_upsert
+
+
+@storage_operation
+@invalidates_db_cache
+def sync_vlan_members_in_db(device_ip: str, vlan_name_vs_mem: dict):
+    """
+    Synchronizes VLAN memberships of a device in the database with the given state.
+
+    The difference between the memberships in DB and on the device is computed in memory,
+    and applied using one UNWIND statement per relationship type and operation,
+    instead of disconnecting and reconnecting every member individually.
+
+    Args:
+        device_ip (str): The IP address of the device.
+        vlan_name_vs_mem (dict): A dictionary mapping VLAN names to a list of members,
+        every member being a dict with keys ifname and tagging_mode.
+
+    Returns:
+        None
+    """
+    to_remove, to_upsert = diff_vlan_members(
+        get_vlan_members_rel_from_db(device_ip), get_vlan_members_rel(vlan_name_vs_mem)
+    )
+    _logger.debug(
+        "Syncing VLAN members of device %s, removing %s and upserting %s memberships.",
+        device_ip,
+        len(to_remove),
+        len(to_upsert),
+    )
+    for rel_type, label, key_prop in (
+        ("MEMBER_IF", "Interface", "name"),
+        ("MEMBER_PORT_CHANNEL", "PortChannel", "lag_name"),
+    ):
+        if rows := [
+            {"vlan": vlan_name, "ifname": if_name}
+            for vlan_name, r_type, if_name in to_remove
+            if r_type == rel_type
+        ]:
+            db.cypher_query(
+                f"""
+                UNWIND $rows AS row
+                MATCH (:Device {{mgt_ip: $device_ip}})-[:HAS]->(v:Vlan {{name: row.vlan}})
+                      -[r:{rel_type}]->(m:{label} {{{key_prop}: row.ifname}})
+                DELETE r
+                """,
+                {"device_ip": device_ip, "rows": rows},
+            )
+        if rows := [
+            {"vlan": vlan_name, "ifname": if_name, "tagging_mode": tagging_mode}
+            for (vlan_name, r_type, if_name), tagging_mode in to_upsert
+            if r_type == rel_type
+        ]:
+            db.cypher_query(
+                f"""
+                UNWIND $rows AS row
+                MATCH (d:Device {{mgt_ip: $device_ip}})-[:HAS]->(v:Vlan {{name: row.vlan}})
+                MATCH (d)-[:HAS]->(m:{label} {{{key_prop}: row.ifname}})
+                MERGE (v)-[r:{rel_type}]->(m)
+                SET r.tagging_mode = row.tagging_mode
+                """,
+                {"device_ip": device_ip, "rows": rows},
+            )
+
+
+@storage_operation
+@invalidates_db_cache
+@write_transaction("vlan")
 def insert_vlan_in_db(device: Device, vlans_obj_vs_mem):
     """
     Inserts VLAN information into the database.
@@ -117,7 +276,7 @@ def insert_vlan_in_db(device: Device, vlans_obj_vs_mem):
     Returns:
         None
     """
-    for vlan, members in vlans_obj_vs_mem.items() or []:
+    for vlan in vlans_obj_vs_mem or {}:
         if v := get_vlan_obj_from_db(device.mgt_ip, vlan.name):
             # update existing vlan if already exists.
             copy_vlan_obj_prop(v, vlan)
@@ -128,31 +287,13 @@ def insert_vlan_in_db(device: Device, vlans_obj_vs_mem):
             vlan.save()
             device.vlans.connect(vlan)
 
-        saved_vlan = get_vlan_obj_from_db(device.mgt_ip, vlan.name)
-        
-        ## For updating vlan members in db, lets first disconnect any existing members and recreate membership in DB.
-        ## It will cater case when vlan has members are in db but not on device.
-        ## Also the case when members has been changed/updated.
-        saved_vlan.memberInterfaces.disconnect_all()
-        saved_vlan.memberPortChannel.disconnect_all()
-        for mem in members or []:
-            if "ethernet" in mem.get("ifname").lower():
-                intf = get_interface_of_device_from_db(
-                            device.mgt_ip, mem.get("ifname")
-                        )
-                if saved_vlan and intf:
-                    mem_rel = saved_vlan.memberInterfaces.connect(intf)
-                    mem_rel.tagging_mode = mem.get("tagging_mode")
-                    mem_rel.save()
-            else:
-                ## Its a port channel.
-                intf = get_port_chnl_of_device_from_db(
-                            device.mgt_ip, mem.get("ifname")
-                        )
-                if saved_vlan and intf:
-                    mem_rel = saved_vlan.memberPortChannel.connect(intf)
-                    mem_rel.tagging_mode = mem.get("tagging_mode")
-                    mem_rel.save()
+    ## Sync vlan members in one go, It caters the case when vlan members are in db but not on device,
+    ## Also the case when members has been changed/updated.
+    sync_vlan_members_in_db(
+        device.mgt_ip,
+        {vlan.name: members for vlan, members in (vlans_obj_vs_mem or {}).items()},
+    )
+
     ## Handle the case when some or all vlans has been deleted from device but remained in DB
     ## Remove all vlans which are in DB but not on device.
     for vlan_in_db in get_vlan_obj_from_db(device.mgt_ip) or []:
@@ -160,6 +301,8 @@ def insert_vlan_in_db(device: Device, vlans_obj_vs_mem):
             del_vlan_from_db(device.mgt_ip, vlan_in_db.name)
 
 
+@storage_operation
+@cached_db_read
 def get_vlan_obj_from_db_using_id(device_ip, vlan_id: int = None):
     """
     Get the VLAN object from the database.
@@ -176,4 +319,36 @@ def get_vlan_obj_from_db_using_id(device_ip, vlan_id: int = None):
         (device.vlans.all()
         if not vlan_id
         else device.vlans.get_or_none(vlanid=vlan_id)) if device else None
-    )
\ No newline at end of file
+    )
+
+@storage_operation
+def get_vlans_page_from_db(
+    device_ip: str, after: Optional[str] = None, limit: Optional[int] = None
+) -> Tuple[List[Tuple[Vlan, List[str]]], Optional[str]]:
+    """
+    Retrieves one page of the VLANs of a device, ordered by name,
+    together with the names of their member interfaces in a single query.
+
+    Args:
+        device_ip (str): The IP address of the device.
+        after (str, optional): Name of the last VLAN of the previous page. Defaults to None.
+        limit (int, optional): Max number of VLANs in the page. Defaults to db_read_page_size.
+
+    Returns:
+        Tuple[List[Tuple[Vlan, List[str]]], Optional[str]]: The VLANs with their member
+        interface names, and the cursor of the next page or None if it is the last page.
+    """
+    limit = limit or get_db_read_page_size()
+    results, _ = db.cypher_query(
+        """
+        MATCH (:Device {mgt_ip: $device_ip})-[:HAS]->(v:Vlan)
+        WHERE $after IS NULL OR v.name > $after
+        WITH v ORDER BY v.name LIMIT $limit
+        OPTIONAL MATCH (v)-[:MEMBER_IF]->(m:Interface)
+        RETURN v, collect(m.name)
+        ORDER BY v.name
+        """,
+        {"device_ip": device_ip, "after": after, "limit": limit},
+    )
+    page = [(Vlan.inflate(v), members) for v, members in results]
+    return page, page[-1][0].name if len(page) == limit else None
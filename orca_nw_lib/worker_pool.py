@@ -0,0 +1,197 @@
+""" Fixed size worker pool executing the tasks of the same key in order """
+
+import threading
+import zlib
+from collections import OrderedDict
+from itertools import count
+from typing import Callable, Hashable
+
+from .utils import get_logging, get_subscription_queue_size, get_subscription_workers
+
+_logger = get_logging().getLogger(__name__)
+
+## Policies of a pool when the queue of a shard is full.
+## Wait until the queue has room, nothing is lost but the submitter is slowed down.
+POLICY_BLOCK = "block"
+## Drop the oldest queued task.
+POLICY_DROP_OLDEST = "drop_oldest"
+## Keep only the latest task per key, a task replaces the queued task of the same key.
+## When the queue is full of other keys, the oldest queued task is dropped.
+POLICY_KEEP_LATEST = "keep_latest"
+
+POLICIES = (POLICY_BLOCK, POLICY_DROP_OLDEST, POLICY_KEEP_LATEST)
+
+
+class _Shard:
+    """
+    Bounded queue consumed by one worker thread.
+    Queued tasks are kept in insertion order in an OrderedDict, keyed by the task key
+    for keep_latest and by a sequence number otherwise.
+    """
+
+    def __init__(self, pool: "ShardedWorkerPool", queue_size: int):
+        self.pool = pool
+        self.queue_size = queue_size
+        self.tasks = OrderedDict()
+        self.cond = threading.Condition()
+        self.stopped = False
+        self.busy = False
+
+    def put(self, key: Hashable, task: tuple):
+        pool = self.pool
+        with self.cond:
+            if pool.policy == POLICY_KEEP_LATEST:
+                if key in self.tasks:
+                    # Replaced in place, the key keeps its position in the queue.
+                    self.tasks[key] = task
+                    pool._count("coalesced")
+                    return
+            else:
+                key = next(pool._seq)
+            if len(self.tasks) >= self.queue_size:
+                if pool.policy == POLICY_BLOCK:
+                    pool._count("blocked")
+                    self.cond.wait_for(lambda: len(self.tasks) < self.queue_size)
+                else:
+                    self.tasks.popitem(last=False)
+                    pool._count("dropped")
+            self.tasks[key] = task
+            self.cond.notify_all()
+
+    def work(self):
+        while True:
+            with self.cond:
+                self.cond.wait_for(lambda: self.tasks or self.stopped)
+                if not self.tasks:
+                    return
+                _, (func, args, kwargs) = self.tasks.popitem(last=False)
+                self.busy = True
+                self.cond.notify_all()
+            try:
+                func(*args, **kwargs)
+                self.pool._count("completed")
+            except Exception as e:
+                _logger.error("Task %s of pool %s failed: %s", func.__name__, self.pool.name, e)
+                self.pool._count("failed")
+            finally:
+                with self.cond:
+                    self.busy = False
+                    self.cond.notify_all()
+
+    def join(self):
+        with self.cond:
+            self.cond.wait_for(lambda: not self.tasks and not self.busy)
+
+    def stop(self):
+        with self.cond:
+            self.stopped = True
+            self.cond.notify_all()
+
+
+class ShardedWorkerPool:
+    """
+    Pool of worker threads, every worker consumes its own bounded queue (shard).
+    Tasks are assigned to a shard by hashing their key, so tasks of different keys
+    run in parallel while tasks of the same key run one after the other in submission order.
+    What happens when the queue of a shard is full is decided by the policy of the pool,
+    one of POLICIES, by default submit blocks until the worker catches up.
+    """
+
+    def __init__(self, name: str, workers: int, queue_size: int, policy: str = POLICY_BLOCK):
+        if policy not in POLICIES:
+            raise ValueError(f"Invalid policy {policy} of pool {name}, expected one of {POLICIES}.")
+        self.name = name
+        self.policy = policy
+        self._seq = count()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "blocked": 0,
+            "dropped": 0,
+            "coalesced": 0,
+        }
+        self._shards = [_Shard(self, queue_size) for _ in range(workers)]
+        self._threads = [
+            threading.Thread(target=shard.work, name=f"{name}_{i}", daemon=True)
+            for i, shard in enumerate(self._shards)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _count(self, stat: str):
+        with self._stats_lock:
+            self._stats[stat] += 1
+
+    def get_shard(self, key: Hashable) -> int:
+        """
+        Returns the index of the shard executing the tasks of the key.
+        crc32 is used instead of hash() so that the shard of a key is stable across processes.
+        """
+        return zlib.crc32(repr(key).encode()) % len(self._shards)
+
+    def submit(self, key: Hashable, func: Callable, *args, **kwargs):
+        """
+        Queues func(*args, **kwargs) on the shard of the key, according to the policy of the pool.
+
+        Args:
+            key (Hashable): Key of the task, e.g. (device_ip, if_name),
+                for keep_latest the task replaces the queued task of the same key.
+            func (Callable): Function to be executed.
+        """
+        self._count("submitted")
+        self._shards[self.get_shard(key)].put(key, (func, args, kwargs))
+
+    def join(self):
+        """
+        Waits until all the queued tasks are executed.
+        """
+        for shard in self._shards:
+            shard.join()
+
+    def shutdown(self):
+        """
+        Stops the workers once the already queued tasks are executed.
+        """
+        for shard in self._shards:
+            shard.stop()
+        for thread in self._threads:
+            thread.join()
+
+    def get_stats(self) -> dict:
+        """
+        Returns the pool metrics.
+
+        Returns:
+            dict: policy, workers, submitted, completed, failed, blocked (submits which waited for room),
+            dropped and coalesced (replaced by a later task of the same key) task counts,
+            and queue_depths, the number of tasks queued per shard.
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["policy"] = self.policy
+        stats["workers"] = len(self._shards)
+        stats["queue_depths"] = [len(shard.tasks) for shard in self._shards]
+        return stats
+
+
+_subscription_pool = None
+_subscription_pool_lock = threading.Lock()
+
+
+def get_subscription_worker_pool() -> ShardedWorkerPool:
+    """
+    Returns the worker pool handling the gNMI subscription updates,
+    created on first use with subscription_workers workers of subscription_queue_size.
+    Config updates are never dropped, submit blocks while the shard is full.
+    """
+    global _subscription_pool
+    with _subscription_pool_lock:
+        if _subscription_pool is None:
+            _subscription_pool = ShardedWorkerPool(
+                "subscription_worker",
+                get_subscription_workers(),
+                get_subscription_queue_size(),
+            )
+        return _subscription_pool
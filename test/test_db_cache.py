@@ -0,0 +1,50 @@
+import unittest
+from unittest import mock
+
+from orca_nw_lib import db_cache, storage_backend
+from orca_nw_lib.graph_db_models import Interface
+
+
+class TestCachedDbRead(unittest.TestCase):
+    def setUp(self):
+        patches = [
+            mock.patch.object(db_cache, "get_db_cache_enabled", return_value=True),
+            mock.patch.object(
+                storage_backend,
+                "get_storage_backend",
+                return_value=storage_backend.NEO4J_BACKEND,
+            ),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        db_cache.invalidate_db_cache()
+        self.reads = 0
+
+        @db_cache.cached_db_read
+        def get_interface_of_device_from_db(device_ip: str, intfc_name: str):
+            self.reads += 1
+            return [Interface(name=intfc_name, mtu=9100)]
+
+        self.get_interface = get_interface_of_device_from_db
+
+    def test_hits_return_copies(self):
+        first = self.get_interface("10.10.1.1", "Ethernet0")
+        first[0].mtu = 1500
+        second = self.get_interface("10.10.1.1", "Ethernet0")
+        third = self.get_interface("10.10.1.1", "Ethernet0")
+        self.assertEqual(self.reads, 1)
+        self.assertEqual(second[0].mtu, 9100)
+        self.assertIsNot(second[0], third[0])
+        second[0].mtu = 1500
+        self.assertEqual(self.get_interface("10.10.1.1", "Ethernet0")[0].mtu, 9100)
+
+    def test_invalidation(self):
+        self.get_interface("10.10.1.1", "Ethernet0")
+        db_cache.invalidate_db_cache("10.10.1.1")
+        self.get_interface("10.10.1.1", "Ethernet0")
+        self.assertEqual(self.reads, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from orca_nw_lib import db_locks
+from orca_nw_lib.db_locks import ReadWriteLock, device_read_locked, get_device_lock
+
+
+class TestReadWriteLock(unittest.TestCase):
+    def test_concurrent_readers(self):
+        lock = ReadWriteLock("test")
+        barrier = threading.Barrier(3, timeout=5)
+
+        def reader():
+            with lock.read_locked():
+                # All readers have to be inside the lock at the same time to pass the barrier.
+                barrier.wait()
+
+        threads = [threading.Thread(target=reader) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertFalse(barrier.broken)
+        self.assertEqual(lock.get_stats()["read"]["acquired"], 3)
+        self.assertEqual(lock.get_stats()["read"]["contended"], 0)
+
+    def test_writer_is_exclusive(self):
+        lock = ReadWriteLock("test")
+        events = []
+
+        def reader():
+            with lock.read_locked():
+                events.append("read")
+
+        with lock.write_locked():
+            t = threading.Thread(target=reader)
+            t.start()
+            time.sleep(0.1)
+            events.append("write")
+        t.join()
+        self.assertEqual(events, ["write", "read"])
+        self.assertEqual(lock.get_stats()["read"]["contended"], 1)
+        self.assertGreater(lock.get_stats()["read"]["wait_time"], 0)
+
+    def test_reentrant(self):
+        lock = ReadWriteLock("test")
+        with lock.write_locked():
+            with lock.read_locked():
+                with lock.write_locked():
+                    pass
+        with lock.read_locked():
+            with lock.read_locked():
+                self.assertRaises(RuntimeError, lock.acquire_write)
+        with lock.write_locked():
+            pass
+
+    def test_no_read_lock_in_write_transaction(self):
+        device_ip = "10.10.10.20"
+        writing = threading.Event()
+        done = threading.Event()
+
+        def writer():
+            with get_device_lock(device_ip).write_locked():
+                writing.set()
+                done.wait(5)
+
+        t = threading.Thread(target=writer)
+        t.start()
+        writing.wait(5)
+        try:
+            with mock.patch.object(db_locks, "in_write_transaction", return_value=True):
+                # Does not wait for the writer, which may be waiting on the transaction.
+                with device_read_locked(device_ip):
+                    pass
+        finally:
+            done.set()
+            t.join()
+        self.assertEqual(get_device_lock(device_ip).get_stats()["read"]["acquired"], 0)
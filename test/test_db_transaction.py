@@ -0,0 +1,57 @@
+import unittest
+from unittest import mock
+
+from orca_nw_lib import db_transaction
+from orca_nw_lib.db_transaction import (
+    checkpoint,
+    get_transaction_stats,
+    write_transaction,
+)
+
+
+class TestWriteTransaction(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(db_transaction, "db")
+        self.db = patcher.start()
+        self.db._active_transaction = None
+        self.addCleanup(patcher.stop)
+
+    def test_commit_and_batches(self):
+        @write_transaction("test_commit")
+        def insert(items):
+            for _ in range(items):
+                checkpoint()
+
+        with mock.patch.object(db_transaction, "get_db_write_batch_size", return_value=2):
+            insert(5)
+        self.assertEqual(self.db.begin.call_count, 3)
+        self.assertEqual(self.db.commit.call_count, 3)
+        stats = get_transaction_stats("test_commit")
+        self.assertEqual(stats["transactions"], 1)
+        self.assertEqual(stats["commits"], 3)
+        self.assertEqual(stats["operations"], 5)
+
+    def test_rollback(self):
+        @write_transaction("test_rollback")
+        def insert():
+            raise ValueError()
+
+        self.db._active_transaction = None
+        self.db.begin.side_effect = lambda: setattr(self.db, "_active_transaction", 1)
+        self.assertRaises(ValueError, insert)
+        self.db.rollback.assert_called_once()
+        self.db.commit.assert_not_called()
+        self.assertEqual(get_transaction_stats("test_rollback")["rollbacks"], 1)
+
+    def test_nested_joins_outer(self):
+        @write_transaction("test_inner")
+        def inner():
+            pass
+
+        @write_transaction("test_outer")
+        def outer():
+            inner()
+
+        outer()
+        self.db.begin.assert_called_once()
+        self.assertEqual(get_transaction_stats("test_inner"), {})
@@ -0,0 +1,87 @@
+import unittest
+from unittest import mock
+
+from orca_nw_lib import db_write_behind
+from orca_nw_lib.db_write_behind import (
+    flush_write_behind,
+    get_write_behind_stats,
+    stop_write_behind,
+    submit_interface_config,
+)
+
+
+class TestWriteBehind(unittest.TestCase):
+    def setUp(self):
+        for name, value in (
+            ("get_db_write_behind_window", 60),
+            ("get_db_write_behind_max_pending", 3),
+        ):
+            patcher = mock.patch.object(db_write_behind, name, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(db_write_behind, "set_interfaces_config_in_db_bulk")
+        self.bulk = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(stop_write_behind)
+        patcher = mock.patch.dict(
+            db_write_behind._write_behind_stats,
+            {name: 0 for name in db_write_behind._write_behind_stats},
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for name, value in (("_failed_flushes", 0), ("_retry_at", 0.0)):
+            patcher = mock.patch.object(db_write_behind, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_coalesce(self):
+        submit_interface_config("10.10.10.10", "Ethernet0", enable=True, mtu=9100)
+        submit_interface_config("10.10.10.10", "Ethernet0", enable=False, mtu=None)
+        submit_interface_config("10.10.10.10", "Ethernet4", description="uplink")
+        self.assertEqual(flush_write_behind(), 2)
+        self.bulk.assert_called_once_with(
+            {
+                ("10.10.10.10", "Ethernet0"): {"enable": False, "mtu": 9100},
+                ("10.10.10.10", "Ethernet4"): {"description": "uplink"},
+            }
+        )
+        stats = get_write_behind_stats()
+        self.assertEqual(stats["coalesced"], 1)
+        self.assertEqual(stats["pending"], 0)
+        self.assertEqual(stats["coalesce_ratio"], 1.5)
+
+    def test_flush_when_full(self):
+        for i in range(3):
+            submit_interface_config("10.10.10.10", f"Ethernet{i}", mtu=9100)
+        self.bulk.assert_called_once()
+        self.assertEqual(len(self.bulk.call_args.args[0]), 3)
+
+    def test_failed_flush_requeued(self):
+        submit_interface_config("10.10.10.10", "Ethernet0", enable=True, mtu=9100)
+        self.bulk.side_effect = RuntimeError("DB unavailable")
+        self.assertEqual(flush_write_behind(), 0)
+        submit_interface_config("10.10.10.10", "Ethernet0", mtu=1500)
+        # Retried only once the retry delay is over.
+        self.assertEqual(flush_write_behind(), 0)
+        self.bulk.assert_called_once()
+        self.bulk.side_effect = None
+        self.assertEqual(flush_write_behind(force=True), 1)
+        self.bulk.assert_called_with({("10.10.10.10", "Ethernet0"): {"enable": True, "mtu": 1500}})
+        stats = get_write_behind_stats()
+        self.assertEqual(stats["failed_flushes"], 1)
+        self.assertEqual(stats["requeued"], 1)
+        self.assertEqual(stats["flushed"], 2)
+        self.assertEqual(stats["pending"], 0)
+
+    def test_retry_delay_doubles(self):
+        self.bulk.side_effect = RuntimeError("DB unavailable")
+        delays = []
+        patcher = mock.patch.object(db_write_behind, "get_db_write_behind_window", return_value=10)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        for _ in range(3):
+            submit_interface_config("10.10.10.10", "Ethernet0", mtu=9100)
+            start = db_write_behind.time.monotonic()
+            flush_write_behind(force=True)
+            delays.append(round(db_write_behind._retry_at - start))
+        self.assertEqual(delays, [10, 20, 30])
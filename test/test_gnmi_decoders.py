@@ -0,0 +1,70 @@
+import unittest
+
+from orca_nw_lib.common import PortFec, Speed
+from orca_nw_lib.gnmi_decoders import (
+    CRM_STATS_DECODERS,
+    INTERFACE_CONFIG_DECODERS,
+    decode_dom_updates,
+    decode_updates,
+    get_empty_fields,
+    get_prometheus_labels,
+)
+from orca_nw_lib.gnmi_pb2 import Path, PathElem, TypedValue, Update
+
+
+def _update(path: str, **val) -> Update:
+    elems = []
+    for name in path.split("/"):
+        name, _, key = name.partition("=")
+        elems.append(PathElem(name=name, key={"severity": key} if key else {}))
+    return Update(path=Path(elem=elems), val=TypedValue(**val))
+
+
+class TestGnmiDecoders(unittest.TestCase):
+    def test_interface_config(self):
+        config = decode_updates(
+            INTERFACE_CONFIG_DECODERS,
+            [
+                _update("config/mtu", uint_val=9100),
+                _update("config/enabled", bool_val=True),
+                _update("openconfig-if-ethernet:ethernet/config/port-speed", string_val="SPEED_100GB"),
+                _update("openconfig-if-ethernet:ethernet/config/port-fec", string_val="FEC_RS"),
+                _update("config/unknown", string_val="ignored"),
+            ],
+            get_empty_fields(INTERFACE_CONFIG_DECODERS),
+        )
+        self.assertEqual(config["mtu"], 9100)
+        self.assertIs(config["enable"], True)
+        self.assertEqual(config["speed"], Speed.SPEED_100GB)
+        self.assertEqual(config["fec"], PortFec.FEC_RS)
+        self.assertIsNone(config["description"])
+        self.assertEqual(len(config), len(INTERFACE_CONFIG_DECODERS))
+
+    def test_crm_prometheus_labels(self):
+        fields = decode_updates(
+            CRM_STATS_DECODERS, [_update("ipv4-routes-used", uint_val=12)]
+        )
+        self.assertEqual(fields, {"ipv4-routes-used": 12})
+        self.assertEqual(get_prometheus_labels(fields), {"ipv4_routes_used": "12"})
+
+    def test_dom(self):
+        fields = decode_dom_updates(
+            [
+                _update("state/vendor", string_val="ACME"),
+                _update("state/qualified", bool_val=True),
+                _update("state/temperature/instant", float_val=31.5),
+                _update("state/thresholds/threshold=CRITICAL/state/module-temperature-upper", float_val=80),
+                _update("state/thresholds/threshold=WARNING/state/input-power-lower", float_val=-10),
+                _update("state/thresholds/threshold=OTHER/state/input-power-upper", float_val=1),
+            ]
+        )
+        self.assertEqual(
+            fields,
+            {
+                "vendor": "ACME",
+                "qualified": "True",
+                "temperature": 31.5,
+                "threshold_critical_module_temperature_upper": 80,
+                "threshold_warning_input_power_lower": -10,
+            },
+        )
@@ -0,0 +1,81 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from orca_nw_lib import gnmi_multiplexer
+from orca_nw_lib.gnmi_multiplexer import (
+    STREAM_CANCELLED,
+    STREAM_CLOSED,
+    SubscriptionMultiplexer,
+)
+from orca_nw_lib.gnmi_pb2 import Notification, SubscribeResponse
+
+
+class _Call:
+    def __init__(self, responses, block=False):
+        self.responses = responses
+        self.block = block
+
+    async def __aiter__(self):
+        for resp in self.responses:
+            yield resp
+        if self.block:
+            await asyncio.Event().wait()
+
+
+class _Channel:
+    async def close(self):
+        pass
+
+
+class TestSubscriptionMultiplexer(unittest.TestCase):
+    device_ip = "10.10.10.10"
+
+    def setUp(self):
+        self.call = None
+        self.dispatched = []
+        stub = mock.Mock()
+        stub.return_value.Subscribe.side_effect = lambda request: self.call
+        for name, value in (
+            ("is_device_ready", mock.Mock(return_value=True)),
+            ("get_grpc_channel_args", mock.Mock(return_value=("target", None, []))),
+            ("get_subscription_handlers", mock.Mock(return_value={})),
+            ("dispatch_update", self._dispatch),
+            ("gNMIStub", stub),
+        ):
+            patcher = mock.patch.object(gnmi_multiplexer, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(
+            gnmi_multiplexer.grpc.aio, "secure_channel", return_value=_Channel()
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.multiplexer = SubscriptionMultiplexer(2)
+
+    def _dispatch(self, handlers, device_ip, resp):
+        self.dispatched.append(resp.update.timestamp)
+
+    def test_updates_in_order(self):
+        updates = [
+            SubscribeResponse(update=Notification(timestamp=i)) for i in range(1, 51)
+        ]
+        self.call = _Call(updates + [SubscribeResponse(sync_response=True)])
+        self.multiplexer.subscribe(self.device_ip, [])
+        stream = self.multiplexer._streams[self.device_ip]
+        self.assertTrue(stream.ended.wait(5))
+        self.assertEqual(self.dispatched, list(range(1, 51)))
+        state = self.multiplexer.get_stream_states(self.device_ip)
+        self.assertEqual(state["state"], STREAM_CLOSED)
+        self.assertEqual(state["updates"], 51)
+        self.assertFalse(self.multiplexer.is_subscribed(self.device_ip))
+
+    def test_cancel(self):
+        self.call = _Call([SubscribeResponse(sync_response=True)], block=True)
+        self.multiplexer.subscribe(self.device_ip, [])
+        stream = self.multiplexer._streams[self.device_ip]
+        self.assertTrue(self.multiplexer.is_subscribed(self.device_ip))
+        self.assertTrue(self.multiplexer.cancel(self.device_ip))
+        self.assertEqual(stream.state, STREAM_CANCELLED)
+        self.assertIsNone(self.multiplexer.get_stream_states(self.device_ip))
+        self.assertFalse(self.multiplexer.cancel(self.device_ip))
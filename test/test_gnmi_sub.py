@@ -0,0 +1,197 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+import grpc
+
+from orca_nw_lib import gnmi_sub, telemetry_store
+from orca_nw_lib.gnmi_pb2 import (
+    Notification,
+    Path,
+    PathElem,
+    SubscribeResponse,
+    Subscription,
+)
+from orca_nw_lib.gnmi_sub import dispatch_update, get_subscription_handlers
+
+
+def _update(*names) -> SubscribeResponse:
+    return SubscribeResponse(
+        update=Notification(prefix=Path(elem=[PathElem(name=name) for name in names]))
+    )
+
+
+class TestSubscriptionDispatch(unittest.TestCase):
+    def test_dispatch_table(self):
+        with mock.patch.object(gnmi_sub, "get_telemetry_db", return_value="influxdb"):
+            handlers = get_subscription_handlers()
+        interface_handlers = handlers["openconfig-interfaces:interfaces"]
+        self.assertEqual(
+            interface_handlers[0], gnmi_sub.submit_interface_config_update
+        )
+        self.assertEqual(
+            interface_handlers[1].__wrapped__,
+            gnmi_sub.handle_interface_counters_influxdb,
+        )
+        system_handlers = handlers["openconfig-system:system"]
+        self.assertEqual(system_handlers[0], gnmi_sub.handle_device_state)
+        self.assertEqual(
+            system_handlers[1].__wrapped__, gnmi_sub.handle_system_influxdb
+        )
+
+    def test_dispatch_update(self):
+        handler = mock.Mock(__name__="handler")
+        resp = _update("openconfig-port-group:port-groups", "port-group")
+        dispatch_update({"port-group": [handler], "other": [mock.Mock()]}, "10.10.10.10", resp)
+        handler.assert_called_once_with("10.10.10.10", resp)
+
+    def test_interface_config_update_key(self):
+        pool = mock.Mock()
+        with mock.patch.object(gnmi_sub, "get_subscription_worker_pool", return_value=pool):
+            for name in ("Ethernet0", "Ethernet4"):
+                resp = SubscribeResponse(
+                    update=Notification(
+                        prefix=Path(
+                            elem=[
+                                PathElem(name="openconfig-interfaces:interfaces"),
+                                PathElem(name="interface", key={"name": name}),
+                                PathElem(name="config"),
+                            ]
+                        )
+                    )
+                )
+                gnmi_sub.submit_interface_config_update("10.10.10.10", resp)
+        # Keyed per interface, so that the updates of different interfaces run in parallel.
+        self.assertEqual(
+            [call.args[0] for call in pool.submit.call_args_list],
+            [("10.10.10.10", "Ethernet0"), ("10.10.10.10", "Ethernet4")],
+        )
+
+
+class _RpcError(grpc.RpcError):
+    def __init__(self, code):
+        self._code = code
+
+    def code(self):
+        return self._code
+
+
+class TestWildcardPaths(unittest.TestCase):
+    device_ip = "10.10.10.10"
+
+    def setUp(self):
+        patcher = mock.patch.dict(gnmi_sub.wildcard_path_support, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(
+            gnmi_sub,
+            "get_all_interfaces_name_of_device_from_db",
+            return_value=["Ethernet0", "Ethernet4"],
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _interface_names(self, mode, probe=None):
+        with mock.patch.object(
+            gnmi_sub, "get_subscription_paths", return_value=mode
+        ), mock.patch.object(gnmi_sub, "send_gnmi_get", probe or mock.Mock()):
+            return gnmi_sub.get_subscription_interface_names(self.device_ip)
+
+    def test_modes(self):
+        self.assertEqual(
+            self._interface_names("per_interface"), ["Ethernet0", "Ethernet4"]
+        )
+        self.assertEqual(self._interface_names("wildcard"), ["*"])
+
+    def test_auto_probe(self):
+        probe = mock.Mock()
+        self.assertEqual(self._interface_names("auto", probe), ["*"])
+        self.assertEqual(self._interface_names("auto", probe), ["*"])
+        probe.assert_called_once()
+        path = probe.call_args.kwargs["path"][0]
+        self.assertEqual(path.elem[1].key, {"name": "*"})
+
+    def test_auto_fallback(self):
+        probe = mock.Mock(side_effect=_RpcError(grpc.StatusCode.UNAVAILABLE))
+        self.assertEqual(
+            self._interface_names("auto", probe), ["Ethernet0", "Ethernet4"]
+        )
+        self.assertNotIn(self.device_ip, gnmi_sub.wildcard_path_support)
+        probe = mock.Mock(side_effect=_RpcError(grpc.StatusCode.INVALID_ARGUMENT))
+        self.assertEqual(
+            self._interface_names("auto", probe), ["Ethernet0", "Ethernet4"]
+        )
+        self.assertFalse(gnmi_sub.wildcard_path_support[self.device_ip])
+
+
+class _Call:
+    """Subscription call blocking until cancelled."""
+
+    def __init__(self):
+        self.cancelled = threading.Event()
+
+    def __iter__(self):
+        self.cancelled.wait()
+        raise _RpcError(grpc.StatusCode.CANCELLED)
+
+    def cancel(self):
+        self.cancelled.set()
+
+
+class TestSubscriptionLifecycle(unittest.TestCase):
+    device_ips = [f"10.10.10.{i}" for i in range(1, 51)]
+
+    def setUp(self):
+        self.report_stream_lost = mock.Mock()
+        for name, value in (
+            ("get_subscription_mode", mock.Mock(return_value="thread")),
+            ("get_device_subscriptions", mock.Mock(return_value=[Subscription()])),
+            ("get_subscription_handlers", mock.Mock(return_value={})),
+            ("send_gnmi_subscribe", mock.Mock(side_effect=lambda **kwargs: _Call())),
+            ("get_all_devices_ip_from_db", mock.Mock(return_value=self.device_ips)),
+            ("supervise", mock.Mock()),
+            ("unsupervise", mock.Mock()),
+            ("report_stream_lost", self.report_stream_lost),
+        ):
+            patcher = mock.patch.object(gnmi_sub, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_unsubscribe_all(self):
+        for device_ip in self.device_ips:
+            self.assertTrue(gnmi_sub.gnmi_subscribe(device_ip))
+        handles = list(gnmi_sub.gnmi_subscriptions.values())
+        self.assertTrue(all(gnmi_sub.is_subscribed(ip) for ip in self.device_ips))
+        start = time.monotonic()
+        self.assertTrue(gnmi_sub.gnmi_unsubscribe_for_all_devices_in_db(timeout=5))
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertTrue(all(handle.join(0) for handle in handles))
+        self.assertEqual(gnmi_sub.gnmi_subscriptions, {})
+        self.report_stream_lost.assert_not_called()
+
+    def test_force_resubscribe(self):
+        device_ip = self.device_ips[0]
+        self.assertTrue(gnmi_sub.gnmi_subscribe(device_ip))
+        handle = gnmi_sub.gnmi_subscriptions[device_ip]
+        self.assertTrue(gnmi_sub.gnmi_subscribe(device_ip, force_resubscribe=True))
+        self.assertTrue(handle.join(0))
+        self.assertIsNot(gnmi_sub.gnmi_subscriptions[device_ip], handle)
+        self.assertTrue(gnmi_sub.gnmi_unsubscribe(device_ip))
+        self.report_stream_lost.assert_not_called()
+
+    def test_unsubscribe_clears_telemetry(self):
+        store = telemetry_store.TelemetryStore(max_series=10)
+        for device_ip in self.device_ips[:2]:
+            store.record(device_ip, telemetry_store.GROUP_INTERFACE, "Ethernet0", {"in-octets": 1}, 1)
+            self.assertTrue(gnmi_sub.gnmi_subscribe(device_ip))
+        with mock.patch.object(telemetry_store, "_telemetry_store", store), mock.patch.object(
+            gnmi_sub, "getGrpcStubs"
+        ), mock.patch("orca_nw_lib.gnmi_util.remove_stub"):
+            self.assertTrue(gnmi_sub.gnmi_unsubscribe(self.device_ips[0]))
+            self.assertEqual(store.get_entities(self.device_ips[0], telemetry_store.GROUP_INTERFACE), [])
+            self.assertEqual(
+                store.get_entities(self.device_ips[1], telemetry_store.GROUP_INTERFACE), ["Ethernet0"]
+            )
+            self.assertTrue(gnmi_sub.close_gnmi_channel(self.device_ips[1]))
+        self.assertEqual(store.get_stats()["series"], 0)
@@ -0,0 +1,221 @@
+import threading
+import unittest
+from unittest import mock
+
+from orca_nw_lib import db_cache, db_transaction, interface_db, port_chnl_db, storage_backend
+from orca_nw_lib.db_locks import get_device_lock
+from orca_nw_lib.interface_db import (
+    build_sub_interface_prefix_index,
+    get_interface_owning_ip_from_db,
+    insert_device_interfaces_in_db,
+    invalidate_sub_interface_prefix_index,
+    lookup_sub_interface_prefix_index,
+)
+
+
+class TestSubInterfacePrefixIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = build_sub_interface_prefix_index(
+            [
+                ("10.10.229.50", "Ethernet0", "192.168.1.1", 24),
+                ("10.10.229.51", "Ethernet4", "192.168.1.129", 25),
+                ("10.10.229.52", "Ethernet8", "10.0.0.1", None),
+                ("10.10.229.53", "Ethernet12", "invalid", 24),
+            ]
+        )
+
+    def test_longest_prefix_match(self):
+        self.assertEqual(
+            lookup_sub_interface_prefix_index(self.index, "192.168.1.130"),
+            ("10.10.229.51", "Ethernet4", "192.168.1.129"),
+        )
+        self.assertEqual(
+            lookup_sub_interface_prefix_index(self.index, "192.168.1.2"),
+            ("10.10.229.50", "Ethernet0", "192.168.1.1"),
+        )
+
+    def test_host_address_without_prefix(self):
+        self.assertEqual(
+            lookup_sub_interface_prefix_index(self.index, "10.0.0.1"),
+            ("10.10.229.52", "Ethernet8", "10.0.0.1"),
+        )
+        self.assertIsNone(lookup_sub_interface_prefix_index(self.index, "10.0.0.2"))
+
+    def test_no_match(self):
+        self.assertIsNone(lookup_sub_interface_prefix_index(self.index, "172.16.0.1"))
+        self.assertIsNone(lookup_sub_interface_prefix_index(self.index, "not-an-ip"))
+
+    def test_peer_of_the_same_subnet(self):
+        index = build_sub_interface_prefix_index(
+            [
+                ("10.10.229.50", "Ethernet0", "172.16.0.1", 31),
+                ("10.10.229.51", "Ethernet0", "172.16.0.0", 31),
+            ]
+        )
+        self.assertEqual(
+            lookup_sub_interface_prefix_index(index, "172.16.0.1"),
+            ("10.10.229.50", "Ethernet0", "172.16.0.1"),
+        )
+        self.assertEqual(
+            lookup_sub_interface_prefix_index(index, "172.16.0.0"),
+            ("10.10.229.51", "Ethernet0", "172.16.0.0"),
+        )
+
+    def test_sub_interface_with_ip(self):
+        sub_if = mock.Mock()
+        with mock.patch.object(
+            interface_db, "get_sub_interface_prefix_index", return_value=self.index
+        ), mock.patch.object(
+            interface_db, "get_sub_interface_of_device_from_db", return_value=sub_if
+        ) as get_sub_if:
+            self.assertIs(interface_db.get_sub_interface_with_ip_from_db("192.168.1.129"), sub_if)
+            get_sub_if.assert_called_once_with("10.10.229.51", "192.168.1.129")
+            # In a fabric subnet but not the address of a sub-interface, or external.
+            self.assertIsNone(interface_db.get_sub_interface_with_ip_from_db("192.168.1.130"))
+            self.assertIsNone(interface_db.get_sub_interface_with_ip_from_db("172.16.0.1"))
+            get_sub_if.assert_called_once()
+
+
+class TestSubInterfacePrefixIndexInvalidation(unittest.TestCase):
+    def setUp(self):
+        invalidate_sub_interface_prefix_index()
+
+    def tearDown(self):
+        invalidate_sub_interface_prefix_index()
+
+    def test_index_reused_until_invalidated(self):
+        rows = [("10.10.229.50", "Ethernet0", "192.168.1.1", 24)]
+        with mock.patch.object(
+            interface_db, "get_sub_interface_prefix_rows_from_db", return_value=rows
+        ) as get_rows:
+            get_interface_owning_ip_from_db("192.168.1.2")
+            get_interface_owning_ip_from_db("192.168.1.3")
+            self.assertEqual(get_rows.call_count, 1)
+            invalidate_sub_interface_prefix_index()
+            get_interface_owning_ip_from_db("192.168.1.2")
+            self.assertEqual(get_rows.call_count, 2)
+
+    def test_invalidation_during_rebuild(self):
+        old_rows = [("10.10.229.50", "Ethernet0", "192.168.1.1", 24)]
+        new_rows = [("10.10.229.51", "Ethernet4", "192.168.1.1", 24)]
+
+        reads = [old_rows, new_rows]
+
+        def get_rows():
+            # Interfaces inserted in DB while the first rows are read.
+            if len(reads) == 2:
+                invalidate_sub_interface_prefix_index()
+            return reads.pop(0)
+
+        with mock.patch.object(
+            interface_db, "get_sub_interface_prefix_rows_from_db", side_effect=get_rows
+        ):
+            self.assertEqual(
+                get_interface_owning_ip_from_db("192.168.1.2")[1], "Ethernet0"
+            )
+            self.assertEqual(
+                get_interface_owning_ip_from_db("192.168.1.2")[1], "Ethernet4"
+            )
+
+
+class TestInsertDeviceInterfaces(unittest.TestCase):
+    def test_device_write_locked_for_the_transaction(self):
+        device = mock.Mock(mgt_ip="10.10.229.60")
+        lock = get_device_lock(device.mgt_ip)
+        writers = []
+
+        def insert(*args):
+            writers.append(lock._writer)
+
+        with mock.patch.object(
+            storage_backend, "get_storage_backend", return_value=storage_backend.NEO4J_BACKEND
+        ), mock.patch.object(interface_db, "_insert_device_interfaces_in_db", side_effect=insert):
+            insert_device_interfaces_in_db(device, {mock.Mock(): []})
+        self.assertEqual(writers, [threading.get_ident()])
+        self.assertIsNone(lock._writer)
+
+    def test_bulk_config_devices_write_locked(self):
+        locks = [get_device_lock(ip) for ip in ("10.10.229.61", "10.10.229.62")]
+        writers = []
+
+        def set_config(updates):
+            writers.extend(lock._writer for lock in locks)
+            return len(updates)
+
+        with mock.patch.object(
+            storage_backend, "get_storage_backend", return_value=storage_backend.NEO4J_BACKEND
+        ), mock.patch.object(
+            interface_db, "_set_interfaces_config_in_db_bulk", side_effect=set_config
+        ):
+            updated = interface_db.set_interfaces_config_in_db_bulk(
+                {
+                    ("10.10.229.62", "Ethernet0"): {"mtu": 9100},
+                    ("10.10.229.61", "Ethernet0"): {"mtu": 9100},
+                    ("10.10.229.61", "Ethernet4"): {"enable": False},
+                }
+            )
+        self.assertEqual(updated, 3)
+        self.assertEqual(writers, [threading.get_ident()] * 2)
+        self.assertTrue(all(lock._writer is None for lock in locks))
+
+
+class TestDeviceLockOrdering(unittest.TestCase):
+    device_ip = "10.10.229.70"
+
+    def test_port_channel_insert_and_interface_config_write(self):
+        # Stands for the Neo4j lock of the Ethernet0 node, held until the transaction commits.
+        node_lock = threading.Lock()
+        connected = threading.Event()
+        saving = threading.Event()
+        results = {}
+        interfaces = {name: mock.Mock(name=name) for name in ("Ethernet0", "Ethernet4")}
+        device = mock.Mock(mgt_ip=self.device_ip)
+        device.interfaces.get_or_none.side_effect = lambda name: interfaces[name]
+        port_chnl = mock.Mock()
+
+        def connect(intfc):
+            if intfc is interfaces["Ethernet0"]:
+                node_lock.acquire()
+                connected.set()
+                # The config write now holds the device write lock and waits on Ethernet0.
+                saving.wait(5)
+
+        def save():
+            saving.set()
+            results["saved"] = node_lock.acquire(timeout=5)
+            if results["saved"]:
+                node_lock.release()
+
+        def commit():
+            if node_lock.locked():
+                node_lock.release()
+
+        port_chnl.members.connect.side_effect = connect
+        interfaces["Ethernet0"].save.side_effect = save
+        neo4j = mock.Mock(_active_transaction=None)
+        neo4j.commit.side_effect = commit
+
+        def insert_port_chnl():
+            port_chnl_db.insert_device_port_chnl_in_db(
+                device, {mock.Mock(lag_name="PortChannel1"): ["Ethernet0", "Ethernet4"]}
+            )
+            results["inserted"] = True
+
+        def set_config():
+            connected.wait(5)
+            interface_db.set_interface_config_in_db(self.device_ip, "Ethernet0", mtu=9100)
+
+        with mock.patch.object(
+            storage_backend, "get_storage_backend", return_value=storage_backend.NEO4J_BACKEND
+        ), mock.patch.object(db_cache, "get_db_cache_enabled", return_value=False), mock.patch.object(
+            db_transaction, "db", neo4j
+        ), mock.patch.object(interface_db, "get_device_db_obj", return_value=device), mock.patch.object(
+            port_chnl_db, "get_port_chnl_of_device_from_db", return_value=port_chnl
+        ), mock.patch.object(port_chnl_db, "get_all_port_chnl_of_device_from_db", return_value=[]):
+            threads = [threading.Thread(target=insert_port_chnl), threading.Thread(target=set_config)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join(15)
+        self.assertEqual(results, {"inserted": True, "saved": True})
+        self.assertEqual(port_chnl.members.connect.call_count, 2)
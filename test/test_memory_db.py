@@ -0,0 +1,162 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from orca_nw_lib import discovery, storage_backend, utils
+from orca_nw_lib.common import DiscoveryFeature
+from orca_nw_lib.device_db import get_all_devices_ip_from_db, insert_devices_in_db
+from orca_nw_lib.graph_db_models import Device, Interface, SubInterface, Vlan
+from orca_nw_lib.interface import get_interface, get_interfaces_page, iter_interfaces
+from orca_nw_lib.interface_db import (
+    get_all_interfaces_of_device_from_db,
+    get_interface_by_alias_from_db,
+    get_interface_owning_ip_from_db,
+    insert_device_interfaces_in_db,
+    set_interface_config_in_db,
+)
+from orca_nw_lib.memory_db import (
+    get_memory_store,
+    load_memory_snapshot,
+    save_memory_snapshot,
+)
+from orca_nw_lib.topology_snapshot import (
+    export_topology_snapshot,
+    import_topology_snapshot,
+)
+from orca_nw_lib.vlan import get_vlan
+from orca_nw_lib.vlan_db import get_vlan_mem_ifcs_from_db, insert_vlan_in_db
+
+
+class TestMemoryBackend(unittest.TestCase):
+    ip = "10.10.10.10"
+
+    def setUp(self):
+        patcher = mock.patch.object(
+            storage_backend,
+            "get_storage_backend",
+            return_value=storage_backend.MEMORY_BACKEND,
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        get_memory_store().clear()
+        self.addCleanup(get_memory_store().clear)
+
+        device = Device(mgt_ip=self.ip, hostname="sonic")
+        insert_devices_in_db(device)
+        insert_device_interfaces_in_db(
+            device,
+            {
+                Interface(name="Ethernet0", alias="Eth1/1"): [
+                    SubInterface(ip_address="1.1.1.1", prefix=24)
+                ],
+                Interface(name="Ethernet4", alias="Eth1/2"): [],
+            },
+        )
+        insert_vlan_in_db(
+            device,
+            {
+                Vlan(name="Vlan10", vlanid=10): [
+                    {"ifname": "Ethernet0", "tagging_mode": "tagged"}
+                ]
+            },
+        )
+
+    def test_insert_and_get(self):
+        self.assertEqual(get_all_devices_ip_from_db(), [self.ip])
+        self.assertEqual(
+            {i.name for i in get_all_interfaces_of_device_from_db(self.ip)},
+            {"Ethernet0", "Ethernet4"},
+        )
+        self.assertEqual(
+            get_interface_by_alias_from_db(self.ip, "Eth1/2").name, "Ethernet4"
+        )
+        self.assertEqual(
+            [i.name for i in get_vlan_mem_ifcs_from_db(self.ip, "Vlan10")],
+            ["Ethernet0"],
+        )
+        self.assertEqual(
+            get_interface_owning_ip_from_db("1.1.1.20"),
+            (self.ip, "Ethernet0", "1.1.1.1"),
+        )
+
+    def test_pagination(self):
+        page, cursor = get_interfaces_page(self.ip, limit=1)
+        self.assertEqual([i["name"] for i in page], ["Ethernet0"])
+        self.assertEqual(page[0]["ip_address"][0]["ip_address"], "1.1.1.1")
+        page, cursor = get_interfaces_page(self.ip, cursor=cursor, limit=1)
+        self.assertEqual([i["name"] for i in page], ["Ethernet4"])
+        self.assertEqual(
+            [i["name"] for i in iter_interfaces(self.ip, page_size=1)],
+            ["Ethernet0", "Ethernet4"],
+        )
+        self.assertEqual(get_vlan(self.ip)[0]["members"], ["Ethernet0"])
+
+    def test_list_natural_order(self):
+        insert_device_interfaces_in_db(
+            Device(mgt_ip=self.ip, hostname="sonic"),
+            {Interface(name=name): [] for name in ("Ethernet0", "Ethernet4", "Ethernet100", "Ethernet12")},
+        )
+        self.assertEqual(
+            [i["name"] for i in iter_interfaces(self.ip)],
+            ["Ethernet0", "Ethernet100", "Ethernet12", "Ethernet4"],
+        )
+        self.assertEqual(
+            [i["name"] for i in get_interface(self.ip)],
+            ["Ethernet0", "Ethernet4", "Ethernet12", "Ethernet100"],
+        )
+
+    def test_set_interface_config(self):
+        set_interface_config_in_db(self.ip, "Ethernet4", mtu=9100)
+        self.assertEqual(
+            get_interface_by_alias_from_db(self.ip, "Eth1/2").mtu, 9100
+        )
+
+    def test_snapshot_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "snapshot.json")
+            save_memory_snapshot(path)
+            get_memory_store().clear()
+            self.assertEqual(get_all_devices_ip_from_db(), [])
+            load_memory_snapshot(path)
+        self.assertEqual(get_all_devices_ip_from_db(), [self.ip])
+        self.assertEqual(
+            [i.name for i in get_vlan_mem_ifcs_from_db(self.ip, "Vlan10")],
+            ["Ethernet0"],
+        )
+
+    def test_topology_snapshot_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "snapshot.ndjson.gz")
+            counts = export_topology_snapshot(path)
+            # Device, 2 interfaces, sub-interface and VLAN with their relationships.
+            self.assertEqual(counts, {"nodes": 5, "relationships": 5})
+            get_memory_store().clear()
+            self.assertEqual(import_topology_snapshot(path), counts)
+        self.assertEqual(get_all_devices_ip_from_db(), [self.ip])
+        self.assertEqual(
+            get_interface_owning_ip_from_db("1.1.1.20"),
+            (self.ip, "Ethernet0", "1.1.1.1"),
+        )
+        self.assertEqual(
+            [i.name for i in get_vlan_mem_ifcs_from_db(self.ip, "Vlan10")],
+            ["Ethernet0"],
+        )
+
+    def test_unsupported_feature_not_discovered(self):
+        with mock.patch.object(discovery, "discover_bgp") as discover_bgp:
+            self.assertIsNone(
+                discovery.discover_nw_features(self.ip, DiscoveryFeature.bgp)
+            )
+        discover_bgp.assert_not_called()
+
+
+class TestStorageBackendConfig(unittest.TestCase):
+    def test_memory_backend_not_a_config_setting(self):
+        with mock.patch.dict(utils._settings, {"storage_backend": "memory"}), mock.patch.dict(
+            os.environ, {}, clear=False
+        ):
+            os.environ.pop("storage_backend", None)
+            self.assertEqual(utils.get_storage_backend(), storage_backend.NEO4J_BACKEND)
+            os.environ["storage_backend"] = "memory"
+            self.assertEqual(utils.get_storage_backend(), storage_backend.MEMORY_BACKEND)
@@ -0,0 +1,56 @@
+import time
+import unittest
+
+from orca_nw_lib import metrics
+from orca_nw_lib.gnmi_pb2 import Notification, Path, PathElem, SubscribeResponse
+from orca_nw_lib.gnmi_sub import dispatch_update
+
+
+def _value(name: str, **labels) -> float:
+    for sample_labels, value in metrics.get_metrics().get(name, []):
+        if all(sample_labels.get(k) == v for k, v in labels.items()):
+            return value
+    return 0.0
+
+
+class TestMetrics(unittest.TestCase):
+    device_ip = "10.10.10.250"
+
+    def test_dispatch_update(self):
+        def handle_test_update(device_ip, resp):
+            raise ValueError("bad update")
+
+        resp = SubscribeResponse(
+            update=Notification(
+                timestamp=time.time_ns() - 2 * 10**9,
+                prefix=Path(elem=[PathElem(name="openconfig-test:test")]),
+            )
+        )
+        errors = _value("orca_subscription_handler_errors_total", handler="handle_test_update")
+        with self.assertRaises(ValueError):
+            dispatch_update({"openconfig-test:test": [handle_test_update]}, self.device_ip, resp)
+        self.assertEqual(
+            _value("orca_subscription_messages_total", device_ip=self.device_ip, path_class="test"),
+            1,
+        )
+        self.assertEqual(
+            _value("orca_subscription_handler_errors_total", handler="handle_test_update"),
+            errors + 1,
+        )
+        self.assertEqual(
+            _value("orca_subscription_handler_seconds_count", handler="handle_test_update"), 1
+        )
+        self.assertGreaterEqual(
+            _value("orca_subscription_last_lag_seconds", device_ip=self.device_ip), 2
+        )
+        self.assertGreater(metrics.get_message_rates()[(self.device_ip, "test")], 0)
+        self.assertIn("orca_lane_queue_depth", metrics.get_metrics_text())
+
+    def test_observe_sink(self):
+        with metrics.observe_sink("test_sink"):
+            pass
+        with self.assertRaises(OSError):
+            with metrics.observe_sink("test_sink"):
+                raise OSError()
+        self.assertEqual(_value("orca_sink_write_seconds_count", sink="test_sink"), 2)
+        self.assertEqual(_value("orca_sink_write_errors_total", sink="test_sink"), 1)
@@ -0,0 +1,56 @@
+import unittest
+from unittest import mock
+
+from orca_nw_lib import subscription_profiles
+from orca_nw_lib.gnmi_pb2 import Path, SubscriptionMode
+from orca_nw_lib.subscription_profiles import (
+    PATH_CLASS_CRM,
+    PATH_CLASS_DOM,
+    PATH_CLASS_INTERFACE_COUNTERS,
+    create_subscription,
+)
+
+PROFILES = {
+    "interface_counters": [
+        {"interfaces": "Ethernet(0|4)", "mode": "sample", "sample_interval": 5},
+        {"mode": "SAMPLE", "sample_interval": 30},
+    ],
+    "dom": {
+        "mode": "SAMPLE",
+        "sample_interval": 60,
+        "suppress_redundant": True,
+        "heartbeat_interval": 600,
+    },
+    "crm": [{"mode": "EVERY_NOW_AND_THEN"}],
+}
+
+
+class TestSubscriptionProfiles(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(
+            subscription_profiles, "get_subscription_profiles", return_value=PROFILES
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_interface_selector(self):
+        for if_name, interval in (("Ethernet4", 5), ("Ethernet40", 30), ("*", 30)):
+            sub = create_subscription(Path(), PATH_CLASS_INTERFACE_COUNTERS, if_name)
+            self.assertEqual(sub.mode, SubscriptionMode.SAMPLE)
+            self.assertEqual(sub.sample_interval, interval * 10**9)
+
+    def test_single_rule(self):
+        sub = create_subscription(Path(), PATH_CLASS_DOM)
+        self.assertEqual(sub.sample_interval, 60 * 10**9)
+        self.assertTrue(sub.suppress_redundant)
+        self.assertEqual(sub.heartbeat_interval, 600 * 10**9)
+
+    def test_default(self):
+        self.assertEqual(
+            create_subscription(Path(), "system").mode, SubscriptionMode.TARGET_DEFINED
+        )
+        # Invalid mode falls back to the default mode.
+        self.assertEqual(
+            create_subscription(Path(), PATH_CLASS_CRM).mode,
+            SubscriptionMode.TARGET_DEFINED,
+        )
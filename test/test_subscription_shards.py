@@ -0,0 +1,147 @@
+import os
+import unittest
+from unittest import mock
+
+from orca_nw_lib import subscription_shards
+from orca_nw_lib.gnmi_sub import device_sync_responses
+from orca_nw_lib.subscription_shards import HashRing, ShardCoordinator
+from orca_nw_lib.utils import validate_orca_config
+
+DEVICE_IPS = [f"10.10.{i // 250}.{i % 250 + 1}" for i in range(1000)]
+
+
+class _Worker:
+    """Shard worker keeping its devices in process."""
+
+    def __init__(self, shard):
+        self.shard = shard
+        self.process = mock.Mock(pid=shard, exitcode=None)
+        self.devices = set()
+        self.ready = set()
+        self.alive = True
+
+    def start(self):
+        self.alive = True
+        self.devices = set()
+
+    def is_alive(self):
+        return self.alive
+
+    def stop(self, timeout=5):
+        self.alive = False
+
+    def call(self, command, *args, timeout=None):
+        if command == "subscribe_all":
+            self.devices.update(args[0])
+            return {ip: True for ip in args[0]}
+        if command == "unsubscribe_all":
+            self.devices.difference_update(args[0])
+            return True
+        if command == "status":
+            return {ip: {"subscribed": True, "ready": ip in self.ready} for ip in self.devices}
+        return []
+
+
+class TestHashRing(unittest.TestCase):
+    def test_spread_and_moves(self):
+        ring = HashRing(range(4))
+        before = {ip: ring.get_shard(ip) for ip in DEVICE_IPS}
+        counts = [list(before.values()).count(shard) for shard in range(4)]
+        self.assertTrue(all(150 < count < 350 for count in counts), counts)
+        ring.add(4)
+        after = {ip: ring.get_shard(ip) for ip in DEVICE_IPS}
+        moved = [ip for ip in DEVICE_IPS if before[ip] != after[ip]]
+        self.assertTrue(all(after[ip] == 4 for ip in moved))
+        self.assertLess(len(moved), 350)
+        ring.remove(4)
+        self.assertEqual({ip: ring.get_shard(ip) for ip in DEVICE_IPS}, before)
+
+
+class TestShardWorker(unittest.TestCase):
+    def test_worker_loads_coordinator_config(self):
+        with mock.patch.object(subscription_shards, "_context") as context, mock.patch.object(
+            subscription_shards, "get_orca_config_file", return_value="/etc/orca/orca.yml"
+        ):
+            context.Pipe.return_value = (mock.Mock(), mock.Mock())
+            subscription_shards.ShardWorker(0).start()
+        target, args = (context.Process.call_args.kwargs[k] for k in ("target", "args"))
+        self.assertEqual(args[1], "/etc/orca/orca.yml")
+
+        conn = mock.Mock()
+        ## Coordinator gone, the worker stops right away.
+        conn.recv.side_effect = EOFError
+        with mock.patch.object(subscription_shards, "load_orca_config") as load_orca_config:
+            target(conn, args[1])
+            target(conn, subscription_shards.get_orca_config_file())
+        load_orca_config.assert_called_once_with("/etc/orca/orca.yml")
+
+
+class TestShardCoordinator(unittest.TestCase):
+    def setUp(self):
+        for name, value in (
+            ("ShardWorker", _Worker),
+            ## Workers are checked by the tests only.
+            ("get_subscription_shard_status_interval", mock.Mock(return_value=3600)),
+        ):
+            patcher = mock.patch.object(subscription_shards, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.coordinator = ShardCoordinator(4)
+        self.coordinator.start()
+        self.addCleanup(self.coordinator.stop)
+        self.workers = self.coordinator._workers
+
+    def _devices(self):
+        return {shard: set(worker.devices) for shard, worker in self.workers.items()}
+
+    def test_rebalance(self):
+        self.assertEqual(self.coordinator.rebalance(DEVICE_IPS[:100]), 100)
+        self.assertEqual(sum(len(devices) for devices in self._devices().values()), 100)
+        self.assertEqual(self.coordinator.rebalance(DEVICE_IPS[50:150]), 50)
+        self.assertEqual(
+            set().union(*self._devices().values()), set(DEVICE_IPS[50:150])
+        )
+        before = self._devices()
+        moved = self.coordinator.resize(5)
+        after = self._devices()
+        self.assertEqual(moved, len(after[4]))
+        for shard in range(4):
+            self.assertTrue(after[shard] <= before[shard])
+
+    def test_readiness(self):
+        device_ip = DEVICE_IPS[0]
+        self.assertTrue(self.coordinator.subscribe(device_ip))
+        worker = self.workers[self.coordinator.get_shard(device_ip)]
+        worker.ready.add(device_ip)
+        self.coordinator.check_workers()
+        self.assertTrue(self.coordinator.get_readiness(device_ip)["ready"])
+        self.assertTrue(device_sync_responses.get(device_ip))
+        ## A dead worker is restarted with its devices.
+        worker.alive = False
+        worker.devices.clear()
+        self.coordinator.check_workers()
+        self.assertEqual(worker.devices, {device_ip})
+        self.assertTrue(self.coordinator.unsubscribe_all())
+        self.assertNotIn(device_ip, device_sync_responses)
+        self.assertEqual(self.coordinator.get_readiness(), {})
+
+
+class TestShardedConfig(unittest.TestCase):
+    def test_process_local_state_rejected(self):
+        for env in (
+            {"storage_backend": "memory"},
+            {"db_cache_enabled": "true"},
+            {"telemetry_store": "true"},
+        ):
+            with mock.patch.dict(os.environ, {"subscription_mode": "sharded", **env}):
+                self.assertRaises(ValueError, validate_orca_config)
+        with mock.patch.dict(
+            os.environ,
+            {
+                "subscription_mode": "sharded",
+                "storage_backend": "neo4j",
+                "db_cache_enabled": "false",
+                "telemetry_store": "false",
+            },
+        ):
+            validate_orca_config()
@@ -0,0 +1,122 @@
+import unittest
+from unittest import mock
+
+from orca_nw_lib import discovery, gnmi_sub, subscription_supervisor
+from orca_nw_lib.common import DiscoveryFeature
+from orca_nw_lib.subscription_supervisor import (
+    get_subscription_gap_stats,
+    report_stream_lost,
+    supervise,
+    unsupervise,
+)
+
+
+class TestSubscriptionSupervisor(unittest.TestCase):
+    device_ip = "10.10.10.10"
+
+    def setUp(self):
+        for name, value in (
+            ("get_subscription_reconnect_backoff", 0.01),
+            ("get_subscription_reconnect_max_backoff", 0.02),
+            ("get_subscription_sync_timeout", 0.2),
+            ("get_subscription_resync_features", ["interface", "port_group"]),
+        ):
+            patcher = mock.patch.object(subscription_supervisor, name, return_value=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.dict(subscription_supervisor._gap_stats, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.dict(gnmi_sub.device_sync_responses, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(discovery, "discover_nw_features")
+        self.discover = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(unsupervise, self.device_ip)
+        self.attempts = 0
+
+    def _subscribe(self, device_ip, supervised=True):
+        # The supervisor does not supervise the device again.
+        self.assertFalse(supervised)
+        # The first attempt gets no sync response.
+        self.attempts += 1
+        if self.attempts > 1:
+            gnmi_sub.device_sync_responses[device_ip] = True
+        return True
+
+    def _wait_for_reconnect(self):
+        thread = subscription_supervisor._reconnecting.get(self.device_ip)
+        if thread:
+            thread.join(5)
+
+    def test_reconnect(self):
+        supervise(self.device_ip)
+        with mock.patch.object(gnmi_sub, "gnmi_subscribe", self._subscribe):
+            report_stream_lost(self.device_ip, "GOAWAY")
+            self._wait_for_reconnect()
+        stats = get_subscription_gap_stats(self.device_ip)
+        self.assertEqual(stats["lost"], 1)
+        self.assertEqual(stats["reconnects"], 1)
+        self.assertEqual(stats["attempts"], 2)
+        self.assertFalse(stats["reconnecting"])
+        self.assertGreater(stats["last_gap"], 0)
+        self.assertEqual(
+            [c.args for c in self.discover.call_args_list],
+            [
+                (self.device_ip, DiscoveryFeature.interface),
+                (self.device_ip, DiscoveryFeature.port_group),
+            ],
+        )
+
+    def test_not_supervised(self):
+        with mock.patch.object(gnmi_sub, "gnmi_subscribe") as subscribe:
+            report_stream_lost(self.device_ip)
+            self._wait_for_reconnect()
+        subscribe.assert_not_called()
+        self.assertEqual(get_subscription_gap_stats(self.device_ip), {})
+
+    def test_unsubscribed_before_resync(self):
+        supervise(self.device_ip)
+
+        def synced_then_unsubscribed(device_ip, stopped):
+            unsupervise(device_ip)
+            return True
+
+        with mock.patch.object(gnmi_sub, "gnmi_subscribe", self._subscribe), mock.patch.object(
+            subscription_supervisor, "_wait_for_sync", synced_then_unsubscribed
+        ):
+            report_stream_lost(self.device_ip)
+            self._wait_for_reconnect()
+        self.assertFalse(subscription_supervisor.is_supervised(self.device_ip))
+        self.discover.assert_not_called()
+
+    def test_not_resubscribed_once_unsubscribed(self):
+        supervise(self.device_ip)
+        with mock.patch.object(gnmi_sub, "gnmi_subscribe") as subscribe, mock.patch.object(
+            subscription_supervisor, "get_subscription_reconnect_backoff", return_value=0.5
+        ):
+            report_stream_lost(self.device_ip)
+            unsupervise(self.device_ip)
+            self._wait_for_reconnect()
+        subscribe.assert_not_called()
+        self.assertFalse(subscription_supervisor.is_supervised(self.device_ip))
+
+    def test_unsubscribed_while_resubscribing(self):
+        supervise(self.device_ip)
+
+        def subscribe_then_unsubscribed(device_ip, supervised=True):
+            # The lock is not held while subscribing.
+            self.assertTrue(subscription_supervisor._lock.acquire(blocking=False))
+            subscription_supervisor._lock.release()
+            unsupervise(device_ip)
+            return True
+
+        with mock.patch.object(
+            gnmi_sub, "gnmi_subscribe", subscribe_then_unsubscribed
+        ), mock.patch.object(gnmi_sub, "gnmi_unsubscribe") as unsubscribe:
+            report_stream_lost(self.device_ip)
+            self._wait_for_reconnect()
+        unsubscribe.assert_called_once_with(self.device_ip)
+        self.assertEqual(get_subscription_gap_stats(self.device_ip)["reconnects"], 0)
+        self.discover.assert_not_called()
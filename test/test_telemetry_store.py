@@ -0,0 +1,76 @@
+import unittest
+from unittest import mock
+
+from orca_nw_lib import telemetry_store
+from orca_nw_lib.gnmi_pb2 import (
+    Notification,
+    Path,
+    PathElem,
+    SubscribeResponse,
+    TypedValue,
+    Update,
+)
+from orca_nw_lib.telemetry_store import (
+    GROUP_INTERFACE,
+    TelemetryStore,
+    get_live_counters,
+    store_interface_counters,
+)
+
+
+class TestTelemetryStore(unittest.TestCase):
+    device_ip = "10.10.10.10"
+
+    def setUp(self):
+        self.store = TelemetryStore(max_series=4)
+
+    def test_record(self):
+        self.store.record(
+            self.device_ip,
+            GROUP_INTERFACE,
+            "Ethernet0",
+            {"in-octets": 2**62 + 1, "temperature": 31.5},
+            1,
+        )
+        self.store.record(self.device_ip, GROUP_INTERFACE, "Ethernet0", {"in-octets": 7}, 2)
+        self.assertEqual(
+            self.store.get(self.device_ip, GROUP_INTERFACE, "Ethernet0"),
+            {"in-octets": (7, 2), "temperature": (31.5, 1)},
+        )
+        self.assertEqual(self.store.get(self.device_ip, GROUP_INTERFACE, "Ethernet4"), {})
+
+    def test_max_series(self):
+        for i in range(3):
+            self.store.record(
+                self.device_ip, GROUP_INTERFACE, f"Ethernet{i}", {"in-octets": i, "out-octets": i}, 1
+            )
+        stats = self.store.get_stats()
+        self.assertEqual(stats["series"], 4)
+        self.assertEqual(stats["rejected"], 2)
+        self.assertEqual(self.store.get_entities(self.device_ip, GROUP_INTERFACE), ["Ethernet0", "Ethernet1"])
+        self.store.clear_device(self.device_ip)
+        self.assertEqual(self.store.get_stats()["series"], 0)
+        self.store.record("10.10.10.11", GROUP_INTERFACE, "Ethernet0", {"in-octets": 1}, 1)
+        self.assertEqual(len(self.store._int_values), 4)
+
+    def test_store_interface_counters(self):
+        resp = SubscribeResponse(
+            update=Notification(
+                timestamp=5,
+                prefix=Path(
+                    elem=[
+                        PathElem(name="openconfig-interfaces:interfaces"),
+                        PathElem(name="interface", key={"name": "Ethernet0"}),
+                        PathElem(name="state"),
+                        PathElem(name="counters"),
+                    ]
+                ),
+                update=[
+                    Update(path=Path(elem=[PathElem(name="in-octets")]), val=TypedValue(uint_val=100)),
+                    Update(path=Path(elem=[PathElem(name="last-clear")]), val=TypedValue(string_val="never")),
+                ],
+            )
+        )
+        with mock.patch.object(telemetry_store, "_telemetry_store", self.store):
+            store_interface_counters(self.device_ip, resp)
+            self.assertEqual(get_live_counters(self.device_ip, "Ethernet0"), {"in-octets": (100, 5)})
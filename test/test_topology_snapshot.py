@@ -0,0 +1,147 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from orca_nw_lib import db_transaction, device_db, storage_backend, topology_snapshot
+from orca_nw_lib.topology_snapshot import (
+    export_topology_snapshot,
+    import_topology_snapshot,
+)
+
+
+def _export_query(query, params):
+    if params["after"]:
+        return [], None
+    if "MATCH (n)" in query:
+        return [
+            ["4:n:0", ["Device"], {"mgt_ip": "10.10.10.10"}],
+            ["4:n:1", ["Interface"], {"name": "Ethernet0"}],
+        ], None
+    return [["5:r:0", "HAS", "4:n:0", "4:n:1", {}]], None
+
+
+def _import_query(query, params=None):
+    if "UNWIND" in query:
+        return [[len(params["rows"])]], None
+    return [], None
+
+
+class TestTopologySnapshot(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(db_transaction, "db")
+        patcher.start()._active_transaction = None
+        self.addCleanup(patcher.stop)
+        backend_patcher = mock.patch.object(
+            storage_backend, "get_storage_backend", return_value=storage_backend.NEO4J_BACKEND
+        )
+        backend_patcher.start()
+        self.addCleanup(backend_patcher.stop)
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.path = os.path.join(tmp_dir.name, "snapshot.ndjson.gz")
+
+    def test_export_import(self):
+        with mock.patch.object(
+            topology_snapshot.db, "cypher_query", side_effect=_export_query
+        ):
+            self.assertEqual(
+                export_topology_snapshot(self.path), {"nodes": 2, "relationships": 1}
+            )
+
+        with mock.patch.object(
+            topology_snapshot.db, "cypher_query", side_effect=_import_query
+        ) as cypher_query:
+            self.assertEqual(
+                import_topology_snapshot(self.path), {"nodes": 2, "relationships": 1}
+            )
+        queries = [c.args[0] for c in cypher_query.call_args_list]
+        creates = [q for q in queries if "UNWIND" in q]
+        # One statement per label set, then one per relationship type.
+        self.assertEqual(len(creates), 3)
+        self.assertIn("`Device`", creates[0])
+        self.assertIn("`HAS`", creates[2])
+        # Existing nodes are deleted only once all the nodes are staged.
+        deletes = [i for i, q in enumerate(queries) if "DETACH DELETE" in q]
+        self.assertEqual(len(deletes), 1)
+        self.assertGreater(deletes[0], queries.index(creates[2]))
+        self.assertIn("NOT n:OrcaSnapshotImport", queries[deletes[0]])
+
+    def test_truncated_snapshot(self):
+        with mock.patch.object(
+            topology_snapshot.db, "cypher_query", side_effect=_export_query
+        ):
+            export_topology_snapshot(self.path)
+        with topology_snapshot._open_snapshot(self.path, "r") as f:
+            lines = f.readlines()[:-1]
+        with topology_snapshot._open_snapshot(self.path, "w") as f:
+            f.writelines(lines)
+
+        with mock.patch.object(
+            topology_snapshot.db, "cypher_query", return_value=([], None)
+        ) as cypher_query, mock.patch.object(
+            topology_snapshot, "create_db_index"
+        ) as create_index:
+            self.assertRaises(ValueError, import_topology_snapshot, self.path)
+        # Existing nodes are left untouched, nothing is written in DB.
+        cypher_query.assert_not_called()
+        create_index.assert_not_called()
+
+    def test_failed_import_deletes_staged_nodes(self):
+        with mock.patch.object(
+            topology_snapshot.db, "cypher_query", side_effect=_export_query
+        ):
+            export_topology_snapshot(self.path)
+
+        def fail_relationships(query, params=None):
+            if "CREATE (a)-[r:" in query:
+                raise RuntimeError("DB unavailable")
+            return [], None
+
+        with mock.patch.object(
+            topology_snapshot.db, "cypher_query", side_effect=fail_relationships
+        ) as cypher_query:
+            self.assertRaises(RuntimeError, import_topology_snapshot, self.path)
+        queries = [c.args[0] for c in cypher_query.call_args_list]
+        deletes = [q for q in queries if "DETACH DELETE" in q]
+        self.assertEqual(len(deletes), 1)
+        self.assertIn("MATCH (n:OrcaSnapshotImport)", deletes[0])
+
+    def test_missing_rows_fail_the_import(self):
+        with mock.patch.object(
+            topology_snapshot.db, "cypher_query", side_effect=_export_query
+        ):
+            export_topology_snapshot(self.path)
+
+        def drop_relationships(query, params=None):
+            if "CREATE (a)-[r:" in query:
+                # End nodes deleted meanwhile, e.g. by the orphan sweeper.
+                return [[0]], None
+            return _import_query(query, params)
+
+        with mock.patch.object(
+            topology_snapshot.db, "cypher_query", side_effect=drop_relationships
+        ) as cypher_query:
+            self.assertRaises(ValueError, import_topology_snapshot, self.path)
+        queries = [c.args[0] for c in cypher_query.call_args_list]
+        self.assertFalse(any("REMOVE n:OrcaSnapshotImport" in q for q in queries))
+        self.assertTrue(any("MATCH (n:OrcaSnapshotImport) WITH n LIMIT" in q for q in queries))
+
+    def test_orphan_sweep_skips_staged_nodes(self):
+        with mock.patch.object(
+            device_db.db, "cypher_query", return_value=([[0]], None)
+        ) as cypher_query:
+            device_db.sweep_orphan_nodes_in_db()
+        for c in cypher_query.call_args_list:
+            self.assertIn("NOT n:OrcaSnapshotImport", c.args[0])
+
+    def test_orphan_sweep_per_label(self):
+        with mock.patch.object(
+            device_db.db, "cypher_query", return_value=([], None)
+        ) as cypher_query:
+            self.assertEqual(device_db.sweep_orphan_nodes_in_db(), 0)
+        # One label scoped collection per label and nothing to delete.
+        self.assertEqual(
+            [c.args[0].split(" WHERE")[0] for c in cypher_query.call_args_list],
+            [f"MATCH (n:{label})" for label in device_db.DEVICE_OWNED_LABELS],
+        )
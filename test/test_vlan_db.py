@@ -0,0 +1,70 @@
+import unittest
+from unittest import mock
+
+from orca_nw_lib import storage_backend, vlan_db
+from orca_nw_lib.vlan_db import diff_vlan_members
+
+
+class TestDiffVlanMembers(unittest.TestCase):
+    def test_diff_vlan_members(self):
+        existing = {
+            ("Vlan1", "MEMBER_IF", "Ethernet0"): "tagged",
+            ("Vlan1", "MEMBER_IF", "Ethernet4"): "tagged",
+            ("Vlan2", "MEMBER_PORT_CHANNEL", "PortChannel1"): "untagged",
+        }
+        desired = {
+            ("Vlan1", "MEMBER_IF", "Ethernet0"): "tagged",
+            ("Vlan1", "MEMBER_IF", "Ethernet4"): "untagged",
+            ("Vlan2", "MEMBER_IF", "Ethernet8"): "tagged",
+        }
+        to_remove, to_upsert = diff_vlan_members(existing, desired)
+        self.assertEqual(to_remove, [("Vlan2", "MEMBER_PORT_CHANNEL", "PortChannel1")])
+        self.assertEqual(
+            sorted(to_upsert),
+            [
+                (("Vlan1", "MEMBER_IF", "Ethernet4"), "untagged"),
+                (("Vlan2", "MEMBER_IF", "Ethernet8"), "tagged"),
+            ],
+        )
+
+    def test_diff_vlan_members_no_change(self):
+        members = {("Vlan1", "MEMBER_IF", "Ethernet0"): "tagged"}
+        self.assertEqual(diff_vlan_members(members, dict(members)), ([], []))
+
+
+class TestSyncVlanMembers(unittest.TestCase):
+    device_ip = "10.10.10.10"
+
+    def test_port_channel_member_removed(self):
+        calls = []
+
+        def cypher_query(query, params=None, *args, **kwargs):
+            calls.append((query, params))
+            if "RETURN" in query:
+                ## Port channels are read by lag_name, not by name which is the protocol.
+                self.assertIn("WHEN 'MEMBER_PORT_CHANNEL' THEN m.lag_name", query)
+                return [
+                    ("Vlan1", "MEMBER_IF", "Ethernet0", "tagged"),
+                    ("Vlan1", "MEMBER_PORT_CHANNEL", "PortChannel1", "tagged"),
+                    ("Vlan1", "MEMBER_PORT_CHANNEL", "PortChannel2", "untagged"),
+                ], []
+            return [], []
+
+        with mock.patch.object(vlan_db.db, "cypher_query", cypher_query), mock.patch.object(
+            storage_backend, "get_storage_backend", return_value=storage_backend.NEO4J_BACKEND
+        ):
+            vlan_db.sync_vlan_members_in_db(
+                self.device_ip,
+                {
+                    "Vlan1": [
+                        {"ifname": "Ethernet0", "tagging_mode": "tagged"},
+                        {"ifname": "PortChannel2", "tagging_mode": "untagged"},
+                    ]
+                },
+            )
+        writes = calls[1:]
+        self.assertEqual(len(writes), 1)
+        query, params = writes[0]
+        self.assertIn("DELETE r", query)
+        self.assertIn("PortChannel {lag_name: row.ifname}", query)
+        self.assertEqual(params["rows"], [{"vlan": "Vlan1", "ifname": "PortChannel1"}])
@@ -0,0 +1,106 @@
+import threading
+import unittest
+
+from orca_nw_lib.worker_pool import (
+    POLICY_BLOCK,
+    POLICY_DROP_OLDEST,
+    POLICY_KEEP_LATEST,
+    ShardedWorkerPool,
+)
+
+
+class TestShardedWorkerPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = ShardedWorkerPool("test_pool", workers=4, queue_size=2)
+        self.addCleanup(self.pool.shutdown)
+
+    def test_order_per_key(self):
+        results = {}
+        lock = threading.Lock()
+
+        def record(key, value):
+            with lock:
+                results.setdefault(key, []).append(value)
+
+        keys = [("10.10.10.10", f"Ethernet{i}") for i in range(8)]
+        for value in range(50):
+            for key in keys:
+                self.pool.submit(key, record, key, value)
+        self.pool.join()
+        for key in keys:
+            self.assertEqual(results[key], list(range(50)))
+        stats = self.pool.get_stats()
+        self.assertEqual(stats["completed"], 400)
+        self.assertEqual(stats["queue_depths"], [0, 0, 0, 0])
+
+    def test_failed_task(self):
+        def fail():
+            raise ValueError()
+
+        self.pool.submit("key", fail)
+        self.pool.join()
+        self.assertEqual(self.pool.get_stats()["failed"], 1)
+
+
+class TestShardedWorkerPoolPolicies(unittest.TestCase):
+    def _lane(self, policy):
+        lane = ShardedWorkerPool("test_lane", workers=1, queue_size=3, policy=policy)
+        self.addCleanup(lane.shutdown)
+        # Holds the worker until released, so that tasks stay queued.
+        self.release = threading.Event()
+        self.handled = []
+        held = threading.Event()
+
+        def hold():
+            held.set()
+            self.release.wait()
+
+        lane.submit("hold", hold)
+        held.wait()
+        return lane
+
+    def _submit(self, lane, key, value):
+        lane.submit(key, self.handled.append, value)
+
+    def test_keep_latest(self):
+        lane = self._lane(POLICY_KEEP_LATEST)
+        for value in range(3):
+            self._submit(lane, "Ethernet0", ("Ethernet0", value))
+        self._submit(lane, "Ethernet4", ("Ethernet4", 0))
+        self._submit(lane, "Ethernet8", ("Ethernet8", 0))
+        self._submit(lane, "Ethernet12", ("Ethernet12", 0))
+        self.assertEqual(lane.get_stats()["queue_depths"], [3])
+        self.release.set()
+        lane.join()
+        self.assertEqual(
+            self.handled, [("Ethernet4", 0), ("Ethernet8", 0), ("Ethernet12", 0)]
+        )
+        stats = lane.get_stats()
+        self.assertEqual(stats["coalesced"], 2)
+        self.assertEqual(stats["dropped"], 1)
+        self.assertEqual(stats["completed"], 4)
+
+    def test_drop_oldest(self):
+        lane = self._lane(POLICY_DROP_OLDEST)
+        for value in range(5):
+            self._submit(lane, "Ethernet0", value)
+        self.release.set()
+        lane.join()
+        self.assertEqual(self.handled, [2, 3, 4])
+        self.assertEqual(lane.get_stats()["dropped"], 2)
+
+    def test_block(self):
+        lane = self._lane(POLICY_BLOCK)
+        for value in range(3):
+            self._submit(lane, "Ethernet0", value)
+        blocked = threading.Thread(target=self._submit, args=(lane, "Ethernet0", 3))
+        blocked.start()
+        blocked.join(0.1)
+        self.assertTrue(blocked.is_alive())
+        self.release.set()
+        blocked.join()
+        lane.join()
+        self.assertEqual(self.handled, [0, 1, 2, 3])
+        stats = lane.get_stats()
+        self.assertEqual(stats["blocked"], 1)
+        self.assertEqual(stats["dropped"], 0)